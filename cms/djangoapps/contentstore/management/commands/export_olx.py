@@ -15,19 +15,15 @@ At present, it differs from Studio exports in several ways:
 """
 
 import os
-import re
-import shutil
-import tarfile
-from tempfile import mkdtemp, mktemp
+from tempfile import mktemp
 from textwrap import dedent
 
 from django.core.management.base import BaseCommand, CommandError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey
-from path import Path as path
 
 from xmodule.modulestore.django import modulestore
-from xmodule.modulestore.xml_exporter import export_course_to_xml
+from xmodule.modulestore.xml_exporter import export_course_to_tar
 
 
 class Command(BaseCommand):
@@ -73,16 +69,6 @@ class Command(BaseCommand):
 
 def export_course_to_tarfile(course_key, filename):
     """Exports a course into a tar.gz file"""
-    tmp_dir = mkdtemp()
-    try:
-        course_dir = export_course_to_directory(course_key, tmp_dir)
-        compress_directory(course_dir, filename)
-    finally:
-        shutil.rmtree(tmp_dir, ignore_errors=True)
-
-
-def export_course_to_directory(course_key, root_dir):
-    """Export course into a directory"""
     store = modulestore()
     course = store.get_course(course_key)
     if course is None:
@@ -93,15 +79,6 @@ def export_course_to_directory(course_key, root_dir):
     # TODO: Once we support courses with unicode characters, we will need to revisit this.
     course_dir = course.url_name
 
-    export_course_to_xml(store, None, course.id, root_dir, course_dir)
-
-    export_dir = path(root_dir) / course_dir
-    return export_dir
-
-
-def compress_directory(directory, filename):
-    """Compress a directory into a tar.gz file"""
-    mode = 'w:gz'
-    name = path(directory).name
-    with tarfile.open(filename, mode) as tar_file:
-        tar_file.add(directory, arcname=name)
+    # The course is exported straight into the tar file, without staging it in a directory.
+    with open(filename, 'wb') as tar_file:
+        export_course_to_tar(store, None, course.id, tar_file, course_dir)
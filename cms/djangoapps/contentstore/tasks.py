@@ -10,7 +10,7 @@ import shutil
 import tarfile
 from datetime import datetime
 from math import ceil
-from tempfile import NamedTemporaryFile, mkdtemp
+from tempfile import NamedTemporaryFile
 
 from celery import group
 from celery.task import task
@@ -51,7 +51,7 @@ from xmodule.exceptions import SerializationError
 from xmodule.modulestore import COURSE_ROOT, LIBRARY_ROOT
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import DuplicateCourseError, ItemNotFoundError
-from xmodule.modulestore.xml_exporter import export_course_to_xml, export_library_to_xml
+from xmodule.modulestore.xml_exporter import export_course_to_tar, export_library_to_tar
 from xmodule.modulestore.xml_importer import import_course_from_xml, import_library_from_xml
 from xmodule.video_module.transcripts_utils import (
     Transcript,
@@ -456,9 +456,22 @@ def rerun_course(source_course_key_string, destination_course_key_string, user_i
 
         # use the split modulestore as the store for the rerun course,
         # as the Mongo modulestore doesn't support multiple runs of the same course.
+        def report_asset_progress(copied, total):
+            """
+            Reports the progress of the copy of the course's assets.
+            """
+            LOGGER.info(u'Course Rerun %s: copied %d of %d assets', destination_course_key, copied, total)
+            CourseRerunState.objects.progressed(
+                course_key=destination_course_key,
+                message=u'Copied {copied} of {total} assets'.format(copied=copied, total=total),
+            )
+
         store = modulestore()
         with store.default_store('split'):
-            store.clone_course(source_course_key, destination_course_key, user_id, fields=fields)
+            store.clone_course(
+                source_course_key, destination_course_key, user_id, fields=fields,
+                asset_progress_callback=report_asset_progress,
+            )
 
         # set initial permissions for the user to access the course.
         initialize_permissions(destination_course_key, User.objects.get(id=user_id))
@@ -637,20 +650,19 @@ def create_export_tarball(course_module, course_key, context, status=None):
     """
     name = course_module.url_name
     export_file = NamedTemporaryFile(prefix=name + '.', suffix=".tar.gz")
-    root_dir = path(mkdtemp())
 
     try:
+        # The export is written straight into the tar file, without staging it in a directory.
+        LOGGER.debug(u'tar file being generated at %s', export_file.name)
         if isinstance(course_key, LibraryLocator):
-            export_library_to_xml(modulestore(), contentstore(), course_key, root_dir, name)
+            export_library_to_tar(modulestore(), contentstore(), course_key, export_file, name)
         else:
-            export_course_to_xml(modulestore(), contentstore(), course_module.id, root_dir, name)
+            export_course_to_tar(modulestore(), contentstore(), course_module.id, export_file, name)
+        export_file.seek(0)
 
         if status:
             status.set_state(u'Compressing')
             status.increment_completed_steps()
-        LOGGER.debug(u'tar file being generated at %s', export_file.name)
-        with tarfile.open(name=export_file.name, mode='w:gz') as tar_file:
-            tar_file.add(root_dir / name, arcname=name)
 
     except SerializationError as exc:
         LOGGER.exception(u'There was an error exporting %s', course_key, exc_info=True)
@@ -683,9 +695,6 @@ def create_export_tarball(course_module, course_key, context, status=None):
         if status:
             status.fail(json.dumps({'raw_error_msg': context['raw_err_msg']}))
         raise
-    finally:
-        if os.path.exists(root_dir / name):
-            shutil.rmtree(root_dir / name)
 
     return export_file
 
@@ -869,7 +878,8 @@ def import_olx(self, user_id, course_key_string, archive_path, archive_name, lan
             settings.GITHUB_REPO_ROOT, [dirpath],
             load_error_modules=False,
             static_content_store=contentstore(),
-            target_id=courselike_key
+            target_id=courselike_key,
+            import_workers=getattr(settings, 'COURSE_IMPORT_WORKERS', 0),
         )
 
         new_location = courselike_items[0].location
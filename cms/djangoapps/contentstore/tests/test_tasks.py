@@ -21,6 +21,8 @@ from contentstore.tests.test_libraries import LibraryTestCase
 from contentstore.tests.utils import CourseTestCase
 from course_action_state.models import CourseRerunState
 from openedx.core.djangoapps.embargo.models import Country, CountryAccessRule, RestrictedCourse
+from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.django import contentstore
 from xmodule.modulestore.django import modulestore
 
 TEST_DATA_CONTENTSTORE = copy.deepcopy(settings.CONTENTSTORE)
@@ -53,7 +55,7 @@ class ExportCourseTestCase(CourseTestCase):
         output = artifacts[0]
         self.assertEqual(output.name, 'Output')
 
-    @mock.patch('contentstore.tasks.export_course_to_xml', side_effect=side_effect_exception)
+    @mock.patch('contentstore.tasks.export_course_to_tar', side_effect=side_effect_exception)
     def test_exception(self, mock_export):  # pylint: disable=unused-argument
         """
         The export task should fail gracefully if an exception is thrown
@@ -161,3 +163,17 @@ class RerunCourseTaskTestCase(CourseTestCase):
             restricted_course=restricted_course,
             country=restricted_country
         )
+
+    def test_asset_progress(self):
+        """ The task should copy the course's assets, and report its progress. """
+        old_course_key = self.course.id
+        new_course_key = CourseLocator(org=old_course_key.org, course=old_course_key.course, run='rerun')
+        asset_key = old_course_key.make_asset_key('asset', 'sample.txt')
+        contentstore().save(StaticContent(asset_key, 'sample.txt', 'text/plain', 'sample'))
+
+        with mock.patch.object(CourseRerunState.objects, 'progressed') as mock_progressed:
+            self._rerun_course(old_course_key, new_course_key)
+
+        mock_progressed.assert_called_once_with(course_key=new_course_key, message=u'Copied 1 of 1 assets')
+        copied_asset = contentstore().find(new_course_key.make_asset_key('asset', 'sample.txt'))
+        self.assertEqual(copied_asset.data, 'sample')
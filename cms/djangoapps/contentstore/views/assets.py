@@ -539,7 +539,7 @@ def delete_asset(course_key, asset_key):
     _save_content_to_trash(content)
 
     _delete_thumbnail(content.thumbnail_location, course_key, asset_key)
-    contentstore().delete(content.get_id())
+    contentstore().delete(content.location)
     del_cached_content(content.location)
 
 
@@ -561,7 +561,7 @@ def _delete_thumbnail(thumbnail_location, course_key, asset_key):
         try:
             thumbnail_content = contentstore().find(thumbnail_location)
             _save_content_to_trash(thumbnail_content)
-            contentstore().delete(thumbnail_content.get_id())
+            contentstore().delete(thumbnail_content.location)
             del_cached_content(thumbnail_location)
         except Exception:  # pylint: disable=broad-except
             logging.warning('Could not delete thumbnail: %s', thumbnail_location)
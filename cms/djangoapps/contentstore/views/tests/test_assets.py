@@ -21,7 +21,7 @@ from contentstore.views import assets
 from static_replace import replace_static_urls
 from xmodule.assetstore import AssetMetadata
 from xmodule.contentstore.content import StaticContent
-from xmodule.contentstore.django import contentstore
+from xmodule.contentstore.django import ASSET_CHANGED, contentstore
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.xml_importer import import_course_from_xml
@@ -517,6 +517,18 @@ class DeleteAssetTestCase(AssetsTestCase):
         resp = self.client.delete(test_url, HTTP_ACCEPT="application/json")
         self.assertEquals(resp.status_code, 204)
 
+    def test_delete_asset_invalidates_asset_index(self):
+        """ Tests that deleting an asset tells the contentserver its course's assets changed """
+        receiver = mock.Mock()
+        ASSET_CHANGED.connect(receiver)
+        self.addCleanup(ASSET_CHANGED.disconnect, receiver)
+
+        test_url = reverse_course_url(
+            'assets_handler', self.course.id, kwargs={'asset_key_string': unicode(self.uploaded_url)})
+        resp = self.client.delete(test_url, HTTP_ACCEPT="application/json")
+        self.assertEquals(resp.status_code, 204)
+        self.assertIn(self.course.id, [kwargs['course_key'] for __, kwargs in receiver.call_args_list])
+
     def test_delete_image_type_asset(self):
         """ Tests deletion of image type asset """
         image_asset = self.get_sample_asset(self.asset_name, asset_type="image")
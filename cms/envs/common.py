@@ -619,6 +619,25 @@ MODULESTORE = {
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ()
 
+# Maximum total size, in bytes, of the pickled data of the course structures
+# that each process keeps decoded in memory, in front of the
+# 'course_structure_cache'.  0 means don't keep any.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Maximum total size, in bytes, of the chunks of streamed course assets (those
+# too large for the 'course_assets' cache) that each process keeps, for both
+# full and ranged responses.  The chunks are kept in memory, unless
+# CONTENTSERVER_CHUNK_CACHE_DIR is the path of a local directory in which to
+# keep them, shared by the processes of the host, whose total size the processes
+# also keep within CONTENTSERVER_CHUNK_CACHE_MAX_BYTES.  0 means don't keep any.
+CONTENTSERVER_CHUNK_CACHE_MAX_BYTES = 64 * 1024 * 1024
+CONTENTSERVER_CHUNK_CACHE_DIR = None
+
+# Maximum total size, in bytes, of the indexes of course asset metadata that
+# each process mirrors from the 'course_assets' cache, so that the contentserver
+# can check assets without querying the contentstore.  0 disables the index.
+CONTENTSERVER_ASSET_INDEX_MAX_BYTES = 16 * 1024 * 1024
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -632,6 +651,14 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Pool of pre-started sandbox workers, see capa.safe_exec.pool.
+    'pool': {
+        # How many workers does each process keep running?  0 means don't pool.
+        'size': 0,
+        # How many executions does a worker run before it is replaced?
+        'max_executions': 100,
+    },
 }
 
 ############################ DJANGO_BUILTINS ################################
@@ -700,6 +727,10 @@ MESSAGE_STORAGE = 'django.contrib.messages.storage.session.SessionStorage'
 
 COURSE_IMPORT_EXPORT_STORAGE = 'django.core.files.storage.FileSystemStorage'
 
+# The number of threads which upload a course's static files during a Studio
+# import, while its modules are written.  0 imports the files one by one first.
+COURSE_IMPORT_WORKERS = 4
+
 ##### EMBARGO #####
 EMBARGO_SITE_REDIRECT_URL = None
 
@@ -1031,7 +1062,7 @@ INSTALLED_APPS = [
     # For CMS
     'contentstore.apps.ContentstoreConfig',
 
-    'openedx.core.djangoapps.contentserver',
+    'openedx.core.djangoapps.contentserver.apps.ContentServerConfig',
     'course_creators',
     'openedx.core.djangoapps.external_auth',
     'student.apps.StudentConfig',  # misleading name due to sharing with lms
@@ -373,6 +373,8 @@ else:
 
 USER_TASKS_ARTIFACT_STORAGE = COURSE_IMPORT_EXPORT_STORAGE
 
+COURSE_IMPORT_WORKERS = ENV_TOKENS.get('COURSE_IMPORT_WORKERS', COURSE_IMPORT_WORKERS)
+
 DATABASES = AUTH_TOKENS['DATABASES']
 
 # The normal database user does not have enough permissions to run migrations.
@@ -390,6 +392,16 @@ for name, database in DATABASES.items():
         })
 
 MODULESTORE = convert_module_store_setting_if_needed(AUTH_TOKENS.get('MODULESTORE', MODULESTORE))
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES', COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES
+)
+CONTENTSERVER_CHUNK_CACHE_MAX_BYTES = ENV_TOKENS.get(
+    'CONTENTSERVER_CHUNK_CACHE_MAX_BYTES', CONTENTSERVER_CHUNK_CACHE_MAX_BYTES
+)
+CONTENTSERVER_CHUNK_CACHE_DIR = ENV_TOKENS.get('CONTENTSERVER_CHUNK_CACHE_DIR', CONTENTSERVER_CHUNK_CACHE_DIR)
+CONTENTSERVER_ASSET_INDEX_MAX_BYTES = ENV_TOKENS.get(
+    'CONTENTSERVER_ASSET_INDEX_MAX_BYTES', CONTENTSERVER_ASSET_INDEX_MAX_BYTES
+)
 
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ENV_TOKENS.get(
     'MODULESTORE_FIELD_OVERRIDE_PROVIDERS',
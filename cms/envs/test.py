@@ -174,6 +174,9 @@ CACHES = {
     },
 }
 
+# Tests count the structures loaded from the modulestore.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES = 0
+
 ################################# CELERY ######################################
 
 CELERY_ALWAYS_EAGER = True
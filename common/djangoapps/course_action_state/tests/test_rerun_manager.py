@@ -74,6 +74,16 @@ class TestCourseRerunStateManager(TestCase):
         )
         self.verify_rerun_state()
 
+    def test_rerun_progressed(self):
+        self.initiate_rerun()
+
+        CourseRerunState.objects.progressed(course_key=self.course_key, message="Copied 1 of 2 assets")
+        self.expected_rerun_state.update({
+            'state': CourseRerunUIStateManager.State.IN_PROGRESS,
+            'message': "Copied 1 of 2 assets",
+        })
+        self.verify_rerun_state()
+
     def test_rerun_succeeded(self):
         # initiate
         self.initiate_rerun()
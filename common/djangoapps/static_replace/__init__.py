@@ -30,6 +30,34 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+# The url regexes which don't depend on the settings are compiled once.
+_COURSE_URL_REGEX = re.compile(_url_replace_regex('/course/'))
+_JUMP_TO_ID_URL_REGEX = re.compile(_url_replace_regex('/jump_to_id/'))
+
+# The compiled regexes of CourseUrlRewriter, keyed by (STATIC_URL, data directory).
+_COMBINED_URL_REGEXES = {}
+
+
+def _combined_url_replace_regex(data_dir):
+    """
+    Returns the compiled regex matching the static, course and jump_to_id urls
+    in quotes.  The prefix of the url is captured in the group named after its
+    kind: 'static', 'course' or 'jump_to_id'.
+    """
+    key = (settings.STATIC_URL, data_dir)
+    if key not in _COMBINED_URL_REGEXES:
+        static_prefix = u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+            static_url=settings.STATIC_URL,
+            data_dir=data_dir
+        )
+        _COMBINED_URL_REGEXES[key] = re.compile(_url_replace_regex(
+            u'(?P<static>{static_prefix})|(?P<course>/course/)|(?P<jump_to_id>/jump_to_id/)'.format(
+                static_prefix=static_prefix
+            )
+        ))
+    return _COMBINED_URL_REGEXES[key]
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -71,7 +99,7 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    return _JUMP_TO_ID_URL_REGEX.sub(replace_jump_to_id_url, text)
 
 
 def replace_course_urls(text, course_key):
@@ -91,7 +119,19 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return _COURSE_URL_REGEX.sub(replace_course_url, text)
+
+
+def _is_xblock_resource_url(full_url):
+    """
+    Returns whether the static url links to an XBlock resource, which is never rewritten.
+    """
+    # Probably wasn't a good idea that /static works for actual static assets and
+    # for magical course asset URLs....
+    starts_with_static_url = full_url.startswith(unicode(settings.STATIC_URL))
+    starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
+    contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
+    return starts_with_prefix or (starts_with_static_url and contains_prefix)
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -109,14 +149,8 @@ def process_static_urls(text, replacement_function, data_dir=None):
         quote = match.group('quote')
         rest = match.group('rest')
 
-        # Don't rewrite XBlock resource links.  Probably wasn't a good idea that /static
-        # works for actual static assets and for magical course asset URLs....
-        full_url = prefix + rest
-
-        starts_with_static_url = full_url.startswith(unicode(settings.STATIC_URL))
-        starts_with_prefix = full_url.startswith(XBLOCK_STATIC_RESOURCE_PREFIX)
-        contains_prefix = XBLOCK_STATIC_RESOURCE_PREFIX in full_url
-        if starts_with_prefix or (starts_with_static_url and contains_prefix):
+        # Don't rewrite XBlock resource links.
+        if _is_xblock_resource_url(prefix + rest):
             return original
 
         return replacement_function(original, prefix, quote, rest)
@@ -148,6 +182,63 @@ def make_static_urls_absolute(request, html):
     )
 
 
+def _resolve_static_url(prefix, rest, data_directory, course_id, static_asset_path):
+    """
+    Returns the url a static url of the course is replaced with, or None if it
+    is left unchanged.  See replace_static_urls for the arguments.
+    """
+    # Don't mess with things that end in '?raw'
+    if rest.endswith('?raw'):
+        return None
+
+    # In debug mode, if we can find the url as is,
+    if settings.DEBUG and finders.find(rest, True):
+        return None
+
+    # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
+    elif (not static_asset_path) and course_id:
+        # first look in the static file pipeline and see if we are trying to reference
+        # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+
+        exists_in_staticfiles_storage = False
+        try:
+            exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+
+        if exists_in_staticfiles_storage:
+            url = staticfiles_storage.url(rest)
+        else:
+            # if not, then assume it's courseware specific content and then look in the
+            # Mongo-backed database
+            # Import is placed here to avoid model import at project startup.
+            from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
+            base_url = AssetBaseUrlConfig.get_base_url()
+            excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
+            url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
+
+            if AssetLocator.CANONICAL_NAMESPACE in url:
+                url = url.replace('block@', 'block/', 1)
+
+    # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
+    else:
+        course_path = "/".join((static_asset_path or data_directory, rest))
+
+        try:
+            if staticfiles_storage.exists(rest):
+                url = staticfiles_storage.url(rest)
+            else:
+                url = staticfiles_storage.url(course_path)
+        # And if that fails, assume that it's course content, and add manually data directory
+        except Exception as err:
+            log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+                rest, str(err)))
+            url = "".join([prefix, course_path])
+
+    return url
+
+
 def replace_static_urls(text, data_directory=None, course_id=None, static_asset_path='', static_paths_out=None):
     """
     Replace /static/$stuff urls either with their correct url as generated by collectstatic,
@@ -172,58 +263,71 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
         Replace a single matched url.
         """
         original_uri = "".join([prefix, rest])
-        # Don't mess with things that end in '?raw'
-        if rest.endswith('?raw'):
+        url = _resolve_static_url(prefix, rest, data_directory, course_id, static_asset_path)
+        if url is None:
             static_paths_out.append((original_uri, original_uri))
             return original
 
-        # In debug mode, if we can find the url as is,
-        if settings.DEBUG and finders.find(rest, True):
-            static_paths_out.append((original_uri, original_uri))
-            return original
+        static_paths_out.append((original_uri, url))
+        return "".join([quote, url, quote])
 
-        # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
-        elif (not static_asset_path) and course_id:
-            # first look in the static file pipeline and see if we are trying to reference
-            # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
 
-            exists_in_staticfiles_storage = False
-            try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
 
-            if exists_in_staticfiles_storage:
-                url = staticfiles_storage.url(rest)
-            else:
-                # if not, then assume it's courseware specific content and then look in the
-                # Mongo-backed database
-                # Import is placed here to avoid model import at project startup.
-                from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
-                base_url = AssetBaseUrlConfig.get_base_url()
-                excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
-                url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
-
-                if AssetLocator.CANONICAL_NAMESPACE in url:
-                    url = url.replace('block@', 'block/', 1)
-
-        # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
-        else:
-            course_path = "/".join((static_asset_path or data_directory, rest))
-
-            try:
-                if staticfiles_storage.exists(rest):
-                    url = staticfiles_storage.url(rest)
-                else:
-                    url = staticfiles_storage.url(course_path)
-            # And if that fails, assume that it's course content, and add manually data directory
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
-                url = "".join([prefix, course_path])
+class CourseUrlRewriter(object):
+    """
+    Rewrites the /static/, /course/ and /jump_to_id/ urls of the HTML of a
+    course in a single pass, as replace_static_urls, replace_course_urls and
+    replace_jump_to_id_urls do one after the other.
 
-        static_paths_out.append((original_uri, url))
-        return "".join([quote, url, quote])
+    The urls which the static urls resolve to are memoized by the rewriter, so
+    a rewriter should not outlive the request it was created for.
+    """
+    def __init__(self, course_id, jump_to_id_base_url, data_directory=None, static_asset_path=''):
+        """
+        course_id: The course_id in which this rewrite happens
+        jump_to_id_base_url: The base url of the jump_to_id handler of the course,
+            see replace_jump_to_id_urls
+        data_directory: The directory in which course data is stored
+        static_asset_path: Path for static assets, which overrides data_directory and course_id, if nonempty
+        """
+        self.course_id = course_id
+        self.jump_to_id_base_url = jump_to_id_base_url
+        self.data_directory = data_directory
+        self.static_asset_path = static_asset_path
+        self._course_url_base = u'/courses/{}/'.format(text_type(course_id))
+        self._regex = _combined_url_replace_regex(static_asset_path or data_directory)
+        self._static_urls = {}
+
+    def rewrite(self, text):
+        """
+        Returns the text with its urls rewritten.
+        """
+        return self._regex.sub(self._rewrite_url, text)
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    def _rewrite_url(self, match):
+        """
+        Rewrites a single matched url.
+        """
+        quote = match.group('quote')
+        rest = match.group('rest')
+        if match.group('course') is not None:
+            return u''.join([quote, self._course_url_base, rest, quote])
+        if match.group('jump_to_id') is not None:
+            return u''.join([quote, self.jump_to_id_base_url + rest, quote])
+
+        original = match.group(0)
+        prefix = match.group('prefix')
+        # Don't rewrite XBlock resource links.
+        if _is_xblock_resource_url(prefix + rest):
+            return original
+
+        key = (prefix, rest)
+        if key not in self._static_urls:
+            self._static_urls[key] = _resolve_static_url(
+                prefix, rest, self.data_directory, self.course_id, self.static_asset_path
+            )
+        url = self._static_urls[key]
+        if url is None:
+            return original
+        return u''.join([quote, url, quote])
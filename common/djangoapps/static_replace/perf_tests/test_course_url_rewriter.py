@@ -0,0 +1,104 @@
+"""
+Performance test of rewriting the urls of course HTML with replace_static_urls,
+replace_course_urls and replace_jump_to_id_urls one after the other, compared
+to a single CourseUrlRewriter.
+"""
+import itertools
+import unittest
+
+import ddt
+import pytest
+from django.test import TestCase
+from opaque_keys.edx.keys import CourseKey
+
+from static_replace import CourseUrlRewriter, replace_course_urls, replace_jump_to_id_urls, replace_static_urls
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+COURSE_KEY = CourseKey.from_string('course-v1:org+course+run')
+JUMP_TO_ID_BASE_URL = u'/courses/course-v1:org+course+run/jump_to_id/'
+
+# Numbers of HTML fragments rendered in a request, like the blocks of a unit.
+NUM_FRAGMENTS = (10, 50)
+
+# Numbers of paragraphs of text in each fragment.
+NUM_PARAGRAPHS = (5, 50)
+
+# Numbers of distinct assets of the course the fragments link to.
+NUM_ASSETS = (5, 50)
+
+# Static asset paths of the course: the assets of courses without one are in the contentstore.
+STATIC_ASSET_PATHS = ('', 'data_dir')
+
+PARAGRAPH = (
+    u'<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor incididunt '
+    u'ut labore et dolore magna aliqua. <img src="/static/images/figure{asset}.png" alt="Figure"/> '
+    u'Ut enim ad minim veniam, see <a href="/course/courseware/week{index}">the week</a> and '
+    u'<a href="/jump_to_id/problem{index}">the problem</a>, or download '
+    u'<a href=\'/static/handouts/handout{asset}.pdf\'>the handout</a>.</p>\n'
+)
+
+
+def _course_html(num_paragraphs, num_assets, offset):
+    """
+    Returns course HTML with the given number of paragraphs, linking to static
+    assets, courseware and other blocks.
+    """
+    return u''.join(
+        PARAGRAPH.format(asset=(offset + index) % num_assets, index=index)
+        for index in range(num_paragraphs)
+    )
+
+
+@ddt.ddt
+@unittest.skip
+class CourseUrlRewriterPerfTest(TestCase):
+    """
+    Generates the times taken to rewrite the urls of course HTML.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(*itertools.product(NUM_FRAGMENTS, NUM_PARAGRAPHS, NUM_ASSETS, STATIC_ASSET_PATHS))
+    @ddt.unpack
+    def test_rewrite_times(self, num_fragments, num_paragraphs, num_assets, static_asset_path):
+        """
+        Generates the times taken to rewrite the urls of the fragments of a request.
+        """
+        if CodeBlockTimer is None:
+            pytest.skip("CodeBlockTimer undefined.")
+
+        desc = "UrlRewriting:{}:{}:{}:{!r}".format(
+            num_fragments,
+            num_paragraphs,
+            num_assets,
+            static_asset_path,
+        )
+        fragments = [_course_html(num_paragraphs, num_assets, offset) for offset in range(num_fragments)]
+
+        with CodeBlockTimer(desc):
+
+            with CodeBlockTimer("sequential"):
+                sequential = [
+                    replace_jump_to_id_urls(
+                        replace_course_urls(
+                            replace_static_urls(fragment, None, COURSE_KEY, static_asset_path=static_asset_path),
+                            COURSE_KEY,
+                        ),
+                        COURSE_KEY,
+                        JUMP_TO_ID_BASE_URL,
+                    )
+                    for fragment in fragments
+                ]
+
+            with CodeBlockTimer("rewriter"):
+                rewriter = CourseUrlRewriter(COURSE_KEY, JUMP_TO_ID_BASE_URL, static_asset_path=static_asset_path)
+                rewritten = [rewriter.rewrite(fragment) for fragment in fragments]
+
+        self.assertEqual(rewritten, sequential)
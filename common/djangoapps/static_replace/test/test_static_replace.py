@@ -15,10 +15,12 @@ from opaque_keys.edx.keys import CourseKey
 from PIL import Image
 
 from static_replace import (
+    CourseUrlRewriter,
     _url_replace_regex,
     make_static_urls_absolute,
     process_static_urls,
     replace_course_urls,
+    replace_jump_to_id_urls,
     replace_static_urls
 )
 from xmodule.assetstore.assetmgr import AssetManager
@@ -250,6 +252,50 @@ def test_static_url_with_xblock_resource_on_cdn(mock_modulestore, mock_storage):
     assert replace_static_urls(pre_text, DATA_DIRECTORY, COURSE_KEY) == post_text
 
 
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_course_url_rewriter(mock_storage):
+    """
+    Make sure CourseUrlRewriter rewrites the urls as replace_static_urls, replace_course_urls
+    and replace_jump_to_id_urls do one after the other.
+    """
+    mock_storage.exists.return_value = False
+    mock_storage.url.side_effect = lambda path: '/static/hashed/' + path
+    jump_to_id_base_url = '/courses/org/course/run/jump_to_id/'
+
+    text = (
+        '<img src="/static/file.png"/> <a href=\'/course/info\'>info</a> <a href="/jump_to_id/problem">problem</a> '
+        '<script src="/static/foo.js?raw"></script> '
+        '<img src="/static/xblock/resources/babys_first.lil_xblock/public/images/pacifier.png"/> '
+        '<a href="/courses/org/course/run/info">info</a>'
+    )
+    expected = replace_jump_to_id_urls(
+        replace_course_urls(
+            replace_static_urls(text, None, COURSE_KEY, static_asset_path=DATA_DIRECTORY),
+            COURSE_KEY,
+        ),
+        COURSE_KEY,
+        jump_to_id_base_url,
+    )
+    rewriter = CourseUrlRewriter(COURSE_KEY, jump_to_id_base_url, static_asset_path=DATA_DIRECTORY)
+    assert rewriter.rewrite(text) == expected
+    assert '"/static/hashed/data_dir/file.png"' in expected
+
+
+@patch('static_replace.staticfiles_storage', autospec=True)
+def test_course_url_rewriter_memoizes_static_urls(mock_storage):
+    """
+    Make sure CourseUrlRewriter looks each static url up once.
+    """
+    mock_storage.exists.return_value = True
+    mock_storage.url.return_value = '/static/file.hashed.png'
+
+    rewriter = CourseUrlRewriter(COURSE_KEY, '/jump_to_id/', data_directory=DATA_DIRECTORY)
+    assert rewriter.rewrite(STATIC_SOURCE + STATIC_SOURCE) == '"/static/file.hashed.png"' * 2
+    assert rewriter.rewrite(STATIC_SOURCE) == '"/static/file.hashed.png"'
+    mock_storage.exists.assert_called_once_with('file.png')
+    mock_storage.url.assert_called_once_with('file.png')
+
+
 @ddt.ddt
 class CanonicalContentTest(SharedModuleStoreTestCase):
     """
@@ -7,6 +7,8 @@ Uses pyparsing to parse. Main function as of now is evaluator().
 import math
 import numbers
 import operator
+import threading
+from collections import OrderedDict
 
 import numpy
 from pyparsing import (
@@ -80,6 +82,9 @@ SUFFIXES = {
     '%': 0.01,
 }
 
+# How many compiled expressions to keep in the process-wide cache.
+COMPILED_EXPRESSION_CACHE_SIZE = 1000
+
 
 class UndefinedVariable(Exception):
     """
@@ -243,35 +248,60 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     if math_expr.strip() == "":
         return float('nan')
 
-    # Parse the tree.
-    check_parens(math_expr)
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
+    expression = compile_expression(variables, functions, math_expr, case_sensitive)
+    return expression.evaluate(variables, functions)
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
+def evaluate_many(variables_list, functions, math_expr, case_sensitive=False):
+    """
+    Evaluate an expression at each of the variable assignments in `variables_list`.
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
-
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
+    Return a list with one result per assignment, equal to what `evaluator`
+    would return for each of them. The expression is only parsed once, and is
+    evaluated for all of the assignments at once using numpy arrays wherever
+    that gives the same results.
+    """
+    if not variables_list:
+        return []
+
+    # No need to go further.
+    if math_expr.strip() == "":
+        return [float('nan')] * len(variables_list)
+
+    expression = compile_expression(variables_list[0], functions, math_expr, case_sensitive)
+    return expression.evaluate_many(variables_list, functions)
 
-    return math_interpreter.reduce_tree(evaluate_actions)
+
+_compiled_expressions = OrderedDict()
+_compiled_expressions_lock = threading.Lock()
+
+
+def compile_expression(variables, functions, math_expr, case_sensitive=False):
+    """
+    Return a `CompiledExpression` for `math_expr`, which has been checked
+    against the names in `variables` and `functions`.
+
+    Compiled expressions are kept in a process-wide LRU cache, keyed on the
+    expression, its case sensitivity and the names of the variables and
+    functions, so that repeated evaluations of the same formula don't need
+    to parse it again.
+    """
+    cache_key = (math_expr, case_sensitive, frozenset(variables), frozenset(functions))
+    with _compiled_expressions_lock:
+        expression = _compiled_expressions.pop(cache_key, None)
+        if expression is not None:
+            _compiled_expressions[cache_key] = expression
+            return expression
+
+    expression = CompiledExpression(math_expr, case_sensitive)
+    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
+    expression.check_variables(all_variables, all_functions)
+
+    with _compiled_expressions_lock:
+        _compiled_expressions[cache_key] = expression
+        while len(_compiled_expressions) > COMPILED_EXPRESSION_CACHE_SIZE:
+            _compiled_expressions.popitem(last=False)
+    return expression
 
 
 def check_parens(formula):
@@ -499,3 +529,150 @@ class ParseAugmenter(object):
                     message += " (did you mean " + betternames + "?)"
 
             raise UndefinedVariable(message)
+
+
+class CompiledExpression(object):
+    """
+    A parsed math expression that can be evaluated repeatedly.
+
+    The parse tree is turned into nested closures once, so evaluating the
+    expression doesn't need pyparsing or a walk of the parse tree. Variable and
+    function values are looked up at evaluation time.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        """
+        Parse `math_expr`, raising the same exceptions as `evaluator` would.
+        """
+        check_parens(math_expr)
+        self.math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+        self.math_interpreter.parse_algebra()
+
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+        if case_sensitive:
+            self.casify = lambda x: x
+        else:
+            self.casify = lambda x: x.lower()  # Lowercase for case insens.
+
+        self._evaluate = self._compile_node(self.math_interpreter.tree)
+
+    def check_variables(self, valid_variables, valid_functions):
+        """
+        Confirm that all the variables used in the expression are valid/defined.
+
+        Otherwise, raise an UndefinedVariable containing all bad variables.
+        """
+        self.math_interpreter.check_variables(valid_variables, valid_functions)
+
+    def evaluate(self, variables, functions):
+        """
+        Evaluate the expression for a single assignment of `variables`.
+        """
+        all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
+        return self._evaluate(all_variables, all_functions)
+
+    def evaluate_many(self, variables_list, functions):
+        """
+        Evaluate the expression for each of the assignments in `variables_list`.
+
+        All of the assignments are first evaluated at once, with each variable
+        bound to a numpy array of its values. If that fails, or gives any
+        non-finite values (where numpy's semantics differ from python's, e.g.
+        division by zero), fall back to evaluating each assignment on its own.
+        """
+        names = set(variables_list[0])
+        if len(variables_list) > 1 and all(set(variables) == names for variables in variables_list):
+            variable_arrays = {
+                name: numpy.array([variables[name] for variables in variables_list])
+                for name in names
+            }
+            try:
+                with numpy.errstate(all='ignore'):
+                    results = numpy.asarray(self.evaluate(variable_arrays, functions))
+                if results.ndim == 0:
+                    results = numpy.array([results] * len(variables_list))
+                if results.shape == (len(variables_list),) and numpy.isfinite(results).all():
+                    return results.tolist()
+            except Exception:  # pylint: disable=broad-except
+                # Not every function can take arrays (e.g. `fact`); evaluate one by one instead.
+                pass
+
+        return [self.evaluate(variables, functions) for variables in variables_list]
+
+    def _compile_node(self, node):
+        """
+        Return a function of `(all_variables, all_functions)` which computes
+        the value of the parse tree `node`.
+
+        This mirrors the evaluation actions used by `evaluator`, with the
+        terminal tokens (operators and parentheses) resolved ahead of time.
+        """
+        node_name = node.getName()
+        children = [child for child in node if isinstance(child, ParseResults)]
+
+        if node_name == 'number':
+            value = eval_number(node)
+            return lambda variables, functions: value
+
+        elif node_name == 'variable':
+            name = self.casify(node[0])
+            return lambda variables, functions: variables[name]
+
+        elif node_name == 'function':
+            name = self.casify(node[0])
+            argument = self._compile_node(node[1])
+            return lambda variables, functions: functions[name](argument(variables, functions))
+
+        elif node_name == 'atom':
+            # Parentheses are the only terminal tokens here, so skip them.
+            return self._compile_node(children[0])
+
+        operands = [self._compile_node(child) for child in children]
+        if node_name in ('power', 'parallel') and len(operands) == 1:
+            return operands[0]
+
+        if node_name == 'power':
+            def evaluate_power(variables, functions):
+                """Exponentiate right to left."""
+                values = [operand(variables, functions) for operand in operands]
+                return reduce(lambda a, b: b ** a, reversed(values))
+            return evaluate_power
+
+        elif node_name == 'parallel':
+            def evaluate_parallel(variables, functions):
+                """Apply the parallel resistors operator."""
+                values = [operand(variables, functions) for operand in operands]
+                if not any(isinstance(value, numpy.ndarray) for value in values):
+                    return eval_parallel(values)
+                result = 1. / sum(1. / value for value in values)
+                has_zero = reduce(numpy.logical_or, [numpy.equal(value, 0) for value in values])
+                return numpy.where(has_zero, float('nan'), result)
+            return evaluate_parallel
+
+        elif node_name in ('product', 'sum'):
+            if node_name == 'product':
+                initial = 1.0
+                operators = {'*': operator.mul, '/': operator.truediv}
+            else:
+                initial = 0.0
+                operators = {'+': operator.add, '-': operator.sub}
+
+            # Pair each operand with the operator preceding it.
+            steps = []
+            current_op = operator.mul if node_name == 'product' else operator.add
+            operand_iter = iter(operands)
+            for token in node:
+                if isinstance(token, ParseResults):
+                    steps.append((current_op, next(operand_iter)))
+                else:
+                    current_op = operators[token]
+
+            def evaluate_steps(variables, functions):
+                """Combine the operands from left to right."""
+                total = initial
+                for step_op, operand in steps:
+                    total = step_op(total, operand(variables, functions))
+                return total
+            return evaluate_steps
+
+        raise Exception(u"Unknown branch name '{}'".format(node_name))  # pragma: no cover
@@ -5,6 +5,8 @@ Unit tests for calc.py
 import unittest
 import numpy
 import calc
+from calc import calc as calc_module
+from mock import patch
 from pyparsing import ParseException
 
 # numpy's default behavior when it evaluates a function outside its domain
@@ -554,3 +556,83 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({}, {}, "(1+2")
         with self.assertRaisesRegexp(calc.UnmatchedParenthesis, 'no matching opening parenthesis'):
             calc.evaluator({}, {}, "(1+2))")
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Run tests for calc.compile_expression and calc.evaluate_many
+    """
+
+    def setUp(self):
+        super(CompiledExpressionTest, self).setUp()
+        calc_module._compiled_expressions.clear()  # pylint: disable=protected-access
+        self.samples = [{'x': float(value), 'y': float(value) / 2} for value in range(1, 21)]
+
+    def assert_matches_evaluator(self, math_expr, functions=None):
+        """
+        Check that `evaluate_many` gives the same results as calling
+        `evaluator` for each of the samples.
+        """
+        functions = functions or {}
+        expected = [calc.evaluator(sample, functions, math_expr) for sample in self.samples]
+        results = calc.evaluate_many(self.samples, functions, math_expr)
+        self.assertEqual(len(results), len(expected))
+        for result, value in zip(results, expected):
+            self.assertAlmostEqual(result, value)
+
+    def test_evaluate_many(self):
+        self.assert_matches_evaluator("x^2 + 3*x - y")
+        self.assert_matches_evaluator("-x/y + sin(x)*cos(y)")
+        self.assert_matches_evaluator("x || y")
+        self.assert_matches_evaluator("2^x^0.5")
+        self.assert_matches_evaluator("sqrt(x)*i + 5%")
+        self.assert_matches_evaluator("f(x) + y", {'f': lambda value: value * 3})
+
+    def test_evaluate_many_constant(self):
+        self.assertEqual(calc.evaluate_many(self.samples, {}, "2*3"), [6.0] * len(self.samples))
+
+    def test_evaluate_many_empty(self):
+        self.assertEqual(calc.evaluate_many([], {}, "x"), [])
+        results = calc.evaluate_many(self.samples, {}, " ")
+        self.assertTrue(all(numpy.isnan(result) for result in results))
+
+    def test_evaluate_many_fallback(self):
+        """
+        Where numpy semantics differ from python's, the samples are
+        evaluated one by one, just as `evaluator` would.
+        """
+        self.assert_matches_evaluator("fact(x)")
+        with self.assertRaises(ZeroDivisionError):
+            calc.evaluate_many(self.samples, {}, "x/(y-y)")
+        with self.assertRaises(ValueError):
+            calc.evaluate_many(self.samples, {}, "fact(y)")
+
+        results = calc.evaluate_many(self.samples, {}, "x || (y-y)")
+        self.assertTrue(all(numpy.isnan(result) for result in results))
+
+    def test_errors(self):
+        with self.assertRaises(calc.UnmatchedParenthesis):
+            calc.evaluate_many(self.samples, {}, "(x+y")
+        with self.assertRaises(ParseException):
+            calc.evaluate_many(self.samples, {}, "x+")
+        with self.assertRaisesRegexp(calc.UndefinedVariable, r'z'):
+            calc.evaluate_many(self.samples, {}, "x+z")
+
+    def test_compiled_expression_is_cached(self):
+        with patch.object(calc.ParseAugmenter, 'parse_algebra', autospec=True,
+                          side_effect=calc.ParseAugmenter.parse_algebra) as mock_parse:
+            calc.evaluator({'a': 1.0}, {}, "a*17+13")
+            calc.evaluator({'a': 2.0}, {}, "a*17+13")
+            calc.evaluate_many([{'a': 3.0}, {'a': 4.0}], {}, "a*17+13")
+            self.assertEqual(mock_parse.call_count, 1)
+
+            # The case sensitivity and the names available are part of the cache key
+            calc.evaluator({'a': 2.0}, {}, "a*17+13", case_sensitive=True)
+            calc.evaluator({'a': 2.0, 'b': 3.0}, {}, "a*17+13")
+            self.assertEqual(mock_parse.call_count, 3)
+
+    def test_cache_size_is_bounded(self):
+        with patch.object(calc_module, 'COMPILED_EXPRESSION_CACHE_SIZE', 2):
+            for value in range(5):
+                calc.evaluator({}, {}, "{}+1".format(value))
+            self.assertEqual(len(calc_module._compiled_expressions), 2)  # pylint: disable=protected-access
@@ -1,3 +1,5 @@
 """Capa's specialized use of codejail.safe_exec."""
 
+from .cache import SafeExecCache
+from .pool import SandboxPool
 from .safe_exec import safe_exec, update_hash
@@ -0,0 +1,107 @@
+"""
+A two-level cache for the results of safe_exec.
+
+Sandboxed executions are expensive, and their results only depend on the
+code, globals, random seed and extra files that make up their cache key.
+:class:`SafeExecCache` keeps results in a process-local LRU cache in front of
+a cache shared by all processes (usually the Django cache), so that the
+same problem variant rendered over and over rarely spawns a sandbox.
+"""
+import json
+
+from django.conf import settings
+from edx_django_utils.monitoring import set_custom_metric
+
+from openedx.core.lib.cache_utils import ProcessLRUCache, get_cache as get_request_cache
+
+# Default maximum total size, in bytes, of the serialized results held in
+# the process-local cache.
+DEFAULT_PROCESS_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+PROCESS_HIT = 'process_hit'
+SHARED_HIT = 'shared_hit'
+MISS = 'miss'
+
+# The namespace of the request cache holding the counts of the lookups of
+# the current request.
+REQUEST_CACHE_NAMESPACE = 'capa.safe_exec.cache'
+
+_process_cache = None  # pylint: disable=invalid-name
+
+
+class SafeExecCache(object):
+    """
+    A cache for safe_exec, with the .get(key) and .set(key, value) methods
+    it expects.
+
+    Lookups first try the process-local cache, then the shared cache; results
+    found in the shared cache are copied into the process-local one.  Hits and
+    misses are counted in `stats`, and their counts in the current request are
+    reported as custom monitoring metrics.
+    """
+    def __init__(self, shared_cache=None):
+        """
+        Arguments:
+            shared_cache - An object with .get(key) and .set(key, value) methods,
+                shared by all processes, or None to only cache in this process.
+        """
+        self.shared_cache = shared_cache
+        self.stats = dict.fromkeys((PROCESS_HIT, SHARED_HIT, MISS), 0)
+
+    def get(self, key):
+        """
+        Returns the result cached for the given key, or None if not found.
+        """
+        serialized_value = process_cache().get(key)
+        if serialized_value is not None:
+            self._record(PROCESS_HIT)
+            return json.loads(serialized_value)
+
+        if self.shared_cache is not None:
+            value = self.shared_cache.get(key)
+            if value is not None:
+                self._record(SHARED_HIT)
+                # Return the same representation as a process-local hit.
+                return json.loads(self._set_in_process_cache(key, value))
+
+        self._record(MISS)
+        return None
+
+    def set(self, key, value):
+        """
+        Caches the given result for the given key in both levels.
+        """
+        self._set_in_process_cache(key, value)
+        if self.shared_cache is not None:
+            self.shared_cache.set(key, value)
+
+    def _set_in_process_cache(self, key, value):
+        """
+        Caches the given result in the process-local cache, and returns it
+        serialized.  Results are stored serialized, since callers update their
+        globals with them.
+        """
+        serialized_value = json.dumps(value)
+        process_cache().set(key, serialized_value, size=len(serialized_value))
+        return serialized_value
+
+    def _record(self, outcome):
+        """
+        Counts a cache lookup with the given outcome.
+        """
+        self.stats[outcome] += 1
+        request_stats = get_request_cache(REQUEST_CACHE_NAMESPACE)
+        request_stats[outcome] = request_stats.get(outcome, 0) + 1
+        set_custom_metric('safe_exec_cache_' + outcome, request_stats[outcome])
+
+
+def process_cache():
+    """
+    Returns the process-local cache of serialized safe_exec results.
+    """
+    global _process_cache  # pylint: disable=global-statement, invalid-name
+    if _process_cache is None:
+        _process_cache = ProcessLRUCache(
+            max_size=getattr(settings, 'SAFE_EXEC_PROCESS_CACHE_MAX_BYTES', DEFAULT_PROCESS_CACHE_MAX_BYTES),
+        )
+    return _process_cache
@@ -0,0 +1,59 @@
+"""
+Performance test comparing the latency of sandboxed executions in a new
+sandbox per execution and in a pool of sandbox workers.
+"""
+import unittest
+
+import ddt
+import pytest
+from codejail.jail_code import is_configured
+from codejail.safe_exec import safe_exec as codejail_safe_exec
+
+from ..pool import SandboxPool
+from ..safe_exec import CODE_PROLOG, LAZY_IMPORTS
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Number of executions timed for each executor.
+NUM_EXECUTIONS = 50
+
+# Code resembling that of typical randomized problems.
+PROBLEM_CODES = (
+    "a = random.randint(1, 10)\nb = a * 2",
+    "x = numpy.linalg.solve(numpy.array([[3, 1], [1, 2]]), numpy.array([9, 8]))\nanswer = float(x[0])",
+)
+
+
+@ddt.ddt
+@unittest.skip
+class SandboxPoolPerfTest(unittest.TestCase):
+    """
+    Generates timings of sandboxed executions, with and without a pool.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(*PROBLEM_CODES)
+    def test_execution_timings(self, problem_code):
+        """
+        Generates the timings of each execution with each executor.
+        """
+        if CodeBlockTimer is None:
+            pytest.skip("CodeBlockTimer undefined.")
+        if not is_configured("python"):
+            pytest.skip("CodeJail isn't configured for python.")
+
+        pool = SandboxPool(1)
+        self.addCleanup(pool.close)
+        for name, exec_fn in (("spawn", codejail_safe_exec), ("pool", pool.safe_exec)):
+            with CodeBlockTimer("SandboxExecution:{}:{!r}".format(name, problem_code[:20])):
+                for seed in range(NUM_EXECUTIONS):
+                    code = CODE_PROLOG % seed + LAZY_IMPORTS + problem_code
+                    with CodeBlockTimer("execution"):
+                        exec_fn(code, {})
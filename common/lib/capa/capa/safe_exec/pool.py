@@ -0,0 +1,286 @@
+"""
+A pool of pre-started sandbox workers for safe_exec.
+
+Starting a sandboxed Python process and importing numpy and friends in it
+costs hundreds of milliseconds, on every uncached execution.  A
+:class:`SandboxPool` keeps a few sandboxed Python processes running, with
+those modules already imported, and runs each execution in a process forked
+from one of them (see `sandbox_worker.py`), which takes a few milliseconds.
+
+Workers are started with the same command line codejail uses, and each
+execution gets codejail's resource limits.  Each worker is replaced after
+running a configurable number of executions.
+
+The pool is configured with the "pool" key of the CODE_JAIL setting, and is
+disabled unless its size is set and codejail is configured::
+
+    CODE_JAIL = {
+        ...
+        'pool': {
+            # How many workers does each process keep running?
+            'size': 2,
+            # How many executions does a worker run before it is replaced?
+            'max_executions': 100,
+        },
+    }
+
+"""
+import atexit
+import binascii
+import json
+import logging
+import os
+import os.path
+import select
+import shutil
+import subprocess
+import tempfile
+
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException, json_safe
+from django.conf import settings
+from six.moves.queue import Queue
+
+from . import sandbox_worker
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MAX_EXECUTIONS = 100
+
+# How long, in seconds, to wait for a worker beyond the REALTIME limit it
+# enforces on executions itself.
+WORKER_TIMEOUT_MARGIN = 5
+
+# The modules preloaded in each worker, which Capa code can use without
+# importing them (see ASSUMED_IMPORTS in safe_exec.py).
+PRELOADED_MODULES = [
+    "numpy",
+    "math",
+    "scipy",
+    "calc",
+    "eia",
+    "chem.chemcalc",
+    "chem.chemtools",
+    "chem.miller",
+    "verifiers.draganddrop",
+]
+
+# Workers run the source of sandbox_worker.py, so read it now.
+sandbox_worker_py_file = sandbox_worker.__file__
+if sandbox_worker_py_file.endswith("c"):
+    sandbox_worker_py_file = sandbox_worker_py_file[:-1]
+
+sandbox_worker_py = open(sandbox_worker_py_file).read()
+
+
+class SandboxWorkerError(Exception):
+    """
+    A sandbox worker died, or didn't answer in time.
+    """
+    pass
+
+
+class SandboxWorker(object):
+    """
+    A running sandbox worker process.
+    """
+    def __init__(self, command, limits, preload):
+        config = {"limits": limits, "preload": preload}
+        with open(os.devnull, "w") as devnull:
+            self.process = subprocess.Popen(
+                command + ["-c", sandbox_worker_py, json.dumps(config)],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=devnull,
+                env={}, close_fds=True,
+            )
+        self.executions = 0
+        self._buffer = ""
+
+    def execute(self, request, timeout=None):
+        """
+        Send a request to the worker, and return its response.
+
+        Raises `SandboxWorkerError` if the worker dies, if it doesn't
+        respond within `timeout` seconds, or if its response isn't the one to
+        this request.
+
+        """
+        self.executions += 1
+        nonce = binascii.hexlify(os.urandom(16))
+        try:
+            self.process.stdin.write(json.dumps(dict(request, nonce=nonce)) + "\n")
+            self.process.stdin.flush()
+        except IOError:
+            raise SandboxWorkerError("Sandbox worker {} died".format(self.process.pid))
+        try:
+            response = json.loads(self._read_line(timeout))
+        except ValueError:
+            raise SandboxWorkerError("Sandbox worker {} sent a malformed response".format(self.process.pid))
+        if not isinstance(response, dict) or response.pop("nonce", None) != nonce:
+            raise SandboxWorkerError("Sandbox worker {} sent a mismatched response".format(self.process.pid))
+        return response
+
+    def _read_line(self, timeout):
+        """
+        Read a line from the worker's stdout.
+        """
+        stdout = self.process.stdout.fileno()
+        while "\n" not in self._buffer:
+            if timeout and not select.select([stdout], [], [], timeout)[0]:
+                raise SandboxWorkerError("Sandbox worker {} timed out".format(self.process.pid))
+            chunk = os.read(stdout, 65536)
+            if not chunk:
+                raise SandboxWorkerError("Sandbox worker {} died".format(self.process.pid))
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split("\n", 1)
+        return line
+
+    def close(self):
+        """
+        Stop the worker.
+        """
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+
+
+class SandboxPool(object):
+    """
+    A pool of sandbox workers, with a `safe_exec` method that can be used in
+    place of codejail's.
+    """
+    def __init__(self, size, max_executions=DEFAULT_MAX_EXECUTIONS, command=None, limits=None, preload=None):
+        """
+        Arguments:
+            size - The number of workers to keep running.
+            max_executions - The number of executions after which a worker is replaced.
+            command - The command line that starts the sandboxed Python, by
+                default the one codejail is configured with.
+            limits - The limits applied to each execution, by default codejail's.
+            preload - The modules to import in each worker.
+        """
+        self.max_executions = max_executions
+        self.command = command if command is not None else python_command()
+        self.limits = dict(limits if limits is not None else jail_code.LIMITS)
+        self.preload = preload if preload is not None else PRELOADED_MODULES
+        self.pid = os.getpid()
+        self._idle = Queue()
+        self._workers = set()
+        for _ in range(size):
+            self._idle.put(self._start_worker())
+
+    def safe_exec(self, code, globals_dict, python_path=None, extra_files=None, slug=None):
+        """
+        Execute code like codejail's safe_exec, in one of the pool's workers.
+
+        `code`, `globals_dict`, `python_path`, `extra_files` and `slug` mean
+        the same as for codejail's safe_exec.
+
+        """
+        home = self._make_home(python_path or (), extra_files or ())
+        request = {
+            "code": code,
+            "globals": json_safe(globals_dict),
+            "python_path": [os.path.basename(pydir) for pydir in python_path or ()],
+            "home": home,
+        }
+        timeout = self.limits.get("REALTIME") and self.limits["REALTIME"] + WORKER_TIMEOUT_MARGIN
+
+        worker = self._idle.get()
+        try:
+            log.debug("Executing jailed code %s in sandbox worker %d", slug, worker.process.pid)
+            response = worker.execute(request, timeout)
+        except SandboxWorkerError as exc:
+            log.warning("Couldn't execute jailed code %s: %s", slug, exc)
+            worker.executions = self.max_executions
+            response = {"emsg": str(exc), "globals": {}}
+        finally:
+            if worker.executions >= self.max_executions:
+                self._stop_worker(worker)
+                worker = self._start_worker()
+            self._idle.put(worker)
+            shutil.rmtree(home, ignore_errors=True)
+
+        if response["emsg"]:
+            raise SafeExecException("Couldn't execute jailed code: {}".format(response["emsg"]))
+        globals_dict.update(response["globals"])
+
+    def close(self):
+        """
+        Stop all of the pool's workers.
+        """
+        for worker in list(self._workers):
+            self._stop_worker(worker)
+
+    def _start_worker(self):
+        """
+        Start a new worker.
+        """
+        worker = SandboxWorker(self.command, self.limits, self.preload)
+        self._workers.add(worker)
+        return worker
+
+    def _stop_worker(self, worker):
+        """
+        Stop a worker for good.
+        """
+        self._workers.discard(worker)
+        worker.close()
+
+    def _make_home(self, python_path, extra_files):
+        """
+        Make a temporary directory for an execution, with the files it needs,
+        the way codejail does.
+        """
+        home = tempfile.mkdtemp(prefix="codejail-")
+        # Make directory readable by other users ('sandbox' user needs to be
+        # able to read it).
+        os.chmod(home, 0775)
+        tmptmp = os.path.join(home, "tmp")
+        os.mkdir(tmptmp)
+        os.chmod(tmptmp, 0777)
+
+        extra_names = set(name for name, _ in extra_files)
+        for pydir in python_path:
+            if os.path.basename(pydir) in extra_names:
+                continue
+            dest = os.path.join(home, os.path.basename(pydir))
+            if os.path.isdir(pydir):
+                shutil.copytree(pydir, dest)
+            else:
+                shutil.copyfile(pydir, dest)
+        for name, contents in extra_files:
+            with open(os.path.join(home, name), "wb") as extra:
+                extra.write(contents)
+        return home
+
+
+def python_command():
+    """
+    Returns the command line codejail uses to run sandboxed Python.
+    """
+    python = jail_code.COMMANDS["python"]
+    command = []
+    if python["user"]:
+        command.extend(["sudo", "-u", python["user"]])
+    command.extend(python["cmdline_start"])
+    return command
+
+
+_pool = None  # pylint: disable=invalid-name
+
+
+def sandbox_pool():
+    """
+    Returns this process's pool of sandbox workers, or None if pooling is
+    disabled.
+    """
+    global _pool  # pylint: disable=global-statement, invalid-name
+    if _pool is not None and _pool.pid == os.getpid():
+        return _pool
+
+    config = getattr(settings, "CODE_JAIL", {}).get("pool", {})
+    if not config.get("size") or not jail_code.is_configured("python"):
+        return None
+    _pool = SandboxPool(config["size"], config.get("max_executions", DEFAULT_MAX_EXECUTIONS))
+    atexit.register(_pool.close)
+    return _pool
@@ -4,9 +4,13 @@ from codejail.safe_exec import safe_exec as codejail_safe_exec
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import json_safe, SafeExecException
 from . import lazymod
+from .pool import sandbox_pool
 from six import text_type
 
 import hashlib
+import re
+import zipfile
+from io import BytesIO
 
 # Establish the Python environment for Capa.
 # Capa assumes float-friendly division always.
@@ -49,6 +53,24 @@ for name, modname in ASSUMED_IMPORTS:
 
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
+# Globals specific to the student the code is executed for.  Code which never
+# reads them is cached for all students alike (see `cache_key`).
+STUDENT_GLOBALS = ('anonymous_student_id',)
+
+# Matches the names through which code can read globals without naming them.
+DYNAMIC_GLOBALS_ACCESS_RE = re.compile(
+    r'\b(globals|locals|vars|dir|eval|exec|execfile|compile|inspect|_getframe|f_globals|__dict__|__main__)\b'
+)
+
+# Digests of the contents of extra files, and whether the files may read the
+# globals of the code dynamically, keyed by the id of the contents.  The
+# contents are kept alongside, so that their id can't be reused by another
+# object.  Callers pass the same object for a file until it changes (see
+# xmodule.util.sandboxing.get_python_lib_zip), so each version of a file is
+# only inspected once.
+_extra_file_digests = {}  # pylint: disable=invalid-name
+MAX_EXTRA_FILE_DIGESTS = 32
+
 
 def update_hash(hasher, obj):
     """
@@ -73,6 +95,83 @@ def update_hash(hasher, obj):
         hasher.update(repr(obj))
 
 
+def cache_key(code, globals_dict, random_seed=None, extra_files=None):
+    """
+    Return the key used to cache the execution of `code` with `globals_dict`.
+
+    The key accounts for the code, the values of the globals it may read (see
+    `cached_globals`), the random seed and the contents of `extra_files`.
+
+    """
+    md5er = hashlib.md5()
+    md5er.update(repr(code))
+    update_hash(md5er, json_safe(cached_globals(code, globals_dict, extra_files)))
+    for filename, contents in extra_files or ():
+        md5er.update(filename)
+        md5er.update(_extra_file_info(contents)[0])
+    return "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
+
+
+def cached_globals(code, globals_dict, extra_files=None):
+    """
+    Return the globals of `globals_dict` whose values the cached execution of
+    `code` depends on.
+
+    These are all the globals, except for the `STUDENT_GLOBALS` when neither
+    the code nor the extra files name them or read globals dynamically, so
+    that executions for different students share their results.
+
+    """
+    if any(name in globals_dict for name in STUDENT_GLOBALS) and not _may_read_student_globals(code, extra_files):
+        return {name: value for name, value in globals_dict.iteritems() if name not in STUDENT_GLOBALS}
+    return globals_dict
+
+
+def _may_read_student_globals(code, extra_files):
+    """
+    Return whether `code`, or the modules in `extra_files` it can import, may
+    read the `STUDENT_GLOBALS`.
+    """
+    if any(name in code for name in STUDENT_GLOBALS) or DYNAMIC_GLOBALS_ACCESS_RE.search(code):
+        return True
+    return any(_extra_file_info(contents)[1] for _, contents in extra_files or ())
+
+
+def _extra_file_info(contents):
+    """
+    Return the md5 digest of the contents of an extra file, and whether the
+    file may read the globals of the code dynamically.
+    """
+    cached = _extra_file_digests.get(id(contents))
+    if cached is not None and cached[0] is contents:
+        return cached[1:]
+    info = (hashlib.md5(contents).hexdigest(), _may_read_globals_dynamically(contents))
+    if len(_extra_file_digests) >= MAX_EXTRA_FILE_DIGESTS:
+        _extra_file_digests.clear()
+    _extra_file_digests[id(contents)] = (contents,) + info
+    return info
+
+
+def _may_read_globals_dynamically(contents):
+    """
+    Return whether the contents of an extra file, or any module in them if they
+    are a zip file, may read the globals of the code that imports them.
+    """
+    contents_file = BytesIO(contents)
+    if not zipfile.is_zipfile(contents_file):
+        return bool(DYNAMIC_GLOBALS_ACCESS_RE.search(contents))
+    try:
+        with zipfile.ZipFile(contents_file) as zip_file:
+            return any(
+                # Compiled modules can't be inspected.
+                not name.endswith('.py') or DYNAMIC_GLOBALS_ACCESS_RE.search(zip_file.read(name))
+                for name in zip_file.namelist()
+                if not name.endswith('/')
+            )
+    except zipfile.BadZipfile:
+        return True
+
+
 def safe_exec(
     code,
     globals_dict,
@@ -100,22 +199,20 @@ def safe_exec(
     created in the sandbox.
 
     `cache` is an object with .get(key) and .set(key, value) methods.  It will be used
-    to cache the execution, taking into account the code, the values of the globals,
-    and the random seed.
+    to cache the execution, taking into account the code, the values of the globals
+    it may read, the random seed, and the contents of `extra_files` (see `cache_key`).
 
     `slug` is an arbitrary string, a description that's meaningful to the
     caller, that will be used in log messages.
 
     If `unsafely` is true, then the code will actually be executed without sandboxing.
+    Otherwise, it is executed in a pooled sandbox worker when a pool is
+    configured (see `capa.safe_exec.pool`), or in a new sandbox.
 
     """
     # Check the cache for a previous result.
     if cache:
-        safe_globals = json_safe(globals_dict)
-        md5er = hashlib.md5()
-        md5er.update(repr(code))
-        update_hash(md5er, safe_globals)
-        key = "safe_exec.%r.%s" % (random_seed, md5er.hexdigest())
+        key = cache_key(code, globals_dict, random_seed, extra_files)
         cached = cache.get(key)
         if cached is not None:
             # We have a cached result.  The result is a pair: the exception
@@ -133,7 +230,8 @@ def safe_exec(
     if unsafely:
         exec_fn = codejail_not_safe_exec
     else:
-        exec_fn = codejail_safe_exec
+        pool = sandbox_pool()
+        exec_fn = pool.safe_exec if pool else codejail_safe_exec
 
     # Run the code!  Results are side effects in globals_dict.
     try:
@@ -147,9 +245,10 @@ def safe_exec(
         emsg = None
 
     # Put the result back in the cache.  This is complicated by the fact that
-    # the globals dict might not be entirely serializable.
+    # the globals dict might not be entirely serializable.  Globals that aren't
+    # part of the key are left out, so that they keep their values on a hit.
     if cache:
-        cleaned_results = json_safe(globals_dict)
+        cleaned_results = json_safe(cached_globals(code, globals_dict, extra_files))
         cache.set(key, (emsg, cleaned_results))
 
     # If an exception happened, raise it now.
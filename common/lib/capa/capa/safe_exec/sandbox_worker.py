@@ -0,0 +1,160 @@
+"""
+A long-lived sandbox worker, used by `capa.safe_exec.pool`.
+
+This module is not imported: its source is run by the sandboxed Python
+executable (``python -c <source> <config>``), so it can only use the standard
+library.  The worker imports the modules Capa code usually needs once, then
+reads execution requests from stdin, one JSON document per line.  Each request
+runs in a freshly forked child, so no state leaks from one execution to the
+next, with the resource limits in the config applied to the child.  The
+child only keeps the pipe it sends its result back on open, so executed code
+can't write to the protocol streams.  Each response is written to stdout as
+one JSON document per line, with the nonce of its request.
+
+"""
+import json
+import os
+import resource
+import select
+import signal
+import sys
+import time
+import traceback
+
+# The rlimits applied to each execution, by codejail limit name.
+RLIMITS = {
+    "CPU": resource.RLIMIT_CPU,
+    "VMEM": resource.RLIMIT_AS,
+    "FSIZE": resource.RLIMIT_FSIZE,
+}
+
+# The types of global values which are sent back from an execution.
+OK_TYPES = (type(None), int, long, float, str, unicode, list, tuple, dict)  # pylint: disable=undefined-variable
+BAD_KEYS = ("__builtins__",)
+
+
+def serve(config):
+    """
+    Preload modules, then execute requests from stdin until it is closed.
+    """
+    for modname in config.get("preload", ()):
+        try:
+            __import__(modname)
+        except Exception:  # pylint: disable=broad-except
+            pass
+
+    # Keep the protocol streams to ourselves: executed code gets /dev/null.
+    requests = os.fdopen(os.dup(0), "r")
+    responses = os.fdopen(os.dup(1), "w")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+
+    limits = config.get("limits", {})
+    while True:
+        line = requests.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        response = run(request, limits)
+        response["nonce"] = request.get("nonce")
+        responses.write(json.dumps(response) + "\n")
+        responses.flush()
+
+
+def run(request, limits):
+    """
+    Execute a request in a forked child, and return its response.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Close every inherited file descriptor but stdin, stdout and stderr
+        # (all /dev/null now) and our end of the result pipe.
+        maxfd = os.sysconf("SC_OPEN_MAX")
+        os.closerange(3, write_fd)
+        os.closerange(write_fd + 1, maxfd)
+        try:
+            output = json.dumps(execute(request, limits))
+        except BaseException:  # pylint: disable=broad-except
+            output = json.dumps({"emsg": traceback.format_exc(), "globals": {}})
+        while output:
+            output = output[os.write(write_fd, output):]
+        os._exit(0)  # pylint: disable=protected-access
+
+    os.close(write_fd)
+    output, timed_out = read_all(read_fd, limits.get("REALTIME"))
+    os.close(read_fd)
+    if timed_out:
+        os.kill(pid, signal.SIGKILL)
+    _, status = os.waitpid(pid, 0)
+
+    if timed_out:
+        return {"emsg": "Execution timed out", "globals": {}}
+    try:
+        return json.loads(output)
+    except ValueError:
+        return {"emsg": "Execution failed with status %d" % status, "globals": {}}
+
+
+def read_all(fd, timeout):
+    """
+    Read from `fd` until EOF, or until `timeout` seconds have passed.
+
+    Returns the data read, and whether the timeout expired.
+
+    """
+    deadline = time.time() + timeout if timeout else None
+    chunks = []
+    while True:
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                return "".join(chunks), True
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            return "".join(chunks), False
+        chunks.append(chunk)
+
+
+def execute(request, limits):
+    """
+    Execute the code of a request, in the forked child.
+    """
+    for name, rlimit in RLIMITS.items():
+        if limits.get(name):
+            resource.setrlimit(rlimit, (limits[name], limits[name]))
+    # Executed code can't start processes of its own.
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+
+    home = request.get("home")
+    if home:
+        os.chdir(home)
+        os.environ["TMPDIR"] = os.path.join(home, "tmp")
+    for pydir in request.get("python_path", ()):
+        sys.path.append(pydir)
+
+    g_dict = request["globals"]
+    try:
+        exec request["code"] in g_dict  # pylint: disable=exec-used
+    except BaseException:  # pylint: disable=broad-except
+        return {"emsg": traceback.format_exc(), "globals": {}}
+
+    def jsonable(value):
+        """
+        Can `value` be sent back as JSON?
+        """
+        if not isinstance(value, OK_TYPES):
+            return False
+        try:
+            json.dumps(value)
+        except Exception:  # pylint: disable=broad-except
+            return False
+        return True
+
+    g_dict = {k: v for k, v in g_dict.iteritems() if jsonable(v) and k not in BAD_KEYS}
+    return {"emsg": None, "globals": g_dict}
+
+
+if __name__ == "__main__":
+    serve(json.loads(sys.argv[1]))
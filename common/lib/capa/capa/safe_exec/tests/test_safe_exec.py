@@ -1,19 +1,30 @@
 """Test safe_exec.py"""
 
 import hashlib
+import importlib
+import io
+import json
 import os
 import os.path
 import random
+import sys
 import textwrap
 import unittest
+import zipfile
 
 import pytest
+from mock import patch
 from six import text_type
 
-from capa.safe_exec import safe_exec, update_hash
+from capa.safe_exec import SafeExecCache, SandboxPool, safe_exec, update_hash
+from capa.safe_exec.cache import MISS, PROCESS_HIT, SHARED_HIT, process_cache
+from capa.safe_exec.safe_exec import cache_key
 from codejail.safe_exec import SafeExecException
 from codejail.jail_code import is_configured
 
+# ``capa.safe_exec`` re-exports the ``safe_exec`` function under the module's name.
+SAFE_EXEC_MODULE = importlib.import_module('capa.safe_exec.safe_exec')
+
 
 class TestSafeExec(unittest.TestCase):
     def test_set_values(self):
@@ -177,6 +188,229 @@ class TestSafeExecCaching(unittest.TestCase):
             except UnicodeEncodeError:
                 self.fail("Tried executing code with non-ASCII unicode: {0}".format(code))
 
+    def test_cache_key_includes_student_context_read_by_code(self):
+        cache = {}
+        g = {'anonymous_student_id': 'student1'}
+        safe_exec("a = anonymous_student_id", g, cache=DictCache(cache), random_seed=3)
+        g = {'anonymous_student_id': 'student2'}
+        safe_exec("a = anonymous_student_id", g, cache=DictCache(cache), random_seed=3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(g, {'anonymous_student_id': 'student2', 'a': 'student2'})
+
+    def test_cache_key_excludes_student_context_not_read_by_code(self):
+        cache = {}
+        safe_exec("a = 17", {'anonymous_student_id': 'student1'}, cache=DictCache(cache), random_seed=3)
+        self.assertEqual(cache.values(), [(None, {'a': 17})])
+
+        # The cached result is used for another student, without changing the student's context.
+        g = {'anonymous_student_id': 'student2'}
+        with patch.object(SAFE_EXEC_MODULE, 'codejail_safe_exec') as mock_exec:
+            safe_exec("a = 17", g, cache=DictCache(cache), random_seed=3)
+        self.assertFalse(mock_exec.called)
+        self.assertEqual(g, {'anonymous_student_id': 'student2', 'a': 17})
+
+    def test_cache_key_includes_student_context_read_dynamically(self):
+        g = {'anonymous_student_id': 'student1'}
+        for code in ("a = globals()['anonymous_' + 'student_id']", "a = eval('anonymous_' + 'student_id')"):
+            self.assertNotEqual(
+                cache_key(code, g),
+                cache_key(code, {'anonymous_student_id': 'student2'}),
+            )
+
+    @patch.dict(SAFE_EXEC_MODULE._extra_file_digests, clear=True)  # pylint: disable=protected-access
+    def test_cache_key_includes_student_context_read_by_python_lib(self):
+        def python_lib(module_code):
+            """
+            Returns the contents of a python_lib.zip with a module of the given code.
+            """
+            zip_file = io.BytesIO()
+            with zipfile.ZipFile(zip_file, 'w') as python_lib_zip:
+                python_lib_zip.writestr('constant.py', module_code)
+            return zip_file.getvalue()
+
+        for module_code, expect_per_student in (
+                ("def student():\n    return 17\n", False),
+                ("import inspect\ndef student():\n    return inspect.stack()[1][0].f_globals\n", True),
+        ):
+            extra_files = [("python_lib.zip", python_lib(module_code))]
+            keys = {
+                cache_key("import constant", {'anonymous_student_id': student}, extra_files=extra_files)
+                for student in ('student1', 'student2')
+            }
+            self.assertEqual(len(keys), 2 if expect_per_student else 1)
+
+    def test_cache_key_includes_extra_files(self):
+        cache = {}
+        safe_exec("a = 17", {}, cache=DictCache(cache), extra_files=[("data.txt", "one")])
+        safe_exec("a = 17", {}, cache=DictCache(cache), extra_files=[("data.txt", "two")])
+        self.assertEqual(len(cache), 2)
+
+    @patch.dict(SAFE_EXEC_MODULE._extra_file_digests, clear=True)  # pylint: disable=protected-access
+    def test_extra_file_digests_are_memoized(self):
+        contents = "some library"
+        with patch.object(SAFE_EXEC_MODULE.hashlib, 'md5', wraps=hashlib.md5) as mock_md5:
+            key = cache_key("a = 17", {}, extra_files=[("data.txt", contents)])
+            self.assertEqual(cache_key("a = 17", {}, extra_files=[("data.txt", contents)]), key)
+        # One digest for each key, and one for the contents.
+        self.assertEqual(mock_md5.call_count, 3)
+
+
+class TestSafeExecCache(unittest.TestCase):
+    """Test the two-level SafeExecCache."""
+
+    def setUp(self):
+        super(TestSafeExecCache, self).setUp()
+        process_cache().clear()
+        self.addCleanup(process_cache().clear)
+        self.shared = {}
+        self.cache = SafeExecCache(DictCache(self.shared))
+
+    def test_miss_then_hits(self):
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=self.cache)
+        self.assertEqual(g['a'], 3)
+        self.assertEqual(len(self.shared), 1)
+
+        # A process-local hit doesn't need the shared cache.
+        self.shared.clear()
+        g = {}
+        safe_exec("a = int(math.pi)", g, cache=self.cache)
+        self.assertEqual(g['a'], 3)
+
+        # A shared hit is copied to the process-local cache.
+        process_cache().clear()
+        self.shared[cache_key("a = 17", {})] = (None, {'a': 17})
+        g = {}
+        safe_exec("a = 17", g, cache=self.cache)
+        self.assertEqual(g['a'], 17)
+        self.assertIn(cache_key("a = 17", {}), process_cache())
+
+        self.assertEqual(self.cache.stats, {PROCESS_HIT: 1, SHARED_HIT: 1, MISS: 1})
+
+    def test_hits_have_the_same_representation(self):
+        self.shared[cache_key("a = 17", {})] = (None, {'a': ('tuple', 'value')})
+        shared_hit = self.cache.get(cache_key("a = 17", {}))
+        process_hit = self.cache.get(cache_key("a = 17", {}))
+        self.assertEqual(shared_hit, process_hit)
+        self.assertEqual(shared_hit, [None, {'a': ['tuple', 'value']}])
+
+    def test_cached_results_are_not_shared(self):
+        g = {}
+        safe_exec("a = [1, 2]", g, cache=self.cache)
+        g['a'].append(3)
+
+        g = {}
+        safe_exec("a = [1, 2]", g, cache=self.cache)
+        self.assertEqual(g['a'], [1, 2])
+
+    def test_without_shared_cache(self):
+        cache = SafeExecCache()
+        safe_exec("a = 17", {}, cache=cache)
+        g = {}
+        with patch.object(SAFE_EXEC_MODULE, 'codejail_safe_exec') as mock_exec:
+            safe_exec("a = 17", g, cache=cache)
+        self.assertFalse(mock_exec.called)
+        self.assertEqual(g['a'], 17)
+
+
+class TestSandboxPool(unittest.TestCase):
+    """Test executing code in a pool of sandbox workers."""
+
+    def setUp(self):
+        super(TestSandboxPool, self).setUp()
+        # The workers run this Python, unsandboxed, so this works without
+        # codejail being configured.
+        self.pool = SandboxPool(
+            1, max_executions=3, command=[sys.executable, "-E", "-B"],
+            limits={"CPU": 1, "REALTIME": 3}, preload=["math"],
+        )
+        self.addCleanup(self.pool.close)
+
+    def safe_exec(self, code, globals_dict, **kwargs):
+        """Run safe_exec with our pool."""
+        with patch.object(SAFE_EXEC_MODULE, 'sandbox_pool', return_value=self.pool):
+            safe_exec(code, globals_dict, **kwargs)
+
+    def test_set_values(self):
+        g = {'x': 2}
+        self.safe_exec("a = 1/2\nb = int(math.pi) + x", g)
+        self.assertEqual(g, {'x': 2, 'a': 0.5, 'b': 5})
+
+    def test_random_seeding(self):
+        r = random.Random(17)
+        rnums = [r.randint(0, 999) for _ in xrange(100)]
+        g = {}
+        self.safe_exec("rnums = [random.randint(0, 999) for _ in xrange(100)]", g, random_seed=17)
+        self.assertEqual(g['rnums'], rnums)
+
+    def test_python_lib(self):
+        pylib = os.path.dirname(__file__) + "/test_files/pylib"
+        g = {}
+        self.safe_exec("import constant; a = constant.THE_CONST", g, python_path=[pylib])
+        self.assertEqual(g['a'], 23)
+
+    def test_raising_exceptions(self):
+        with self.assertRaises(SafeExecException) as cm:
+            self.safe_exec("1/0", {})
+        self.assertIn("ZeroDivisionError", text_type(cm.exception))
+
+    def test_executions_are_isolated(self):
+        self.safe_exec("import sys; sys.leftover = 1", {})
+        g = {}
+        self.safe_exec("import sys; a = hasattr(sys, 'leftover')", g)
+        self.assertFalse(g['a'])
+
+    def test_limits(self):
+        with self.assertRaises(SafeExecException):
+            self.safe_exec("while True: pass", {})
+        with self.assertRaises(SafeExecException) as cm:
+            self.safe_exec("import time; time.sleep(10)", {}, random_seed=1)
+        self.assertIn("timed out", text_type(cm.exception))
+        # The pool still works afterwards.
+        g = {}
+        self.safe_exec("a = 17", g)
+        self.assertEqual(g['a'], 17)
+
+    def test_workers_are_recycled(self):
+        pids = set()
+        for _ in range(7):
+            g = {}
+            self.safe_exec("import os; a = os.getppid()", g)
+            pids.add(g['a'])
+        self.assertEqual(len(pids), 3)
+
+    def test_inherited_fds_are_closed(self):
+        # Executed code tries to forge responses on every file descriptor.
+        forge = textwrap.dedent("""\
+            import json, os
+            forged = json.dumps({"emsg": None, "globals": {"forged": True}}) + "\\n"
+            for fd in range(256):
+                try:
+                    os.write(fd, forged)
+                except OSError:
+                    pass
+            """)
+        try:
+            self.safe_exec(forge, {})
+        except SafeExecException:
+            # It can only spoil its own result.
+            pass
+        g = {}
+        self.safe_exec("a = 17", g)
+        self.assertEqual(g, {'a': 17})
+
+    def test_mismatched_responses_are_rejected(self):
+        worker, = self.pool._workers  # pylint: disable=protected-access
+        stale = {"emsg": None, "globals": {"a": 42}, "nonce": "stale"}
+        worker._buffer = json.dumps(stale) + "\n"  # pylint: disable=protected-access
+        with self.assertRaises(SafeExecException) as cm:
+            self.safe_exec("a = 17", {})
+        self.assertIn("mismatched response", text_type(cm.exception))
+        # The worker was replaced.
+        g = {}
+        self.safe_exec("a = 17", g)
+        self.assertEqual(g, {'a': 17})
+
 
 class TestUpdateHash(unittest.TestCase):
     """Test the safe_exec.update_hash function to be sure it canonicalizes properly."""
@@ -18,6 +18,7 @@ from six import text_type
 from capa.capa_problem import LoncapaProblem, LoncapaSystem
 from capa.inputtypes import Status
 from capa.responsetypes import StudentInputError, ResponseError, LoncapaProblemError
+from capa.safe_exec import SafeExecCache
 from capa.util import convert_files_to_filenames, get_inner_html_from_xpath
 from xblock.fields import Boolean, Dict, Float, Integer, Scope, String, XMLString
 from xblock.scorable import ScorableXBlockMixin, Score
@@ -58,6 +59,19 @@ def randomization_bin(seed, problem_id):
     return int(r_hash.hexdigest()[:7], 16) % NUM_RANDOMIZATION_BINS
 
 
+def variant_seeds(rerandomize):
+    """
+    Return all of the seeds that `choose_new_seed` can pick for a problem
+    with the given `rerandomize` setting, i.e. the seeds of its variants.
+    """
+    if rerandomize == RANDOMIZATION.NEVER:
+        return [1]
+    elif rerandomize == RANDOMIZATION.PER_STUDENT:
+        return range(NUM_RANDOMIZATION_BINS)
+    else:
+        return range(MAX_RANDOMIZATION_BINS)
+
+
 class Randomization(String):
     """
     Define a field to store how to randomize a problem.
@@ -321,7 +335,7 @@ class CapaMixin(ScorableXBlockMixin, CapaFields):
         capa_system = LoncapaSystem(
             ajax_url=self.runtime.ajax_url,
             anonymous_student_id=self.runtime.anonymous_student_id,
-            cache=self.runtime.cache,
+            cache=SafeExecCache(self.runtime.cache) if self.runtime.cache else None,
             can_execute_unsafe_code=self.runtime.can_execute_unsafe_code,
             get_python_lib_zip=self.runtime.get_python_lib_zip,
             DEBUG=self.runtime.DEBUG,
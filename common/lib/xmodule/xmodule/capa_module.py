@@ -12,10 +12,10 @@ from xmodule.exceptions import NotFoundError, ProcessingError
 from xmodule.raw_module import RawDescriptor
 from xmodule.contentstore.django import contentstore
 from xmodule.util.misc import escape_html_characters
-from xmodule.util.sandboxing import get_python_lib_zip
+from xmodule.util.sandboxing import can_execute_unsafe_code, get_python_lib_zip
 from xmodule.x_module import DEPRECATION_VSCOMPAT_EVENT, XModule, module_attr
 
-from .capa_base import CapaFields, CapaMixin, ComplexEncoder
+from .capa_base import NUM_RANDOMIZATION_BINS, CapaFields, CapaMixin, ComplexEncoder, variant_seeds
 
 log = logging.getLogger("edx.courseware")
 
@@ -300,6 +300,64 @@ class CapaDescriptor(CapaFields, RawDescriptor):
         )
         return lcp.get_max_score()
 
+    def precompute_variants(self, cache, max_variants=NUM_RANDOMIZATION_BINS):
+        """
+        Run the problem's scripts for each of its variants, so that the results
+        of the scripts which don't read the per-student context are already in
+        `cache` when the problem is loaded for any student.
+
+        Arguments:
+            cache: the cache the LMS passes to safe_exec (see capa.safe_exec.SafeExecCache).
+            max_variants (int): skip problems with more variants than this, e.g.
+                problems which are rerandomized on every attempt.
+
+        Returns the number of variants that were run.
+        """
+        from capa.capa_problem import LoncapaProblem, LoncapaSystem
+
+        if self.category != 'problem' or '<script' not in self.data:
+            return 0
+
+        seeds = variant_seeds(self.rerandomize)
+        if len(seeds) > max_variants:
+            return 0
+
+        course_id = self.runtime.course_id
+        python_lib_zip = get_python_lib_zip(contentstore, course_id)
+        capa_system = LoncapaSystem(
+            ajax_url=None,
+            # Executions which read the per-student context are cached per student
+            # (see capa.safe_exec.cache_key), so those can't be precomputed.
+            anonymous_student_id=None,
+            cache=cache,
+            can_execute_unsafe_code=lambda: can_execute_unsafe_code(course_id),
+            get_python_lib_zip=lambda: python_lib_zip,
+            DEBUG=None,
+            filestore=self.runtime.resources_fs,
+            i18n=self.runtime.service(self, "i18n"),
+            node_path=None,
+            render_template=None,
+            seed=1,
+            STATIC_URL=None,
+            xqueue=None,
+            matlab_api_key=None,
+        )
+        for seed in seeds:
+            try:
+                LoncapaProblem(
+                    problem_text=self.data,
+                    id=self.location.html_id(),
+                    capa_system=capa_system,
+                    capa_module=None,
+                    state={'seed': seed},
+                    seed=seed,
+                    extract_tree=False,
+                )
+            except responsetypes.LoncapaProblemError:
+                # The error is cached too, so students will see it just the same.
+                log.warning("Error running variant %s of problem %s", seed, self.location, exc_info=True)
+        return len(seeds)
+
     def generate_report_data(self, user_state_iterator, limit_responses=None):
         """
         Return a list of student responses to this block in a readable way.
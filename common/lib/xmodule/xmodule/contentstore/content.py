@@ -373,16 +373,21 @@ class ContentStore(object):
         '''
         raise NotImplementedError
 
-    def delete_all_course_assets(self, course_key):
+    def delete_all_course_assets(self, course_key, progress_callback=None):
         """
         Delete all of the assets which use this course_key as an identifier
         :param course_key:
+        :param progress_callback: if given, called with the number of assets deleted so far
+            and the total number of assets to delete, as the deletion progresses
         """
         raise NotImplementedError
 
-    def copy_all_course_assets(self, source_course_key, dest_course_key):
+    def copy_all_course_assets(self, source_course_key, dest_course_key, progress_callback=None):
         """
         Copy all the course assets from source_course_key to dest_course_key
+
+        If given, progress_callback is called with the number of assets copied so far and the
+        total number of assets to copy, as the copy progresses.
         """
         raise NotImplementedError
 
@@ -1,10 +1,15 @@
 from __future__ import absolute_import
 from importlib import import_module
 
+import django.dispatch
 from django.conf import settings
 
 _CONTENTSTORE = {}
 
+# Sent by contentstores, with the course_key of the course, after any of the
+# course's assets is saved, changed or deleted.
+ASSET_CHANGED = django.dispatch.Signal(providing_args=['course_key'])
+
 
 def load_function(path):
     """
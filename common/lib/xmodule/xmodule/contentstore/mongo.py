@@ -1,17 +1,24 @@
 """
 MongoDB/GridFS-level code for the contentstore.
 """
+import datetime
+import hashlib
 import os
 import json
+from collections import Counter
+
 import pymongo
 import gridfs
 from gridfs.errors import NoFile
+from gridfs.grid_file import DEFAULT_CHUNK_SIZE
 from fs.osfs import OSFS
 from bson.son import SON
 
 from mongodb_proxy import autoretry_read
 from opaque_keys.edx.keys import AssetKey
+from opaque_keys.edx.locator import CourseLocator
 from xmodule.contentstore.content import XASSET_LOCATION_TAG
+from xmodule.contentstore.django import ASSET_CHANGED
 from xmodule.exceptions import NotFoundError
 from xmodule.modulestore.django import ASSET_IGNORE_REGEX
 from xmodule.util.misc import escape_invalid_characters
@@ -22,16 +29,29 @@ from .content import StaticContent, ContentStore, StaticContentStream
 class MongoContentStore(ContentStore):
     """
     MongoDB-backed ContentStore.
+
+    Each asset is a GridFS file.  In content-addressed mode, the data of the assets saved is stored
+    once per distinct content, as a blob in a separate GridFS bucket, and the GridFS file of each
+    asset only holds its attributes and a reference to its blob.  The blobs are reference counted,
+    and deleted along with the last asset which references them.  Assets stored before the mode
+    was enabled keep their own data.
     """
+    # The number of assets copied or deleted at once by copy_all_course_assets and
+    # delete_all_course_assets, and the total size of the chunks they insert at once.
+    BULK_ASSETS_BATCH_SIZE = 100
+    BULK_CHUNKS_BATCH_BYTES = 16 * 1024 * 1024
+
     # pylint: disable=unused-argument, bad-continuation
     def __init__(
         self, host, db,
-        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None, **kwargs
+        port=27017, tz_aware=True, user=None, password=None, bucket='fs', collection=None,
+        content_addressed=False, **kwargs
     ):
         """
         Establish the connection with the mongo backend and connect to the collections
 
         :param collection: ignores but provided for consistency w/ other doc_store_config patterns
+        :param content_addressed: whether to save the data of assets as shared blobs
         """
         # GridFS will throw an exception if the Database is wrapped in a MongoProxy. So don't wrap it.
         # The appropriate methods below are marked as autoretry_read - those methods will handle
@@ -47,6 +67,13 @@ class MongoContentStore(ContentStore):
         self.fs_files = mongo_db[bucket + ".files"]  # the underlying collection GridFS uses
         self.chunks = mongo_db[bucket + ".chunks"]
 
+        # The blobs of content-addressed assets, and their reference counts by sha1 digest.
+        self.content_addressed = content_addressed
+        self.blobs = gridfs.GridFS(mongo_db, bucket + ".blobs")
+        self.blob_files = mongo_db[bucket + ".blobs.files"]
+        self.blob_chunks = mongo_db[bucket + ".blobs.chunks"]
+        self.blob_refs = mongo_db[bucket + ".blob_refs"]
+
     def close_connections(self):
         """
         Closes any open connections to the underlying databases
@@ -70,24 +97,48 @@ class MongoContentStore(ContentStore):
         if database:
             connection.drop_database(self.fs_files.database)
         elif collections:
-            self.fs_files.drop()
-            self.chunks.drop()
+            for collection in self._collections():
+                collection.drop()
         else:
-            self.fs_files.remove({})
-            self.chunks.remove({})
+            for collection in self._collections():
+                collection.remove({})
 
         if connections:
             self.close_connections()
 
+    def _collections(self):
+        """
+        Returns all of the collections used by this contentstore.
+        """
+        return [self.fs_files, self.chunks, self.blob_files, self.blob_chunks, self.blob_refs]
+
     def save(self, content):
         content_id, content_son = self.asset_db_key(content.location)
+        thumbnail_location = content.thumbnail_location.to_deprecated_list_repr() if content.thumbnail_location else None
+
+        if self.content_addressed:
+            data = b''.join(content.data) if hasattr(content.data, '__iter__') else content.data
+            # Reference the blob before deleting the previous version, which may reference it too.
+            blob_digest, blob_id = self._save_blob(data)
+            self.delete(content_id)
+            self.fs_files.insert({
+                '_id': content_id, 'filename': unicode(content.location), 'contentType': content.content_type,
+                'displayname': content.name, 'content_son': content_son,
+                'thumbnail_location': thumbnail_location,
+                'import_path': content.import_path,
+                # getattr b/c caching may mean some pickled instances don't have attr
+                'locked': getattr(content, 'locked', False),
+                'length': len(data), 'chunkSize': DEFAULT_CHUNK_SIZE, 'uploadDate': datetime.datetime.utcnow(),
+                'md5': hashlib.md5(data).hexdigest(), 'blob_digest': blob_digest, 'blob_id': blob_id,
+            })
+            ASSET_CHANGED.send(sender=self.__class__, course_key=content.location.course_key)
+            return content
 
         # The way to version files in gridFS is to not use the file id as the _id but just as the filename.
         # Then you can upload as many versions as you like and access by date or version. Because we use
         # the location as the _id, we must delete before adding (there's no replace method in gridFS)
         self.delete(content_id)  # delete is a noop if the entry doesn't exist; so, don't waste time checking
 
-        thumbnail_location = content.thumbnail_location.to_deprecated_list_repr() if content.thumbnail_location else None
         with self.fs.new_file(_id=content_id, filename=unicode(content.location), content_type=content.content_type,
                               displayname=content.name, content_son=content_son,
                               thumbnail_location=thumbnail_location,
@@ -100,16 +151,31 @@ class MongoContentStore(ContentStore):
             else:
                 fp.write(content.data)
 
+        ASSET_CHANGED.send(sender=self.__class__, course_key=content.location.course_key)
         return content
 
     def delete(self, location_or_id):
         """
-        Delete an asset.
+        Delete an asset, given its key or its database _id.
         """
         if isinstance(location_or_id, AssetKey):
+            course_key = location_or_id.course_key
             location_or_id, _ = self.asset_db_key(location_or_id)
+        else:
+            course_key = self._course_key_for_id(location_or_id)
         # Deletes of non-existent files are considered successful
-        self.fs.delete(location_or_id)
+        self._delete_fs_entries([location_or_id])
+        ASSET_CHANGED.send(sender=self.__class__, course_key=course_key)
+
+    @staticmethod
+    def _course_key_for_id(asset_id):
+        """
+        Returns the key of the course of the asset with the given database _id (see asset_db_key).
+        """
+        if isinstance(asset_id, basestring):
+            return AssetKey.from_string(asset_id).course_key
+        # Assets of deprecated courses are identified by a SON, without their run.
+        return CourseLocator(asset_id['org'], asset_id['course'], asset_id.get('run'), deprecated=True)
 
     @autoretry_read()
     def find(self, location, throw_on_not_found=True, as_stream=False):
@@ -125,7 +191,7 @@ class MongoContentStore(ContentStore):
                         thumbnail_location[4]
                     )
                 return StaticContentStream(
-                    location, fp.displayname, fp.content_type, fp, last_modified_at=fp.uploadDate,
+                    location, fp.displayname, fp.content_type, self._get_data_file(fp), last_modified_at=fp.uploadDate,
                     thumbnail_location=thumbnail_location,
                     import_path=getattr(fp, 'import_path', None),
                     length=fp.length, locked=getattr(fp, 'locked', False),
@@ -140,7 +206,8 @@ class MongoContentStore(ContentStore):
                             thumbnail_location[4]
                         )
                     return StaticContent(
-                        location, fp.displayname, fp.content_type, fp.read(), last_modified_at=fp.uploadDate,
+                        location, fp.displayname, fp.content_type, self._get_data_file(fp).read(),
+                        last_modified_at=fp.uploadDate,
                         thumbnail_location=thumbnail_location,
                         import_path=getattr(fp, 'import_path', None),
                         length=fp.length, locked=getattr(fp, 'locked', False),
@@ -153,22 +220,35 @@ class MongoContentStore(ContentStore):
                 return None
 
     def export(self, location, output_directory):
-        content = self.find(location)
-
-        filename = content.name
-        if content.import_path is not None:
-            output_directory = output_directory + '/' + os.path.dirname(content.import_path)
-
         if not os.path.exists(output_directory):
             os.makedirs(output_directory)
 
-        # Escape invalid char from filename.
-        export_name = escape_invalid_characters(name=filename, invalid_char_list=['/', '\\'])
+        self.export_to_fs(location, OSFS(output_directory))
 
-        disk_fs = OSFS(output_directory)
+    def export_to_fs(self, location, output_fs):
+        """
+        Export an asset to the given PyFilesystem, in the directory of its import path.
 
-        with disk_fs.open(export_name, 'wb') as asset_file:
-            asset_file.write(content.data)
+        The asset's data is handed to the filesystem's setbinfile as a GridFS file, so it is copied
+        as it is read rather than loaded in memory first.
+        """
+        content_id, __ = self.asset_db_key(location)
+        try:
+            fp = self.fs.get(content_id)
+        except NoFile:
+            raise NotFoundError(content_id)
+
+        export_dir = u''
+        import_path = getattr(fp, 'import_path', None)
+        if import_path is not None:
+            export_dir = os.path.dirname(import_path)
+            if export_dir:
+                output_fs.makedirs(export_dir, recreate=True)
+
+        # Escape invalid char from filename.
+        export_name = escape_invalid_characters(name=fp.displayname, invalid_char_list=['/', '\\'])
+
+        output_fs.setbinfile(os.path.join(export_dir, export_name), self._get_data_file(fp))
 
     def export_all_for_course(self, course_key, output_directory, assets_policy_file):
         """
@@ -181,6 +261,31 @@ class MongoContentStore(ContentStore):
             assets_policy_file: the filename for the policy file which should be in the same
                 directory as the other policy files.
         """
+        policy = self._export_all_assets(course_key, lambda location: self.export(location, output_directory))
+
+        with open(assets_policy_file, 'w') as f:
+            json.dump(policy, f, sort_keys=True, indent=4)
+
+    def export_all_for_course_to_fs(self, course_key, output_fs, policies_fs):
+        """
+        Like export_all_for_course, but exports the assets to a PyFilesystem (see export_to_fs), and
+        their attributes to the assets.json file of another.
+
+        Args:
+            course_key (CourseKey): the :class:`CourseKey` identifying the course
+            output_fs: the filesystem under which to put all the asset files
+            policies_fs: the filesystem of the other policy files
+        """
+        policy = self._export_all_assets(course_key, lambda location: self.export_to_fs(location, output_fs))
+
+        with policies_fs.open(u'assets.json', 'wb') as f:
+            f.write(json.dumps(policy, sort_keys=True, indent=4))
+
+    def _export_all_assets(self, course_key, export_asset):
+        """
+        Calls export_asset with the location of each of this course's assets, and returns the
+        policy of their attributes.
+        """
         policy = {}
         assets, __ = self.get_all_content_for_course(course_key)
 
@@ -193,13 +298,12 @@ class MongoContentStore(ContentStore):
             #
             # When debugging course exports, this might be a good place
             # to look. -- pmitros
-            self.export(asset['asset_key'], output_directory)
+            export_asset(asset['asset_key'])
             for attr, value in asset.iteritems():
-                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key']:
+                if attr not in ['_id', 'md5', 'uploadDate', 'length', 'chunkSize', 'asset_key'] + BLOB_ATTRS:
                     policy.setdefault(asset['asset_key'].block_id, {})[attr] = value
 
-        with open(assets_policy_file, 'w') as f:
-            json.dump(policy, f, sort_keys=True, indent=4)
+        return policy
 
     def get_all_content_thumbnails_for_course(self, course_key):
         return self._get_all_content_for_course(course_key, get_thumbnails=True)[0]
@@ -221,10 +325,9 @@ class MongoContentStore(ContentStore):
                 ('{}.category'.format(prefix), 'asset'),
                 ('{}.name'.format(prefix), {'$regex': ASSET_IGNORE_REGEX}),
             ])
-            items = self.fs_files.find(query)
+            items = self.fs_files.find(query, ['_id'])
             assets_to_delete = assets_to_delete + items.count()
-            for asset in items:
-                self.fs.delete(asset[prefix])
+            self._delete_fs_entries([self.make_id_son(asset) for asset in items])
 
             self.fs_files.remove(query)
         return assets_to_delete
@@ -314,6 +417,24 @@ class MongoContentStore(ContentStore):
             asset['asset_key'] = course_key.make_asset_key(asset_id['category'], asset_id['name'])
         return assets, count
 
+    @autoretry_read()
+    def get_all_content_attrs_for_course(self, course_key, fields=None):
+        """
+        Returns the attributes of all of the assets and thumbnails of a course, as a list of
+        dictionaries like those returned by get_attrs, with an additional asset_key.
+
+        :param course_key: the CourseKey of the course
+        :param fields: the names of the attributes to return, or None to return all of them
+        """
+        projection = None
+        if fields is not None:
+            projection = list(fields) + ['content_son']
+        attrs_list = list(self.fs_files.find(query_for_course(course_key), projection))
+        for attrs in attrs_list:
+            asset_id = attrs.get('content_son', attrs['_id'])
+            attrs['asset_key'] = course_key.make_asset_key(asset_id['category'], asset_id['name'])
+        return attrs_list
+
     def set_attr(self, asset_key, attr, value=True):
         """
         Add/set the given attr on the asset at the given location. Does not allow overwriting gridFS built in
@@ -350,13 +471,14 @@ class MongoContentStore(ContentStore):
         :param location:  a c4x asset location
         """
         for attr in attr_dict.iterkeys():
-            if attr in ['_id', 'md5', 'uploadDate', 'length']:
+            if attr in ['_id', 'md5', 'uploadDate', 'length'] + BLOB_ATTRS:
                 raise AttributeError("{} is a protected attribute.".format(attr))
         asset_db_key, __ = self.asset_db_key(location)
         # catch upsert error and raise NotFoundError if asset doesn't exist
         result = self.fs_files.update({'_id': asset_db_key}, {"$set": attr_dict}, upsert=False)
         if not result.get('updatedExisting', True):
             raise NotFoundError(asset_db_key)
+        ASSET_CHANGED.send(sender=self.__class__, course_key=location.course_key)
 
     @autoretry_read()
     def get_attrs(self, location):
@@ -375,56 +497,177 @@ class MongoContentStore(ContentStore):
             raise NotFoundError(asset_db_key)
         return item
 
-    def copy_all_course_assets(self, source_course_key, dest_course_key):
+    def copy_all_course_assets(self, source_course_key, dest_course_key, progress_callback=None):
         """
         See :meth:`.ContentStore.copy_all_course_assets`
 
-        This implementation fairly expensively copies all of the data
-        """
-        source_query = query_for_course(source_course_key)
-        # it'd be great to figure out how to do all of this on the db server and not pull the bits over
-        for asset in self.fs_files.find(source_query):
-            asset_key = self.make_id_son(asset)
-            # don't convert from string until fs access
-            source_content = self.fs.get(asset_key)
-            if isinstance(asset_key, basestring):
-                asset_key = AssetKey.from_string(asset_key)
-                __, asset_key = self.asset_db_key(asset_key)
-            asset_key['org'] = dest_course_key.org
-            asset_key['course'] = dest_course_key.course
-            if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
-                if 'run' in asset_key:
-                    del asset_key['run']
-                asset_id = asset_key
-            else:  # add the run, since it's the last field, we're golden
-                asset_key['run'] = dest_course_key.run
-                asset_id = unicode(
-                    dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
-                )
-
-            self.fs.put(
-                source_content.read(),
-                _id=asset_id, filename=asset['filename'], content_type=asset['contentType'],
-                displayname=asset['displayname'], content_son=asset_key,
-                # thumbnail is not technically correct but will be functionally correct as the code
-                # only looks at the name which is not course relative.
-                thumbnail_location=asset['thumbnail_location'],
-                import_path=asset['import_path'],
-                # getattr b/c caching may mean some pickled instances don't have attr
-                locked=asset.get('locked', False)
-            )
-
-    def delete_all_course_assets(self, course_key):
+        This implementation copies the GridFS documents of the assets, with batched inserts of their
+        chunks, without decoding them into files.  Assets which the destination course already has
+        with the same md5 aren't copied again, so rerunning a copy only copies what changed.
+        """
+        source_assets = list(self.fs_files.find(query_for_course(source_course_key)))
+        dest_md5s = {
+            self._asset_name(asset): asset.get('md5')
+            for asset in self.fs_files.find(query_for_course(dest_course_key), ['content_son', 'md5'])
+        }
+
+        for start in range(0, len(source_assets), self.BULK_ASSETS_BATCH_SIZE):
+            dest_assets = []
+            chunks = []
+            chunks_size = 0
+            blob_refs = Counter()
+            for asset in source_assets[start:start + self.BULK_ASSETS_BATCH_SIZE]:
+                asset_name = self._asset_name(asset)
+                if asset_name in dest_md5s:
+                    if asset.get('md5') and dest_md5s[asset_name] == asset['md5']:
+                        continue
+                    self._delete_fs_entries([self._copied_asset_ids(asset, dest_course_key)[0]])
+
+                source_id = self.make_id_son(asset)
+                asset_id, asset_key = self._copied_asset_ids(asset, dest_course_key)
+                if asset.get('blob_digest'):
+                    # Content-addressed assets only need another reference to their blob.
+                    blob_refs[asset['blob_digest']] += 1
+                    blob_attrs = {'blob_digest': asset['blob_digest'], 'blob_id': asset['blob_id']}
+                else:
+                    blob_attrs = {}
+                    for chunk in self.chunks.find({'files_id': source_id}, ['n', 'data']):
+                        chunks.append({'files_id': asset_id, 'n': chunk['n'], 'data': chunk['data']})
+                        chunks_size += len(chunk['data'])
+                        if chunks_size >= self.BULK_CHUNKS_BATCH_BYTES:
+                            self.chunks.insert(chunks)
+                            chunks = []
+                            chunks_size = 0
+                dest_assets.append(dict(blob_attrs, **{
+                    '_id': asset_id, 'filename': asset['filename'], 'contentType': asset['contentType'],
+                    'displayname': asset['displayname'], 'content_son': asset_key,
+                    # thumbnail is not technically correct but will be functionally correct as the code
+                    # only looks at the name which is not course relative.
+                    'thumbnail_location': asset.get('thumbnail_location'),
+                    'import_path': asset.get('import_path'),
+                    'locked': asset.get('locked', False),
+                    'length': asset['length'], 'chunkSize': asset['chunkSize'], 'md5': asset.get('md5'),
+                    'uploadDate': datetime.datetime.utcnow(),
+                }))
+
+            # Like GridFS, write the chunks of the files before the files themselves.
+            if chunks:
+                self.chunks.insert(chunks)
+            for blob_digest, count in blob_refs.iteritems():
+                self.blob_refs.update({'_id': blob_digest}, {'$inc': {'refcount': count}})
+            if dest_assets:
+                self.fs_files.insert(dest_assets)
+            if progress_callback is not None:
+                progress_callback(min(start + self.BULK_ASSETS_BATCH_SIZE, len(source_assets)), len(source_assets))
+        ASSET_CHANGED.send(sender=self.__class__, course_key=dest_course_key)
+
+    def delete_all_course_assets(self, course_key, progress_callback=None):
         """
         Delete all assets identified via this course_key. Dangerous operation which may remove assets
-        referenced by other runs or other courses.
+        referenced by other runs or other courses.  The assets are deleted in batches.
         :param course_key:
+        :param progress_callback: see :meth:`.ContentStore.delete_all_course_assets`
         """
-        course_query = query_for_course(course_key)
-        matching_assets = self.fs_files.find(course_query)
-        for asset in matching_assets:
-            asset_key = self.make_id_son(asset)
-            self.fs.delete(asset_key)
+        asset_ids = [
+            self.make_id_son(asset) for asset in self.fs_files.find(query_for_course(course_key), ['_id'])
+        ]
+        for start in range(0, len(asset_ids), self.BULK_ASSETS_BATCH_SIZE):
+            batch = asset_ids[start:start + self.BULK_ASSETS_BATCH_SIZE]
+            self._delete_fs_entries(batch)
+            if progress_callback is not None:
+                progress_callback(start + len(batch), len(asset_ids))
+        ASSET_CHANGED.send(sender=self.__class__, course_key=course_key)
+
+    def _delete_fs_entries(self, asset_ids):
+        """
+        Deletes the GridFS files with the given database _ids, with their chunks, and releases the
+        blobs they reference.
+        """
+        blob_refs = Counter(
+            fs_entry['blob_digest']
+            for fs_entry in self.fs_files.find(
+                {'_id': {'$in': asset_ids}, 'blob_digest': {'$exists': True}}, ['blob_digest']
+            )
+        )
+        # Like GridFS, delete the files before their chunks.
+        self.fs_files.remove({'_id': {'$in': asset_ids}})
+        self.chunks.remove({'files_id': {'$in': asset_ids}})
+        self._release_blobs(blob_refs)
+
+    def _save_blob(self, data):
+        """
+        Adds a reference to the blob holding the given data, storing the blob if there's none.
+
+        Returns the sha1 digest and GridFS file id of the blob.
+        """
+        blob_digest = hashlib.sha1(data).hexdigest()
+        while True:
+            blob_ref = self.blob_refs.find_and_modify({'_id': blob_digest}, {'$inc': {'refcount': 1}}, new=True)
+            if blob_ref is not None:
+                return blob_digest, blob_ref['blob_id']
+            blob_id = self.blobs.put(data)
+            try:
+                self.blob_refs.insert({'_id': blob_digest, 'blob_id': blob_id, 'refcount': 1})
+            except pymongo.errors.DuplicateKeyError:
+                # Another process stored the same data at the same time: reference its blob instead.
+                self.blobs.delete(blob_id)
+            else:
+                return blob_digest, blob_id
+
+    def _release_blobs(self, blob_refs):
+        """
+        Removes the given numbers of references, by digest, to blobs, and deletes the blobs which
+        are no longer referenced.
+        """
+        for blob_digest, count in blob_refs.iteritems():
+            blob_ref = self.blob_refs.find_and_modify({'_id': blob_digest}, {'$inc': {'refcount': -count}}, new=True)
+            if blob_ref is not None and blob_ref['refcount'] <= 0:
+                # Don't delete the blob if it was referenced again in the meantime.
+                result = self.blob_refs.remove({'_id': blob_digest, 'refcount': {'$lte': 0}})
+                if result.get('n'):
+                    self.blobs.delete(blob_ref['blob_id'])
+
+    def _get_data_file(self, fp):
+        """
+        Returns the GridFS file holding the data of the asset of the given GridFS file: the blob
+        it references, or the file itself.
+        """
+        blob_id = getattr(fp, 'blob_id', None)
+        if blob_id is None:
+            return fp
+        return self.blobs.get(blob_id)
+
+    @staticmethod
+    def _asset_name(fs_entry):
+        """
+        Returns the (category, name) of the asset of the given entry of self.fs_files.
+        """
+        asset_id = fs_entry.get('content_son', fs_entry['_id'])
+        return asset_id['category'], asset_id['name']
+
+    def _copied_asset_ids(self, fs_entry, dest_course_key):
+        """
+        Returns the database _id and son structured key of the copy, in dest_course_key, of the
+        asset of the given entry of self.fs_files.
+        """
+        asset_key = self.make_id_son(fs_entry)
+        if isinstance(asset_key, basestring):
+            asset_key = AssetKey.from_string(asset_key)
+            __, asset_key = self.asset_db_key(asset_key)
+        else:
+            asset_key = SON(asset_key)
+        asset_key['org'] = dest_course_key.org
+        asset_key['course'] = dest_course_key.course
+        if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
+            if 'run' in asset_key:
+                del asset_key['run']
+            asset_id = asset_key
+        else:  # add the run, since it's the last field, we're golden
+            asset_key['run'] = dest_course_key.run
+            asset_id = unicode(
+                dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
+            )
+        return asset_id, asset_key
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -559,6 +802,10 @@ class MongoContentStore(ContentStore):
         )
 
 
+# The attributes of the GridFS files of content-addressed assets which reference their blob.
+BLOB_ATTRS = ['blob_digest', 'blob_id']
+
+
 def query_for_course(course_key, category=None):
     """
     Construct a SON object that will query for all assets possibly limited to the given type
@@ -321,10 +321,27 @@ class BulkOperationsMixin(object):
         Sends out the signal that items have been published from within this course.
         """
         if self.signal_handler and bulk_ops_record.has_publish_item:
+            kwargs = {}
+            try:
+                structure_diff = self._get_published_structure_diff(bulk_ops_record, course_id)
+            except Exception:  # pylint: disable=broad-except
+                # Without the diff, receivers update everything the publish may have changed.
+                log.exception(u"Couldn't compute the structure diff of a publish of %s", course_id)
+                structure_diff = None
+            if structure_diff is not None:
+                kwargs['structure_diff'] = structure_diff
             # We remove the branch, because publishing always means copying from draft to published
-            self.signal_handler.send("course_published", course_key=course_id.for_branch(None))
+            self.signal_handler.send("course_published", course_key=course_id.for_branch(None), **kwargs)
             bulk_ops_record.has_publish_item = False
 
+    def _get_published_structure_diff(self, bulk_ops_record, course_id):  # pylint: disable=unused-argument
+        """
+        Returns the StructureDiff of the usage keys of the blocks which this bulk
+        operation added to, changed in and removed from the published course, if
+        the modulestore can tell; otherwise, None.
+        """
+        return None
+
     def send_bulk_library_updated_signal(self, bulk_ops_record, library_id):
         """
         Sends out the signal that library have been updated.
@@ -423,6 +440,8 @@ class BlockData(object):
     def __init__(self, **kwargs):
         # Has the definition been loaded?
         self.definition_loaded = False
+        # If only some of the definition's fields have been loaded, their names.
+        self.definition_fields = None
         self.from_storable(kwargs)
 
     def to_storable(self):
@@ -1334,11 +1353,16 @@ class ModuleStoreWriteBase(ModuleStoreReadBase, ModuleStoreWrite):
         """
         This base method just copies the assets. The lower level impls must do the actual cloning of
         content.
+
+        If an asset_progress_callback kwarg is given, it's passed to the contentstore's
+        copy_all_course_assets as its progress_callback.
         """
         with self.bulk_operations(dest_course_id):
             # copy the assets
             if self.contentstore:
-                self.contentstore.copy_all_course_assets(source_course_id, dest_course_id)
+                self.contentstore.copy_all_course_assets(
+                    source_course_id, dest_course_id, progress_callback=kwargs.get('asset_progress_callback'),
+                )
             return dest_course_id
 
     def delete_course(self, course_key, user_id, **kwargs):
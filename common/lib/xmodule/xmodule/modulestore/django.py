@@ -155,6 +155,9 @@ class SignalHandler(object):
     2. The sender is going to be the class of the modulestore sending it.
     3. The names of your handler function's parameters *must* be "sender" and "course_key".
     4. Always have **kwargs in your signal handler, as new things may be added.
+       For instance, modulestores which can tell which blocks a publish added,
+       changed and removed send course_published with a "structure_diff",
+       which also has the versions of the course before and after the publish.
     5. The thing that listens for the signal lives in process, but should do
        almost no work. Its main job is to kick off the celery task that will
        do the actual work.
@@ -163,7 +166,7 @@ class SignalHandler(object):
     # If you add a new signal, please don't forget to add it to the _mapping
     # as well.
     pre_publish = SwitchedSignal("pre_publish", providing_args=["course_key"])
-    course_published = SwitchedSignal("course_published", providing_args=["course_key"])
+    course_published = SwitchedSignal("course_published", providing_args=["course_key", "structure_diff"])
     course_deleted = SwitchedSignal("course_deleted", providing_args=["course_key"])
     library_updated = SwitchedSignal("library_updated", providing_args=["library_key"])
     item_deleted = SwitchedSignal("item_deleted", providing_args=["usage_key", "user_id"])
@@ -254,6 +254,15 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         store = self._get_modulestore_for_courselike(usage_key.course_key)
         return store.get_item(usage_key, depth, **kwargs)
 
+    def prefetch_definitions(self, course_key, usage_keys, depth=None):
+        """
+        Loads the definitions of the given blocks of the course, and of their descendants
+        down to depth, ahead of their use, if the course's modulestore loads them lazily.
+        """
+        store = self._get_modulestore_for_courselike(course_key)
+        if hasattr(store, 'prefetch_definitions'):
+            store.prefetch_definitions(course_key, usage_keys, depth=depth)
+
     @strip_key
     def get_items(self, course_key, **kwargs):
         """
@@ -395,6 +404,60 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         except ItemNotFoundError:
             return None
 
+    @strip_key
+    def get_courselikes(self, courselike_keys, **kwargs):
+        """
+        Returns the root blocks of the courses and libraries with the given keys,
+        in the order of the keys, skipping the keys which aren't found.
+
+        Each modulestore is asked for all of the keys it may have at once, so
+        modulestores which implement get_courselikes can get them with a few
+        queries, rather than a few per key.
+        """
+        courselike_ids = [self._clean_locator_for_mapping(courselike_key) for courselike_key in courselike_keys]
+        courselikes = {}
+        for store in self.modulestores:
+            store_keys = [
+                courselike_key
+                for courselike_key, courselike_id in zip(courselike_keys, courselike_ids)
+                if courselike_id not in courselikes and self.mappings.get(courselike_id, store) is store
+            ]
+            if not store_keys:
+                continue
+            for courselike in self._get_courselikes_from_store(store, store_keys, **kwargs):
+                courselike_id = self._clean_locator_for_mapping(courselike.location.course_key)
+                courselikes[courselike_id] = courselike
+                self.mappings.setdefault(courselike_id, store)
+        return [
+            courselikes[courselike_id]
+            for courselike_id in courselike_ids
+            if courselike_id in courselikes
+        ]
+
+    def _get_courselikes_from_store(self, store, courselike_keys, **kwargs):
+        """
+        Returns the root blocks of the courses and libraries with the given keys
+        in the given modulestore.
+        """
+        if hasattr(store, 'get_courselikes'):
+            return store.get_courselikes(courselike_keys, **kwargs)
+
+        courselikes = []
+        for courselike_key in courselike_keys:
+            if isinstance(courselike_key, LibraryLocator):
+                if not hasattr(store, 'get_library'):
+                    continue
+                get_courselike = store.get_library
+            else:
+                get_courselike = store.get_course
+            try:
+                courselike = get_courselike(courselike_key, **kwargs)
+            except ItemNotFoundError:
+                continue
+            if courselike is not None:
+                courselikes.append(courselike)
+        return courselikes
+
     @strip_key
     @contract(library_key='LibraryLocator')
     def get_library(self, library_key, depth=0, **kwargs):
@@ -717,12 +780,16 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
             return source_modulestore.clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
 
         if dest_modulestore.get_modulestore_type() == ModuleStoreEnum.Type.split:
+            asset_progress_callback = kwargs.pop('asset_progress_callback', None)
             split_migrator = SplitMigrator(dest_modulestore, source_modulestore)
             split_migrator.migrate_mongo_course(source_course_id, user_id, dest_course_id.org,
                                                 dest_course_id.course, dest_course_id.run, fields, **kwargs)
 
             # the super handles assets and any other necessities
-            super(MixedModuleStore, self).clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
+            super(MixedModuleStore, self).clone_course(
+                source_course_id, dest_course_id, user_id, fields, asset_progress_callback=asset_progress_callback,
+                **kwargs
+            )
         else:
             raise NotImplementedError("No code for cloning from {} to {}".format(
                 source_modulestore, dest_modulestore
@@ -196,7 +196,10 @@ class DraftModuleStore(MongoModuleStore):
                 )
 
             # clone the assets
-            super(DraftModuleStore, self).clone_course(source_course_id, dest_course_id, user_id, fields)
+            super(DraftModuleStore, self).clone_course(
+                source_course_id, dest_course_id, user_id, fields,
+                asset_progress_callback=kwargs.get('asset_progress_callback'),
+            )
 
             # get the whole old course
             new_course = self.get_course(dest_course_id)
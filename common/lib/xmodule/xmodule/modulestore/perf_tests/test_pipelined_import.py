@@ -0,0 +1,67 @@
+"""
+Performance test for importing courses with their static files uploaded in a pool.
+"""
+import itertools
+import unittest
+
+import ddt
+import pytest
+
+from xmodule.modulestore.perf_tests.test_asset_import_export import TEST_COURSE, TEST_DATA_ROOT
+from xmodule.modulestore.tests.utils import MODULESTORE_SETUPS, SHORT_NAME_MAP
+from xmodule.modulestore.xml_importer import import_course_from_xml
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Numbers of threads uploading static files; 0 is the sequential import.
+IMPORT_WORKERS = (0, 2, 4, 8)
+
+
+@ddt.ddt
+@unittest.skip
+class PipelinedImportTest(unittest.TestCase):
+    """
+    This class exists to time the end-to-end XML import of a course into different
+    modulestore classes, with different numbers of static file upload threads.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(*itertools.product(
+        MODULESTORE_SETUPS,
+        IMPORT_WORKERS,
+    ))
+    @ddt.unpack
+    def test_generate_import_timings(self, source_ms, import_workers):
+        """
+        Generate import timings for different modulestores and numbers of upload threads.
+        """
+        if CodeBlockTimer is None:
+            pytest.skip("CodeBlockTimer undefined.")
+
+        desc = "PipelinedImport:{}:{}".format(
+            SHORT_NAME_MAP[source_ms],
+            import_workers,
+        )
+
+        with source_ms.build() as (source_content, source_store):
+            source_course_key = source_store.make_course_key('a', 'course', 'course')
+
+            with CodeBlockTimer(desc):
+                import_course_from_xml(
+                    source_store,
+                    'test_user',
+                    TEST_DATA_ROOT,
+                    source_dirs=TEST_COURSE,
+                    static_content_store=source_content,
+                    target_id=source_course_key,
+                    create_if_not_present=True,
+                    raise_on_failure=True,
+                    import_workers=import_workers,
+                )
@@ -0,0 +1,91 @@
+"""
+Performance test for exporting courses to tar archives, with and without staging them in a directory.
+"""
+import tarfile
+import unittest
+from shutil import rmtree
+from tempfile import TemporaryFile, mkdtemp
+
+import ddt
+import pytest
+from path import Path as path
+
+from xmodule.modulestore.perf_tests.test_asset_import_export import TEST_COURSE, TEST_DATA_ROOT
+from xmodule.modulestore.tests.utils import MODULESTORE_SETUPS, SHORT_NAME_MAP
+from xmodule.modulestore.xml_exporter import export_course_to_tar, export_course_to_xml
+from xmodule.modulestore.xml_importer import import_course_from_xml
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+EXPORTED_COURSE_DIR_NAME = u'exported_course'
+
+
+@ddt.ddt
+@unittest.skip
+class StreamingExportTest(unittest.TestCase):
+    """
+    This class exists to time the export of a course to a .tar.gz file from different
+    modulestore classes, by exporting it to a directory and compressing the directory,
+    and by streaming it into the archive.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super(StreamingExportTest, self).setUp()
+        self.export_dir = path(mkdtemp())
+        self.addCleanup(rmtree, self.export_dir, ignore_errors=True)
+
+    @ddt.data(*MODULESTORE_SETUPS)
+    def test_generate_export_timings(self, source_ms):
+        """
+        Generate timings of both exports for different modulestores.
+        """
+        if CodeBlockTimer is None:
+            pytest.skip("CodeBlockTimer undefined.")
+
+        desc = "StreamingExport:{}".format(SHORT_NAME_MAP[source_ms])
+
+        with source_ms.build() as (source_content, source_store):
+            source_course_key = source_store.make_course_key('a', 'course', 'course')
+            import_course_from_xml(
+                source_store,
+                'test_user',
+                TEST_DATA_ROOT,
+                source_dirs=TEST_COURSE,
+                static_content_store=source_content,
+                target_id=source_course_key,
+                create_if_not_present=True,
+                raise_on_failure=True,
+            )
+
+            with CodeBlockTimer(desc):
+
+                with CodeBlockTimer("directory_export"):
+                    with TemporaryFile() as export_file:
+                        export_course_to_xml(
+                            source_store,
+                            source_content,
+                            source_course_key,
+                            self.export_dir,
+                            EXPORTED_COURSE_DIR_NAME,
+                        )
+                        with tarfile.open(fileobj=export_file, mode='w:gz') as tar_file:
+                            tar_file.add(self.export_dir / EXPORTED_COURSE_DIR_NAME, arcname=EXPORTED_COURSE_DIR_NAME)
+                        rmtree(self.export_dir / EXPORTED_COURSE_DIR_NAME)
+
+                with CodeBlockTimer("streaming_export"):
+                    with TemporaryFile() as export_file:
+                        export_course_to_tar(
+                            source_store,
+                            source_content,
+                            source_course_key,
+                            export_file,
+                            EXPORTED_COURSE_DIR_NAME,
+                        )
@@ -21,3 +21,35 @@ class BlockKey(namedtuple('BlockKey', 'type id')):
 
 
 CourseEnvelope = namedtuple('CourseEnvelope', 'course_key structure')
+
+
+# The sets of keys of the blocks which were added, changed and removed between
+# two versions of a structure, and the ids of the versions (see diff_structures).
+StructureDiff = namedtuple('StructureDiff', 'added changed removed old_version new_version')
+
+
+def diff_structures(old_structure, new_structure):
+    """
+    Compares two versions of a structure, either of which may be None, and returns
+    a StructureDiff of the BlockKeys of their blocks.  A block changed if its
+    definition or the version in which it was last updated differ.
+    """
+    old_blocks = old_structure['blocks'] if old_structure else {}
+    new_blocks = new_structure['blocks'] if new_structure else {}
+    return StructureDiff(
+        added=new_blocks.viewkeys() - old_blocks.viewkeys(),
+        changed={
+            block_key for block_key in new_blocks.viewkeys() & old_blocks.viewkeys()
+            if _block_version(new_blocks[block_key]) != _block_version(old_blocks[block_key])
+        },
+        removed=old_blocks.viewkeys() - new_blocks.viewkeys(),
+        old_version=old_structure['_id'] if old_structure else None,
+        new_version=new_structure['_id'] if new_structure else None,
+    )
+
+
+def _block_version(block_data):
+    """
+    Returns what identifies the version of a block in a structure.
+    """
+    return block_data.definition, block_data.edit_info.update_version
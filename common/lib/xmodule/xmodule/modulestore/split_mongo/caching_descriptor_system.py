@@ -198,6 +198,9 @@ class CachingDescriptorSystem(MakoDescriptorSystem, EditInfoRuntimeMixin):
                 block_key.type,
                 definition_id,
                 convert_fields,
+                # for the situation if block_data has no definition_fields attribute
+                # (in case it was taken from memcache)
+                getattr(block_data, 'definition_fields', None),
             )
         else:
             definition_loader = None
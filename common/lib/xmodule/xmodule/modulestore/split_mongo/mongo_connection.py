@@ -15,7 +15,9 @@ from time import time
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
+    from openedx.core.lib.cache_utils import ProcessLRUCache
     DJANGO_AVAILABLE = True
 except ImportError:
     DJANGO_AVAILABLE = False
@@ -203,11 +205,34 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+_process_cache = None  # pylint: disable=invalid-name
+
+
+def process_cache():
+    """
+    Returns the process-local cache of decoded course structures, keyed by
+    structure id, whose size is the total size of their pickled data.
+    """
+    global _process_cache  # pylint: disable=global-statement, invalid-name
+    if _process_cache is None:
+        _process_cache = ProcessLRUCache(
+            max_size=getattr(settings, 'COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES', 0),
+        )
+    return _process_cache
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
     The course structures are pickled and compressed when cached.
 
+    Since structures never change once saved, decoded structures are also
+    kept in a process-local cache (see :func:`process_cache`) in front of the
+    django cache, so they aren't decompressed and unpickled on every get.
+    Callers must not modify the structures they get, or their blocks: the
+    modulestore copies a structure before versioning it, and copies blocks
+    before adding their definitions to them.
+
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
@@ -225,6 +250,12 @@ class CourseStructureCache(object):
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
+            structure = process_cache().get(key)
+            tagger.tag(from_process_cache=str(structure is not None).lower())
+            if structure is not None:
+                tagger.tag(from_cache='true')
+                return structure
+
             compressed_pickled_data = self.cache.get(key)
             tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
 
@@ -234,11 +265,48 @@ class CourseStructureCache(object):
                 return None
 
             tagger.measure('compressed_size', len(compressed_pickled_data))
+            return self._decode(key, compressed_pickled_data, tagger)
 
-            pickled_data = zlib.decompress(compressed_pickled_data)
-            tagger.measure('uncompressed_size', len(pickled_data))
+    def get_many(self, keys, course_context=None):
+        """
+        Pull the structures with the given keys from cache, in a single request
+        for those which aren't cached in this process.  Returns a dict of the
+        structures found by key.
+        """
+        if self.cache is None:
+            return {}
+
+        with TIMER.timer("CourseStructureCache.get_many", course_context) as tagger:
+            tagger.measure('requested', len(keys))
+            structures = {}
+            for key in keys:
+                structure = process_cache().get(key)
+                if structure is not None:
+                    structures[key] = structure
+            tagger.measure('from_process_cache', len(structures))
+
+            missing_keys = [key for key in keys if key not in structures]
+            if missing_keys:
+                for key, compressed_pickled_data in self.cache.get_many(missing_keys).iteritems():
+                    structures[key] = self._decode(key, compressed_pickled_data, tagger)
+            tagger.measure('found', len(structures))
+            if len(structures) < len(keys):
+                # Always log cache misses, because they are unexpected
+                tagger.sample_rate = 1
+
+            return structures
 
-            return pickle.loads(pickled_data)
+    def _decode(self, key, compressed_pickled_data, tagger):
+        """
+        Decompress and unpickle a structure read from the cache, and keep it in
+        the process-local cache.
+        """
+        pickled_data = zlib.decompress(compressed_pickled_data)
+        tagger.measure('uncompressed_size', len(pickled_data))
+
+        structure = pickle.loads(pickled_data)
+        process_cache().set(key, structure, size=len(pickled_data))
+        return structure
 
     def set(self, key, structure, course_context=None):
         """Given a structure, will pickle, compress, and write to cache."""
@@ -255,6 +323,8 @@ class CourseStructureCache(object):
 
             # Stuctures are immutable, so we set a timeout of "never"
             self.cache.set(key, compressed_pickled_data, None)
+            # Keep a copy of our own, since the caller may still modify its structure.
+            process_cache().set(key, pickle.loads(pickled_data), size=len(pickled_data))
 
 
 class MongoConnection(object):
@@ -322,6 +392,28 @@ class MongoConnection(object):
 
             return structure
 
+    def get_structures(self, keys, course_context=None):
+        """
+        Get the structures from the persistence mechanism whose ids are the given keys.
+
+        Structures are taken from the cache when available; the others are
+        fetched with a single query and added to the cache.  Returns a list of
+        the structures found.
+        """
+        with TIMER.timer("get_structures", course_context) as tagger_get_structures:
+            tagger_get_structures.measure("requested_ids", len(keys))
+            cache = CourseStructureCache()
+
+            structures = cache.get_many(keys, course_context)
+            tagger_get_structures.measure("from_cache", len(structures))
+            missing_keys = [key for key in keys if key not in structures]
+            if missing_keys:
+                for structure in self.find_structures_by_id(missing_keys, course_context):
+                    cache.set(structure['_id'], structure, course_context)
+                    structures[structure['_id']] = structure
+
+            return structures.values()
+
     @autoretry_read()
     def find_structures_by_id(self, ids, course_context=None):
         """
@@ -538,13 +630,19 @@ class MongoConnection(object):
             tagger.tag(block_type=definition['block_type'])
             return definition
 
-    def get_definitions(self, definitions, course_context=None):
+    def get_definitions(self, definitions, course_context=None, fields=None):
         """
         Retrieve all definitions listed in `definitions`.
+
+        If `fields` is given, only those of the definitions' fields are retrieved.
         """
         with TIMER.timer("get_definitions", course_context) as tagger:
             tagger.measure('definitions', len(definitions))
-            definitions = self.definitions.find({'_id': {'$in': definitions}})
+            projection = None
+            if fields is not None:
+                tagger.measure('fields', len(fields))
+                projection = ['block_type'] + ['fields.{}'.format(field) for field in fields]
+            definitions = self.definitions.find({'_id': {'$in': definitions}}, projection)
             return definitions
 
     def insert_definition(self, definition, course_context=None):
@@ -87,7 +87,7 @@ from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
-from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
+from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope, diff_structures
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.error_module import ErrorDescriptor
 from collections import defaultdict
@@ -410,7 +410,7 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
             definition_guid = course_key.as_object_id(definition_guid)
             return self.db_connection.get_definition(definition_guid, course_key)
 
-    def get_definitions(self, course_key, ids):
+    def get_definitions(self, course_key, ids, fields=None):
         """
         Return all definitions that specified in ``ids``.
 
@@ -421,6 +421,8 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
             course_key (:class:`.CourseKey`): The course that these definitions are being loaded
                 for (to respect bulk operations).
             ids (list): A list of definition ids
+            fields (list): If given, the names of the only fields to fetch from the
+                database. Definitions fetched this way are incomplete, so they aren't cached.
         """
         definitions = []
         ids = set(ids)
@@ -436,11 +438,12 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
 
         if len(ids):
             # Query the db for the definitions.
-            defs_from_db = list(self.db_connection.get_definitions(list(ids), course_key))
-            defs_dict = {d.get('_id'): d for d in defs_from_db}
-            # Add the retrieved definitions to the cache.
-            bulk_write_record.definitions_in_db.update(defs_dict.iterkeys())
-            bulk_write_record.definitions.update(defs_dict)
+            defs_from_db = list(self.db_connection.get_definitions(list(ids), course_key, fields))
+            if fields is None:
+                defs_dict = {d.get('_id'): d for d in defs_from_db}
+                # Add the retrieved definitions to the cache.
+                bulk_write_record.definitions_in_db.update(defs_dict.iterkeys())
+                bulk_write_record.definitions.update(defs_dict)
             definitions.extend(defs_from_db)
         return definitions
 
@@ -597,7 +600,9 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         Return all structures that specified in ``ids``.
 
         If a structure with the same id is in both the cache and the database,
-        the cached version will be preferred.
+        the cached version will be preferred.  Structures which aren't in the
+        cache are taken from the structure cache, and the remaining ones are
+        fetched from the database in a single query.
 
         Arguments:
             ids (list): A list of structure ids
@@ -612,7 +617,8 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
                     ids.remove(structure_id)
                     structures.append(structure)
 
-        structures.extend(self.db_connection.find_structures_by_id(list(ids)))
+        if ids:
+            structures.extend(self.db_connection.get_structures(list(ids)))
         return structures
 
     def find_structures_derived_from(self, ids):
@@ -759,7 +765,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         self.db_connection._drop_database(database, collections, connections)  # pylint: disable=protected-access
 
-    def cache_items(self, system, base_block_ids, course_key, depth=0, lazy=True):
+    def cache_items(self, system, base_block_ids, course_key, depth=0, lazy=True, definition_fields=None):
         """
         Handles caching of items once inheritance and any other one time
         per course per fetch operations are done.
@@ -770,6 +776,9 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             course_key: the destination course providing the context
             depth: how deep below these to prefetch
             lazy: whether to load definitions now or later
+            definition_fields: if not lazy, a map of block types to the names of the only
+                definition fields to load now for blocks of those types; the blocks' other
+                definition fields, and those of blocks of other types, are loaded when first used
         """
         with self.bulk_operations(course_key, emit_signals=False):
             new_module_data = {}
@@ -783,29 +792,60 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
             # This method supports lazy loading, where the descendent definitions aren't loaded
             # until they're actually needed.
-            if not lazy:
+            if not lazy and definition_fields is None:
                 # Non-lazy loading: Load all descendants by id.
                 descendent_definitions = self.get_definitions(
                     course_key,
                     [
                         block.definition
                         for block in new_module_data.itervalues()
-                    ]
+                    ],
                 )
-                # Turn definitions into a map.
-                definitions = {definition['_id']: definition
-                               for definition in descendent_definitions}
+            elif not lazy:
+                # Load the requested fields of the descendants, with a query for each set of fields.
+                definition_ids_by_fields = defaultdict(list)
+                for block_key, block in new_module_data.iteritems():
+                    fields = frozenset(definition_fields.get(block_key.type, ()))
+                    if fields:
+                        definition_ids_by_fields[fields].append(block.definition)
+                descendent_definitions = []
+                for fields, definition_ids in definition_ids_by_fields.iteritems():
+                    descendent_definitions.extend(self.get_definitions(course_key, definition_ids, sorted(fields)))
 
-                for block in new_module_data.itervalues():
-                    if block.definition in definitions:
-                        definition = definitions[block.definition]
-                        # convert_fields gets done later in the runtime's xblock_from_json
-                        block.fields.update(definition.get('fields'))
-                        block.definition_loaded = True
+            if not lazy:
+                self._add_definitions_to_blocks(
+                    new_module_data,
+                    {definition['_id']: definition for definition in descendent_definitions},
+                    definition_fields
+                )
 
             system.module_data.update(new_module_data)
             return system.module_data
 
+    def _add_definitions_to_blocks(self, module_data, definitions, definition_fields=None):
+        """
+        Replaces the blocks in module_data whose definitions are in definitions
+        (a map of definition ids to definitions) by copies which include the
+        definitions' fields.  The blocks themselves belong to the structure,
+        which may be shared (see CourseStructureCache), so they aren't modified.
+
+        If the definitions only have the fields named for the blocks' types in
+        definition_fields (a map of block types to field names), the blocks record
+        it, so that their other fields are loaded when needed.
+        """
+        for block_key, block in module_data.items():
+            if block.definition in definitions:
+                definition = definitions[block.definition]
+                block = copy.copy(block)
+                block.fields = dict(block.fields)
+                # convert_fields gets done later in the runtime's xblock_from_json
+                block.fields.update(definition.get('fields', {}))
+                if definition_fields is None:
+                    block.definition_loaded = True
+                else:
+                    block.definition_fields = frozenset(definition_fields.get(block_key.type, ()))
+                module_data[block_key] = block
+
     @contract(course_entry=CourseEnvelope, block_keys="list(BlockKey)", depth="int | None")
     def _load_items(self, course_entry, block_keys, depth=0, **kwargs):
         """
@@ -813,8 +853,12 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         Load the definitions into each block if lazy is in kwargs and is False;
         otherwise, do not load the definitions - they'll be loaded later when needed.
+        If definition_fields (a map of block types to field names) is in kwargs as
+        well, only load those fields of the definitions of blocks of those types now;
+        the others will be loaded later when needed.
         """
         lazy = kwargs.pop('lazy', True)
+        definition_fields = kwargs.pop('definition_fields', None)
         should_cache_items = not lazy
 
         runtime = self._get_cache(course_entry.structure['_id'])
@@ -824,7 +868,7 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             should_cache_items = True
 
         if should_cache_items:
-            self.cache_items(runtime, block_keys, course_entry.course_key, depth, lazy)
+            self.cache_items(runtime, block_keys, course_entry.course_key, depth, lazy, definition_fields)
 
         with self.bulk_operations(course_entry.course_key, emit_signals=False):
             return [runtime.load_item(block_key, course_entry, **kwargs) for block_key in block_keys]
@@ -973,15 +1017,12 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         :param str branch: Branch to fetch structures from
         :param type locator_factory: Factory to create locator from structure info and branch
         """
-        result = []
-        for entry, structure_info in self._get_structures_for_branch(branch, **kwargs):
-            locator = locator_factory(structure_info, branch)
-            envelope = CourseEnvelope(locator, entry)
-            root = entry['root']
-            structures_list = self._load_items(envelope, [root], depth=0, **kwargs)
-            if not isinstance(structures_list[0], ErrorDescriptor):
-                result.append(structures_list[0])
-        return result
+        course_entries = [
+            CourseEnvelope(locator_factory(structure_info, branch), entry)
+            for entry, structure_info in self._get_structures_for_branch(branch, **kwargs)
+        ]
+        # The roots' definitions are needed to construct them, so get them all at once.
+        return self._load_courselike_roots(course_entries, load_definitions=True, **kwargs)
 
     def _create_course_locator(self, course_info, branch):
         """
@@ -1108,6 +1149,123 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         """
         return self._get_structures_for_branch_and_locator(branch, self._create_library_locator, **kwargs)
 
+    def get_courselikes(self, courselike_keys, depth=0, load_definitions=False, head_validation=True, **kwargs):
+        """
+        Returns the root blocks of the courses and libraries with the given keys,
+        in the order of the keys.  Keys which aren't found in this modulestore are
+        skipped.
+
+        Unlike calling get_course or get_library for each key, this fetches the
+        course indexes of all of the keys in one query, and their structures in
+        another one, which skips the structures found in the structure cache and
+        adds the others to it.  If load_definitions is True, the definitions of
+        the blocks down to depth are fetched in one more query; otherwise they're
+        loaded when needed, as usual.
+
+        :param courselike_keys: the CourseLocators and LibraryLocators to get, with branches
+        :param head_validation: if False, keys with a version_guid get that version
+            without checking that it's the head of their branch (see get_library)
+        """
+        courselike_keys = [
+            courselike_key for courselike_key in courselike_keys
+            if isinstance(courselike_key, (CourseLocator, LibraryLocator))
+            and not getattr(courselike_key, 'deprecated', False)
+        ]
+        course_entries = self._lookup_courselikes(courselike_keys, head_validation=head_validation)
+        return self._load_courselike_roots(course_entries, depth, load_definitions, **kwargs)
+
+    def _load_courselike_roots(self, course_entries, depth=0, load_definitions=False, **kwargs):
+        """
+        Loads the root blocks of the given CourseEnvelopes, with the blocks down
+        to depth, skipping roots which fail to load.  If load_definitions is True,
+        the definitions of those blocks are fetched in a single query; the
+        definitions of other blocks are still loaded lazily.
+        """
+        runtimes = []
+        for course_entry in course_entries:
+            structure = course_entry.structure
+            runtime = self._get_cache(structure['_id'])
+            module_data = {}
+            if runtime is None or load_definitions:
+                module_data = self.descendants(structure['blocks'], structure['root'], depth, {})
+            if runtime is None:
+                runtime = self._add_cache(structure['_id'], self.create_runtime(course_entry, True))
+            runtimes.append((course_entry, runtime, module_data))
+
+        if load_definitions:
+            definitions = []
+            definition_ids = set()
+            for course_entry, _, module_data in runtimes:
+                block_definition_ids = [
+                    block.definition for block in module_data.itervalues() if block.definition is not None
+                ]
+                if self._get_bulk_ops_record(course_entry.course_key).active:
+                    # Respect the definitions of the course's bulk operation.
+                    definitions.extend(self.get_definitions(course_entry.course_key, block_definition_ids))
+                else:
+                    definition_ids.update(block_definition_ids)
+            if definition_ids:
+                definitions.extend(self.db_connection.get_definitions(list(definition_ids)))
+            definitions = {definition['_id']: definition for definition in definitions}
+            for _, _, module_data in runtimes:
+                self._add_definitions_to_blocks(module_data, definitions)
+
+        courselikes = []
+        for course_entry, runtime, module_data in runtimes:
+            runtime.module_data.update(module_data)
+            with self.bulk_operations(course_entry.course_key, emit_signals=False):
+                courselike = runtime.load_item(course_entry.structure['root'], course_entry, **kwargs)
+            if not isinstance(courselike, ErrorDescriptor):
+                courselikes.append(courselike)
+        return courselikes
+
+    def _lookup_courselikes(self, courselike_keys, head_validation=True):
+        """
+        Returns the CourseEnvelopes of the courses and libraries with the given
+        keys, like _lookup_course does for one key, in the order of the keys.
+        Keys which aren't found are skipped.
+        """
+        version_guids = {}
+        index_keys = []
+        for courselike_key in courselike_keys:
+            if (head_validation or not courselike_key.version_guid) and \
+                    courselike_key.org and courselike_key.course and courselike_key.run:
+                if courselike_key.branch is None:
+                    raise InsufficientSpecificationError(courselike_key)
+                index_keys.append(courselike_key)
+            elif courselike_key.version_guid is None:
+                raise InsufficientSpecificationError(courselike_key)
+            else:
+                version_guids[courselike_key] = courselike_key.version_guid
+
+        if index_keys:
+            indexes = {
+                (index['org'], index['course'], index['run']): index
+                for index in self.find_matching_course_indexes(course_keys=index_keys)
+            }
+            for courselike_key in index_keys:
+                index = indexes.get((courselike_key.org, courselike_key.course, courselike_key.run))
+                if index is None or courselike_key.branch not in index['versions']:
+                    continue
+                version_guid = index['versions'][courselike_key.branch]
+                if courselike_key.version_guid is not None and version_guid != courselike_key.version_guid:
+                    # This may be a bit too touchy but it's hard to infer intent
+                    raise VersionConflictError(courselike_key, version_guid)
+                version_guids[courselike_key] = version_guid
+
+        structures = {
+            structure['_id']: structure
+            for structure in self.find_structures_by_id(version_guids.values())
+        }
+        return [
+            CourseEnvelope(
+                courselike_key.replace(version_guid=version_guids[courselike_key]),
+                structures[version_guids[courselike_key]]
+            )
+            for courselike_key in courselike_keys
+            if version_guids.get(courselike_key) in structures
+        ]
+
     def make_course_key(self, org, course, run):
         """
         Return a valid :class:`~opaque_keys.edx.keys.CourseKey` for this modulestore
@@ -1226,6 +1384,36 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 log.debug("Found more than one item for '{}'".format(usage_key))
             return items[0]
 
+    def prefetch_definitions(self, course_key, usage_keys, depth=None):
+        """
+        Loads the definitions of the given blocks of the course, and of their descendants
+        down to depth, in a single query, ahead of their use.
+
+        Blocks which are loaded afterwards through the course's cached runtime (see
+        _get_cache) come with their definitions, instead of fetching them one by one
+        when their content fields are first read.  During a bulk operation on the course,
+        the definitions are also cached in it, so blocks loaded before don't fetch them
+        either.
+
+        Arguments:
+            course_key (:class:`.CourseKey`): The course of the blocks
+            usage_keys (list): The keys of the root blocks of the subtrees to prefetch
+            depth (int): The number of levels of descendants to prefetch; None for all
+        """
+        with self.bulk_operations(course_key, emit_signals=False):
+            course_entry = self._lookup_course(course_key)
+            runtime = self._get_cache(course_entry.structure['_id'])
+            if runtime is None:
+                runtime = self.create_runtime(course_entry, lazy=True)
+                self._add_cache(course_entry.structure['_id'], runtime)
+            self.cache_items(
+                runtime,
+                [BlockKey.from_usage_key(usage_key) for usage_key in usage_keys],
+                course_entry.course_key,
+                depth,
+                lazy=False,
+            )
+
     def get_items(self, course_locator, settings=None, content=None, qualifiers=None, include_orphans=True, **kwargs):
         """
         Returns:
@@ -1486,6 +1674,54 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             'edited_on': course['edited_on']
         }
 
+    def get_structure_diff(self, course_key, old_version_guid, new_version_guid=None):
+        """
+        Compares two versions of the structure of a course or library, and returns a
+        StructureDiff of the sets of usage keys of the blocks which were added, changed
+        (in their definitions or settings) and removed, in course_key without its version.
+
+        :param course_key: the course or library; if new_version_guid isn't given, the head
+            of its branch is compared
+        :param old_version_guid: the version to compare from, or None for an empty structure
+        """
+        if new_version_guid is None:
+            new_version_guid = self._lookup_course(course_key).structure['_id']
+        structures = {
+            structure['_id']: structure
+            for structure in self.find_structures_by_id(
+                [version_guid for version_guid in (old_version_guid, new_version_guid) if version_guid is not None]
+            )
+        }
+        if new_version_guid not in structures:
+            raise ItemNotFoundError(course_key.for_version(new_version_guid))
+
+        structure_diff = diff_structures(structures.get(old_version_guid), structures[new_version_guid])
+        course_key = course_key.version_agnostic()
+
+        def usage_keys(block_keys):
+            """
+            Returns the usage keys in course_key of the given BlockKeys.
+            """
+            return {course_key.make_usage_key(block_key.type, block_key.id) for block_key in block_keys}
+
+        return structure_diff._replace(
+            added=usage_keys(structure_diff.added),
+            changed=usage_keys(structure_diff.changed),
+            removed=usage_keys(structure_diff.removed),
+        )
+
+    def _get_published_structure_diff(self, bulk_ops_record, course_id):
+        """
+        Returns the StructureDiff of the usage keys of the blocks which this bulk
+        operation added to, changed in and removed from the published branch.
+        """
+        published = ModuleStoreEnum.BranchName.published
+        old_version_guid = (bulk_ops_record.initial_index or {}).get('versions', {}).get(published)
+        new_version_guid = (bulk_ops_record.index or {}).get('versions', {}).get(published)
+        if new_version_guid is None:
+            return None
+        return self.get_structure_diff(course_id.for_branch(None), old_version_guid, new_version_guid)
+
     def get_definition_history_info(self, definition_locator, course_context=None):
         """
         Because xblocks doesn't give a means to separate the definition's meta information from
@@ -1890,6 +2126,8 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if source_index is None:
             raise ItemNotFoundError("Cannot find a course at {0}. Aborting".format(source_course_id))
 
+        # Only meant for copying the assets, which create_course doesn't do.
+        asset_progress_callback = kwargs.pop('asset_progress_callback', None)
         with self.bulk_operations(dest_course_id):
             new_course = self.create_course(
                 dest_course_id.org, dest_course_id.course, dest_course_id.run,
@@ -1901,7 +2139,10 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 **kwargs
             )
             # don't copy assets until we create the course in case something's awry
-            super(SplitMongoModuleStore, self).clone_course(source_course_id, dest_course_id, user_id, fields, **kwargs)
+            super(SplitMongoModuleStore, self).clone_course(
+                source_course_id, dest_course_id, user_id, fields, asset_progress_callback=asset_progress_callback,
+                **kwargs
+            )
             return new_course
 
     DEFAULT_ROOT_COURSE_BLOCK_ID = 'course'
@@ -65,6 +65,20 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         library_id = self._map_revision_to_branch(library_id)
         return super(DraftVersioningModuleStore, self).get_library(library_id, depth=depth, **kwargs)
 
+    def get_courselikes(self, courselike_keys, depth=0, head_validation=True, **kwargs):
+        """
+        See :py:meth: xmodule.modulestore.split_mongo.split.SplitMongoModuleStore.get_courselikes
+        """
+        courselike_keys = [
+            courselike_key
+            if not head_validation and courselike_key.version_guid
+            else self._map_revision_to_branch(courselike_key)
+            for courselike_key in courselike_keys
+        ]
+        return super(DraftVersioningModuleStore, self).get_courselikes(
+            courselike_keys, depth=depth, head_validation=head_validation, **kwargs
+        )
+
     def clone_course(self, source_course_id, dest_course_id, user_id, fields=None, revision=None, **kwargs):
         """
         See :py:meth: xmodule.modulestore.split_mongo.split.SplitMongoModuleStore.clone_course
@@ -279,6 +293,13 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         usage_key = self._map_revision_to_branch(usage_key, revision=revision)
         return super(DraftVersioningModuleStore, self).get_item(usage_key, depth=depth, **kwargs)
 
+    def prefetch_definitions(self, course_key, usage_keys, depth=None):
+        """
+        See :py:meth: xmodule.modulestore.split_mongo.split.SplitMongoModuleStore.prefetch_definitions
+        """
+        course_key = self._map_revision_to_branch(course_key)
+        return super(DraftVersioningModuleStore, self).prefetch_definitions(course_key, usage_keys, depth=depth)
+
     def get_items(self, course_locator, revision=None, **kwargs):
         """
         Returns a list of XModuleDescriptor instances for the matching items within the course with
@@ -76,7 +76,7 @@ class SplitMongoKVS(InheritanceKeyValueStore):
                     # get default which may be the inherited value
                     raise KeyError()
                 elif key.scope == Scope.content:
-                    if isinstance(self._definition, DefinitionLazyLoader):
+                    if self._is_definition_field_pending(key.field_name):
                         self._load_definition()
                     else:
                         raise KeyError()
@@ -143,7 +143,8 @@ class SplitMongoKVS(InheritanceKeyValueStore):
             return False
 
         if key.scope == Scope.content:
-            self._load_definition()
+            if self._is_definition_field_pending(key.field_name):
+                self._load_definition()
         elif key.scope == Scope.parent:
             return True
 
@@ -174,6 +175,14 @@ class SplitMongoKVS(InheritanceKeyValueStore):
         # If not, try inheriting from a parent, then use the XBlock type's normal default value:
         return super(SplitMongoKVS, self).default(key)
 
+    def _is_definition_field_pending(self, field_name):
+        """
+        Is the given definition field still to be loaded? Some of the
+        definition's fields may have been loaded without the others.
+        """
+        return isinstance(self._definition, DefinitionLazyLoader) and \
+            field_name not in self._definition.loaded_fields
+
     def _load_definition(self):
         """
         Update fields w/ the lazily loaded definitions
@@ -182,6 +191,9 @@ class SplitMongoKVS(InheritanceKeyValueStore):
             persisted_definition = self._definition.fetch()
             if persisted_definition is not None:
                 fields = self._definition.field_converter(persisted_definition.get('fields'))
+                # don't clobber the values of the fields which were already loaded
+                for field_name in self._definition.loaded_fields:
+                    fields.pop(field_name, None)
                 self._fields.update(fields)
                 aside_fields_p = persisted_definition.get('aside_fields')
                 if aside_fields_p:
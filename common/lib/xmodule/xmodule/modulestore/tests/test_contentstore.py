@@ -1,6 +1,8 @@
 """
  Test contentstore.mongo functionality
 """
+import itertools
+import json
 import logging
 from uuid import uuid4
 import unittest
@@ -9,11 +11,14 @@ from tempfile import mkdtemp
 import path
 import shutil
 
+from fs.memoryfs import MemoryFS
+from mock import Mock, call, patch
 from opaque_keys.edx.locator import CourseLocator, AssetLocator
 from opaque_keys.edx.keys import AssetKey
 from xmodule.tests import DATA_DIR
 from xmodule.contentstore.mongo import MongoContentStore
 from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.django import ASSET_CHANGED
 from xmodule.exceptions import NotFoundError
 import ddt
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
@@ -51,13 +56,13 @@ class TestContentstore(unittest.TestCase):
             del CourseLocator.deprecated
         return super(TestContentstore, cls).tearDownClass()
 
-    def set_up_assets(self, deprecated):
+    def set_up_assets(self, deprecated, content_addressed=False):
         """
         Setup contentstore w/ proper overriding of deprecated.
         """
         # since MongoModuleStore and MongoContentStore are basically assumed to be together, create this class
         # as well
-        self.contentstore = MongoContentStore(HOST, DB, port=PORT)
+        self.contentstore = MongoContentStore(HOST, DB, port=PORT, content_addressed=content_addressed)
         self.addCleanup(self.contentstore._drop_database)  # pylint: disable=protected-access
 
         AssetLocator.deprecated = deprecated
@@ -146,6 +151,25 @@ class TestContentstore(unittest.TestCase):
         finally:
             shutil.rmtree(root_dir)
 
+    @ddt.data(*itertools.product([True, False], [True, False]))
+    @ddt.unpack
+    def test_export_for_course_to_fs(self, deprecated, content_addressed):
+        """
+        Test exporting to a filesystem
+        """
+        self.set_up_assets(deprecated, content_addressed)
+        with MemoryFS() as export_fs:
+            self.contentstore.export_all_for_course_to_fs(
+                self.course1_key, export_fs.makedir(u'static'), export_fs.makedir(u'policies'),
+            )
+            self.assertItemsEqual(export_fs.listdir(u'static'), self.course1_files)
+            for filename in self.course1_files:
+                with open("{}/static/{}".format(DATA_DIR, filename), "rb") as f:
+                    self.assertEqual(export_fs.getbytes(u'static/' + filename), f.read())
+            policy = json.loads(export_fs.gettext(u'policies/assets.json'))
+            self.assertItemsEqual(policy.keys(), self.course1_files)
+            self.assertTrue(policy['picture1.jpg']['locked'])
+
     @ddt.data(True, False)
     def test_get_all_content(self, deprecated):
         """
@@ -166,6 +190,65 @@ class TestContentstore(unittest.TestCase):
         self.assertEqual(count, 0)
         self.assertEqual(course_assets, [])
 
+    @ddt.data(True, False)
+    def test_get_all_content_attrs(self, deprecated):
+        """
+        Test get_all_content_attrs_for_course
+        """
+        self.set_up_assets(deprecated)
+        course1_attrs = self.contentstore.get_all_content_attrs_for_course(self.course1_key, fields=['locked'])
+        self.assertItemsEqual(
+            [attrs['asset_key'] for attrs in course1_attrs],
+            [self.course1_key.make_asset_key('asset', filename) for filename in self.course1_files],
+        )
+        for attrs in course1_attrs:
+            self.assertEqual(attrs.get('locked', False), self.contentstore.get_attr(attrs['asset_key'], 'locked'))
+            self.assertNotIn('md5', attrs)
+
+        fake_course = CourseLocator('test', 'fake', 'non')
+        self.assertEqual(self.contentstore.get_all_content_attrs_for_course(fake_course), [])
+
+    @ddt.data(True, False)
+    def test_asset_changed(self, deprecated):
+        """
+        Test that changes to assets send ASSET_CHANGED with their course
+        """
+        self.set_up_assets(deprecated)
+        receiver = Mock()
+        ASSET_CHANGED.connect(receiver)
+        self.addCleanup(ASSET_CHANGED.disconnect, receiver)
+
+        asset_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+        self.contentstore.set_attr(asset_key, 'locked', True)
+        self.contentstore.delete(asset_key)
+        self.save_asset(self.course1_files[0], asset_key, self.course1_files[0], False)
+        self.contentstore.delete_all_course_assets(self.course2_key)
+
+        self.assertEqual(
+            [call_kwargs['course_key'] for __, call_kwargs in receiver.call_args_list],
+            [self.course1_key, self.course1_key, self.course1_key, self.course2_key],
+        )
+
+    @ddt.data(True, False)
+    def test_asset_changed_on_delete_by_id(self, deprecated):
+        """
+        Test that deleting an asset by its database _id sends ASSET_CHANGED with its course
+        """
+        self.set_up_assets(deprecated)
+        receiver = Mock()
+        ASSET_CHANGED.connect(receiver)
+        self.addCleanup(ASSET_CHANGED.disconnect, receiver)
+
+        asset_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+        asset_id, __ = self.contentstore.asset_db_key(asset_key)
+        self.contentstore.delete(asset_id)
+
+        self.assertEqual(receiver.call_count, 1)
+        course_key = receiver.call_args[1]['course_key']
+        self.assertEqual((course_key.org, course_key.course), (self.course1_key.org, self.course1_key.course))
+        if not deprecated:
+            self.assertEqual(course_key, self.course1_key)
+
     @ddt.data(True, False)
     def test_attrs(self, deprecated):
         """
@@ -197,15 +280,130 @@ class TestContentstore(unittest.TestCase):
         __, count = self.contentstore.get_all_content_for_course(dest_course)
         self.assertEqual(count, len(self.course1_files))
 
+    @ddt.data(True, False)
+    def test_copy_assets_progress(self, deprecated):
+        """
+        copy_all_course_assets copies the data of the assets in batches, reporting its progress
+        """
+        self.set_up_assets(deprecated)
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        progress_callback = Mock()
+        with patch.object(MongoContentStore, 'BULK_ASSETS_BATCH_SIZE', 2):
+            self.contentstore.copy_all_course_assets(self.course1_key, dest_course, progress_callback)
+        self.assertEqual(progress_callback.call_args_list, [call(2, 3), call(3, 3)])
+        for filename in self.course1_files:
+            source = self.contentstore.find(self.course1_key.make_asset_key('asset', filename))
+            copied = self.contentstore.find(dest_course.make_asset_key('asset', filename))
+            self.assertEqual(source.data, copied.data)
+            self.assertEqual(source.content_digest, copied.content_digest)
+
+    @ddt.data(True, False)
+    def test_copy_assets_again(self, deprecated):
+        """
+        copy_all_course_assets only copies the assets the destination course doesn't already have
+        """
+        self.set_up_assets(deprecated)
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        unchanged_key = dest_course.make_asset_key('asset', self.course1_files[1])
+        unchanged_upload_date = self.contentstore.get_attr(unchanged_key, 'uploadDate')
+
+        # Replace the data of one of the assets, then copy again
+        changed_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+        self.save_asset(self.course1_files[2], changed_key, self.course1_files[0], False)
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+
+        copied = self.contentstore.find(dest_course.make_asset_key('asset', self.course1_files[0]))
+        self.assertEqual(copied.data, self.contentstore.find(changed_key).data)
+        self.assertEqual(self.contentstore.get_attr(unchanged_key, 'uploadDate'), unchanged_upload_date)
+        __, count = self.contentstore.get_all_content_for_course(dest_course)
+        self.assertEqual(count, len(self.course1_files))
+
+    def assert_blob_refs(self, expected_refs):
+        """
+        Asserts that the content-addressed blobs have the given reference counts, by file name.
+        """
+        actual_refs = {}
+        for blob_ref in self.contentstore.blob_refs.find():
+            actual_refs[self.contentstore.blobs.get(blob_ref['blob_id']).read()] = blob_ref['refcount']
+        self.assertEqual(self.contentstore.blob_files.count(), len(expected_refs))
+        expected_data = {}
+        for filename, refcount in expected_refs.iteritems():
+            with open("{}/static/{}".format(DATA_DIR, filename), "rb") as f:
+                expected_data[f.read()] = refcount
+        self.assertEqual(actual_refs, expected_data)
+
+    @ddt.data(True, False)
+    def test_content_addressed(self, deprecated):
+        """
+        Test that content-addressed assets with the same data share a blob
+        """
+        self.set_up_assets(deprecated, content_addressed=True)
+        self.assert_blob_refs({
+            'contains.sh': 1, 'picture1.jpg': 2, 'picture2.jpg': 1, 'picture3.jpg': 1, 'door_2.ogg': 1,
+        })
+        self.assertEqual(self.contentstore.chunks.count(), 0)
+
+        for course_key in (self.course1_key, self.course2_key):
+            asset_key = course_key.make_asset_key('asset', 'picture1.jpg')
+            with open("{}/static/picture1.jpg".format(DATA_DIR), "rb") as f:
+                data = f.read()
+            content = self.contentstore.find(asset_key)
+            self.assertEqual(content.data, data)
+            self.assertEqual(content.length, len(data))
+            self.assertEqual(''.join(self.contentstore.find(asset_key, as_stream=True).stream_data()), data)
+
+        # Saving an asset again keeps a single reference to its blob.
+        asset_key = self.course1_key.make_asset_key('asset', 'picture1.jpg')
+        self.save_asset('picture1.jpg', asset_key, 'picture1.jpg', True)
+        self.assertTrue(self.contentstore.get_attr(asset_key, 'locked'))
+
+        # Blobs are deleted along with the last asset referencing them.
+        self.contentstore.delete(asset_key)
+        self.contentstore.delete(self.course1_key.make_asset_key('asset', 'contains.sh'))
+        self.assert_blob_refs({'picture1.jpg': 1, 'picture2.jpg': 1, 'picture3.jpg': 1, 'door_2.ogg': 1})
+        self.contentstore.delete(self.course2_key.make_asset_key('asset', 'picture1.jpg'))
+        self.assert_blob_refs({'picture2.jpg': 1, 'picture3.jpg': 1, 'door_2.ogg': 1})
+
+    @ddt.data(True, False)
+    def test_content_addressed_copy_and_delete_assets(self, deprecated):
+        """
+        Test that copying content-addressed assets only adds references to their blobs
+        """
+        self.set_up_assets(deprecated, content_addressed=True)
+        dest_course = CourseLocator('test', 'destination', 'copy')
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        self.assert_blob_refs({
+            'contains.sh': 2, 'picture1.jpg': 3, 'picture2.jpg': 2, 'picture3.jpg': 1, 'door_2.ogg': 1,
+        })
+        self.assertEqual(self.contentstore.chunks.count(), 0)
+        for filename in self.course1_files:
+            source = self.contentstore.find(self.course1_key.make_asset_key('asset', filename))
+            copied = self.contentstore.find(dest_course.make_asset_key('asset', filename))
+            self.assertEqual(source.data, copied.data)
+
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        self.contentstore.delete_all_course_assets(dest_course)
+        self.assert_blob_refs({'picture1.jpg': 1, 'picture3.jpg': 1, 'door_2.ogg': 1})
+
     @ddt.data(True, False)
     def test_delete_assets(self, deprecated):
         """
         delete_all_course_assets
         """
         self.set_up_assets(deprecated)
-        self.contentstore.delete_all_course_assets(self.course1_key)
+        progress_callback = Mock()
+        self.contentstore.delete_all_course_assets(self.course1_key, progress_callback)
         __, count = self.contentstore.get_all_content_for_course(self.course1_key)
         self.assertEqual(count, 0)
+        progress_callback.assert_called_once_with(len(self.course1_files), len(self.course1_files))
+        self.assertEqual(
+            self.contentstore.chunks.find({'files_id': {'$in': [
+                self.contentstore.asset_db_key(self.course1_key.make_asset_key('asset', filename))[0]
+                for filename in self.course1_files
+            ]}}).count(),
+            0
+        )
         # ensure it didn't remove any from other course
         __, count = self.contentstore.get_all_content_for_course(self.course2_key)
         self.assertEqual(count, len(self.course2_files))
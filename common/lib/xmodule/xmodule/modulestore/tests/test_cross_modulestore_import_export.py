@@ -100,6 +100,7 @@ class CrossStoreXMLRoundtrip(CourseComparisonTest, PartitionTestCase):
                             EXPORTED_COURSE_DIR_NAME,
                         )
 
+                        # Upload the assets in a pool, which must import the same course.
                         import_course_from_xml(
                             dest_store,
                             'test_user',
@@ -109,6 +110,7 @@ class CrossStoreXMLRoundtrip(CourseComparisonTest, PartitionTestCase):
                             target_id=dest_course_key,
                             raise_on_failure=True,
                             create_if_not_present=True,
+                            import_workers=2,
                         )
 
                         # NOT CURRENTLY USED
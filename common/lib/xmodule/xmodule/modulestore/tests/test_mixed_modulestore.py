@@ -10,7 +10,7 @@ import mimetypes
 from uuid import uuid4
 from contextlib import contextmanager
 import pytest
-from mock import patch, Mock, call
+from mock import patch, Mock
 
 # Mixed modulestore depends on django, so we'll manually configure some django settings
 # before importing the module
@@ -2476,6 +2476,16 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
             dest_store = self.store._get_modulestore_by_type(destination_modulestore)
             self.assertCoursesEqual(source_store, source_course_key, dest_store, dest_course_id)
 
+    def assert_course_published(self, signal_handler, course_key):
+        """
+        Asserts that the last signal sent was course_published, for the given course.
+        (Some modulestores send a structure_diff with it as well.)
+        """
+        self.assertIsNotNone(signal_handler.send.call_args)
+        args, kwargs = signal_handler.send.call_args
+        self.assertEqual(args, ('course_published',))
+        self.assertEqual(kwargs['course_key'], course_key)
+
     @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
     def test_bulk_operations_signal_firing(self, default):
         """ Signals should be fired right before bulk_operations() exits. """
@@ -2496,7 +2506,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                 # Course creation and publication should fire the signal
                 course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                self.assert_course_published(signal_handler, course.id)
                 signal_handler.reset_mock()
 
                 course_key = course.id
@@ -2506,7 +2516,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                     Check if the signal has been fired.
                     The course_published signal fires before the _clear_bulk_ops_record.
                     """
-                    signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                    self.assert_course_published(signal_handler, course.id)
 
                 with patch.object(
                     self.store.thread_cache.default_store, '_clear_bulk_ops_record', wraps=_clear_bulk_ops_record
@@ -2520,6 +2530,30 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                     self.assertEqual(mock_clear_bulk_ops_record.call_count, 1)
 
+                self.assert_course_published(signal_handler, course.id)
+
+    def test_course_publish_signal_without_structure_diff(self):
+        """ The signal is sent without a structure_diff if it can't be computed. """
+        with MongoContentstoreBuilder().build() as contentstore:
+            signal_handler = Mock(name='signal_handler')
+            self.store = MixedModuleStore(
+                contentstore=contentstore,
+                create_modulestore_instance=create_modulestore_instance,
+                mappings={},
+                signal_handler=signal_handler,
+                **self.OPTIONS
+            )
+            self.addCleanup(self.store.close_all_connections)
+
+            with self.store.default_store(ModuleStoreEnum.Type.split):
+                course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
+                signal_handler.reset_mock()
+
+                split_store = self.store.thread_cache.default_store
+                with patch.object(split_store, 'get_structure_diff', side_effect=ItemNotFoundError(course.id)):
+                    with self.store.bulk_operations(course.id):
+                        self.store.create_item(self.user_id, course.id, 'about')
+
                 signal_handler.send.assert_called_with('course_published', course_key=course.id)
 
     @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
@@ -2542,7 +2576,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                 # Course creation and publication should fire the signal
                 course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                self.assert_course_published(signal_handler, course.id)
 
                 course_key = course.id
 
@@ -2552,16 +2586,16 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                     log.debug('Testing with block type %s', block_type)
                     signal_handler.reset_mock()
                     block = self.store.create_item(self.user_id, course_key, block_type)
-                    signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                    self.assert_course_published(signal_handler, course.id)
 
                     signal_handler.reset_mock()
                     block.display_name = block_type
                     self.store.update_item(block, self.user_id)
-                    signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                    self.assert_course_published(signal_handler, course.id)
 
                     signal_handler.reset_mock()
                     self.store.publish(block.location, self.user_id)
-                    signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                    self.assert_course_published(signal_handler, course.id)
 
     @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
     def test_course_publish_signal_rerun_firing(self, default):
@@ -2583,7 +2617,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                 # Course creation and publication should fire the signal
                 course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                self.assert_course_published(signal_handler, course.id)
 
                 course_key = course.id
 
@@ -2591,7 +2625,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                 signal_handler.reset_mock()
                 dest_course_id = self.store.make_course_key("org.other", "course.other", "run.other")
                 self.store.clone_course(course_key, dest_course_id, self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=dest_course_id)
+                self.assert_course_published(signal_handler, dest_course_id)
 
     @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
     @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
@@ -2620,12 +2654,11 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                     static_content_store=contentstore,
                     create_if_not_present=True,
                 )
-                signal_handler.send.assert_has_calls([
-                    call('pre_publish', course_key=self.store.make_course_key('edX', 'toy', '2012_Fall')),
-                    call('course_published', course_key=self.store.make_course_key('edX', 'toy', '2012_Fall')),
-                    call('pre_publish', course_key=self.store.make_course_key('edX', 'toy', '2012_Fall')),
-                    call('course_published', course_key=self.store.make_course_key('edX', 'toy', '2012_Fall')),
-                ])
+                # (course_published may come with a structure_diff as well)
+                course_key = self.store.make_course_key('edX', 'toy', '2012_Fall')
+                sent = [(args[0], kwargs.get('course_key')) for args, kwargs in signal_handler.send.call_args_list]
+                expected = [('pre_publish', course_key), ('course_published', course_key)] * 2
+                self.assertIn(expected, [sent[index:index + len(expected)] for index in range(len(sent))])
 
     @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
     def test_course_publish_signal_publish_firing(self, default):
@@ -2647,18 +2680,18 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                 # Course creation and publication should fire the signal
                 course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                self.assert_course_published(signal_handler, course.id)
 
                 # Test a draftable block type, which needs to be explicitly published, and nest it within the
                 # normal structure - this is important because some implementors change the parent when adding a
                 # non-published child; if parent is in DIRECT_ONLY_CATEGORIES then this should not fire the event
                 signal_handler.reset_mock()
                 section = self.store.create_item(self.user_id, course.id, 'chapter')
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                self.assert_course_published(signal_handler, course.id)
 
                 signal_handler.reset_mock()
                 subsection = self.store.create_child(self.user_id, section.location, 'sequential')
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                self.assert_course_published(signal_handler, course.id)
 
                 # 'units' and 'blocks' are draftable types
                 signal_handler.reset_mock()
@@ -2673,15 +2706,15 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                 signal_handler.reset_mock()
                 self.store.publish(unit.location, self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                self.assert_course_published(signal_handler, course.id)
 
                 signal_handler.reset_mock()
                 self.store.unpublish(unit.location, self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                self.assert_course_published(signal_handler, course.id)
 
                 signal_handler.reset_mock()
                 self.store.delete_item(unit.location, self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                self.assert_course_published(signal_handler, course.id)
 
     @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
     def test_bulk_course_publish_signal_direct_firing(self, default):
@@ -2703,7 +2736,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                 # Course creation and publication should fire the signal
                 course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                self.assert_course_published(signal_handler, course.id)
 
                 course_key = course.id
 
@@ -2723,7 +2756,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                         self.store.publish(block.location, self.user_id)
                         signal_handler.send.assert_not_called()
 
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                self.assert_course_published(signal_handler, course.id)
 
     @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
     def test_bulk_course_publish_signal_publish_firing(self, default):
@@ -2745,7 +2778,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
 
                 # Course creation and publication should fire the signal
                 course = self.store.create_course('org_x', 'course_y', 'run_z', self.user_id)
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                self.assert_course_published(signal_handler, course.id)
 
                 course_key = course.id
 
@@ -2779,7 +2812,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                     self.store.delete_item(unit.location, self.user_id)
                     signal_handler.send.assert_not_called()
 
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                self.assert_course_published(signal_handler, course.id)
 
                 # Test editing draftable block type without publish
                 signal_handler.reset_mock()
@@ -2790,7 +2823,7 @@ class TestMixedModuleStore(CommonMixedModuleStoreSetup):
                     signal_handler.send.assert_not_called()
                     self.store.publish(unit.location, self.user_id)
                     signal_handler.send.assert_not_called()
-                signal_handler.send.assert_called_with('course_published', course_key=course.id)
+                self.assert_course_published(signal_handler, course.id)
 
                 signal_handler.reset_mock()
                 with self.store.bulk_operations(course_key):
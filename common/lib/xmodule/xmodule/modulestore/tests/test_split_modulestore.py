@@ -2,6 +2,7 @@
     Test split modulestore w/o using any django stuff.
 """
 from mock import patch
+import copy
 import datetime
 from importlib import import_module
 from path import Path as path
@@ -13,8 +14,10 @@ import os
 import ddt
 from contracts import contract
 from django.core.cache import caches, InvalidCacheBackendError
+from django.test.utils import override_settings
 
 from openedx.core.lib import tempdir
+from openedx.core.lib.cache_utils import ProcessLRUCache
 from openedx.core.lib.tests import attr
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
 from xmodule.course_module import CourseDescriptor
@@ -32,6 +35,7 @@ from xmodule.fields import Date, Timedelta
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import CourseStructureCache
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.tests.utils import mock_tab_from_json
@@ -751,6 +755,41 @@ class SplitModuleCourseTests(SplitModuleTest):
         course = modulestore().get_course(locator)
         self.assertNotEqual(course.location.version_guid, published_version)
 
+    @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
+    def test_get_courselikes(self, _from_json):
+        locators = [
+            CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT),
+            CourseLocator(org='edu', course='nosuchthing', run="run", branch=BRANCH_NAME_DRAFT),
+            CourseLocator(org='testx', course='wonderful', run="run", branch=BRANCH_NAME_PUBLISHED),
+            CourseLocator(org='guestx', course='contender', run="run", branch=BRANCH_NAME_DRAFT),
+        ]
+        courses = modulestore().get_courselikes(locators)
+        self.assertEqual(
+            [course.location.course_key.version_agnostic() for course in courses],
+            [locators[0], locators[2], locators[3]],
+        )
+        for course in courses:
+            course_from_key = modulestore().get_course(course.location.course_key)
+            self.assertEqual(course.location, course_from_key.location)
+            self.assertEqual(course.display_name, course_from_key.display_name)
+
+    @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
+    def test_get_courselikes_with_definitions(self, _from_json):
+        locators = [
+            CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT),
+            CourseLocator(org='guestx', course='contender', run="run", branch=BRANCH_NAME_DRAFT),
+        ]
+        # one query for the course indexes, one for the structures and one
+        # for the definitions of all of the courses
+        with check_mongo_calls(3):
+            courses = modulestore().get_courselikes(locators, depth=1, load_definitions=True)
+        self.assertEqual(len(courses), 2)
+        for course in courses:
+            block_key = BlockKey.from_usage_key(course.location)
+            self.assertTrue(course.system.module_data[block_key].definition_loaded)
+            # the blocks of the structure itself are left alone
+            self.assertFalse(course.system.course_entry.structure['blocks'][block_key].definition_loaded)
+
     def test_get_course_negative(self):
         # Now negative testing
         with self.assertRaises(InsufficientSpecificationError):
@@ -976,6 +1015,66 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_process_cache(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+        structure_cache = ProcessLRUCache(max_size=10 * 1024 * 1024)
+
+        with patch('xmodule.modulestore.split_mongo.mongo_connection.process_cache', return_value=structure_cache):
+            with check_mongo_calls(1):
+                not_cached_structure = self._get_structure(self.new_course)
+
+            # the decoded structure is kept in the process, so neither mongo
+            # nor the django cache is needed to get it again
+            self.cache.clear()
+            with check_mongo_calls(0):
+                cached_structure = self._get_structure(self.new_course)
+            self.assertIs(self._get_structure(self.new_course), cached_structure)
+
+        # the process keeps a copy of its own of the structure it cached
+        self.assertEqual(cached_structure, not_cached_structure)
+        self.assertIsNot(cached_structure, not_cached_structure)
+        self.assertEqual(structure_cache.stats()['hits'], 2)
+
+    @override_settings(COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES=10 * 1024 * 1024)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection._process_cache', None)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_process_cached_structures_are_not_modified(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+        # the first get caches a copy of the structure read from mongo
+        self._get_structure(self.new_course)
+        structure = self._get_structure(self.new_course)
+        self.assertIs(self._get_structure(self.new_course), structure)
+        blocks = {
+            block_key: (dict(block.fields), block.definition_loaded)
+            for block_key, block in structure['blocks'].iteritems()
+        }
+
+        # loading the definitions of the course's blocks doesn't add them to
+        # the blocks of the cached structure
+        modulestore().get_course(self.new_course.id, depth=None, lazy=False)
+        self.assertIs(self._get_structure(self.new_course), structure)
+        self.assertEqual(
+            {
+                block_key: (dict(block.fields), block.definition_loaded)
+                for block_key, block in structure['blocks'].iteritems()
+            },
+            blocks
+        )
+
+    @override_settings(COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES=10 * 1024 * 1024)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection._process_cache', None)
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_process_cache_copies_set_structures(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+        structure = copy.deepcopy(self._get_structure(self.new_course))
+        structure_cache = CourseStructureCache()
+        structure_cache.set(structure['_id'], structure)
+
+        # the writer of a structure can't modify the one the process cached
+        structure['blocks'].clear()
+        self.assertTrue(structure_cache.get(structure['_id'])['blocks'])
+
     @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
     def test_course_structure_cache_no_cache_configured(self, mock_get_cache):
         mock_get_cache.side_effect = InvalidCacheBackendError
@@ -1669,6 +1768,59 @@ class TestItemCrud(SplitModuleTest):
         self.assertEqual(updated_block.children[0].version_agnostic(), block.children[0].version_agnostic())
         self.assertEqual(updated_block.advertised_start, "Soon")
 
+    def test_get_item_with_definition_fields(self):
+        """
+        Test loading only some of the definition fields of blocks up front
+        """
+        course_key = CourseLocator('guestx', 'contender', 'run', branch=BRANCH_NAME_DRAFT)
+        payload = "<problem>empty</problem>"
+        problem = modulestore().create_child(
+            'test_definition_fields', BlockUsageLocator(course_key, 'course', block_id="head345679"), 'problem',
+            fields={'display_name': 'problem 1', 'data': payload},
+        )
+        problem_locator = BlockUsageLocator(course_key, 'problem', block_id=problem.location.block_id)
+        # pylint: disable=protected-access
+        modulestore()._clear_cache()
+
+        problem = modulestore().get_item(problem_locator, lazy=False, definition_fields={'problem': ['data']})
+        block_data = problem.system.module_data[BlockKey.from_usage_key(problem.location)]
+        self.assertFalse(block_data.definition_loaded)
+        self.assertEqual(block_data.definition_fields, {'data'})
+        with check_mongo_calls(0):
+            self.assertEqual(problem.data, payload)
+
+        # the fields are only loaded up front for blocks of the given types
+        modulestore()._clear_cache()
+        problem = modulestore().get_item(problem_locator, lazy=False, definition_fields={'html': ['data']})
+        # the definition's other fields are loaded when first needed
+        with check_mongo_calls(1):
+            self.assertEqual(problem.data, payload)
+        self.assertEqual(problem.display_name, 'problem 1')
+
+    def test_prefetch_definitions(self):
+        """
+        Test loading the definitions of a subtree before its blocks use them
+        """
+        course_key = CourseLocator('guestx', 'contender', 'run', branch=BRANCH_NAME_DRAFT)
+        course_root = BlockUsageLocator(course_key, 'course', block_id="head345679")
+        payloads = ["<problem>one</problem>", "<problem>two</problem>"]
+        problem_locators = [
+            BlockUsageLocator(course_key, 'problem', block_id=modulestore().create_child(
+                'test_prefetch_definitions', course_root, 'problem', fields={'data': payload},
+            ).location.block_id)
+            for payload in payloads
+        ]
+        # pylint: disable=protected-access
+        modulestore()._clear_cache()
+
+        with modulestore().bulk_operations(course_key):
+            # blocks loaded before the prefetch use the definitions cached in the bulk operation
+            problem = modulestore().get_item(problem_locators[0])
+            modulestore().prefetch_definitions(course_key, [course_root])
+            with check_mongo_calls(0):
+                self.assertEqual(problem.data, payloads[0])
+                self.assertEqual(modulestore().get_item(problem_locators[1]).data, payloads[1])
+
     def test_delete_item(self):
         course = self.create_course_for_deletion()
         with self.assertRaises(ValueError):
@@ -2097,6 +2249,44 @@ class TestPublish(SplitModuleTest):
         pub_module = modulestore().get_item(new_module.location.map_into_course(dest_course))
         self._check_course(source_course, dest_course, expected, unexpected)
 
+    @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
+    def test_structure_diff(self, _from_json):
+        """
+        Test diffing the versions of the published branch before and after a publish
+        """
+        source_course = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        dest_course = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_PUBLISHED)
+        head = source_course.make_usage_key('course', "head12345")
+        chapter1 = source_course.make_usage_key('chapter', 'chapter1')
+        chapter2 = source_course.make_usage_key('chapter', 'chapter2')
+        chapter3 = source_course.make_usage_key('chapter', 'chapter3')
+        modulestore().copy(self.user_id, source_course, dest_course, [head], [chapter2, chapter3])
+        first_version = modulestore().get_course(dest_course).location.version_guid
+
+        # everything is new compared to nothing
+        structure_diff = modulestore().get_structure_diff(dest_course, None)
+        self.assertIn(head.map_into_course(dest_course), structure_diff.added)
+        self.assertIn(chapter1.map_into_course(dest_course), structure_diff.added)
+        self.assertEqual(structure_diff.changed, set())
+        self.assertEqual(structure_diff.removed, set())
+
+        new_module = modulestore().create_child(
+            self.user_id, chapter1, "sequential",
+            fields={'display_name': 'new sequential'},
+        )
+        modulestore().copy(self.user_id, source_course, dest_course, [new_module.location], None)
+        second_version = modulestore().get_course(dest_course).location.version_guid
+        structure_diff = modulestore().get_structure_diff(dest_course, first_version)
+        self.assertEqual((structure_diff.old_version, structure_diff.new_version), (first_version, second_version))
+        self.assertEqual(structure_diff.added, {new_module.location.map_into_course(dest_course)})
+        self.assertNotIn(head.map_into_course(dest_course), structure_diff.changed)
+        self.assertEqual(structure_diff.removed, set())
+
+        # and the other way around
+        structure_diff = modulestore().get_structure_diff(dest_course, second_version, first_version)
+        self.assertEqual(structure_diff.added, set())
+        self.assertEqual(structure_diff.removed, {new_module.location.map_into_course(dest_course)})
+
     def test_exceptions(self):
         """
         Test the exceptions which preclude successful publication
@@ -2,6 +2,7 @@
 Tests for XML importer.
 """
 import mock
+from concurrent.futures import ThreadPoolExecutor
 from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
 from xblock.fields import String, Scope, ScopeIds, List
 from xblock.runtime import Runtime, KvsFieldData, DictKeyValueStore
@@ -378,6 +379,25 @@ class StaticContentImporterTest(unittest.TestCase):
                 'static/inner/file1.txt', base_dir=expected_base_dir
             )
 
+    def test_submit_static_content_directory(self):
+        expected_base_dir = path(self.course_data_path / 'static')
+        mocked_os_walk_yield = [
+            ('static', None, ['file1.txt', '.DS_Store']),
+            ('static/inner', None, ['file1.txt']),
+        ]
+        with mock.patch(
+            'xmodule.modulestore.xml_importer.os.walk',
+            return_value=mocked_os_walk_yield
+        ), mock.patch.object(
+            self.static_content_importer, 'import_static_file', side_effect=lambda file_path, base_dir: file_path
+        ):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                uploads = self.static_content_importer.submit_static_content_directory(executor, 'static')
+                imported = sorted(upload.result() for upload in uploads)
+            self.assertEqual(imported, ['static/file1.txt', 'static/inner/file1.txt'])
+            for call in self.static_content_importer.import_static_file.call_args_list:
+                self.assertEqual(call[1], {'base_dir': expected_base_dir})
+
     def test_import_static_file(self):
         base_dir = path('/path/to/dir')
         full_file_path = os.path.join(base_dir, 'static/some_file.txt')
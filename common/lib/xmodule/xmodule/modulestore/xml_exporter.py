@@ -14,6 +14,7 @@ from xmodule.modulestore import EdxJSONEncoder, ModuleStoreEnum
 from xmodule.modulestore.inheritance import own_metadata
 from xmodule.modulestore.store_utilities import draft_node_constructor, get_draft_subtree_roots
 from xmodule.modulestore import LIBRARY_ROOT
+from xmodule.util.streaming_tar import StreamingTarFS
 from fs.osfs import OSFS
 from json import dumps
 import os
@@ -112,7 +113,8 @@ class ExportManager(object):
         `modulestore`: A `ModuleStore` object that is the source of the modules to export
         `contentstore`: A `ContentStore` object that is the source of the content to export, can be None
         `courselike_key`: The Locator of the Descriptor to export
-        `root_dir`: The directory to write the exported xml to
+        `root_dir`: The directory to write the exported xml to, or None if it is only exported
+            with export_to_fs
         `target_dir`: The name of the directory inside `root_dir` to write the content to
         """
         self.modulestore = modulestore
@@ -133,7 +135,7 @@ class ExportManager(object):
         Perform any additional tasks to the root XML node.
         """
 
-    def process_extra(self, root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs):
+    def process_extra(self, root, courselike, xml_centric_courselike_key, export_fs):
         """
         Process additional content, like static assets.
         """
@@ -153,9 +155,15 @@ class ExportManager(object):
         """
         Perform the export given the parameters handed to this class at init.
         """
+        self.export_to_fs(OSFS(self.root_dir))
+
+    def export_to_fs(self, fsm):
+        """
+        Perform the export into the `target_dir` directory of the given PyFilesystem, instead
+        of `root_dir`.
+        """
         with self.modulestore.bulk_operations(self.courselike_key):
 
-            fsm = OSFS(self.root_dir)
             root = lxml.etree.Element('unknown')
 
             # export only the published content
@@ -173,8 +181,7 @@ class ExportManager(object):
             self.process_root(root, export_fs)
 
             # Process extra items-- drafts, assets, etc
-            root_courselike_dir = self.root_dir + '/' + self.target_dir
-            self.process_extra(root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs)
+            self.process_extra(root, courselike, xml_centric_courselike_key, export_fs)
 
             # Any last pass adjustments
             self.post_process(root, export_fs)
@@ -201,32 +208,33 @@ class CourseExportManager(ExportManager):
         with export_fs.open(u'course.xml', 'wb') as course_xml:
             lxml.etree.ElementTree(root).write(course_xml, encoding='utf-8')
 
-    def process_extra(self, root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs):
+    def process_extra(self, root, courselike, xml_centric_courselike_key, export_fs):
         # Export the modulestore's asset metadata.
-        asset_dir = root_courselike_dir + '/' + AssetMetadata.EXPORTED_ASSET_DIR + '/'
-        if not os.path.isdir(asset_dir):
-            os.makedirs(asset_dir)
+        asset_dir = export_fs.makedir(AssetMetadata.EXPORTED_ASSET_DIR, recreate=True)
         asset_root = lxml.etree.Element(AssetMetadata.ALL_ASSETS_XML_TAG)
         course_assets = self.modulestore.get_all_asset_metadata(self.courselike_key, None)
         for asset_md in course_assets:
             # All asset types are exported using the "asset" tag - but their asset type is specified in each asset key.
             asset = lxml.etree.SubElement(asset_root, AssetMetadata.ASSET_XML_TAG)
             asset_md.to_xml(asset)
-        with OSFS(asset_dir).open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'wb') as asset_xml_file:
+        with asset_dir.open(AssetMetadata.EXPORTED_ASSET_FILENAME, 'wb') as asset_xml_file:
             lxml.etree.ElementTree(asset_root).write(asset_xml_file, encoding='utf-8')
 
         # export the static assets
         policies_dir = export_fs.makedir('policies', recreate=True)
         if self.contentstore:
-            self.contentstore.export_all_for_course(
+            self.contentstore.export_all_for_course_to_fs(
                 self.courselike_key,
-                root_courselike_dir + '/static/',
-                root_courselike_dir + '/policies/assets.json',
+                export_fs.makedir('static', recreate=True),
+                policies_dir,
             )
 
             # If we are using the default course image, export it to the
             # legacy location to support backwards compatibility.
-            if courselike.course_image == courselike.fields['course_image'].default:
+            # It is already there if that is where the image was imported from.
+            course_image_path = u'static/images/course_image.jpg'
+            if courselike.course_image == courselike.fields['course_image'].default and \
+                    not export_fs.exists(course_image_path):
                 try:
                     course_image = self.contentstore.find(
                         StaticContent.compute_location(
@@ -237,10 +245,8 @@ class CourseExportManager(ExportManager):
                 except NotFoundError:
                     pass
                 else:
-                    output_dir = root_courselike_dir + '/static/images/'
-                    if not os.path.isdir(output_dir):
-                        os.makedirs(output_dir)
-                    with OSFS(output_dir).open(u'course_image.jpg', 'wb') as course_image_file:
+                    export_fs.makedirs(os.path.dirname(course_image_path), recreate=True)
+                    with export_fs.open(course_image_path, 'wb') as course_image_file:
                         course_image_file.write(course_image.data)
 
         # export the static tabs
@@ -308,19 +314,19 @@ class LibraryExportManager(ExportManager):
         root.set('org', self.courselike_key.org)
         root.set('library', self.courselike_key.library)
 
-    def process_extra(self, root, courselike, root_courselike_dir, xml_centric_courselike_key, export_fs):
+    def process_extra(self, root, courselike, xml_centric_courselike_key, export_fs):
         """
         Notionally, libraries may have assets. This is currently unsupported, but the structure is here
         to ease in duck typing during import. This may be expanded as a useful feature eventually.
         """
         # export the static assets
-        export_fs.makedir('policies', recreate=True)
+        policies_dir = export_fs.makedir('policies', recreate=True)
 
         if self.contentstore:
-            self.contentstore.export_all_for_course(
+            self.contentstore.export_all_for_course_to_fs(
                 self.courselike_key,
-                self.root_dir + '/' + self.target_dir + '/static/',
-                self.root_dir + '/' + self.target_dir + '/policies/assets.json',
+                export_fs.makedir('static', recreate=True),
+                policies_dir,
             )
 
     def post_process(self, root, export_fs):
@@ -350,6 +356,24 @@ def export_library_to_xml(modulestore, contentstore, library_key, root_dir, libr
     LibraryExportManager(modulestore, contentstore, library_key, root_dir, library_dir).export()
 
 
+def export_course_to_tar(modulestore, contentstore, course_key, fileobj, course_dir, compression='gz'):
+    """
+    Export a course as a tar archive written to `fileobj`, with the course in its `course_dir`
+    directory.  The archive is streamed to `fileobj` as the course is exported, without using
+    the disk.  See ExportManager for the other arguments, and StreamingTarFS for `compression`.
+    """
+    with StreamingTarFS(fileobj, compression) as tar_fs:
+        CourseExportManager(modulestore, contentstore, course_key, None, course_dir).export_to_fs(tar_fs)
+
+
+def export_library_to_tar(modulestore, contentstore, library_key, fileobj, library_dir, compression='gz'):
+    """
+    Export a library as a tar archive written to `fileobj`, like export_course_to_tar.
+    """
+    with StreamingTarFS(fileobj, compression) as tar_fs:
+        LibraryExportManager(modulestore, contentstore, library_key, None, library_dir).export_to_fs(tar_fs)
+
+
 def adapt_references(subtree, destination_course_key, export_fs):
     """
     Map every reference in the subtree into destination_course_key and set it back into the xblock fields
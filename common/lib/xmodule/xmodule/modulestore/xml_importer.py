@@ -27,6 +27,7 @@ import mimetypes
 import os
 import re
 from abc import abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 
 import xblock
 from lxml import etree
@@ -100,6 +101,34 @@ class StaticContentImporter:
     def import_static_content_directory(self, content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR, verbose=False):
         remap_dict = {}
 
+        for file_path, static_dir in self.static_content_files(content_subdir, verbose):
+            imported_file_attrs = self.import_static_file(file_path, base_dir=static_dir)
+
+            if imported_file_attrs:
+                # store the remapping information which will be needed
+                # to subsitute in the module data
+                remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
+
+        return remap_dict
+
+    def submit_static_content_directory(self, executor, content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR, verbose=False):
+        """
+        Like import_static_content_directory, but imports each file in one of
+        the workers of the given concurrent.futures executor.
+
+        Returns the list of futures of the imports, whose results are what
+        import_static_file returns.
+        """
+        return [
+            executor.submit(self.import_static_file, file_path, base_dir=static_dir)
+            for file_path, static_dir in self.static_content_files(content_subdir, verbose)
+        ]
+
+    def static_content_files(self, content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR, verbose=False):
+        """
+        Yields a (file_path, static_dir) tuple for each file to import from the
+        given subdirectory of the course.
+        """
         static_dir = self.course_data_path / content_subdir
         for dirname, _, filenames in os.walk(static_dir):
             for filename in filenames:
@@ -114,14 +143,7 @@ class StaticContentImporter:
                 if verbose:
                     log.debug('importing static content %s...', file_path)
 
-                imported_file_attrs = self.import_static_file(file_path, base_dir=static_dir)
-
-                if imported_file_attrs:
-                    # store the remapping information which will be needed
-                    # to subsitute in the module data
-                    remap_dict[imported_file_attrs[0]] = imported_file_attrs[1]
-
-        return remap_dict
+                yield file_path, static_dir
 
     def import_static_file(self, full_file_path, base_dir):
         filename = os.path.basename(full_file_path)
@@ -218,6 +240,10 @@ class ImportManager(object):
         python_lib_filename: The filename of the courselike's python library. Course authors can optionally
             create this file to implement custom logic in their course.
 
+        import_workers: If greater than 0, the number of threads which upload the static files into
+            static_content_store, while the courselike's modules are written to the modulestore.
+            Otherwise, static files are imported one by one before the modules.
+
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
     """
     store_class = XMLModuleStore
@@ -231,6 +257,7 @@ class ImportManager(object):
             create_if_not_present=False, raise_on_failure=False,
             static_content_subdir=DEFAULT_STATIC_CONTENT_SUBDIR,
             python_lib_filename='python_lib.zip',
+            import_workers=0,
     ):
         self.store = store
         self.user_id = user_id
@@ -246,6 +273,7 @@ class ImportManager(object):
         self.do_import_python_lib = do_import_python_lib
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
+        self.import_workers = import_workers
         self.xml_module_store = self.store_class(
             data_dir,
             default_class=default_class,
@@ -266,13 +294,31 @@ class ImportManager(object):
         if self.target_id:
             assert len(self.xml_module_store.modules) == 1
 
-    def import_static(self, data_path, dest_id):
+    def import_static(self, data_path, dest_id, executor=None):
         """
         Import all static items into the content store.
+
+        If a concurrent.futures executor is given, the static content
+        directories are imported by its workers, and the list of futures of
+        the file imports is returned.
         """
+        uploads = []
         if self.static_content_store is None:
             log.warning("Static content store is None. Skipping static content import...")
-            return
+            return uploads
+
+        def import_directory(content_subdir):
+            """
+            Import a static content directory, with the executor if there is one.
+            """
+            if executor is None:
+                static_content_importer.import_static_content_directory(
+                    content_subdir=content_subdir, verbose=self.verbose
+                )
+            else:
+                uploads.extend(static_content_importer.submit_static_content_directory(
+                    executor, content_subdir=content_subdir, verbose=self.verbose
+                ))
 
         static_content_importer = StaticContentImporter(
             self.static_content_store,
@@ -283,9 +329,7 @@ class ImportManager(object):
             if self.verbose:
                 log.debug("Importing static content and python library")
             # first pass to find everything in the static content directory
-            static_content_importer.import_static_content_directory(
-                content_subdir=self.static_content_subdir, verbose=self.verbose
-            )
+            import_directory(self.static_content_subdir)
         elif self.do_import_python_lib and self.python_lib_filename:
             if self.verbose:
                 log.debug("Skipping static content import, still importing python library")
@@ -312,9 +356,9 @@ class ImportManager(object):
         if os.path.exists(data_path / simport):
             if self.verbose:
                 log.debug("Importing %s directory", simport)
-            static_content_importer.import_static_content_directory(
-                content_subdir=simport, verbose=self.verbose
-            )
+            import_directory(simport)
+
+        return uploads
 
     def import_asset_metadata(self, data_dir, course_id):
         """
@@ -501,14 +545,25 @@ class ImportManager(object):
                 # Retrieve the course itself.
                 source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
 
-                # Import all static pieces.
-                self.import_static(data_path, dest_id)
+                if self.import_workers > 0:
+                    # Upload the static pieces in a pool of threads, while the
+                    # modules are written in this one.
+                    with ThreadPoolExecutor(max_workers=self.import_workers) as executor:
+                        uploads = self.import_static(data_path, dest_id, executor)
+                        self.import_asset_metadata(data_path, dest_id)
+                        self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                        # Raise the first error of the uploads, like a sequential import would.
+                        for upload in uploads:
+                            upload.result()
+                else:
+                    # Import all static pieces.
+                    self.import_static(data_path, dest_id)
 
-                # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
+                    # Import asset metadata stored in XML.
+                    self.import_asset_metadata(data_path, dest_id)
 
-                # Import all children
-                self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                    # Import all children
+                    self.import_children(source_courselike, courselike, courselike_key, dest_id)
 
             # This bulk operation wraps all the operations to populate the draft branch with any items
             # from the /drafts subdirectory.
@@ -6,6 +6,7 @@ Tests of the Capa XModule
 # pylint: disable=invalid-name
 
 import datetime
+import importlib
 import json
 import random
 import requests
@@ -39,6 +40,9 @@ from pytz import UTC
 from capa.correctmap import CorrectMap
 from ..capa_base_constants import RANDOMIZATION, SHOWANSWER
 
+# ``capa.safe_exec`` re-exports the ``safe_exec`` function under the module's name.
+SAFE_EXEC_MODULE = importlib.import_module('capa.safe_exec.safe_exec')
+
 
 class CapaFactory(object):
     """
@@ -3234,3 +3238,61 @@ class TestCapaDescriptorReportGeneration(unittest.TestCase):
         iterator = iter([self._user_state(suffix='_dynamath')])
         report_data = list(descriptor.generate_report_data(iterator))
         self.assertEquals(0, len(report_data))
+
+
+@ddt.ddt
+class TestCapaDescriptorPrecomputeVariants(unittest.TestCase):
+    """
+    Ensure that the script results of problem variants can be precomputed
+    """
+    problem_xml = textwrap.dedent("""\
+        <problem>
+            <script type="loncapa/python">
+        answer = random.randint(0, 1000)
+            </script>
+            <p>What is $answer?</p>
+            <stringresponse answer="$answer">
+                <textline/>
+            </stringresponse>
+        </problem>
+    """)
+
+    def _get_descriptor(self, rerandomize, data=problem_xml):
+        location = BlockUsageLocator(
+            CourseLocator("edX", "capa_test", "2012_Fall", deprecated=True),
+            "problem",
+            "SampleProblem",
+            deprecated=True,
+        )
+        descriptor = CapaDescriptor(
+            get_test_system(),
+            field_data=DictFieldData({'data': data, 'rerandomize': rerandomize}),
+            scope_ids=ScopeIds(None, 'problem', location, location),
+        )
+        descriptor.runtime = Mock(course_id=location.course_key)
+        return descriptor
+
+    @ddt.data(
+        (RANDOMIZATION.NEVER, 1),
+        (RANDOMIZATION.PER_STUDENT, 20),
+    )
+    @ddt.unpack
+    @patch('xmodule.capa_module.get_python_lib_zip', Mock(return_value=None))
+    def test_precompute_variants(self, rerandomize, num_variants):
+        cache = {}
+        descriptor = self._get_descriptor(rerandomize)
+        with patch.object(SAFE_EXEC_MODULE, 'codejail_safe_exec') as mock_exec:
+            self.assertEqual(descriptor.precompute_variants(Mock(get=cache.get, set=cache.__setitem__)), num_variants)
+        self.assertEqual(mock_exec.call_count, num_variants)
+        self.assertEqual(len(cache), num_variants)
+
+    @ddt.data(RANDOMIZATION.ALWAYS, RANDOMIZATION.ONRESET)
+    def test_too_many_variants(self, rerandomize):
+        descriptor = self._get_descriptor(rerandomize)
+        with patch.object(SAFE_EXEC_MODULE, 'codejail_safe_exec') as mock_exec:
+            self.assertEqual(descriptor.precompute_variants(Mock()), 0)
+        self.assertFalse(mock_exec.called)
+
+    def test_no_script(self):
+        descriptor = self._get_descriptor(RANDOMIZATION.PER_STUDENT, data='<problem/>')
+        self.assertEqual(descriptor.precompute_variants(Mock()), 0)
@@ -0,0 +1,53 @@
+"""
+Tests for sandboxing utilities.
+"""
+import unittest
+
+import mock
+from opaque_keys.edx.locator import CourseLocator
+
+from ..util import sandboxing
+
+
+class TestGetPythonLibZip(unittest.TestCase):
+    """
+    Test `get_python_lib_zip` function.
+    """
+    shard = 1
+
+    def setUp(self):
+        super(TestGetPythonLibZip, self).setUp()
+        self.course_id = CourseLocator('org', 'course', 'run')
+        patcher = mock.patch.dict(sandboxing._python_lib_zips, clear=True)  # pylint: disable=protected-access
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def contentstore(self, data, last_modified_at):
+        """
+        Return a contentstore factory whose python_lib.zip has the given contents.
+        """
+        zip_lib = mock.Mock(last_modified_at=last_modified_at)
+        zip_lib.copy_to_in_mem.return_value.data = data
+        store = mock.Mock()
+        store.find.return_value = zip_lib
+        return mock.Mock(return_value=store)
+
+    def test_no_python_lib(self):
+        contentstore = mock.Mock()
+        contentstore.return_value.find.return_value = None
+        self.assertIsNone(sandboxing.get_python_lib_zip(contentstore, self.course_id))
+
+    def test_unmodified_file_is_read_once(self):
+        contentstore = self.contentstore(b'zip one', last_modified_at=1)
+        first = sandboxing.get_python_lib_zip(contentstore, self.course_id)
+        second = sandboxing.get_python_lib_zip(contentstore, self.course_id)
+        self.assertEqual(first, b'zip one')
+        self.assertIs(first, second)
+        zip_lib = contentstore.return_value.find.return_value
+        self.assertEqual(zip_lib.copy_to_in_mem.call_count, 1)
+        self.assertEqual(zip_lib.close.call_count, 2)
+
+    def test_modified_file_is_read_again(self):
+        sandboxing.get_python_lib_zip(self.contentstore(b'zip one', last_modified_at=1), self.course_id)
+        data = sandboxing.get_python_lib_zip(self.contentstore(b'zip two', last_modified_at=2), self.course_id)
+        self.assertEqual(data, b'zip two')
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Tests for the streaming tar filesystem.
+"""
+import io
+import tarfile
+import unittest
+
+from fs import errors
+
+from ..util.streaming_tar import StreamingTarFS
+
+
+class WriteOnlyFile(object):
+    """
+    A file object which can only be written to, like a socket or a response.
+    """
+    def __init__(self):
+        self.output = io.BytesIO()
+
+    def write(self, data):
+        """
+        Write data to the file.
+        """
+        self.output.write(data)
+
+
+class TestStreamingTarFS(unittest.TestCase):
+    """
+    Test `StreamingTarFS`.
+    """
+    shard = 1
+
+    def setUp(self):
+        super(TestStreamingTarFS, self).setUp()
+        self.fileobj = WriteOnlyFile()
+        self.tar_fs = StreamingTarFS(self.fileobj)
+
+    def read_archive(self):
+        """
+        Returns the archive written, as a dict of member names to their data, or None for directories.
+        """
+        self.tar_fs.close()
+        members = {}
+        with tarfile.open(fileobj=io.BytesIO(self.fileobj.output.getvalue())) as tar_file:
+            for member in tar_file:
+                members[member.name] = tar_file.extractfile(member).read() if member.isfile() else None
+        return members
+
+    def test_write(self):
+        course_dir = self.tar_fs.makedir(u'course')
+        with course_dir.open(u'course.xml', 'wb') as course_xml:
+            course_xml.write(b'<course/>')
+        course_dir.makedirs(u'static/images', recreate=True)
+        with course_dir.open(u'static/images/é.txt', 'w') as text_file:
+            text_file.write(u'café')
+
+        self.assertTrue(self.tar_fs.isdir(u'course/static'))
+        self.assertTrue(self.tar_fs.isfile(u'course/course.xml'))
+        self.assertEqual(sorted(course_dir.listdir(u'/')), [u'course.xml', u'static'])
+        self.assertEqual(self.read_archive(), {
+            'course': None,
+            'course/course.xml': b'<course/>',
+            'course/static': None,
+            'course/static/images': None,
+            u'course/static/images/é.txt'.encode('utf-8'): u'café'.encode('utf-8'),
+        })
+
+    def test_setbinfile(self):
+        data = b'x' * 100000
+        source = io.BytesIO(data)
+        self.tar_fs.setbinfile(u'asset.bin', source)
+        self.assertEqual(self.read_archive(), {'asset.bin': data})
+
+    def test_write_again(self):
+        self.tar_fs.setbytes(u'file.txt', b'one')
+        self.tar_fs.setbytes(u'file.txt', b'two')
+        self.tar_fs.close()
+        with tarfile.open(fileobj=io.BytesIO(self.fileobj.output.getvalue())) as tar_file:
+            self.assertEqual(tar_file.extractfile('file.txt').read(), b'two')
+
+    def test_missing_parent(self):
+        with self.assertRaises(errors.ResourceNotFound):
+            self.tar_fs.makedir(u'static/images')
+        with self.assertRaises(errors.ResourceNotFound):
+            self.tar_fs.open(u'static/file.txt', 'wb')
+
+    def test_read(self):
+        self.tar_fs.setbytes(u'file.txt', b'data')
+        with self.assertRaises(errors.Unsupported):
+            self.tar_fs.open(u'file.txt', 'rb')
+
+    def test_uncompressed(self):
+        fileobj = WriteOnlyFile()
+        with StreamingTarFS(fileobj, compression='') as tar_fs:
+            tar_fs.setbytes(u'file.txt', b'data')
+        with tarfile.open(fileobj=io.BytesIO(fileobj.output.getvalue()), mode='r:') as tar_file:
+            self.assertEqual(tar_file.getnames(), ['file.txt'])
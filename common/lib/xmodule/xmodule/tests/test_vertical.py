@@ -170,6 +170,22 @@ class VerticalBlockTestCase(BaseVerticalBlockTest):
             else:
                 self.assertNotIn('wrap_xblock_data', mock_student_view.call_args[0][1])
 
+    def test_render_with_child_prefetch_service(self):
+        """
+        Test that the child_prefetch service loads the data of the children before they render.
+        """
+        child_prefetch_service = Mock()
+        child_prefetch_service.prefetch_children.side_effect = lambda block: self.assertFalse(mock_render.called)
+        self.module_system._services['child_prefetch'] = child_prefetch_service
+        self.module_system._services['bookmarks'] = Mock()
+        self.module_system._services['user'] = StubUserService()
+
+        with patch.object(self.html1block, 'render', wraps=self.html1block.render) as mock_render:
+            html = self.module_system.render(self.vertical, STUDENT_VIEW, self.default_context).content
+        child_prefetch_service.prefetch_children.assert_called_once_with(self.vertical)
+        self.assertIn(self.test_html_1, html)
+        self.assertIn(self.test_html_2, html)
+
     def test_render_studio_view(self):
         """
         Test the rendering of the Studio author view
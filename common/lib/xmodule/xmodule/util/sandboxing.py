@@ -3,6 +3,12 @@ from django.conf import settings
 
 DEFAULT_PYTHON_LIB_FILENAME = 'python_lib.zip'
 
+# The contents of the course code library files read by this process, with the
+# time they were last modified, so that they're only read again once modified.
+# {asset key: (last modified time, contents)}
+_python_lib_zips = {}  # pylint: disable=invalid-name
+MAX_CACHED_PYTHON_LIB_ZIPS = 32
+
 
 def can_execute_unsafe_code(course_id):
     """
@@ -30,11 +36,27 @@ def can_execute_unsafe_code(course_id):
 
 
 def get_python_lib_zip(contentstore, course_id):
-    """Return the bytes of the course code library file, if it exists."""
+    """
+    Return the bytes of the course code library file, if it exists.
+
+    The same bytes object is returned until the file is modified, so that
+    safe_exec only hashes each version of it once.
+    """
     python_lib_filename = getattr(settings, 'PYTHON_LIB_FILENAME', DEFAULT_PYTHON_LIB_FILENAME)
     asset_key = course_id.make_asset_key("asset", python_lib_filename)
-    zip_lib = contentstore().find(asset_key, throw_on_not_found=False)
-    if zip_lib is not None:
-        return zip_lib.data
-    else:
+    zip_lib = contentstore().find(asset_key, throw_on_not_found=False, as_stream=True)
+    if zip_lib is None:
         return None
+
+    try:
+        cached = _python_lib_zips.get(asset_key)
+        if cached is not None and zip_lib.last_modified_at is not None and cached[0] == zip_lib.last_modified_at:
+            return cached[1]
+        data = zip_lib.copy_to_in_mem().data
+    finally:
+        zip_lib.close()
+
+    if len(_python_lib_zips) >= MAX_CACHED_PYTHON_LIB_ZIPS:
+        _python_lib_zips.clear()
+    _python_lib_zips[asset_key] = (zip_lib.last_modified_at, data)
+    return data
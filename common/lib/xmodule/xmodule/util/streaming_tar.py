@@ -0,0 +1,188 @@
+"""
+A write-only PyFilesystem which streams what is written to it into a tar archive.
+"""
+import io
+import tarfile
+import time
+
+from fs import errors
+from fs.base import FS
+from fs.info import Info
+from fs.mode import Mode
+from fs.path import basename, dirname, relpath
+
+
+class StreamingTarFS(FS):
+    """
+    A write-only filesystem which adds each directory made in it and each file written to it to a
+    tar archive, written to a file object as a stream.
+
+    A file is added to the archive when it is closed, so its data is kept in memory until then,
+    except for files written with setbinfile from a seekable file object, whose data is copied
+    into the archive as it is read.  The file object only needs a write method, so the archive
+    can be streamed to a response or a storage without being staged on disk.
+
+    Files can't be read back.  A file written again is added to the archive again, and replaces
+    the earlier one when the archive is extracted.
+    """
+    _meta = {
+        'case_insensitive': False,
+        'invalid_path_chars': '\0',
+        'network': False,
+        'read_only': False,
+        'thread_safe': True,
+        'unicode_paths': True,
+        'virtual': False,
+    }
+
+    def __init__(self, fileobj, compression='gz'):
+        """
+        Arguments:
+            fileobj - The file object the archive is written to.  It is not closed with the
+                filesystem.
+            compression - 'gz', 'bz2', or '' for an uncompressed archive.
+        """
+        super(StreamingTarFS, self).__init__()
+        self._tar = tarfile.open(fileobj=fileobj, mode='w|' + compression)
+        self._mtime = time.time()
+        self._dirs = set([u'/'])
+        self._files = set()
+
+    def getinfo(self, path, namespaces=None):
+        _path = self.validatepath(path)
+        with self._lock:
+            if _path in self._dirs:
+                is_dir = True
+            elif _path in self._files:
+                is_dir = False
+            else:
+                raise errors.ResourceNotFound(path)
+        return Info({'basic': {'name': basename(_path), 'is_dir': is_dir}})
+
+    def listdir(self, path):
+        _path = self.validatepath(path)
+        with self._lock:
+            if _path not in self._dirs:
+                if _path in self._files:
+                    raise errors.DirectoryExpected(path)
+                raise errors.ResourceNotFound(path)
+            return [
+                basename(entry) for entry in self._dirs | self._files
+                if entry != u'/' and dirname(entry) == _path
+            ]
+
+    def makedir(self, path, permissions=None, recreate=False):
+        _path = self.validatepath(path)
+        with self._lock:
+            if _path in self._files:
+                raise errors.DirectoryExists(path)
+            if _path in self._dirs:
+                if not recreate:
+                    raise errors.DirectoryExists(path)
+            else:
+                self._check_parent(path, _path)
+                self._add_member(_path, tarfile.DIRTYPE)
+        return self.opendir(path)
+
+    def openbin(self, path, mode='r', buffering=-1, **options):
+        _mode = Mode(mode)
+        _mode.validate_bin()
+        if _mode.reading or _mode.appending:
+            raise errors.Unsupported(u'{} is write-only'.format(self))
+        _path = self.validatepath(path)
+        self._check_new_file(path, _path)
+        return _TarMemberFile(self, _path)
+
+    def setbinfile(self, path, file):
+        """
+        Add a file with the data read from a file object.  If it can seek, its data is copied
+        into the archive as it is read.
+        """
+        try:
+            start = file.tell()
+            file.seek(0, io.SEEK_END)
+            size = file.tell() - start
+            file.seek(start)
+        except (AttributeError, IOError, ValueError):
+            return super(StreamingTarFS, self).setbinfile(path, file)
+
+        _path = self.validatepath(path)
+        with self._lock:
+            self._check_new_file(path, _path)
+            self._add_member(_path, tarfile.REGTYPE, file, size)
+
+    def remove(self, path):
+        raise errors.Unsupported(u"Files can't be removed from {}".format(self))
+
+    def removedir(self, path):
+        raise errors.Unsupported(u"Directories can't be removed from {}".format(self))
+
+    def setinfo(self, path, info):
+        raise errors.Unsupported(u"Files of {} can't be changed".format(self))
+
+    def close(self):
+        """
+        Finish the archive.
+        """
+        if not self.isclosed():
+            self._tar.close()
+        super(StreamingTarFS, self).close()
+
+    def __repr__(self):
+        return 'StreamingTarFS({!r})'.format(self._tar.fileobj)
+
+    def _check_parent(self, path, _path):
+        """
+        Raises ResourceNotFound if the parent directory of the path wasn't made.
+        """
+        if dirname(_path) not in self._dirs:
+            raise errors.ResourceNotFound(path)
+
+    def _check_new_file(self, path, _path):
+        """
+        Raises an error if a file can't be written at the path.
+        """
+        with self._lock:
+            if _path in self._dirs:
+                raise errors.FileExpected(path)
+            self._check_parent(path, _path)
+
+    def _add_member(self, _path, member_type, fileobj=None, size=0):
+        """
+        Add a member of the given type to the archive, with the given data.
+        """
+        info = tarfile.TarInfo(relpath(_path).encode('utf-8'))
+        info.type = member_type
+        info.mtime = self._mtime
+        info.size = size
+        if member_type == tarfile.DIRTYPE:
+            info.mode = 0o755
+        else:
+            info.mode = 0o644
+        with self._lock:
+            self._tar.addfile(info, fileobj)
+            if member_type == tarfile.DIRTYPE:
+                self._dirs.add(_path)
+            else:
+                self._files.add(_path)
+
+
+class _TarMemberFile(io.BytesIO):
+    """
+    A file of a StreamingTarFS, which is added to its archive when it is closed.
+    """
+    mode = 'wb'
+
+    def __init__(self, tar_fs, path):
+        super(_TarMemberFile, self).__init__()
+        self._tar_fs = tar_fs
+        self._path = path
+
+    def close(self):
+        if not self.closed:
+            self.seek(0, io.SEEK_END)
+            size = self.tell()
+            self.seek(0)
+            # pylint: disable=protected-access
+            self._tar_fs._add_member(self._path, tarfile.REGTYPE, self, size)
+        super(_TarMemberFile, self).close()
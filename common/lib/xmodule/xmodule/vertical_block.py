@@ -28,7 +28,7 @@ CLASS_PRIORITY = ['video', 'problem']
 
 
 @XBlock.needs('user', 'bookmarks')
-@XBlock.wants('completion')
+@XBlock.wants('completion', 'child_prefetch')
 class VerticalBlock(SequenceFields, XModuleFields, StudioEditableBlock, XmlParserMixin, MakoTemplateBlockBase, XBlock):
     """
     Layout XBlock for rendering subblocks vertically.
@@ -64,6 +64,11 @@ class VerticalBlock(SequenceFields, XModuleFields, StudioEditableBlock, XmlParse
                 user_service = self.runtime.service(self, 'user')
                 child_context['username'] = user_service.get_current_user().opt_attrs['edx-platform.username']
 
+        # The child_prefetch service may load the data of the children in bulk.
+        child_prefetch_service = self.runtime.service(self, 'child_prefetch')
+        if child_prefetch_service:
+            child_prefetch_service.prefetch_children(self)
+
         child_blocks = self.get_display_items()
 
         child_blocks_to_complete_on_view = set()
@@ -146,6 +146,12 @@ class CCXModulestoreWrapper(object):
         with remove_ccx(course_key) as (course_key, restore):
             return restore(self._modulestore.get_items(course_key, **kwargs))
 
+    def prefetch_definitions(self, course_key, usage_keys, depth=None):
+        """See the docs for xmodule.modulestore.mixed.MixedModuleStore"""
+        with remove_ccx(course_key) as (course_key, _):
+            usage_keys = [strip_ccx(usage_key)[0] for usage_key in usage_keys]
+            self._modulestore.prefetch_definitions(course_key, usage_keys, depth=depth)
+
     def get_course(self, course_key, depth=0, **kwargs):
         """See the docs for xmodule.modulestore.mixed.MixedModuleStore"""
         with remove_ccx(course_key) as (course_key, restore):
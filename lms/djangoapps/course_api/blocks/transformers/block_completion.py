@@ -14,6 +14,8 @@ class BlockCompletionTransformer(BlockStructureTransformer):
     """
     READ_VERSION = 1
     WRITE_VERSION = 1
+    INCREMENTAL_COLLECT_SCOPE = BlockStructureTransformer.CHANGED_BLOCKS
+    DEFINITION_FIELDS = {}
     COMPLETION = 'completion'
 
     @classmethod
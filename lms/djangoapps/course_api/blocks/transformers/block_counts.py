@@ -10,6 +10,7 @@ class BlockCountsTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    DEFINITION_FIELDS = {}
     BLOCK_COUNTS = 'block_counts'
 
     def __init__(self, block_types_to_count):
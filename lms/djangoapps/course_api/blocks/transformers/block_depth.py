@@ -11,6 +11,7 @@ class BlockDepthTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    DEFINITION_FIELDS = {}
     BLOCK_DEPTH = 'block_depth'
 
     def __init__(self, requested_depth=None):
@@ -1,7 +1,10 @@
 """
 Blocks API Transformer
 """
-from openedx.core.djangoapps.content.block_structure.transformer import BlockStructureTransformer
+from openedx.core.djangoapps.content.block_structure.transformer import (
+    BlockStructureTransformer,
+    merge_definition_fields,
+)
 
 from .block_counts import BlockCountsTransformer
 from .block_depth import BlockDepthTransformer
@@ -25,6 +28,13 @@ class BlocksAPITransformer(BlockStructureTransformer):
 
     WRITE_VERSION = 1
     READ_VERSION = 1
+    INCREMENTAL_COLLECT_SCOPE = BlockStructureTransformer.CHANGED_SUBTREES
+    DEFINITION_FIELDS = merge_definition_fields(
+        StudentViewTransformer.DEFINITION_FIELDS,
+        BlockCountsTransformer.DEFINITION_FIELDS,
+        BlockDepthTransformer.DEFINITION_FIELDS,
+        BlockNavigationTransformer.DEFINITION_FIELDS,
+    )
     STUDENT_VIEW_DATA = 'student_view_data'
     STUDENT_VIEW_MULTI_DEVICE = 'student_view_multi_device'
 
@@ -10,6 +10,8 @@ class StudentViewTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    # Of the blocks with student_view_data, only HTML blocks use content fields.
+    DEFINITION_FIELDS = {'html': ('data',)}
     STUDENT_VIEW_DATA = 'student_view_data'
     STUDENT_VIEW_MULTI_DEVICE = 'student_view_multi_device'
 
@@ -31,6 +31,8 @@ class HiddenContentTransformer(FilteringTransformerMixin, BlockStructureTransfor
     """
     WRITE_VERSION = 2
     READ_VERSION = 2
+    INCREMENTAL_COLLECT_SCOPE = BlockStructureTransformer.CHANGED_SUBTREES
+    DEFINITION_FIELDS = {}
     MERGED_DUE_DATE = 'merged_due_date'
     MERGED_HIDE_AFTER_DUE = 'merged_hide_after_due'
 
@@ -14,6 +14,8 @@ class HideEmptyTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    INCREMENTAL_COLLECT_SCOPE = BlockStructureTransformer.CHANGED_BLOCKS
+    DEFINITION_FIELDS = {}
 
     @classmethod
     def name(cls):
@@ -26,6 +26,8 @@ class ContentLibraryTransformer(FilteringTransformerMixin, BlockStructureTransfo
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    INCREMENTAL_COLLECT_SCOPE = BlockStructureTransformer.CHANGED_BLOCKS
+    DEFINITION_FIELDS = {}
 
     @classmethod
     def name(cls):
@@ -59,6 +59,8 @@ class OverrideDataTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    INCREMENTAL_COLLECT_SCOPE = BlockStructureTransformer.CHANGED_SUBTREES
+    DEFINITION_FIELDS = {}
 
     def __init__(self, user):
         self.user = user
@@ -24,6 +24,8 @@ class SplitTestTransformer(FilteringTransformerMixin, BlockStructureTransformer)
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    INCREMENTAL_COLLECT_SCOPE = BlockStructureTransformer.CHANGED_SUBTREES
+    DEFINITION_FIELDS = {'split_test': ('group_id_to_child', 'user_partition_id')}
 
     @classmethod
     def name(cls):
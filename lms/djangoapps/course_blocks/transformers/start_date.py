@@ -29,6 +29,8 @@ class StartDateTransformer(FilteringTransformerMixin, BlockStructureTransformer)
     """
     WRITE_VERSION = 1
     READ_VERSION = 1
+    INCREMENTAL_COLLECT_SCOPE = BlockStructureTransformer.CHANGED_SUBTREES
+    DEFINITION_FIELDS = {}
     MERGED_START_DATE = 'merged_start_date'
 
     @classmethod
@@ -0,0 +1,43 @@
+"""
+Bulk loading of the data the children of a unit need to render.
+
+Rendering the children of a unit one by one loads the definition of each child,
+its content, from the modulestore as it is first read.  When the
+`courseware.prefetch_unit_children` course waffle flag is enabled, the
+`child_prefetch` XBlock service loads the definitions of all the children of a
+unit, and of their descendants, in a single query before they render.
+
+The learner state of the children is already loaded in bulk by the
+FieldDataCache they are bound with.
+"""
+from openedx.core.djangoapps.waffle_utils import CourseWaffleFlag, WaffleFlagNamespace
+from xmodule.modulestore.django import modulestore
+
+WAFFLE_FLAG_NAMESPACE = WaffleFlagNamespace(name=u'courseware')
+
+# Waffle flag to load the definitions of the children of units in bulk.
+PREFETCH_UNIT_CHILDREN_FLAG = CourseWaffleFlag(WAFFLE_FLAG_NAMESPACE, u'prefetch_unit_children')
+
+
+class ChildPrefetchService(object):
+    """
+    An XBlock service loading the data the children of a block need in bulk, if enabled for the course.
+    """
+    def __init__(self, course_key):
+        self.course_key = course_key
+
+    def is_enabled(self):
+        """
+        Returns whether the data of the children is loaded in bulk.
+        """
+        return PREFETCH_UNIT_CHILDREN_FLAG.is_enabled(self.course_key)
+
+    def prefetch_children(self, block):
+        """
+        Loads the definitions of the children of the block, and of their descendants, at once.
+
+        The definitions are kept for the blocks loaded afterwards, and, during a bulk
+        operation on the course, for the blocks already loaded.
+        """
+        if len(block.children) > 1 and self.is_enabled():
+            modulestore().prefetch_definitions(self.course_key, block.children)
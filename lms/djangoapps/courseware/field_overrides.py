@@ -19,6 +19,7 @@ from abc import ABCMeta, abstractmethod
 from contextlib import contextmanager
 
 from django.conf import settings
+from edx_django_utils import monitoring as monitoring_utils
 from edx_django_utils.cache import DEFAULT_REQUEST_CACHE
 from xblock.field_data import FieldData
 
@@ -27,6 +28,9 @@ from xmodule.modulestore.inheritance import InheritanceMixin
 NOTSET = object()
 ENABLED_OVERRIDE_PROVIDERS_KEY = u'courseware.field_overrides.enabled_providers.{course_id}'
 ENABLED_MODULESTORE_OVERRIDE_PROVIDERS_KEY = u'courseware.modulestore_field_overrides.enabled_providers.{course_id}'
+OVERRIDE_RESOLUTIONS_KEY = u'courseware.field_overrides.resolutions'
+PREFETCHED_OVERRIDE_PROVIDERS_KEY = u'courseware.field_overrides.prefetched_providers'
+OVERRIDES_USER_KEY = u'courseware.field_overrides.user'
 
 
 def resolve_dotted(name):
@@ -48,15 +52,27 @@ def resolve_dotted(name):
     return target
 
 
-def _lineage(block):
+def clear_override_resolutions():
     """
-    Returns an iterator over all ancestors of the given block, starting with
-    its immediate parent and ending at the root of the block tree.
+    Forgets the overrides resolved during the request, so that they are
+    resolved again.  Call it after setting or clearing an override.
     """
-    parent = block.get_parent()
-    while parent:
-        yield parent
-        parent = parent.get_parent()
+    DEFAULT_REQUEST_CACHE.data.pop(OVERRIDE_RESOLUTIONS_KEY, None)
+
+
+def _forget_other_users_overrides(user_id):
+    """
+    Forgets the overrides resolved, and the providers prefetched, during the
+    request for users other than the given one.  Tasks which build the field
+    data of many users in turn, like grade reports, then only keep those of
+    the current user, and of no user, instead of those of every user they
+    processed.
+    """
+    request_data = DEFAULT_REQUEST_CACHE.data
+    if request_data.get(OVERRIDES_USER_KEY, user_id) != user_id:
+        request_data.pop(OVERRIDE_RESOLUTIONS_KEY, None)
+        request_data.pop(PREFETCHED_OVERRIDE_PROVIDERS_KEY, None)
+    request_data[OVERRIDES_USER_KEY] = user_id
 
 
 class _OverridesDisabled(threading.local):
@@ -114,6 +130,19 @@ class FieldOverrideProvider(object):
         """
         raise NotImplementedError
 
+    def prefetch(self, course_key):
+        """
+        Load all of the overrides of the course for the user at once, if the
+        provider can, so that `get` doesn't look them up block by block.
+
+        It is called once per request, course, user and provider class,
+        before the provider's first `get` for a block of the course.
+
+        Arguments:
+          course_key (CourseKey)
+        """
+        pass
+
     @abstractmethod
     def enabled_for(self, course):  # pragma no cover
         """
@@ -167,7 +196,10 @@ class OverrideFieldData(FieldData):
             # to check for instance.providers after the instance is built. This
             # would allow for the case where we have registered providers but
             # none are enabled for the provided course
-            return cls(user, wrapped, enabled_providers)
+            field_data = cls(user, wrapped, enabled_providers)
+            if course is not None:
+                field_data.prefetch(course.id)
+            return field_data
 
         return wrapped
 
@@ -198,17 +230,78 @@ class OverrideFieldData(FieldData):
     def __init__(self, user, fallback, providers):
         self.fallback = fallback
         self.providers = tuple(provider(user, fallback) for provider in providers)
+        # The overrides resolved for blocks are shared, for the request, by the
+        # field data of the same user with the same providers.
+        self._resolutions_key = (tuple(providers), getattr(user, 'id', None))
+        if self._resolutions_key[1] is not None:
+            _forget_other_users_overrides(self._resolutions_key[1])
+
+    def prefetch(self, course_key):
+        """
+        Lets each provider load the overrides of the course in bulk, once per request.
+        """
+        prefetched = DEFAULT_REQUEST_CACHE.data.setdefault(PREFETCHED_OVERRIDE_PROVIDERS_KEY, set())
+        for provider in self.providers:
+            prefetch_key = (type(provider), self._resolutions_key[1], course_key)
+            if prefetch_key not in prefetched:
+                prefetched.add(prefetch_key)
+                provider.prefetch(course_key)
 
     def get_override(self, block, name):
         """
         Checks for an override for the field identified by `name` in `block`.
         Returns the overridden value or `NOTSET` if no override is found.
         """
-        if not overrides_disabled():
-            for provider in self.providers:
-                value = provider.get(block, name, NOTSET)
-                if value is not NOTSET:
-                    return value
+        if overrides_disabled():
+            return NOTSET
+        return self._resolve(block, name, inherited=False)
+
+    def get_inherited_override(self, block, name):
+        """
+        Checks for an override for the field identified by `name` in the ancestors
+        of `block`.  Returns the override of the nearest ancestor or `NOTSET` if
+        no override is found.
+        """
+        if overrides_disabled():
+            return NOTSET
+        return self._resolve(block, name, inherited=True)
+
+    def _resolve(self, block, name, inherited):
+        """
+        Returns the override of the field in the block, or in its ancestors if
+        `inherited`, resolving it only once per request.
+        """
+        usage_id = getattr(getattr(block, 'scope_ids', None), 'usage_id', None)
+        if usage_id is None:
+            return self._resolve_uncached(block, name, inherited)
+
+        resolutions = DEFAULT_REQUEST_CACHE.data.setdefault(OVERRIDE_RESOLUTIONS_KEY, {})
+        resolution_key = (self._resolutions_key, usage_id, name, inherited)
+        if resolution_key not in resolutions:
+            resolutions[resolution_key] = self._resolve_uncached(block, name, inherited)
+        return resolutions[resolution_key]
+
+    def _resolve_uncached(self, block, name, inherited):
+        """
+        Returns the override of the field in the block, or in its ancestors if
+        `inherited`, from the providers.
+        """
+        if inherited:
+            parent = block.get_parent()
+            if parent is None:
+                return NOTSET
+            value = self._resolve(parent, name, inherited=False)
+            if value is NOTSET:
+                value = self._resolve(parent, name, inherited=True)
+            return value
+
+        for provider in self.providers:
+            monitoring_utils.accumulate(
+                u'field_overrides.provider_calls.{}'.format(type(provider).__name__), 1
+            )
+            value = provider.get(block, name, NOTSET)
+            if value is not NOTSET:
+                return value
         return NOTSET
 
     def get(self, block, name):
@@ -232,11 +325,9 @@ class OverrideFieldData(FieldData):
             # If this is an inheritable field and an override is set above,
             # then we want to return False here, so the field_data uses the
             # override and not the original value for this block.
-            inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    if self.get_override(ancestor, name) is not NOTSET:
-                        return False
+            if name in InheritanceMixin.fields:
+                if self.get_inherited_override(block, name) is not NOTSET:
+                    return False
 
         return has is not NOTSET or self.fallback.has(block, name)
 
@@ -246,13 +337,10 @@ class OverrideFieldData(FieldData):
     def default(self, block, name):
         # The `default` method is overloaded by the field storage system to
         # also handle inheritance.
-        if self.providers and not overrides_disabled():
-            inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    value = self.get_override(ancestor, name)
-                    if value is not NOTSET:
-                        return value
+        if self.providers and name in InheritanceMixin.fields:
+            value = self.get_inherited_override(block, name)
+            if value is not NOTSET:
+                return value
         return self.fallback.default(block, name)
 
 
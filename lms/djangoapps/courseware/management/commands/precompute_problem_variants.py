@@ -0,0 +1,52 @@
+"""
+Run the scripts of every variant of the problems in a course, so that the
+results of their sandboxed executions are cached before the problems are
+loaded.  Executions of scripts which read the per-student context, such as
+the anonymous id of the student, are cached per student, so they are only
+precomputed for the scripts which don't read it.
+
+Only problems with a limited number of variants (e.g. rerandomized per
+student) are precomputed.
+"""
+from __future__ import unicode_literals
+
+import logging
+from textwrap import dedent
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey
+
+from capa.safe_exec import SafeExecCache
+from xmodule.capa_base import NUM_RANDOMIZATION_BINS
+from xmodule.modulestore.django import modulestore
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = dedent(__doc__).strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='+', help='ids of the courses whose problems to precompute')
+        parser.add_argument('--max-variants',
+                            type=int,
+                            default=NUM_RANDOMIZATION_BINS,
+                            help='skip problems with more variants than this')
+
+    def handle(self, *args, **options):
+        for course_id in options['course_ids']:
+            try:
+                course_key = CourseKey.from_string(course_id)
+            except InvalidKeyError:
+                raise CommandError('Invalid course id: {}'.format(course_id))
+
+            safe_exec_cache = SafeExecCache(cache)
+            store = modulestore()
+            num_variants = 0
+            with store.bulk_operations(course_key):
+                for problem in store.get_items(course_key, qualifiers={'category': 'problem'}):
+                    num_variants += problem.precompute_variants(safe_exec_cache, options['max_variants'])
+
+            log.info('Precomputed %d problem variants for course %s', num_variants, course_key)
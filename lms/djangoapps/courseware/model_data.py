@@ -9,6 +9,9 @@ Classes to provide the LMS runtime data storage to XBlocks.
 :class:`FieldDataCache`: A object which provides a read-through prefetch cache
     of data to support XBlock fields within a limited set of scopes.
 
+:class:`MultiUserFieldDataCache`: Prefetches the data for :class:`FieldDataCache`
+    for many users at once, and hands out prefilled per-user caches.
+
 The remaining classes in this module provide read-through prefetch cache implementations
 for specific scopes. The individual classes provide the knowledge of what are the essential
 pieces of information for each scope, and thus how to cache, prefetch, and create new field data
@@ -28,6 +31,7 @@ from collections import defaultdict, namedtuple
 
 from contracts import contract, new_contract
 from django.db import DatabaseError, IntegrityError, transaction
+from edx_user_state_client.interface import XBlockUserState
 from opaque_keys.edx.asides import AsideUsageKeyV1, AsideUsageKeyV2
 from opaque_keys.edx.block_types import BlockTypeKeyV1
 from opaque_keys.edx.keys import CourseKey
@@ -39,7 +43,13 @@ from xblock.runtime import KeyValueStore
 from courseware.user_state_client import DjangoXBlockUserStateClient
 from xmodule.modulestore.django import modulestore
 
-from .models import StudentModule, XModuleStudentInfoField, XModuleStudentPrefsField, XModuleUserStateSummaryField
+from .models import (
+    StudentModule,
+    XModuleStudentInfoField,
+    XModuleStudentPrefsField,
+    XModuleUserStateSummaryField,
+    chunks
+)
 
 log = logging.getLogger(__name__)
 
@@ -82,6 +92,41 @@ def _all_block_types(descriptors, aside_types):
     return block_types
 
 
+def _descriptor_descendents(descriptor, depth, descriptor_filter):
+    """
+    Return a list of all child descriptors down to the specified depth
+    that match the descriptor filter. Includes `descriptor`
+
+    descriptor: The parent to search inside
+    depth: The number of levels to descend, or None for infinite depth
+    descriptor_filter(descriptor): A function that returns True
+        if descriptor should be included in the results
+    """
+    if descriptor_filter(descriptor):
+        descriptors = [descriptor]
+    else:
+        descriptors = []
+
+    if depth is None or depth > 0:
+        new_depth = depth - 1 if depth is not None else depth
+
+        for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
+            descriptors.extend(_descriptor_descendents(child, new_depth, descriptor_filter))
+
+    return descriptors
+
+
+def _fields_by_scope(descriptors):
+    """
+    Return a map of scopes to the fields in that scope on `descriptors`.
+    """
+    scope_map = defaultdict(set)
+    for descriptor in descriptors:
+        for field in descriptor.fields.values():
+            scope_map[field.scope].add(field)
+    return scope_map
+
+
 class DjangoKeyValueStore(KeyValueStore):
     """
     This KeyValueStore will read and write data in the following scopes to django models
@@ -172,7 +217,16 @@ class DjangoOrmFieldCache(object):
             xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
             aside_types (list of str): Aside types to cache fields for.
         """
-        for field_object in self._read_objects(fields, xblocks, aside_types):
+        self.cache_field_objects(self._read_objects(fields, xblocks, aside_types))
+
+    def cache_field_objects(self, field_objects):
+        """
+        Add already-loaded ``field_objects`` to this cache.
+
+        Arguments:
+            field_objects (iterable of django models): Field rows to cache.
+        """
+        for field_object in field_objects:
             self._cache[self._cache_key_for_field_object(field_object)] = field_object
 
     @contract(kvs_key=DjangoKeyValueStore.Key)
@@ -361,13 +415,33 @@ class UserStateCache(object):
             xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
             aside_types (list of str): Aside types to cache fields for.
         """
-        block_field_state = self._client.get_many(
+        self.cache_user_states(self._client.get_many(
             self.user.username,
             _all_usage_keys(xblocks, aside_types),
-        )
-        for user_state in block_field_state:
+        ))
+
+    def cache_user_states(self, user_states):
+        """
+        Add already-loaded ``user_states`` to this cache.
+
+        Arguments:
+            user_states (iterable of :class:`~XBlockUserState`): Block states to cache.
+        """
+        for user_state in user_states:
             self._cache[user_state.block_key] = user_state.state
 
+    def reload_user_states(self, block_keys):
+        """
+        Replace the cached states of ``block_keys`` with their stored states,
+        for callers which hold this cache while those states may change.
+
+        Arguments:
+            block_keys (list of :class:`~UsageKey`): The blocks to reload the states of.
+        """
+        for block_key in block_keys:
+            self._cache.pop(block_key, None)
+        self.cache_user_states(self._client.get_many(self.user.username, block_keys))
+
     @contract(kvs_key=DjangoKeyValueStore.Key)
     def set(self, kvs_key, value):
         """
@@ -747,32 +821,8 @@ class FieldDataCache(object):
             descriptor_filter is a function that accepts a descriptor and return whether the field data
                 should be cached
         """
-
-        def get_child_descriptors(descriptor, depth, descriptor_filter):
-            """
-            Return a list of all child descriptors down to the specified depth
-            that match the descriptor filter. Includes `descriptor`
-
-            descriptor: The parent to search inside
-            depth: The number of levels to descend, or None for infinite depth
-            descriptor_filter(descriptor): A function that returns True
-                if descriptor should be included in the results
-            """
-            if descriptor_filter(descriptor):
-                descriptors = [descriptor]
-            else:
-                descriptors = []
-
-            if depth is None or depth > 0:
-                new_depth = depth - 1 if depth is not None else depth
-
-                for child in descriptor.get_children() + descriptor.get_required_module_descriptors():
-                    descriptors.extend(get_child_descriptors(child, new_depth, descriptor_filter))
-
-            return descriptors
-
         with modulestore().bulk_operations(descriptor.location.course_key):
-            descriptors = get_child_descriptors(descriptor, depth, descriptor_filter)
+            descriptors = _descriptor_descendents(descriptor, depth, descriptor_filter)
 
         self.add_descriptors_to_cache(descriptors)
 
@@ -797,11 +847,7 @@ class FieldDataCache(object):
         """
         Returns a map of scopes to fields in that scope that should be cached
         """
-        scope_map = defaultdict(set)
-        for descriptor in descriptors:
-            for field in descriptor.fields.values():
-                scope_map[field.scope].add(field)
-        return scope_map
+        return _fields_by_scope(descriptors)
 
     @contract(key=DjangoKeyValueStore.Key)
     def get(self, key):
@@ -930,6 +976,190 @@ class FieldDataCache(object):
         return sum(len(cache) for cache in self.cache.values())
 
 
+class MultiUserFieldDataCache(object):
+    """
+    Prefetches the field data needed by a fixed set of descriptors for many
+    users at once.
+
+    FieldDataCache loads its rows one user at a time, so visiting the same
+    blocks for N users costs O(N) queries. This class instead loads the
+    StudentModule, XModuleStudentInfoField and XModuleStudentPrefsField rows
+    for a whole chunk of users with ``student_id__in`` queries, and then
+    builds a prefilled :class:`FieldDataCache` for each user of that chunk
+    without any further queries. The Scope.user_state_summary data is not
+    user specific, so it is loaded once and shared by all the caches.
+
+    Users are chunked so that at most ``max_rows`` StudentModule rows are
+    expected to be held in memory at once.
+    """
+    # The number of StudentModule rows to hold in memory at once
+    DEFAULT_MAX_ROWS = 10000
+
+    def __init__(self, descriptors, course_id, asides=None, read_only=False, max_rows=None):
+        """
+        Arguments:
+            descriptors: A list of XModuleDescriptors to cache data for.
+            course_id: The id of the current course
+            asides: The list of aside types to load, or None to prefetch no asides.
+            read_only: The caches handed out should not perform writes.
+            max_rows: The maximum number of StudentModule rows to load per chunk of users.
+        """
+        assert isinstance(course_id, CourseKey)
+        self.descriptors = descriptors
+        self.course_id = course_id
+        self.asides = asides or []
+        self.read_only = read_only
+
+        self._fields = _fields_by_scope(descriptors)
+        self._usage_keys = list(_all_usage_keys(descriptors, self.asides))
+        self._block_types = list(_all_block_types(descriptors, self.asides))
+        self._user_state_summary_cache = None
+
+        max_rows = max_rows or self.DEFAULT_MAX_ROWS
+        self.users_per_chunk = max(1, max_rows // max(1, len(self._usage_keys)))
+
+    @classmethod
+    def cache_for_descriptor_descendents(cls, course_id, descriptors, depth=None,
+                                         descriptor_filter=lambda descriptor: True, **kwargs):
+        """
+        Return a MultiUserFieldDataCache for all of ``descriptors`` and their descendants.
+
+        course_id: the course in the context of which we want StudentModules.
+        descriptors: A list of XModuleDescriptors
+        depth is the number of levels of descendant modules to load StudentModules for, in addition to
+            the supplied descriptors. If depth is None, load all descendant StudentModules
+        descriptor_filter is a function that accepts a descriptor and return whether the field data
+            should be cached
+        """
+        all_descriptors = []
+        with modulestore().bulk_operations(course_id):
+            for descriptor in descriptors:
+                all_descriptors.extend(_descriptor_descendents(descriptor, depth, descriptor_filter))
+        return cls(all_descriptors, course_id, **kwargs)
+
+    def caches_for_users(self, users):
+        """
+        Return a dict mapping user ids to prefilled :class:`FieldDataCache`
+        instances for each of the supplied ``users``.
+
+        Arguments:
+            users (list of User): The users to prefetch data for.
+        """
+        caches = {}
+        for user_chunk in chunks(list(users), self.users_per_chunk):
+            caches.update(self._caches_for_user_chunk(user_chunk))
+        return caches
+
+    def iter_caches_for_users(self, users):
+        """
+        Yield a ``(user, FieldDataCache)`` pair for each of the supplied
+        ``users``, keeping only one chunk of users' data in memory at a time.
+
+        Arguments:
+            users (list of User): The users to prefetch data for.
+        """
+        for user_chunk in chunks(list(users), self.users_per_chunk):
+            caches = self._caches_for_user_chunk(user_chunk)
+            for user in user_chunk:
+                yield user, caches[user.id]
+
+    def _caches_for_user_chunk(self, users):
+        """
+        Load the field data for ``users`` and return a dict mapping user ids
+        to prefilled :class:`FieldDataCache` instances.
+        """
+        users_by_id = {user.id: user for user in users}
+        caches = {
+            user_id: FieldDataCache([], self.course_id, user, asides=self.asides, read_only=self.read_only)
+            for user_id, user in users_by_id.iteritems()
+        }
+
+        for field_data_cache in caches.itervalues():
+            field_data_cache.scorable_locations.update(
+                desc.location for desc in self.descriptors if desc.has_score
+            )
+            field_data_cache.cache[Scope.user_state_summary] = self._get_user_state_summary_cache()
+
+        if Scope.user_state in self._fields:
+            user_states = defaultdict(list)
+            for user_id, user_state in self._read_user_states(users_by_id):
+                user_states[user_id].append(user_state)
+            for user_id, states in user_states.iteritems():
+                caches[user_id].cache[Scope.user_state].cache_user_states(states)
+
+        if Scope.user_info in self._fields:
+            self._cache_field_objects(caches, Scope.user_info, XModuleStudentInfoField.objects.filter(
+                student_id__in=users_by_id.keys(),
+                field_name__in=set(field.name for field in self._fields[Scope.user_info]),
+            ))
+
+        if Scope.preferences in self._fields:
+            self._cache_field_objects(caches, Scope.preferences, XModuleStudentPrefsField.objects.chunked_filter(
+                'module_type__in',
+                self._block_types,
+                student_id__in=users_by_id.keys(),
+                field_name__in=set(field.name for field in self._fields[Scope.preferences]),
+            ))
+
+        return caches
+
+    def _read_user_states(self, users_by_id):
+        """
+        Yield ``(user_id, XBlockUserState)`` pairs for all of the stored
+        Scope.user_state data of the users in ``users_by_id``.
+
+        This mirrors :meth:`DjangoXBlockUserStateClient.get_many`, but reads
+        the rows of many users in the same queries.
+        """
+        query = StudentModule.objects.chunked_filter(
+            'module_state_key__in',
+            self._usage_keys,
+            student_id__in=users_by_id.keys(),
+            course_id=self.course_id,
+        )
+        for student_module in query:
+            if student_module.state is None:
+                continue
+
+            state = json.loads(student_module.state)
+
+            # If the state is the empty dict, then it has been deleted, and so
+            # it should be treated as if it doesn't exist.
+            if state == {}:
+                continue
+
+            yield student_module.student_id, XBlockUserState(
+                users_by_id[student_module.student_id].username,
+                student_module.module_state_key.map_into_course(student_module.course_id),
+                state,
+                student_module.modified,
+                Scope.user_state,
+            )
+
+    def _cache_field_objects(self, caches, scope, field_objects):
+        """
+        Distribute the loaded ``field_objects`` for ``scope`` among the
+        per-user ``caches``.
+        """
+        objects_by_user = defaultdict(list)
+        for field_object in field_objects:
+            objects_by_user[field_object.student_id].append(field_object)
+        for user_id, user_objects in objects_by_user.iteritems():
+            caches[user_id].cache[scope].cache_field_objects(user_objects)
+
+    def _get_user_state_summary_cache(self):
+        """
+        Return the UserStateSummaryCache shared by all users, loading it on first use.
+        """
+        if self._user_state_summary_cache is None:
+            self._user_state_summary_cache = UserStateSummaryCache(self.course_id)
+            if Scope.user_state_summary in self._fields:
+                self._user_state_summary_cache.cache_fields(
+                    self._fields[Scope.user_state_summary], self.descriptors, self.asides
+                )
+        return self._user_state_summary_cache
+
+
 class ScoresClient(object):
     """
     Basic client interface for retrieving Score information.
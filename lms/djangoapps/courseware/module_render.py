@@ -41,6 +41,7 @@ import static_replace
 from capa.xqueue_interface import XQueueInterface
 from courseware.access import get_user_role, has_access
 from courseware.access_response import IncorrectPartitionGroupError
+from courseware.child_prefetch import ChildPrefetchService
 from courseware.entrance_exams import user_can_skip_entrance_exam, user_has_passed_entrance_exam
 from courseware.masquerade import (
     MasqueradingKeyValueStore,
@@ -70,9 +71,7 @@ from openedx.core.lib.url_utils import quote_slashes, unquote_slashes
 from openedx.core.lib.xblock_utils import request_token as xblock_request_token
 from openedx.core.lib.xblock_utils import (
     add_staff_markup,
-    replace_course_urls,
-    replace_jump_to_id_urls,
-    replace_static_urls,
+    rewrite_urls,
     wrap_xblock,
     is_xblock_aside,
     get_aside_from_xblock,
@@ -442,120 +441,249 @@ def get_module_for_descriptor(user, request, descriptor, field_data_cache, cours
     )
 
 
-def get_module_system_for_user(
-        user,
-        student_data,  # TODO
-        # Arguments preceding this comment have user binding, those following don't
-        descriptor,
-        course_id,
-        track_function,
-        xqueue_callback_url_prefix,
-        request_token,
-        position=None,
-        wrap_xmodule_display=True,
-        grade_bucket_type=None,
-        static_asset_path='',
-        user_location=None,
-        disable_staff_debug_info=False,
-        course=None
-):
+class ModuleSystemFactory(object):
     """
-    Helper function that returns a module system and student_data bound to a user and a descriptor.
+    Builds the module systems of the blocks bound for a user while rendering a course, usually
+    during one request.
 
-    The purpose of this function is to factor out everywhere a user is implicitly bound when creating a module,
-    to allow an existing module to be re-bound to a user.  Most of the user bindings happen when creating the
-    closures that feed the instantiation of ModuleSystem.
-
-    The arguments fall into two categories: those that have explicit or implicit user binding, which are user
-    and student_data, and those don't and are just present so that ModuleSystem can be instantiated, which
-    are all the other arguments.  Ultimately, this isn't too different than how get_module_for_descriptor_internal
-    was before refactoring.
+    Most of what goes into a module system only depends on the user and the course: the event
+    handlers, the wrappers of the rendered fragments, the xqueue configuration, the services and
+    the user's roles.  A factory builds those once, so that binding each block of a unit only
+    builds a module system with what is specific to the block, like its field data.  The blocks
+    bound through the module systems' get_module share the factory.
 
     Arguments:
         see arguments for get_module()
         request_token (str): A token unique to the request use by xblock initialization
-
-    Returns:
-        (LmsModuleSystem, KvsFieldData):  (module system, student_data) bound to, primarily, the user and descriptor
     """
+    def __init__(
+            self,
+            user,
+            student_data,  # TODO
+            # Arguments preceding this comment have user binding, those following don't
+            course_id,
+            track_function,
+            xqueue_callback_url_prefix,
+            request_token,
+            position=None,
+            wrap_xmodule_display=True,
+            grade_bucket_type=None,
+            static_asset_path='',
+            user_location=None,
+            disable_staff_debug_info=False,
+            course=None
+    ):
+        self.user = user
+        self.student_data = student_data
+        self.course_id = course_id
+        self.track_function = track_function
+        self.xqueue_callback_url_prefix = xqueue_callback_url_prefix
+        self.request_token = request_token
+        self.wrap_xmodule_display = wrap_xmodule_display
+        self.grade_bucket_type = grade_bucket_type
+        self.static_asset_path = static_asset_path
+        self.user_location = user_location
+        self.disable_staff_debug_info = disable_staff_debug_info
+        self.course = course
+        self._children_factory = None
+
+        # pass position specified in URL to module through ModuleSystem
+        if position is not None:
+            try:
+                position = int(position)
+            except (ValueError, TypeError):
+                log.exception('Non-integer %r passed as position.', position)
+                position = None
+        self.position = position
+
+        # Staff access only depends on the course of the blocks.
+        self.user_is_staff = bool(has_access(user, u'staff', course_id))
+        self.user_is_admin = bool(has_access(user, u'staff', 'global'))
+        self.user_is_beta_tester = CourseBetaTesterRole(course_id).has_user(user)
+
+        # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
+        # function, we just need to specify something to get the reverse() to work.
+        self._jump_to_id_base_url = reverse('jump_to_id', kwargs={'course_id': text_type(course_id), 'module_id': ''})
+        self._replace_course_urls = partial(static_replace.replace_course_urls, course_key=course_id)
+        self._replace_jump_to_id_urls = partial(
+            static_replace.replace_jump_to_id_urls,
+            course_id=course_id,
+            jump_to_id_base_url=self._jump_to_id_base_url,
+        )
+        self._static_url_replacers = {}
+        self._anonymous_student_ids = {}
+        self._leading_block_wrappers, self._trailing_block_wrappers = self._make_block_wrappers()
+        self._services = {
+            'fs': FSService(),
+            'user': DjangoXBlockUserService(user, user_is_staff=self.user_is_staff),
+            'verification': XBlockVerificationService(),
+            'proctoring': ProctoringService(),
+            'milestones': milestones_helpers.get_service(),
+            'credit': CreditService(),
+            'bookmarks': BookmarksService(user=user),
+            'gating': GatingService(),
+            'child_prefetch': ChildPrefetchService(course_id),
+        }
 
-    def make_xqueue_callback(dispatch='score_update'):
+    def get_module_system(self, descriptor):
+        """
+        Returns a module system and student_data bound to the user and the given descriptor.
+        """
+        replace_urls, static_url_wrapper = self._get_static_url_replacers(descriptor)
+        field_data = LmsFieldData(descriptor._field_data, self.student_data)  # pylint: disable=protected-access
+
+        # Default queuename is course-specific and is derived from the course that
+        #   contains the current module.
+        # TODO: Queuename should be derived from 'course_settings.json' of each course
+        xqueue_default_queuename = descriptor.location.org + '-' + descriptor.location.course
+
+        xqueue = {
+            'interface': XQUEUE_INTERFACE,
+            'construct_callback': partial(self.make_xqueue_callback, descriptor.location),
+            'default_queuename': xqueue_default_queuename.replace(' ', '_'),
+            'waittime': settings.XQUEUE_WAITTIME_BETWEEN_REQUESTS
+        }
+
+        services = dict(self._services)
+        services['field-data'] = field_data
+
+        system = LmsModuleSystem(
+            track_function=self.track_function,
+            render_template=render_to_string,
+            static_url=settings.STATIC_URL,
+            xqueue=xqueue,
+            # TODO (cpennington): Figure out how to share info between systems
+            filestore=descriptor.runtime.resources_fs,
+            get_module=self.get_module,
+            user=self.user,
+            debug=settings.DEBUG,
+            hostname=settings.SITE_NAME,
+            # TODO (cpennington): This should be removed when all html from
+            # a module is coming through get_html and is therefore covered
+            # by the replace_static_urls code below
+            replace_urls=replace_urls,
+            replace_course_urls=self._replace_course_urls,
+            replace_jump_to_id_urls=self._replace_jump_to_id_urls,
+            node_path=settings.NODE_PATH,
+            publish=self.publish,
+            anonymous_student_id=self._get_anonymous_student_id(descriptor),
+            course_id=self.course_id,
+            cache=cache,
+            can_execute_unsafe_code=self.can_execute_unsafe_code,
+            get_python_lib_zip=self.get_python_lib_zip,
+            # TODO: When we merge the descriptor and module systems, we can stop reaching into the mixologist
+            # (cpennington)
+            mixins=descriptor.runtime.mixologist._mixins,  # pylint: disable=protected-access
+            wrappers=self._leading_block_wrappers + [static_url_wrapper] + self._trailing_block_wrappers,
+            get_real_user=user_by_anonymous_id,
+            services=services,
+            get_user_role=self.get_user_role,
+            descriptor_runtime=descriptor._runtime,  # pylint: disable=protected-access
+            rebind_noauth_module_to_user=self.rebind_noauth_module_to_user,
+            user_location=self.user_location,
+            request_token=self.request_token,
+        )
+
+        system.set('position', self.position)
+
+        system.set(u'user_is_staff', self.user_is_staff)
+        system.set(u'user_is_admin', self.user_is_admin)
+        system.set(u'user_is_beta_tester', self.user_is_beta_tester)
+        system.set(u'days_early_for_beta', descriptor.days_early_for_beta)
+
+        # make an ErrorDescriptor -- assuming that the descriptor's system is ok
+        if self.user_is_staff:
+            system.error_descriptor_class = ErrorDescriptor
+        else:
+            system.error_descriptor_class = NonStaffErrorDescriptor
+
+        return system, field_data
+
+    def make_xqueue_callback(self, location, dispatch='score_update'):
         """
         Returns fully qualified callback URL for external queueing system
         """
         relative_xqueue_callback_url = reverse(
             'xqueue_callback',
             kwargs=dict(
-                course_id=text_type(course_id),
-                userid=str(user.id),
-                mod_id=text_type(descriptor.location),
+                course_id=text_type(self.course_id),
+                userid=str(self.user.id),
+                mod_id=text_type(location),
                 dispatch=dispatch
             ),
         )
-        return xqueue_callback_url_prefix + relative_xqueue_callback_url
-
-    # Default queuename is course-specific and is derived from the course that
-    #   contains the current module.
-    # TODO: Queuename should be derived from 'course_settings.json' of each course
-    xqueue_default_queuename = descriptor.location.org + '-' + descriptor.location.course
-
-    xqueue = {
-        'interface': XQUEUE_INTERFACE,
-        'construct_callback': make_xqueue_callback,
-        'default_queuename': xqueue_default_queuename.replace(' ', '_'),
-        'waittime': settings.XQUEUE_WAITTIME_BETWEEN_REQUESTS
-    }
+        return self.xqueue_callback_url_prefix + relative_xqueue_callback_url
 
-    def inner_get_module(descriptor):
+    def get_module(self, descriptor):
         """
         Delegate to get_module_for_descriptor_internal() with all values except `descriptor` set.
 
         Because it does an access check, it may return None.
         """
-        # TODO: fix this so that make_xqueue_callback uses the descriptor passed into
-        # inner_get_module, not the parent's callback.  Add it as an argument....
+        # Children are bound with staff debug info, even if their parent was not.
+        if self.disable_staff_debug_info:
+            if self._children_factory is None:
+                self._children_factory = ModuleSystemFactory(
+                    user=self.user,
+                    student_data=self.student_data,
+                    course_id=self.course_id,
+                    track_function=self.track_function,
+                    xqueue_callback_url_prefix=self.xqueue_callback_url_prefix,
+                    position=self.position,
+                    wrap_xmodule_display=self.wrap_xmodule_display,
+                    grade_bucket_type=self.grade_bucket_type,
+                    static_asset_path=self.static_asset_path,
+                    user_location=self.user_location,
+                    request_token=self.request_token,
+                    course=self.course,
+                )
+            children_factory = self._children_factory
+        else:
+            children_factory = self
+
         return get_module_for_descriptor_internal(
-            user=user,
+            user=self.user,
             descriptor=descriptor,
-            student_data=student_data,
-            course_id=course_id,
-            track_function=track_function,
-            xqueue_callback_url_prefix=xqueue_callback_url_prefix,
-            position=position,
-            wrap_xmodule_display=wrap_xmodule_display,
-            grade_bucket_type=grade_bucket_type,
-            static_asset_path=static_asset_path,
-            user_location=user_location,
-            request_token=request_token,
-            course=course,
+            student_data=self.student_data,
+            course_id=self.course_id,
+            track_function=self.track_function,
+            xqueue_callback_url_prefix=self.xqueue_callback_url_prefix,
+            position=self.position,
+            wrap_xmodule_display=self.wrap_xmodule_display,
+            grade_bucket_type=self.grade_bucket_type,
+            static_asset_path=self.static_asset_path,
+            user_location=self.user_location,
+            request_token=self.request_token,
+            course=self.course,
             will_recheck_access=True,
+            module_system_factory=children_factory,
         )
 
-    def get_event_handler(event_type):
+    def get_event_handler(self, event_type):
         """
         Return an appropriate function to handle the event.
 
         Returns None if no special processing is required.
         """
         handlers = {
-            'grade': handle_grade_event,
+            'grade': self.handle_grade_event,
         }
         if completion_waffle.waffle().is_enabled(completion_waffle.ENABLE_COMPLETION_TRACKING):
             handlers.update({
-                'completion': handle_completion_event,
-                'progress': handle_deprecated_progress_event,
+                'completion': self.handle_completion_event,
+                'progress': self.handle_deprecated_progress_event,
             })
         return handlers.get(event_type)
 
-    def publish(block, event_type, event):
+    def publish(self, block, event_type, event):
         """
         A function that allows XModules to publish events.
         """
-        handle_event = get_event_handler(event_type)
-        if handle_event and not is_masquerading_as_specific_student(user, course_id):
+        handle_event = self.get_event_handler(event_type)
+        if handle_event and not is_masquerading_as_specific_student(self.user, self.course_id):
             handle_event(block, event)
         else:
-            context = contexts.course_context_from_course_id(course_id)
+            context = contexts.course_context_from_course_id(self.course_id)
             if block.runtime.user_id:
                 context['user_id'] = block.runtime.user_id
             context['asides'] = {}
@@ -565,9 +693,9 @@ def get_module_system_for_user(
                     if aside_event_info is not None:
                         context['asides'][aside.scope_ids.block_type] = aside_event_info
             with tracker.get_tracker().context(event_type, context):
-                track_function(event_type, event)
+                self.track_function(event_type, event)
 
-    def handle_completion_event(block, event):
+    def handle_completion_event(self, block, event):
         """
         Submit a completion object for the block.
         """
@@ -575,20 +703,20 @@ def get_module_system_for_user(
             raise Http404
         else:
             BlockCompletion.objects.submit_completion(
-                user=user,
-                course_key=course_id,
+                user=self.user,
+                course_key=self.course_id,
                 block_key=block.scope_ids.usage_id,
                 completion=event['completion'],
             )
 
-    def handle_grade_event(block, event):
+    def handle_grade_event(self, block, event):
         """
         Submit a grade for the block.
         """
         SCORE_PUBLISHED.send(
             sender=None,
             block=block,
-            user=user,
+            user=self.user,
             raw_earned=event['value'],
             raw_possible=event['max_value'],
             only_if_higher=event.get('only_if_higher'),
@@ -596,7 +724,7 @@ def get_module_system_for_user(
             grader_response=event.get('grader_response')
         )
 
-    def handle_deprecated_progress_event(block, event):
+    def handle_deprecated_progress_event(self, block, event):
         """
         DEPRECATED: Submit a completion for the block represented by the
         progress event.
@@ -608,9 +736,9 @@ def get_module_system_for_user(
         if not completion_waffle.waffle().is_enabled(completion_waffle.ENABLE_COMPLETION_TRACKING):
             raise Http404
         else:
-            requested_user_id = event.get('user_id', user.id)
-            if requested_user_id != user.id:
-                log.warning("{} tried to submit a completion on behalf of {}".format(user, requested_user_id))
+            requested_user_id = event.get('user_id', self.user.id)
+            if requested_user_id != self.user.id:
+                log.warning("{} tried to submit a completion on behalf of {}".format(self.user, requested_user_id))
                 return
 
             # If blocks explicitly declare support for the new completion API,
@@ -619,13 +747,13 @@ def get_module_system_for_user(
             # in order to avoid duplicate work and possibly conflicting semantics.
             if not getattr(block, 'has_custom_completion', False):
                 BlockCompletion.objects.submit_completion(
-                    user=user,
-                    course_key=course_id,
+                    user=self.user,
+                    course_key=self.course_id,
                     block_key=block.scope_ids.usage_id,
                     completion=1.0,
                 )
 
-    def rebind_noauth_module_to_user(module, real_user):
+    def rebind_noauth_module_to_user(self, module, real_user):
         """
         A function that allows a module to get re-bound to a real user if it was previously bound to an AnonymousUser.
 
@@ -638,14 +766,14 @@ def get_module_system_for_user(
         Returns:
             nothing (but the side effect is that module is re-bound to real_user)
         """
-        if user.is_authenticated:
+        if self.user.is_authenticated:
             err_msg = ("rebind_noauth_module_to_user can only be called from a module bound to "
                        "an anonymous user")
             log.error(err_msg)
             raise LmsModuleRenderError(err_msg)
 
         field_data_cache_real_user = FieldDataCache.cache_for_descriptor_descendents(
-            course_id,
+            self.course_id,
             real_user,
             module.descriptor,
             asides=XBlockAsidesConfig.possible_asides(),
@@ -656,23 +784,23 @@ def get_module_system_for_user(
             user=real_user,
             student_data=student_data_real_user,  # These have implicit user bindings, rest of args considered not to
             descriptor=module.descriptor,
-            course_id=course_id,
-            track_function=track_function,
-            xqueue_callback_url_prefix=xqueue_callback_url_prefix,
-            position=position,
-            wrap_xmodule_display=wrap_xmodule_display,
-            grade_bucket_type=grade_bucket_type,
-            static_asset_path=static_asset_path,
-            user_location=user_location,
-            request_token=request_token,
-            course=course
+            course_id=self.course_id,
+            track_function=self.track_function,
+            xqueue_callback_url_prefix=self.xqueue_callback_url_prefix,
+            position=self.position,
+            wrap_xmodule_display=self.wrap_xmodule_display,
+            grade_bucket_type=self.grade_bucket_type,
+            static_asset_path=self.static_asset_path,
+            user_location=self.user_location,
+            request_token=self.request_token,
+            course=self.course
         )
 
         module.descriptor.bind_for_student(
             inner_system,
             real_user.id,
             [
-                partial(OverrideFieldData.wrap, real_user, course),
+                partial(OverrideFieldData.wrap, real_user, self.course),
                 partial(LmsFieldData, student_data=inner_student_data),
             ],
         )
@@ -685,172 +813,184 @@ def get_module_system_for_user(
         module.runtime = inner_system
         inner_system.xmodule_instance = module
 
-    # Build a list of wrapping functions that will be applied in order
-    # to the Fragment content coming out of the xblocks that are about to be rendered.
-    block_wrappers = []
+    def can_execute_unsafe_code(self):
+        """
+        Returns whether the course's code may run unsafely.
+        """
+        return can_execute_unsafe_code(self.course_id)
 
-    if is_masquerading_as_specific_student(user, course_id):
-        block_wrappers.append(filter_displayed_blocks)
+    def get_python_lib_zip(self):
+        """
+        Returns the course's python library zip file, if any.
+        """
+        return get_python_lib_zip(contentstore, self.course_id)
 
-    if settings.FEATURES.get("LICENSING", False):
-        block_wrappers.append(wrap_with_license)
+    def get_user_role(self):
+        """
+        Returns the user's role in the course.
+        """
+        return get_user_role(self.user, self.course_id)
 
-    # Wrap the output display in a single div to allow for the XModule
-    # javascript to be bound correctly
-    if wrap_xmodule_display is True:
-        block_wrappers.append(partial(
-            wrap_xblock,
-            'LmsRuntime',
-            extra_data={'course-id': text_type(course_id)},
-            usage_id_serializer=lambda usage_id: quote_slashes(text_type(usage_id)),
-            request_token=request_token,
-        ))
+    def _make_block_wrappers(self):
+        """
+        Returns the lists of wrapping functions applied before and after the one rewriting
+        static URLs, which depends on the block.
+        """
+        # Build a list of wrapping functions that will be applied in order
+        # to the Fragment content coming out of the xblocks that are about to be rendered.
+        leading_block_wrappers = []
+
+        if is_masquerading_as_specific_student(self.user, self.course_id):
+            leading_block_wrappers.append(filter_displayed_blocks)
+
+        if settings.FEATURES.get("LICENSING", False):
+            leading_block_wrappers.append(wrap_with_license)
+
+        # Wrap the output display in a single div to allow for the XModule
+        # javascript to be bound correctly
+        if self.wrap_xmodule_display is True:
+            leading_block_wrappers.append(partial(
+                wrap_xblock,
+                'LmsRuntime',
+                extra_data={'course-id': text_type(self.course_id)},
+                usage_id_serializer=lambda usage_id: quote_slashes(text_type(usage_id)),
+                request_token=self.request_token,
+            ))
+
+        # The URLs are rewritten here (see _get_static_url_replacers).
+        trailing_block_wrappers = []
+        trailing_block_wrappers.append(partial(display_access_messages, self.user))
+        trailing_block_wrappers.append(partial(course_expiration_wrapper, self.user))
+
+        if settings.FEATURES.get('DISPLAY_DEBUG_INFO_TO_STAFF'):
+            if is_masquerading_as_specific_student(self.user, self.course_id):
+                # When masquerading as a specific student, we want to show the debug button
+                # unconditionally to enable resetting the state of the student we are masquerading as.
+                # We already know the user has staff access when masquerading is active.
+                staff_access = True
+                # To figure out whether the user has instructor access, we temporarily remove the
+                # masquerade_settings from the real_user.  With the masquerading settings in place,
+                # the result would always be "False".
+                masquerade_settings = self.user.real_user.masquerade_settings
+                del self.user.real_user.masquerade_settings
+                self.user.real_user.masquerade_settings = masquerade_settings
+            else:
+                staff_access = self.user_is_staff
+            if staff_access:
+                trailing_block_wrappers.append(partial(add_staff_markup, self.user, self.disable_staff_debug_info))
 
-    # TODO (cpennington): When modules are shared between courses, the static
-    # prefix is going to have to be specific to the module, not the directory
-    # that the xml was loaded from
+        return leading_block_wrappers, trailing_block_wrappers
 
-    # Rewrite urls beginning in /static to point to course-specific content
-    block_wrappers.append(partial(
-        replace_static_urls,
-        getattr(descriptor, 'data_dir', None),
-        course_id=course_id,
-        static_asset_path=static_asset_path or descriptor.static_asset_path
-    ))
-
-    # Allow URLs of the form '/course/' refer to the root of multicourse directory
-    #   hierarchy of this course
-    block_wrappers.append(partial(replace_course_urls, course_id))
-
-    # this will rewrite intra-courseware links (/jump_to_id/<id>). This format
-    # is an improvement over the /course/... format for studio authored courses,
-    # because it is agnostic to course-hierarchy.
-    # NOTE: module_id is empty string here. The 'module_id' will get assigned in the replacement
-    # function, we just need to specify something to get the reverse() to work.
-    block_wrappers.append(partial(
-        replace_jump_to_id_urls,
-        course_id,
-        reverse('jump_to_id', kwargs={'course_id': text_type(course_id), 'module_id': ''}),
-    ))
-
-    block_wrappers.append(partial(display_access_messages, user))
-    block_wrappers.append(partial(course_expiration_wrapper, user))
-
-    if settings.FEATURES.get('DISPLAY_DEBUG_INFO_TO_STAFF'):
-        if is_masquerading_as_specific_student(user, course_id):
-            # When masquerading as a specific student, we want to show the debug button
-            # unconditionally to enable resetting the state of the student we are masquerading as.
-            # We already know the user has staff access when masquerading is active.
-            staff_access = True
-            # To figure out whether the user has instructor access, we temporarily remove the
-            # masquerade_settings from the real_user.  With the masquerading settings in place,
-            # the result would always be "False".
-            masquerade_settings = user.real_user.masquerade_settings
-            del user.real_user.masquerade_settings
-            user.real_user.masquerade_settings = masquerade_settings
-        else:
-            staff_access = has_access(user, 'staff', descriptor, course_id)
-        if staff_access:
-            block_wrappers.append(partial(add_staff_markup, user, disable_staff_debug_info))
-
-    # These modules store data using the anonymous_student_id as a key.
-    # To prevent loss of data, we will continue to provide old modules with
-    # the per-student anonymized id (as we have in the past),
-    # while giving selected modules a per-course anonymized id.
-    # As we have the time to manually test more modules, we can add to the list
-    # of modules that get the per-course anonymized id.
-    is_pure_xblock = isinstance(descriptor, XBlock) and not isinstance(descriptor, XModuleDescriptor)
-    module_class = getattr(descriptor, 'module_class', None)
-    is_lti_module = not is_pure_xblock and issubclass(module_class, LTIModule)
-    if is_pure_xblock or is_lti_module:
-        anonymous_student_id = anonymous_id_for_user(user, course_id)
-    else:
-        anonymous_student_id = anonymous_id_for_user(user, None)
+    def _get_static_url_replacers(self, descriptor):
+        """
+        Returns the replace_urls function of the module system of the given descriptor, and the
+        wrapping function rewriting the static URLs of its fragments.
+        """
+        # TODO (cpennington): When modules are shared between courses, the static
+        # prefix is going to have to be specific to the module, not the directory
+        # that the xml was loaded from
+        data_directory = getattr(descriptor, 'data_dir', None)
+        static_asset_path = self.static_asset_path or descriptor.static_asset_path
+        key = (data_directory, static_asset_path)
+        if key not in self._static_url_replacers:
+            self._static_url_replacers[key] = (
+                partial(
+                    static_replace.replace_static_urls,
+                    data_directory=data_directory,
+                    course_id=self.course_id,
+                    static_asset_path=static_asset_path,
+                ),
+                # Rewrite urls beginning in /static to point to course-specific content,
+                # allow URLs of the form '/course/' to refer to the root of multicourse
+                # directory hierarchy of this course, and rewrite intra-courseware links
+                # (/jump_to_id/<id>), all in a single pass over the fragment.
+                partial(
+                    rewrite_urls,
+                    static_replace.CourseUrlRewriter(
+                        self.course_id,
+                        self._jump_to_id_base_url,
+                        data_directory=data_directory,
+                        static_asset_path=static_asset_path,
+                    ),
+                ),
+            )
+        return self._static_url_replacers[key]
 
-    field_data = LmsFieldData(descriptor._field_data, student_data)  # pylint: disable=protected-access
+    def _get_anonymous_student_id(self, descriptor):
+        """
+        Returns the anonymous id of the user for the given descriptor.
+        """
+        # These modules store data using the anonymous_student_id as a key.
+        # To prevent loss of data, we will continue to provide old modules with
+        # the per-student anonymized id (as we have in the past),
+        # while giving selected modules a per-course anonymized id.
+        # As we have the time to manually test more modules, we can add to the list
+        # of modules that get the per-course anonymized id.
+        is_pure_xblock = isinstance(descriptor, XBlock) and not isinstance(descriptor, XModuleDescriptor)
+        module_class = getattr(descriptor, 'module_class', None)
+        is_lti_module = not is_pure_xblock and issubclass(module_class, LTIModule)
+        per_course = is_pure_xblock or is_lti_module
+        if per_course not in self._anonymous_student_ids:
+            self._anonymous_student_ids[per_course] = anonymous_id_for_user(
+                self.user, self.course_id if per_course else None
+            )
+        return self._anonymous_student_ids[per_course]
 
-    user_is_staff = bool(has_access(user, u'staff', descriptor.location, course_id))
 
-    system = LmsModuleSystem(
-        track_function=track_function,
-        render_template=render_to_string,
-        static_url=settings.STATIC_URL,
-        xqueue=xqueue,
-        # TODO (cpennington): Figure out how to share info between systems
-        filestore=descriptor.runtime.resources_fs,
-        get_module=inner_get_module,
-        user=user,
-        debug=settings.DEBUG,
-        hostname=settings.SITE_NAME,
-        # TODO (cpennington): This should be removed when all html from
-        # a module is coming through get_html and is therefore covered
-        # by the replace_static_urls code below
-        replace_urls=partial(
-            static_replace.replace_static_urls,
-            data_directory=getattr(descriptor, 'data_dir', None),
-            course_id=course_id,
-            static_asset_path=static_asset_path or descriptor.static_asset_path,
-        ),
-        replace_course_urls=partial(
-            static_replace.replace_course_urls,
-            course_key=course_id
-        ),
-        replace_jump_to_id_urls=partial(
-            static_replace.replace_jump_to_id_urls,
-            course_id=course_id,
-            jump_to_id_base_url=reverse('jump_to_id', kwargs={'course_id': text_type(course_id), 'module_id': ''})
-        ),
-        node_path=settings.NODE_PATH,
-        publish=publish,
-        anonymous_student_id=anonymous_student_id,
-        course_id=course_id,
-        cache=cache,
-        can_execute_unsafe_code=(lambda: can_execute_unsafe_code(course_id)),
-        get_python_lib_zip=(lambda: get_python_lib_zip(contentstore, course_id)),
-        # TODO: When we merge the descriptor and module systems, we can stop reaching into the mixologist (cpennington)
-        mixins=descriptor.runtime.mixologist._mixins,  # pylint: disable=protected-access
-        wrappers=block_wrappers,
-        get_real_user=user_by_anonymous_id,
-        services={
-            'fs': FSService(),
-            'field-data': field_data,
-            'user': DjangoXBlockUserService(user, user_is_staff=user_is_staff),
-            'verification': XBlockVerificationService(),
-            'proctoring': ProctoringService(),
-            'milestones': milestones_helpers.get_service(),
-            'credit': CreditService(),
-            'bookmarks': BookmarksService(user=user),
-            'gating': GatingService(),
-        },
-        get_user_role=lambda: get_user_role(user, course_id),
-        descriptor_runtime=descriptor._runtime,  # pylint: disable=protected-access
-        rebind_noauth_module_to_user=rebind_noauth_module_to_user,
-        user_location=user_location,
-        request_token=request_token,
-    )
+def get_module_system_for_user(
+        user,
+        student_data,  # TODO
+        # Arguments preceding this comment have user binding, those following don't
+        descriptor,
+        course_id,
+        track_function,
+        xqueue_callback_url_prefix,
+        request_token,
+        position=None,
+        wrap_xmodule_display=True,
+        grade_bucket_type=None,
+        static_asset_path='',
+        user_location=None,
+        disable_staff_debug_info=False,
+        course=None
+):
+    """
+    Helper function that returns a module system and student_data bound to a user and a descriptor.
 
-    # pass position specified in URL to module through ModuleSystem
-    if position is not None:
-        try:
-            position = int(position)
-        except (ValueError, TypeError):
-            log.exception('Non-integer %r passed as position.', position)
-            position = None
+    The purpose of this function is to factor out everywhere a user is implicitly bound when creating a module,
+    to allow an existing module to be re-bound to a user.  Most of the user bindings happen when creating the
+    closures that feed the instantiation of ModuleSystem.
 
-    system.set('position', position)
+    The arguments fall into two categories: those that have explicit or implicit user binding, which are user
+    and student_data, and those don't and are just present so that ModuleSystem can be instantiated, which
+    are all the other arguments.  Ultimately, this isn't too different than how get_module_for_descriptor_internal
+    was before refactoring.
 
-    system.set(u'user_is_staff', user_is_staff)
-    system.set(u'user_is_admin', bool(has_access(user, u'staff', 'global')))
-    system.set(u'user_is_beta_tester', CourseBetaTesterRole(course_id).has_user(user))
-    system.set(u'days_early_for_beta', descriptor.days_early_for_beta)
+    To bind several descriptors for the same user, use a ModuleSystemFactory.
 
-    # make an ErrorDescriptor -- assuming that the descriptor's system is ok
-    if has_access(user, u'staff', descriptor.location, course_id):
-        system.error_descriptor_class = ErrorDescriptor
-    else:
-        system.error_descriptor_class = NonStaffErrorDescriptor
+    Arguments:
+        see arguments for get_module()
+        request_token (str): A token unique to the request use by xblock initialization
 
-    return system, field_data
+    Returns:
+        (LmsModuleSystem, KvsFieldData):  (module system, student_data) bound to, primarily, the user and descriptor
+    """
+    factory = ModuleSystemFactory(
+        user=user,
+        student_data=student_data,
+        course_id=course_id,
+        track_function=track_function,
+        xqueue_callback_url_prefix=xqueue_callback_url_prefix,
+        request_token=request_token,
+        position=position,
+        wrap_xmodule_display=wrap_xmodule_display,
+        grade_bucket_type=grade_bucket_type,
+        static_asset_path=static_asset_path,
+        user_location=user_location,
+        disable_staff_debug_info=disable_staff_debug_info,
+        course=course,
+    )
+    return factory.get_module_system(descriptor)
 
 
 # TODO: Find all the places that this method is called and figure out how to
@@ -859,7 +999,7 @@ def get_module_for_descriptor_internal(user, descriptor, student_data, course_id
                                        track_function, xqueue_callback_url_prefix, request_token,
                                        position=None, wrap_xmodule_display=True, grade_bucket_type=None,
                                        static_asset_path='', user_location=None, disable_staff_debug_info=False,
-                                       course=None, will_recheck_access=False):
+                                       course=None, will_recheck_access=False, module_system_factory=None):
     """
     Actually implement get_module, without requiring a request.
 
@@ -867,24 +1007,28 @@ def get_module_for_descriptor_internal(user, descriptor, student_data, course_id
 
     Arguments:
         request_token (str): A unique token for this request, used to isolate xblock rendering
+        module_system_factory (ModuleSystemFactory): The factory building the module system, if it
+            is shared with other descriptors; it then takes the place of the other arguments
+            of get_module_system_for_user.
     """
+    if module_system_factory is None:
+        module_system_factory = ModuleSystemFactory(
+            user=user,
+            student_data=student_data,  # These have implicit user bindings, the rest of args are considered not to
+            course_id=course_id,
+            track_function=track_function,
+            xqueue_callback_url_prefix=xqueue_callback_url_prefix,
+            position=position,
+            wrap_xmodule_display=wrap_xmodule_display,
+            grade_bucket_type=grade_bucket_type,
+            static_asset_path=static_asset_path,
+            user_location=user_location,
+            request_token=request_token,
+            disable_staff_debug_info=disable_staff_debug_info,
+            course=course
+        )
 
-    (system, student_data) = get_module_system_for_user(
-        user=user,
-        student_data=student_data,  # These have implicit user bindings, the rest of args are considered not to
-        descriptor=descriptor,
-        course_id=course_id,
-        track_function=track_function,
-        xqueue_callback_url_prefix=xqueue_callback_url_prefix,
-        position=position,
-        wrap_xmodule_display=wrap_xmodule_display,
-        grade_bucket_type=grade_bucket_type,
-        static_asset_path=static_asset_path,
-        user_location=user_location,
-        request_token=request_token,
-        disable_staff_debug_info=disable_staff_debug_info,
-        course=course
-    )
+    (system, student_data) = module_system_factory.get_module_system(descriptor)
 
     descriptor.bind_for_student(
         system,
@@ -1061,10 +1205,17 @@ def handle_xblock_callback(request, course_id, usage_id, handler, suffix=None):
         return _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, course=course)
 
 
-def get_module_by_usage_id(request, course_id, usage_id, disable_staff_debug_info=False, course=None):
+def get_module_by_usage_id(
+        request, course_id, usage_id, disable_staff_debug_info=False, course=None, prefetch_definitions=False
+):
     """
     Gets a module instance based on its `usage_id` in a course, for a given request/user
 
+    If `prefetch_definitions` is True, the definitions of the block and of all of its
+    descendants are loaded at once, for callers which render the whole subtree.  Those
+    callers should be in a bulk operation on the course, which keeps the definitions
+    for the blocks loaded during the render.
+
     Returns (instance, tracking_context)
     """
     user = request.user
@@ -1076,6 +1227,9 @@ def get_module_by_usage_id(request, course_id, usage_id, disable_staff_debug_inf
         raise Http404("Invalid location")
 
     try:
+        if prefetch_definitions:
+            # Load the definitions of the subtree at once, rather than one by one as it renders.
+            modulestore().prefetch_definitions(usage_key.course_key, [usage_key])
         descriptor = modulestore().get_item(usage_key)
         descriptor_orig_usage_key, descriptor_orig_version = modulestore().get_block_original_usage(usage_key)
     except ItemNotFoundError:
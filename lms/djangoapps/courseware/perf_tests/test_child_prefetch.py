@@ -0,0 +1,92 @@
+"""
+Performance test of rendering units with the definitions of their children
+loaded one by one, compared to loading them in bulk with ChildPrefetchService.
+"""
+import itertools
+import unittest
+
+import ddt
+import pytest
+from django.test.client import RequestFactory
+
+from courseware import module_render as render
+from courseware.child_prefetch import PREFETCH_UNIT_CHILDREN_FLAG
+from courseware.model_data import FieldDataCache
+from courseware.tests.factories import UserFactory
+from openedx.core.djangoapps.waffle_utils.testutils import override_waffle_flag
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.tests.django_utils import TEST_DATA_SPLIT_MODULESTORE, SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+from xmodule.x_module import STUDENT_VIEW
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Numbers of children of the generated units.
+NUM_CHILDREN = (5, 20, 50)
+
+# Number of times each unit is rendered for each timing.
+NUM_ITERATIONS = 10
+
+
+@ddt.ddt
+@unittest.skip
+class ChildPrefetchPerfTest(SharedModuleStoreTestCase):
+    """
+    Generates the latencies of rendering units, with and without loading the
+    definitions of their children in bulk.
+    """
+    MODULESTORE = TEST_DATA_SPLIT_MODULESTORE
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @classmethod
+    def setUpClass(cls):
+        super(ChildPrefetchPerfTest, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        cls.verticals = {}
+        for num_children in NUM_CHILDREN:
+            vertical = ItemFactory.create(category='vertical', parent=cls.course)
+            for index in range(num_children):
+                ItemFactory.create(category='html', parent=vertical, data=u'<p>Child {}</p>'.format(index))
+            cls.verticals[num_children] = vertical.location
+
+    def setUp(self):
+        super(ChildPrefetchPerfTest, self).setUp()
+        self.user = UserFactory.create()
+        self.request = RequestFactory().get('')
+        self.request.user = self.user
+
+    def _render(self, usage_key):
+        """
+        Binds and renders the unit, in a bulk operation on the course like the courseware views.
+        """
+        store = modulestore()
+        with store.bulk_operations(self.course.id):
+            vertical = store.get_item(usage_key)
+            field_data_cache = FieldDataCache.cache_for_descriptor_descendents(self.course.id, self.user, vertical)
+            block = render.get_module_for_descriptor(
+                self.user, self.request, vertical, field_data_cache, self.course.id, course=self.course
+            )
+            block.render(STUDENT_VIEW, {})
+
+    @ddt.data(*itertools.product(NUM_CHILDREN, (False, True)))
+    @ddt.unpack
+    def test_render_latencies(self, num_children, prefetch):
+        """
+        Generates the times taken to render a unit.
+        """
+        if CodeBlockTimer is None:
+            pytest.skip("CodeBlockTimer undefined.")
+
+        desc = "ChildPrefetch:{}:{}".format(num_children, 'prefetch' if prefetch else 'lazy')
+        with override_waffle_flag(PREFETCH_UNIT_CHILDREN_FLAG, active=prefetch):
+            with CodeBlockTimer(desc):
+                for _ in range(NUM_ITERATIONS):
+                    with CodeBlockTimer("render"):
+                        self._render(self.verticals[num_children])
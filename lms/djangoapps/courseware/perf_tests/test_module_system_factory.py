@@ -0,0 +1,128 @@
+"""
+Performance test of binding the blocks of a unit for a user, with a module system
+factory for each block, compared to one factory shared by the blocks.
+
+Times the binding of the blocks, and records the number of factories built and
+the number of objects allocated and kept alive by the bound blocks in the
+descriptions of the timings.
+"""
+import gc
+import unittest
+
+import ddt
+import pytest
+from django.test.client import RequestFactory
+from mock import patch
+
+from courseware import module_render as render
+from courseware.model_data import FieldDataCache
+from courseware.tests.factories import UserFactory
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Numbers of blocks of the generated units.
+NUM_BLOCKS = (10, 40, 100)
+
+# Number of times each unit is bound for each timing.
+NUM_ITERATIONS = 10
+
+
+def _count_objects():
+    """
+    Returns the number of objects tracked by the garbage collector.
+    """
+    gc.collect()
+    return len(gc.get_objects())
+
+
+@ddt.ddt
+@unittest.skip
+class ModuleSystemFactoryPerfTest(SharedModuleStoreTestCase):
+    """
+    Generates the times taken to bind the blocks of units of different sizes.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @classmethod
+    def setUpClass(cls):
+        super(ModuleSystemFactoryPerfTest, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        cls.verticals = {}
+        for num_blocks in NUM_BLOCKS:
+            vertical = ItemFactory.create(category='vertical', parent=cls.course)
+            for _ in range(num_blocks):
+                ItemFactory.create(category='html', parent=vertical)
+            cls.verticals[num_blocks] = vertical.location
+
+    def setUp(self):
+        super(ModuleSystemFactoryPerfTest, self).setUp()
+        self.user = UserFactory.create()
+        self.request = RequestFactory().get('')
+        self.request.user = self.user
+
+    def _bind_per_block(self, vertical, field_data_cache):
+        """
+        Binds each child of the vertical separately, with its own factory.
+        """
+        return [
+            render.get_module_for_descriptor(
+                self.user, self.request, child, field_data_cache, self.course.id, course=self.course
+            )
+            for child in vertical.get_children()
+        ]
+
+    def _bind_shared(self, vertical, field_data_cache):
+        """
+        Binds the vertical, and its children through its runtime.
+        """
+        block = render.get_module_for_descriptor(
+            self.user, self.request, vertical, field_data_cache, self.course.id, course=self.course
+        )
+        return block.get_children()
+
+    def _count_allocations(self, bind, vertical, field_data_cache):
+        """
+        Returns the number of factories built to bind the unit and the number of
+        objects kept alive by its blocks.
+        """
+        with patch.object(render, 'ModuleSystemFactory', wraps=render.ModuleSystemFactory) as mock_factory:
+            objects_before = _count_objects()
+            blocks = bind(vertical, field_data_cache)
+            allocated = _count_objects() - objects_before
+            num_factories = mock_factory.call_count
+        del blocks
+        return num_factories, allocated
+
+    @ddt.data(*NUM_BLOCKS)
+    def test_binding_times(self, num_blocks):
+        """
+        Generates the times taken and objects allocated to bind a unit with each approach.
+        """
+        if CodeBlockTimer is None:
+            pytest.skip("CodeBlockTimer undefined.")
+
+        vertical = modulestore().get_item(self.verticals[num_blocks])
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(self.course.id, self.user, vertical)
+
+        for approach, bind in (('per_block', self._bind_per_block), ('shared', self._bind_shared)):
+            num_factories, allocated = self._count_allocations(bind, vertical, field_data_cache)
+            desc = "ModuleSystemFactory:{}:{}:{} factories:{} objects".format(
+                num_blocks,
+                approach,
+                num_factories,
+                allocated,
+            )
+            with CodeBlockTimer(desc):
+                for _ in range(NUM_ITERATIONS):
+                    with CodeBlockTimer("bind"):
+                        bind(vertical, field_data_cache)
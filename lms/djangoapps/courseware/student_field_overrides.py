@@ -4,10 +4,14 @@ by the individual due dates feature.
 """
 import json
 
+from edx_django_utils.cache import DEFAULT_REQUEST_CACHE
+
 from courseware.models import StudentFieldOverride
 from openedx.core.lib.xblock_utils import is_xblock_aside
 
-from .field_overrides import FieldOverrideProvider
+from .field_overrides import FieldOverrideProvider, clear_override_resolutions
+
+PREFETCHED_OVERRIDES_KEY = u'courseware.student_field_overrides.prefetched'
 
 
 class IndividualStudentOverrideProvider(FieldOverrideProvider):
@@ -19,6 +23,9 @@ class IndividualStudentOverrideProvider(FieldOverrideProvider):
     def get(self, block, name, default):
         return get_override_for_user(self.user, block, name, default)
 
+    def prefetch(self, course_key):
+        prefetch_overrides_for_user(self.user, course_key)
+
     @classmethod
     def enabled_for(cls, course):
         """This simple override provider is always enabled"""
@@ -40,6 +47,49 @@ def get_override_for_user(user, block, name, default=None):
     return overrides.get(name, default)
 
 
+def prefetch_overrides_for_user(user, course_key):
+    """
+    Loads all of the individual student overrides for the given user in the
+    course, so that the overrides of its blocks are found without a query
+    per block, for the rest of the request.
+    """
+    prefetched = _prefetched_overrides_for_user(user)
+    if course_key in prefetched:
+        return
+
+    query = StudentFieldOverride.objects.filter(
+        course_id=course_key,
+        student_id=user.id,
+    ).values_list('location', 'field', 'value')
+    course_overrides = {}
+    for location, field, value in query:
+        # Keyed like the location column, as the query of a single block filters it.
+        course_overrides.setdefault(unicode(location), []).append((field, value))
+    prefetched[course_key] = course_overrides
+    # Only keep the overrides of the last user, as tasks prefetch those of many users in turn.
+    DEFAULT_REQUEST_CACHE.data[PREFETCHED_OVERRIDES_KEY] = (user.id, prefetched)
+
+
+def _forget_prefetched_overrides(user, course_key):
+    """
+    Forgets the overrides prefetched for the user in the course, and the
+    overrides resolved from them.
+    """
+    _prefetched_overrides_for_user(user).pop(course_key, None)
+    clear_override_resolutions()
+
+
+def _prefetched_overrides_for_user(user):
+    """
+    Returns the overrides prefetched during the request for the user, by course,
+    which are only kept for the last user they were prefetched for.
+    """
+    prefetched_user_id, prefetched = DEFAULT_REQUEST_CACHE.data.get(PREFETCHED_OVERRIDES_KEY, (None, None))
+    if prefetched_user_id != user.id or prefetched is None:
+        return {}
+    return prefetched
+
+
 def _get_overrides_for_user(user, block):
     """
     Gets all of the individual student overrides for given user and block.
@@ -54,16 +104,19 @@ def _get_overrides_for_user(user, block):
     else:
         location = block.location
 
-    query = StudentFieldOverride.objects.filter(
-        course_id=block.runtime.course_id,
-        location=location,
-        student_id=user.id,
-    )
+    course_overrides = _prefetched_overrides_for_user(user).get(block.runtime.course_id)
+    if course_overrides is not None:
+        query = course_overrides.get(unicode(location), [])
+    else:
+        query = StudentFieldOverride.objects.filter(
+            course_id=block.runtime.course_id,
+            location=location,
+            student_id=user.id,
+        ).values_list('field', 'value')
     overrides = {}
-    for override in query:
-        field = block.fields[override.field]
-        value = field.from_json(json.loads(override.value))
-        overrides[override.field] = value
+    for field_name, value in query:
+        field = block.fields[field_name]
+        overrides[field_name] = field.from_json(json.loads(value))
     return overrides
 
 
@@ -81,6 +134,7 @@ def override_field_for_user(user, block, name, value):
     field = block.fields[name]
     override.value = json.dumps(field.to_json(value))
     override.save()
+    _forget_prefetched_overrides(user, block.runtime.course_id)
 
 
 def clear_override_for_user(user, block, name):
@@ -98,3 +152,4 @@ def clear_override_for_user(user, block, name):
             field=name).delete()
     except StudentFieldOverride.DoesNotExist:
         pass
+    _forget_prefetched_overrides(user, block.runtime.course_id)
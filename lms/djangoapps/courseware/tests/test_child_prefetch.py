@@ -0,0 +1,38 @@
+"""
+Tests for the bulk loading of the data of the children of units.
+"""
+from django.test import TestCase
+from mock import Mock, patch
+from opaque_keys.edx.locator import CourseLocator
+
+from courseware.child_prefetch import PREFETCH_UNIT_CHILDREN_FLAG, ChildPrefetchService
+from openedx.core.djangoapps.waffle_utils.testutils import override_waffle_flag
+
+
+@patch('courseware.child_prefetch.modulestore')
+class ChildPrefetchServiceTest(TestCase):
+    """
+    Tests for ChildPrefetchService.
+    """
+    shard = 4
+
+    def setUp(self):
+        super(ChildPrefetchServiceTest, self).setUp()
+        self.course_key = CourseLocator('org', 'course', 'run')
+        self.service = ChildPrefetchService(self.course_key)
+        self.children = [self.course_key.make_usage_key('html', 'child{}'.format(index)) for index in range(3)]
+
+    @override_waffle_flag(PREFETCH_UNIT_CHILDREN_FLAG, active=True)
+    def test_enabled(self, mock_modulestore):
+        self.service.prefetch_children(Mock(children=self.children))
+        mock_modulestore.return_value.prefetch_definitions.assert_called_once_with(self.course_key, self.children)
+
+    @override_waffle_flag(PREFETCH_UNIT_CHILDREN_FLAG, active=False)
+    def test_disabled(self, mock_modulestore):
+        self.service.prefetch_children(Mock(children=self.children))
+        self.assertFalse(mock_modulestore.return_value.prefetch_definitions.called)
+
+    @override_waffle_flag(PREFETCH_UNIT_CHILDREN_FLAG, active=True)
+    def test_single_child(self, mock_modulestore):
+        self.service.prefetch_children(Mock(children=self.children[:1]))
+        self.assertFalse(mock_modulestore.return_value.prefetch_definitions.called)
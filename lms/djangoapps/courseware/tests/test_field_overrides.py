@@ -5,16 +5,22 @@ Tests for `field_overrides` module.
 import unittest
 
 from django.test.utils import override_settings
+from edx_django_utils.cache import DEFAULT_REQUEST_CACHE, RequestCache
+from mock import Mock
 from xblock.field_data import DictFieldData
+from xblock.fields import ScopeIds
 
 from openedx.core.lib.tests import attr
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
 from ..field_overrides import (
+    NOTSET,
+    OVERRIDE_RESOLUTIONS_KEY,
     FieldOverrideProvider,
     OverrideFieldData,
     OverrideModulestoreFieldData,
+    clear_override_resolutions,
     disable_overrides,
     resolve_dotted
 )
@@ -149,6 +155,109 @@ class OverrideModulestoreFieldDataTests(FieldOverrideTestMixin, OverrideFieldDat
         self.assertIsInstance(data, DictFieldData)
 
 
+class CountingOverrideProvider(FieldOverrideProvider):
+    """
+    A `FieldOverrideProvider` counting the lookups of overrides, for testing.
+    """
+    overrides = {}
+    calls = []
+    prefetches = []
+
+    def get(self, block, name, default):
+        self.calls.append((block.scope_ids.usage_id, name))
+        return self.overrides.get((block.scope_ids.usage_id, name), default)
+
+    def prefetch(self, course_key):
+        self.prefetches.append(course_key)
+
+    @classmethod
+    def enabled_for(cls, course):
+        return True
+
+
+class StubBlock(object):
+    """
+    A block in a tree, identified by its name.
+    """
+    def __init__(self, name, parent=None):
+        self.scope_ids = ScopeIds(None, 'html', name, name)
+        self.parent = parent
+
+    def get_parent(self):
+        return self.parent
+
+
+@attr(shard=1)
+@override_settings(FIELD_OVERRIDE_PROVIDERS=(
+    'courseware.tests.test_field_overrides.CountingOverrideProvider',))
+class OverrideResolutionTests(OverrideFieldBase):
+    """
+    Tests for the resolution of overrides by `OverrideFieldData` once per request.
+    """
+
+    def setUp(self):
+        super(OverrideResolutionTests, self).setUp()
+        OverrideFieldData.provider_classes = None
+        RequestCache.clear_all_namespaces()
+        CountingOverrideProvider.overrides = {('chapter', 'due'): 'soon'}
+        CountingOverrideProvider.calls = []
+        CountingOverrideProvider.prefetches = []
+        self.chapter = StubBlock('chapter')
+        self.sequential = StubBlock('sequential', self.chapter)
+        self.vertical = StubBlock('vertical', self.sequential)
+
+    def tearDown(self):
+        super(OverrideResolutionTests, self).tearDown()
+        OverrideFieldData.provider_classes = None
+        RequestCache.clear_all_namespaces()
+
+    def make_one(self, user=TESTUSER):
+        """
+        Factory method.
+        """
+        return OverrideFieldData.wrap(user, self.course, DictFieldData({}))
+
+    def test_prefetch_once_per_request(self):
+        self.make_one()
+        self.make_one()
+        self.assertEqual(CountingOverrideProvider.prefetches, [self.course.id])
+
+    def test_override_resolved_once(self):
+        data = self.make_one()
+        self.assertEqual(data.get_override(self.chapter, 'due'), 'soon')
+        # Field data of the same user shares the resolutions of the request.
+        self.assertEqual(self.make_one().get_override(self.chapter, 'due'), 'soon')
+        self.assertEqual(CountingOverrideProvider.calls, [('chapter', 'due')])
+
+    def test_inherited_override_resolved_once(self):
+        data = self.make_one()
+        self.assertEqual(data.default(self.vertical, 'due'), 'soon')
+        self.assertEqual(data.default(self.sequential, 'due'), 'soon')
+        self.assertFalse(data.has(self.vertical, 'due'))
+        self.assertEqual(
+            sorted(CountingOverrideProvider.calls),
+            [('chapter', 'due'), ('sequential', 'due'), ('vertical', 'due')],
+        )
+
+    def test_clear_override_resolutions(self):
+        data = self.make_one()
+        self.assertEqual(data.get_override(self.chapter, 'due'), 'soon')
+        CountingOverrideProvider.overrides = {}
+        self.assertEqual(data.get_override(self.chapter, 'due'), 'soon')
+        clear_override_resolutions()
+        self.assertIs(data.get_override(self.chapter, 'due'), NOTSET)
+
+    def test_resolutions_of_last_user(self):
+        first_user, second_user = Mock(id=1), Mock(id=2)
+        self.assertEqual(self.make_one(first_user).get_override(self.chapter, 'due'), 'soon')
+        self.assertEqual(self.make_one(second_user).get_override(self.chapter, 'due'), 'soon')
+        # The field data of another user forgets the resolutions and prefetches of the first one.
+        self.assertEqual(len(DEFAULT_REQUEST_CACHE.data[OVERRIDE_RESOLUTIONS_KEY]), 1)
+        self.assertEqual(self.make_one(first_user).get_override(self.chapter, 'due'), 'soon')
+        self.assertEqual(CountingOverrideProvider.calls, [('chapter', 'due')] * 3)
+        self.assertEqual(CountingOverrideProvider.prefetches, [self.course.id] * 3)
+
+
 @attr(shard=1)
 class ResolveDottedTests(unittest.TestCase):
     """
@@ -11,7 +11,7 @@ from xblock.core import XBlock
 from xblock.exceptions import KeyValueMultiSaveError
 from xblock.fields import BlockScope, Scope, ScopeIds
 
-from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError
+from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError, MultiUserFieldDataCache
 from courseware.models import (
     StudentModule,
     XModuleStudentInfoField,
@@ -434,3 +434,90 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+@attr(shard=1)
+class TestMultiUserFieldDataCache(TestCase):
+    """Tests for prefetching field data for many users at once"""
+    # Tell Django to clean out all databases, not just default
+    multi_db = True
+
+    def setUp(self):
+        super(TestMultiUserFieldDataCache, self).setUp()
+        self.users = []
+        for index in range(3):
+            student_module = StudentModuleFactory(state=json.dumps({'a_field': 'value_{}'.format(index)}))
+            StudentPrefsFactory(student=student_module.student, value=json.dumps('pref_{}'.format(index)))
+            StudentInfoFactory(student=student_module.student, value=json.dumps('info_{}'.format(index)))
+            self.users.append(student_module.student)
+        self.users.append(UserFactory.create())
+        UserStateSummaryFactory.create()
+        self.descriptor = mock_descriptor([
+            mock_field(Scope.user_state, 'a_field'),
+            mock_field(Scope.preferences, 'existing_field'),
+            mock_field(Scope.user_info, 'existing_field'),
+            mock_field(Scope.user_state_summary, 'existing_field'),
+        ])
+
+    def _assert_cached_values(self, caches):
+        """Check that each user's cache holds that user's values, without querying"""
+        with self.assertNumQueries(0):
+            for index, user in enumerate(self.users[:3]):
+                kvs = DjangoKeyValueStore(caches[user.id])
+                self.assertEquals('value_{}'.format(index), kvs.get(
+                    DjangoKeyValueStore.Key(Scope.user_state, user.id, location('usage_id'), 'a_field')
+                ))
+                self.assertEquals('pref_{}'.format(index), kvs.get(
+                    DjangoKeyValueStore.Key(Scope.preferences, user.id, 'mock_problem', 'existing_field')
+                ))
+                self.assertEquals('info_{}'.format(index), kvs.get(
+                    DjangoKeyValueStore.Key(Scope.user_info, user.id, None, 'existing_field')
+                ))
+                self.assertEquals('old_value', kvs.get(user_state_summary_key('existing_field')))
+
+            user_without_state = self.users[3]
+            self.assertFalse(DjangoKeyValueStore(caches[user_without_state.id]).has(
+                DjangoKeyValueStore.Key(Scope.user_state, user_without_state.id, location('usage_id'), 'a_field')
+            ))
+
+    def test_single_chunk(self):
+        multi_user_cache = MultiUserFieldDataCache([self.descriptor], course_id)
+        # One query per user-scoped table, plus one for the shared user_state_summary data
+        with self.assertNumQueries(4):
+            caches = multi_user_cache.caches_for_users(self.users)
+        self._assert_cached_values(caches)
+
+    def test_row_budget_chunks_users(self):
+        multi_user_cache = MultiUserFieldDataCache([self.descriptor], course_id, max_rows=2)
+        self.assertEquals(multi_user_cache.users_per_chunk, 2)
+        with self.assertNumQueries(7):
+            caches = multi_user_cache.caches_for_users(self.users)
+        self._assert_cached_values(caches)
+
+    def test_iter_caches_for_users(self):
+        multi_user_cache = MultiUserFieldDataCache([self.descriptor], course_id, max_rows=1)
+        users = [user for user, _ in multi_user_cache.iter_caches_for_users(self.users)]
+        self.assertEquals(users, self.users)
+
+    def test_write_through_prefetched_cache(self):
+        user = self.users[0]
+        caches = MultiUserFieldDataCache([self.descriptor], course_id).caches_for_users([user])
+        kvs = DjangoKeyValueStore(caches[user.id])
+        kvs.set(DjangoKeyValueStore.Key(Scope.user_state, user.id, location('usage_id'), 'a_field'), 'new_value')
+        student_module = StudentModule.objects.get(student=user)
+        self.assertEquals({'a_field': 'new_value'}, json.loads(student_module.state))
+
+    def test_reload_user_states(self):
+        user = self.users[0]
+        caches = MultiUserFieldDataCache([self.descriptor], course_id).caches_for_users([user])
+        key = DjangoKeyValueStore.Key(Scope.user_state, user.id, location('usage_id'), 'a_field')
+        StudentModule.objects.filter(student=user).update(state=json.dumps({'a_field': 'changed_value'}))
+        # The prefetched state is kept until it's reloaded.
+        self.assertEquals('value_0', DjangoKeyValueStore(caches[user.id]).get(key))
+        with self.assertNumQueries(1):
+            caches[user.id].cache[Scope.user_state].reload_user_states([location('usage_id')])
+        self.assertEquals('changed_value', DjangoKeyValueStore(caches[user.id]).get(key))
+
+        StudentModule.objects.filter(student=user).update(state=json.dumps({}))
+        caches[user.id].cache[Scope.user_state].reload_user_states([location('usage_id')])
+        self.assertFalse(DjangoKeyValueStore(caches[user.id]).has(key))
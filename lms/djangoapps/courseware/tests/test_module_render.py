@@ -2400,6 +2400,33 @@ class LMSXBlockServiceBindingTest(SharedModuleStoreTestCase):
         self.assertFalse(runtime.user_is_beta_tester)
         self.assertEqual(runtime.days_early_for_beta, 5)
 
+    def test_children_share_module_system_factory(self):
+        """
+        Tests that the children bound through a runtime share what doesn't depend on the block.
+        """
+        vertical = ItemFactory(category="vertical", parent=self.course)
+        for _ in range(2):
+            ItemFactory(category="html", parent=vertical)
+        vertical = modulestore().get_item(vertical.location)
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(self.course.id, self.user, vertical)
+        request = RequestFactory().get('')
+        request.user = self.user
+        block = render.get_module_for_descriptor(
+            self.user, request, vertical, field_data_cache, self.course.id, course=self.course
+        )
+
+        with patch.object(render, 'ModuleSystemFactory', wraps=render.ModuleSystemFactory) as mock_factory:
+            children = block.get_children()
+
+        self.assertEqual(len(children), 2)
+        mock_factory.assert_not_called()
+        first, second = [child.xmodule_runtime for child in children]
+        self.assertIsNot(first, second)
+        self.assertIs(first.publish.__self__, second.publish.__self__)
+        self.assertIs(first.replace_urls, second.replace_urls)
+        self.assertIs(first.service(children[0], 'user'), second.service(children[1], 'user'))
+        self.assertIsNot(first.service(children[0], 'field-data'), second.service(children[1], 'field-data'))
+
 
 class PureXBlockWithChildren(PureXBlock):
     """
@@ -83,6 +83,7 @@ from xmodule.course_module import COURSE_VISIBILITY_PRIVATE, COURSE_VISIBILITY_P
 from xmodule.graders import ShowCorrectness
 from xmodule.modulestore import ModuleStoreEnum
 from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.django_utils import (
     TEST_DATA_MIXED_MODULESTORE,
     ModuleStoreTestCase,
@@ -2783,6 +2784,45 @@ class TestRenderXBlock(RenderXBlockTestMixin, ModuleStoreTestCase, CompletionWaf
             url += '?' + url_encoded_params
         return self.client.get(url)
 
+    def test_render_xblock_prefetches_definitions(self):
+        """
+        Test that render_xblock prefetches the definitions of the block's subtree in its
+        bulk operation, and that handler calls don't prefetch them.
+        """
+        self.override_waffle_switch(True)
+        self.setup_course(ModuleStoreEnum.Type.split)
+        self.setup_user(admin=False, enroll=True, login=True)
+        prefetches = []
+
+        def prefetch_definitions(store, course_key, usage_keys, depth=None):  # pylint: disable=unused-argument
+            """
+            Records the blocks to prefetch, and whether a bulk operation is open on their course.
+            """
+            prefetches.append((usage_keys, store._is_in_bulk_operation(course_key)))  # pylint: disable=protected-access
+
+        mock_prefetch = patch.object(
+            SplitMongoModuleStore, 'prefetch_definitions', autospec=True, side_effect=prefetch_definitions
+        )
+        with mock_prefetch:
+            response = self.get_response(usage_key=self.vertical_block.location)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(prefetches, [([self.vertical_block.location], True)])
+
+            request = RequestFactoryNoCsrf().post(
+                '/',
+                data=json.dumps({"completion": 1}),
+                content_type='application/json',
+            )
+            request.user = self.user
+            response = handle_xblock_callback(
+                request,
+                unicode(self.course.id),
+                quote_slashes(unicode(self.html_block.location)),
+                'publish_completion',
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(prefetches), 1)
+
     def test_render_xblock_with_completion_service_disabled(self):
         """
         Test that render_xblock does not set up the CompletionOnViewService.
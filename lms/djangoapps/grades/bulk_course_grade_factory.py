@@ -0,0 +1,324 @@
+"""
+Bulk Course Grade Factory Class
+
+Computes course grades for a whole batch of learners from persisted grades,
+without building a user-specific course structure or SubsectionGrade objects
+for each learner.
+"""
+from collections import OrderedDict
+from itertools import izip
+from logging import getLogger
+
+import numpy
+from six import text_type
+
+from .config import assume_zero_if_absent, should_persist_grades
+from .context import grading_context
+from .course_grade import CourseGrade
+from .course_grade_factory import CourseGradeFactory
+from .models import PersistentCourseGrade, PersistentSubsectionGrade
+
+log = getLogger(__name__)
+
+
+class BulkSubsectionGrade(object):
+    """
+    Read-only subsection grade computed by the BulkCourseGradeFactory.
+    """
+    def __init__(self, location, attempted_graded, percent_graded):
+        self.location = location
+        self.attempted_graded = attempted_graded
+        self.percent_graded = percent_graded
+
+
+class BulkCourseGrade(object):
+    """
+    Read-only course grade computed by the BulkCourseGradeFactory.
+
+    Provides the subset of the CourseGrade interface that is needed to
+    report on a learner's grade, along with the per assignment type
+    averages that were computed for the whole batch.  Subsection grades
+    are read from the learner's row of the batch's matrices on demand.
+    """
+    def __init__(
+            self, user, percent, letter_grade, passed, attempted,
+            subsection_columns, subsection_percents, subsection_attempts, assignment_averages,
+    ):
+        self.user = user
+        self.percent = percent
+        self.letter_grade = letter_grade or None
+        self.passed = passed
+        self.attempted = attempted
+        self._subsection_columns = subsection_columns
+        self._subsection_percents = subsection_percents
+        self._subsection_attempts = subsection_attempts
+        self._assignment_averages = assignment_averages
+
+    def __unicode__(self):
+        return u'Bulk Course Grade: percent: {}, letter_grade: {}, passed: {}'.format(
+            unicode(self.percent),
+            self.letter_grade,
+            self.passed,
+        )
+
+    def subsection_grade(self, subsection_key):
+        """
+        Returns the BulkSubsectionGrade for the given graded subsection.
+        """
+        column = self._subsection_columns[subsection_key]
+        return BulkSubsectionGrade(
+            subsection_key,
+            bool(self._subsection_attempts[column]),
+            float(self._subsection_percents[column]),
+        )
+
+    def assignment_average(self, assignment_type):
+        """
+        Returns the average of the graded subsections of the given
+        assignment type, after dropping the grader's lowest scores.
+        """
+        return self._assignment_averages[assignment_type]
+
+
+class BulkCourseGradeFactory(object):
+    """
+    Factory class to compute course grades for batches of users.
+
+    Rather than reading each user's grade separately, the persisted
+    subsection and course grades of a whole batch are loaded in a couple
+    of set-based queries and arranged in a users x graded subsections
+    matrix, over which the course's graders are applied with vectorized
+    arithmetic.
+
+    Stored course grades are used as-is, as CourseGradeFactory.read does.
+    For users without one, the course grade is computed from the persisted
+    subsection grades using the weights, minimum counts and drop counts of
+    the course's graders.  Unlike CourseGradeFactory, the computed grades
+    are not persisted, and subsections without a persisted grade count as
+    not attempted.  This requires grades to be persisted for the course.
+    """
+    GradeResult = CourseGradeFactory.GradeResult
+
+    def __init__(self, course, collected_block_structure):
+        self.course = course
+        self.course_key = course.id
+        self._assume_zero_if_absent = assume_zero_if_absent(self.course_key)
+
+        grading_cxt = grading_context(course, collected_block_structure)
+        self._subsection_keys = []
+        self._column_for_subsection = {}
+        self._scored_subsections = []
+        self._type_columns = OrderedDict()
+        for assignment_type, subsection_infos in grading_cxt['all_graded_subsections_by_type'].iteritems():
+            first_column = len(self._subsection_keys)
+            for subsection_info in subsection_infos:
+                subsection_key = subsection_info['subsection_block'].location
+                if subsection_key in self._column_for_subsection:
+                    # Subsections with multiple parents are only graded once.
+                    continue
+                self._column_for_subsection[subsection_key] = len(self._subsection_keys)
+                self._subsection_keys.append(subsection_key)
+                self._scored_subsections.append(bool(subsection_info['scored_descendants']))
+            self._type_columns[assignment_type] = slice(first_column, len(self._subsection_keys))
+        self._scored_subsections = numpy.array(self._scored_subsections, dtype=bool)
+
+        self._type_graders = grading_cxt['subsection_type_graders']
+        self._weighted_type_graders = CourseGrade.get_weighted_subsection_type_graders(course)
+
+    @staticmethod
+    def is_enabled(course_key):
+        """
+        Returns whether grades for the given course can be computed in bulk.
+        """
+        return should_persist_grades(course_key)
+
+    def iter(self, users):
+        """
+        Given a batch of students (User), yield a GradeResult for each of
+        them, in the same order.  See CourseGradeFactory.iter.
+
+        Since the batch is graded at once, an error is reported for every
+        student of the batch if it could not be graded.
+        """
+        users = list(users)
+        try:
+            course_grades = self._compute(users)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.exception(
+                'Cannot bulk grade %d students in course %s because of exception: %s',
+                len(users),
+                self.course_key,
+                text_type(exc)
+            )
+            course_grades = [None] * len(users)
+            errors = [exc] * len(users)
+        else:
+            errors = [None] * len(users)
+
+        for user, course_grade, error in izip(users, course_grades, errors):
+            yield self.GradeResult(user, course_grade, error)
+
+    def _compute(self, users):
+        """
+        Returns a list of BulkCourseGrades for the given users.
+        """
+        row_for_user = {user.id: row for row, user in enumerate(users)}
+        shape = (len(users), len(self._subsection_keys))
+        earned = numpy.zeros(shape)
+        possible = numpy.zeros(shape)
+        persisted = numpy.zeros(shape, dtype=bool)
+        attempted = numpy.zeros(shape, dtype=bool)
+        attempted_users = set()
+
+        for (
+                user_id, usage_key, earned_graded, possible_graded, first_attempted, earned_override, possible_override,
+        ) in self._read_subsection_grades(row_for_user.keys()):
+            if first_attempted is not None:
+                attempted_users.add(user_id)
+            if usage_key.run is None:
+                # pylint: disable=unexpected-keyword-arg,no-value-for-parameter
+                usage_key = usage_key.replace(course_key=self.course_key)
+            column = self._column_for_subsection.get(usage_key)
+            if column is None:
+                # The subsection is no longer graded or in the course.
+                continue
+            row = row_for_user[user_id]
+            earned[row, column] = earned_graded if earned_override is None else earned_override
+            possible[row, column] = possible_graded if possible_override is None else possible_override
+            persisted[row, column] = True
+            attempted[row, column] = first_attempted is not None
+
+        persisted_course_grades = self._read_course_grades(row_for_user.keys())
+        if self._assume_zero_if_absent:
+            # Users without a stored course grade get a ZeroCourseGrade.
+            has_course_grade = numpy.array([user.id in persisted_course_grades for user in users], dtype=bool)
+            earned[~has_course_grade] = 0.0
+            persisted &= has_course_grade[:, numpy.newaxis]
+            attempted &= has_course_grade[:, numpy.newaxis]
+
+        percents = _compute_percents(earned, possible)
+        # Graders only consider subsections with a non-zero graded total.
+        has_score = numpy.where(persisted, possible > 0, self._scored_subsections)
+        course_percents = self._compute_course_percents(percents, has_score)
+        assignment_averages = {
+            assignment_type: totals_with_drops(
+                percents[:, columns],
+                numpy.ones((len(users), columns.stop - columns.start), dtype=bool),
+                min_count=0,
+                drop_count=self._type_graders[assignment_type].drop_count,
+            )
+            for assignment_type, columns in self._type_columns.iteritems()
+            if self._type_graders.get(assignment_type)
+        }
+
+        course_grades = []
+        for row, user in enumerate(users):
+            persisted_grade = persisted_course_grades.get(user.id)
+            if persisted_grade is not None:
+                percent = persisted_grade.percent_grade
+                letter_grade = persisted_grade.letter_grade
+                passed = letter_grade != u''
+            elif self._assume_zero_if_absent:
+                percent, letter_grade, passed = 0.0, None, False
+            else:
+                # pylint: disable=protected-access
+                percent = CourseGrade._compute_percent({'percent': course_percents[row]})
+                letter_grade = CourseGrade._compute_letter_grade(self.course.grade_cutoffs, percent)
+                passed = CourseGrade._compute_passed(self.course.grade_cutoffs, percent)
+
+            course_grades.append(BulkCourseGrade(
+                user,
+                percent,
+                letter_grade,
+                passed,
+                attempted=(
+                    persisted_grade is not None if self._assume_zero_if_absent else user.id in attempted_users
+                ),
+                subsection_columns=self._column_for_subsection,
+                subsection_percents=percents[row],
+                subsection_attempts=attempted[row],
+                assignment_averages={
+                    assignment_type: float(averages[row])
+                    for assignment_type, averages in assignment_averages.iteritems()
+                },
+            ))
+        return course_grades
+
+    def _compute_course_percents(self, percents, has_score):
+        """
+        Returns the unrounded course percent of each row of the given
+        users x subsections matrix, as WeightedSubsectionsGrader.grade
+        computes it for a single user.
+        """
+        course_percents = numpy.zeros(percents.shape[0])
+        for assignment_type, grader, weight in self._weighted_type_graders:
+            columns = self._type_columns.get(assignment_type, slice(0, 0))
+            course_percents += weight * totals_with_drops(
+                percents[:, columns],
+                has_score[:, columns],
+                min_count=grader.min_count,
+                drop_count=grader.drop_count,
+            )
+        return course_percents
+
+    def _read_subsection_grades(self, user_ids):
+        """
+        Returns the graded scores of all persisted subsection grades of the
+        given users, taking any grade overrides into account.
+        """
+        return PersistentSubsectionGrade.objects.filter(
+            course_id=self.course_key,
+            user_id__in=user_ids,
+        ).values_list(
+            'user_id',
+            'usage_key',
+            'earned_graded',
+            'possible_graded',
+            'first_attempted',
+            'override__earned_graded_override',
+            'override__possible_graded_override',
+        )
+
+    def _read_course_grades(self, user_ids):
+        """
+        Returns a dict mapping user ids to their persisted course grades.
+        """
+        return {
+            grade.user_id: grade
+            for grade in PersistentCourseGrade.objects.filter(course_id=self.course_key, user_id__in=user_ids)
+        }
+
+
+def _compute_percents(earned, possible):
+    """
+    Vectorized equivalent of scores.compute_percent.
+    """
+    has_possible = possible > 0
+    return numpy.where(
+        has_possible,
+        numpy.around(earned / numpy.where(has_possible, possible, 1.0), decimals=2),
+        0.0,
+    )
+
+
+def totals_with_drops(percents, included, min_count, drop_count):
+    """
+    Vectorized equivalent of AssignmentFormatGrader.total_with_drops,
+    computed for each row of the given users x subsections matrix.
+
+    Only the percents marked in the included matrix are considered.  Rows
+    with fewer than min_count of them are padded with zero scores, as the
+    grader does for assignments that are not released yet.
+    """
+    num_rows = percents.shape[0]
+    num_included = included.sum(axis=1)
+    num_kept = numpy.maximum(num_included, min_count) - drop_count
+
+    # Excluded percents are ranked below all others so they are never kept.
+    # Padded zero scores are never worth summing, so at most num_included
+    # of the highest percents contribute to the total.
+    ranked = -numpy.sort(-numpy.where(included, percents, -1.0), axis=1)
+    cumulative = numpy.hstack([numpy.zeros((num_rows, 1)), numpy.cumsum(ranked, axis=1)])
+    num_summed = numpy.maximum(numpy.minimum(num_kept, num_included), 0)
+    totals = cumulative[numpy.arange(num_rows), num_summed]
+    return numpy.where(num_kept > 0, totals / numpy.maximum(num_kept, 1), 0.0)
@@ -178,6 +178,19 @@ class CourseGradeBase(object):
             in course.grader.subgraders
         }
 
+    @classmethod
+    def get_weighted_subsection_type_graders(cls, course):
+        """
+        Returns a list of (subsection_type, subsection_type_grader, weight)
+        tuples for the graders configured per grading policy.
+        """
+        course = cls._prep_course_for_grading(course)
+        return [
+            (subsection_type, subsection_type_grader, weight)
+            for (subsection_type_grader, subsection_type, weight)
+            in course.grader.subgraders
+        ]
+
     @classmethod
     def _prep_course_for_grading(cls, course):
         """
@@ -0,0 +1,171 @@
+"""
+Performance test of computing course grades for batches of users with
+the BulkCourseGradeFactory, compared to grading each user separately
+with the course's grader.
+
+Grades are read from generated data rather than the database, so the
+timings only cover the grade computation.
+"""
+from collections import OrderedDict
+from datetime import datetime
+import random
+import unittest
+
+import ddt
+import pytest
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
+from pytz import UTC
+
+from xmodule.graders import AggregatedScore, grader_from_conf
+
+from ..bulk_course_grade_factory import BulkCourseGradeFactory
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Number of users graded in each batch, as in CourseGradeReport.
+BATCH_SIZE = 100
+
+# Number of batches graded for each timing.
+NUM_BATCHES = 20
+
+# Number of graded subsections of each of the generated courses.
+NUM_SUBSECTIONS = (10, 50, 200)
+
+GRADING_POLICY = [
+    {'type': 'Homework', 'min_count': 12, 'drop_count': 2, 'weight': 0.5},
+    {'type': 'Lab', 'min_count': 12, 'drop_count': 2, 'weight': 0.2},
+    {'type': 'Final Exam', 'min_count': 1, 'drop_count': 0, 'weight': 0.3},
+]
+
+
+class _Block(object):
+    """
+    Stand-in for a collected subsection block.
+    """
+    def __init__(self, location):
+        self.location = location
+
+
+class _Course(object):
+    """
+    Stand-in for a course descriptor.
+    """
+    def __init__(self):
+        self.id = CourseLocator('org', 'course', 'run')
+        self.grader = grader_from_conf(GRADING_POLICY)
+        self.grade_cutoffs = {'Pass': 0.5}
+
+
+class _User(object):
+    """
+    Stand-in for a user.
+    """
+    def __init__(self, user_id):
+        self.id = user_id
+
+
+class _SubsectionGrade(object):
+    """
+    Stand-in for a subsection grade, as passed to the course's grader.
+    """
+    def __init__(self, earned, possible):
+        self.display_name = u'Subsection'
+        self.graded_total = AggregatedScore(earned, possible, True, None)
+        self.percent_graded = round(earned / possible, 2)
+
+
+def _grading_context(course, num_subsections):
+    """
+    Returns a grading context with the given number of graded subsections,
+    spread over the assignment types of the grading policy.
+    """
+    subsections_by_type = OrderedDict()
+    for index in range(num_subsections):
+        assignment_type = GRADING_POLICY[index % len(GRADING_POLICY)]['type']
+        subsections_by_type.setdefault(assignment_type, []).append({
+            'subsection_block': _Block(course.id.make_usage_key('sequential', 'subsection_{}'.format(index))),
+            'scored_descendants': [None],
+        })
+    return {
+        'all_graded_subsections_by_type': subsections_by_type,
+        'subsection_type_graders': {
+            subsection_type: subsection_type_grader
+            for (subsection_type_grader, subsection_type, _) in course.grader.subgraders
+        },
+    }
+
+
+def _subsection_grades(grading_cxt, users):
+    """
+    Returns generated persisted subsection grade values of the given users,
+    who each attempted about two thirds of the subsections.
+    """
+    attempted = datetime(2020, 1, 1, tzinfo=UTC)
+    return [
+        (
+            user.id, subsection_info['subsection_block'].location,
+            float(random.randint(0, 10)), 10.0, attempted, None, None,
+        )
+        for subsection_infos in grading_cxt['all_graded_subsections_by_type'].itervalues()
+        for subsection_info in subsection_infos
+        for user in users
+        if random.random() < 0.67
+    ]
+
+
+@ddt.ddt
+@unittest.skip
+class BulkCourseGradeFactoryPerfTest(unittest.TestCase):
+    """
+    Generates the rates at which course grades are computed for users.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(*NUM_SUBSECTIONS)
+    def test_grading_rates(self, num_subsections):
+        """
+        Generates the times taken to grade each batch of users with each approach.
+        """
+        if CodeBlockTimer is None:
+            pytest.skip("CodeBlockTimer undefined.")
+
+        course = _Course()
+        grading_cxt = _grading_context(course, num_subsections)
+        batches = [
+            [_User(BATCH_SIZE * batch + index) for index in range(BATCH_SIZE)]
+            for batch in range(NUM_BATCHES)
+        ]
+        subsection_grades = [_subsection_grades(grading_cxt, users) for users in batches]
+        desc = "BulkCourseGradeFactory:{}:{}".format(num_subsections, BATCH_SIZE)
+
+        with CodeBlockTimer(desc):
+
+            with patch('lms.djangoapps.grades.bulk_course_grade_factory.assume_zero_if_absent', return_value=False):
+                with patch('lms.djangoapps.grades.bulk_course_grade_factory.grading_context', return_value=grading_cxt):
+                    factory = BulkCourseGradeFactory(course, None)
+
+                with patch.object(factory, '_read_course_grades', return_value={}):
+                    for users, grades in zip(batches, subsection_grades):
+                        with patch.object(factory, '_read_subsection_grades', return_value=grades):
+                            with CodeBlockTimer("bulk_batch"):
+                                list(factory.iter(users))
+
+            for users, grades in zip(batches, subsection_grades):
+                with CodeBlockTimer("per_user_batch"):
+                    grade_sheets = {user.id: {} for user in users}
+                    for user_id, usage_key, earned, possible, _, _, _ in grades:
+                        policy_index = int(usage_key.block_id.split('_')[1]) % len(GRADING_POLICY)
+                        assignment_type = GRADING_POLICY[policy_index]['type']
+                        grade_sheets[user_id].setdefault(assignment_type, OrderedDict())[usage_key] = _SubsectionGrade(
+                            earned, possible,
+                        )
+                    for user in users:
+                        course.grader.grade(grade_sheets[user.id])
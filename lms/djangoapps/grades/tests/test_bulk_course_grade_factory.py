@@ -0,0 +1,139 @@
+"""
+Tests for the BulkCourseGradeFactory class.
+"""
+import ddt
+import numpy
+from django.test import TestCase
+from mock import patch
+
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
+from student.models import CourseEnrollment
+from student.tests.factories import UserFactory
+from xmodule.graders import AssignmentFormatGrader
+
+from ..bulk_course_grade_factory import BulkCourseGrade, BulkCourseGradeFactory, totals_with_drops
+from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, waffle
+from ..course_grade_factory import CourseGradeFactory
+from ..models import PersistentCourseGrade
+from .base import GradeTestBase
+from .utils import mock_get_score
+
+
+@ddt.ddt
+class TestTotalsWithDrops(TestCase):
+    """
+    Tests that totals_with_drops matches AssignmentFormatGrader.total_with_drops.
+    """
+    @ddt.data(
+        ([], 0, 0),
+        ([], 2, 0),
+        ([0.5], 1, 0),
+        ([0.5], 3, 0),
+        ([0.5, 1.0, 0.25], 0, 1),
+        ([0.5, 1.0, 0.25], 5, 1),
+        ([0.5, 1.0, 0.25], 5, 3),
+        ([0.5, 1.0, 0.25], 0, 3),
+        ([0.5, 1.0, 0.25], 0, 4),
+    )
+    @ddt.unpack
+    def test_matches_grader(self, percents, min_count, drop_count):
+        grader = AssignmentFormatGrader('Homework', min_count, drop_count)
+        padding = [0.0] * max(min_count - len(percents), 0)
+        expected_total, _ = grader.total_with_drops([{'percent': percent} for percent in percents + padding])
+
+        totals = totals_with_drops(
+            numpy.array([percents], dtype=float),
+            numpy.ones((1, len(percents)), dtype=bool),
+            min_count,
+            drop_count,
+        )
+        self.assertAlmostEqual(totals[0], expected_total)
+
+    def test_excluded_percents(self):
+        percents = numpy.array([
+            [0.5, 0.9, 1.0],
+            [0.5, 0.9, 1.0],
+        ])
+        included = numpy.array([
+            [True, False, True],
+            [False, False, False],
+        ])
+        totals = totals_with_drops(percents, included, min_count=2, drop_count=1)
+        self.assertAlmostEqual(totals[0], 1.0)
+        self.assertAlmostEqual(totals[1], 0.0)
+
+
+class TestBulkCourseGradeFactory(GradeTestBase):
+    """
+    Tests that the BulkCourseGradeFactory computes the same grades as
+    the CourseGradeFactory.
+    """
+    def setUp(self):
+        super(TestBulkCourseGradeFactory, self).setUp()
+        self.other_user = UserFactory()
+        CourseEnrollment.enroll(self.other_user, self.course.id)
+        with mock_get_score(1, 2):
+            CourseGradeFactory().update(self.request.user, self.course, force_update_subsections=True)
+
+    def _bulk_grades(self):
+        """
+        Returns the bulk computed course grades of the enrolled users.
+        """
+        factory = BulkCourseGradeFactory(self.course, get_course_in_cache(self.course.id))
+        results = list(factory.iter([self.request.user, self.other_user]))
+        self.assertEqual([result.student for result in results], [self.request.user, self.other_user])
+        self.assertEqual([result.error for result in results], [None, None])
+        return [result.course_grade for result in results]
+
+    def _assert_grades_equal(self, bulk_grade, course_grade):
+        """
+        Asserts that the given bulk computed grade matches the given course grade.
+        """
+        self.assertIsInstance(bulk_grade, BulkCourseGrade)
+        self.assertEqual(bulk_grade.percent, course_grade.percent)
+        self.assertEqual(bulk_grade.letter_grade, course_grade.letter_grade)
+        self.assertEqual(bool(bulk_grade.passed), bool(course_grade.passed))
+        self.assertEqual(bulk_grade.attempted, course_grade.attempted)
+        for subsection in (self.sequence, self.sequence2):
+            bulk_subsection_grade = bulk_grade.subsection_grade(subsection.location)
+            subsection_grade = course_grade.subsection_grade(subsection.location)
+            self.assertEqual(bulk_subsection_grade.attempted_graded, subsection_grade.attempted_graded)
+            self.assertEqual(bulk_subsection_grade.percent_graded, subsection_grade.percent_graded)
+
+    def test_matches_course_grade_factory(self):
+        user_grade, other_user_grade = self._bulk_grades()
+        self.assertEqual(user_grade.percent, 0.5)
+        self.assertEqual(user_grade.assignment_average('Homework'), 0.5)
+        self._assert_grades_equal(user_grade, CourseGradeFactory().read(self.request.user, self.course))
+        self._assert_grades_equal(other_user_grade, CourseGradeFactory().read(self.other_user, self.course))
+
+    def test_computed_without_persisted_course_grade(self):
+        PersistentCourseGrade.objects.filter(user_id=self.request.user.id).delete()
+        user_grade, _ = self._bulk_grades()
+        self.assertEqual(user_grade.percent, 0.5)
+        self.assertEqual(user_grade.letter_grade, 'Pass')
+        self.assertTrue(user_grade.passed)
+        self.assertTrue(user_grade.attempted)
+
+    def test_assume_zero_if_absent(self):
+        PersistentCourseGrade.objects.filter(user_id=self.request.user.id).delete()
+        with waffle().override(ASSUME_ZERO_GRADE_IF_ABSENT, active=True):
+            user_grade, _ = self._bulk_grades()
+        self.assertEqual(user_grade.percent, 0.0)
+        self.assertIsNone(user_grade.letter_grade)
+        self.assertFalse(user_grade.attempted)
+        self.assertFalse(user_grade.subsection_grade(self.sequence.location).attempted_graded)
+
+    def test_no_user_specific_computation(self):
+        with patch('lms.djangoapps.grades.course_data.get_course_blocks') as mock_course_blocks:
+            with patch('lms.djangoapps.grades.subsection_grade.get_score') as mock_get_score:
+                self._bulk_grades()
+                self.assertFalse(mock_get_score.called)
+                self.assertFalse(mock_course_blocks.called)
+
+    def test_grading_failure(self):
+        with patch.object(BulkCourseGradeFactory, '_read_course_grades', side_effect=TypeError('Cannot grade')):
+            factory = BulkCourseGradeFactory(self.course, get_course_in_cache(self.course.id))
+            results = list(factory.iter([self.request.user, self.other_user]))
+        self.assertEqual([result.course_grade for result in results], [None, None])
+        self.assertTrue(all(isinstance(result.error, TypeError) for result in results))
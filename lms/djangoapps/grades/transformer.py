@@ -37,6 +37,9 @@ class GradesTransformer(BlockStructureTransformer):
     """
     WRITE_VERSION = 4
     READ_VERSION = 4
+    INCREMENTAL_COLLECT_SCOPE = BlockStructureTransformer.CHANGED_SUBTREES
+    # Other scorable blocks load the content fields of their max_score on demand.
+    DEFINITION_FIELDS = {u'problem': (u'data',), u'course': (u'grading_policy',)}
     FIELDS_TO_COLLECT = [
         u'due',
         u'format',
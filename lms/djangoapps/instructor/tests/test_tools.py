@@ -12,11 +12,13 @@ from django.contrib.auth.models import User
 from django.core.exceptions import MultipleObjectsReturned
 from django.test import TestCase
 from django.test.utils import override_settings
+from edx_django_utils.cache import DEFAULT_REQUEST_CACHE, RequestCache
 from pytz import UTC
 from opaque_keys.edx.keys import CourseKey
 from six import text_type
 
 from lms.djangoapps.courseware.field_overrides import OverrideFieldData
+from lms.djangoapps.courseware.student_field_overrides import PREFETCHED_OVERRIDES_KEY, prefetch_overrides_for_user
 from lms.djangoapps.ccx.tests.test_overrides import inject_field_overrides
 from openedx.core.lib.tests import attr
 from student.tests.factories import UserFactory
@@ -262,6 +264,28 @@ class TestSetDueDateExtension(ModuleStoreTestCase):
             tools.set_due_date_extension(self.course, self.week1, self.user, extended)
             self._clear_field_data_cache()
 
+    def test_prefetched_due_date_extension(self):
+        extended = datetime.datetime(2013, 12, 25, 0, 0, tzinfo=UTC)
+        tools.set_due_date_extension(self.course, self.week1, self.user, extended)
+        RequestCache.clear_all_namespaces()
+        prefetch_overrides_for_user(self.user, self.course.id)
+        self._clear_field_data_cache()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.assignment.due, extended)
+
+    def test_prefetched_overrides_of_last_user(self):
+        extended = datetime.datetime(2013, 12, 25, 0, 0, tzinfo=UTC)
+        tools.set_due_date_extension(self.course, self.week1, self.user, extended)
+        RequestCache.clear_all_namespaces()
+        prefetch_overrides_for_user(self.user, self.course.id)
+        # The overrides prefetched for another user replace those of the first one,
+        # whose overrides are queried again.
+        other_user = UserFactory.create()
+        prefetch_overrides_for_user(other_user, self.course.id)
+        self.assertEqual(DEFAULT_REQUEST_CACHE.data[PREFETCHED_OVERRIDES_KEY], (other_user.id, {self.course.id: {}}))
+        self._clear_field_data_cache()
+        self.assertEqual(self.assignment.due, extended)
+
     def test_set_due_date_extension_invalid_date(self):
         extended = datetime.datetime(2009, 1, 1, 0, 0, tzinfo=UTC)
         with self.assertRaises(tools.DashboardError):
@@ -53,6 +53,9 @@ CERTIFICATE_FEATURES = ('course_id', 'mode', 'status', 'grade', 'created_date',
 
 UNAVAILABLE = "[unavailable]"
 
+# Number of students loaded at a time by iter_enrolled_students_features.
+ENROLLED_STUDENTS_CHUNK_SIZE = 1000
+
 
 def sale_order_record_features(course_id, features):
     """
@@ -216,6 +219,16 @@ def enrolled_students_features(course_key, features):
         {'username': 'username3', 'first_name': 'firstname3'}
     ]
     """
+    return list(iter_enrolled_students_features(course_key, features))
+
+
+def iter_enrolled_students_features(course_key, features):
+    """
+    Generate the student features of enrolled_students_features.
+
+    Students are loaded in chunks of ENROLLED_STUDENTS_CHUNK_SIZE, in
+    order of username, so only one chunk of students is held in memory.
+    """
     include_cohort_column = 'cohort' in features
     include_team_column = 'team' in features
     include_enrollment_mode = 'enrollment_mode' in features
@@ -295,7 +308,15 @@ def enrolled_students_features(course_key, features):
 
         return student_dict
 
-    return [extract_student(student, features) for student in students]
+    last_username = None
+    while True:
+        chunk = students if last_username is None else students.filter(username__gt=last_username)
+        chunk = list(chunk[:ENROLLED_STUDENTS_CHUNK_SIZE])
+        for student in chunk:
+            yield extract_student(student, features)
+        if len(chunk) < ENROLLED_STUDENTS_CHUNK_SIZE:
+            break
+        last_username = chunk[-1].username
 
 
 def list_may_enroll(course_key, features):
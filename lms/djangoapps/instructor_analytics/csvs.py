@@ -84,6 +84,22 @@ def format_dictlist(dictlist, features):
     return header, datarows
 
 
+def iter_format_dictlist(dictlist, features, default=None):
+    """
+    Lazy variant of format_dictlist for use with large reports.
+
+    `dictlist` is any iterable of dictionaries, e.g. a generator
+    `features` is a list of features
+    `default` is the value of features missing from a dictionary
+
+    Returns header and a generator of datarows, which formats each
+    dictionary as it is consumed.
+    """
+    header = features
+    datarows = ([dct.get(feature, default) for feature in features] for dct in dictlist)
+    return header, datarows
+
+
 def format_instances(instances, features):
     """
     Convert a list of instances into a header list and datarows list.
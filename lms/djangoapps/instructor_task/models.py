@@ -18,15 +18,17 @@ import hashlib
 import json
 import logging
 import os.path
+import tempfile
 from uuid import uuid4
 
 from boto.exception import BotoServerError
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files import File
 from django.db import models, transaction
 from opaque_keys.edx.django.models import CourseKeyField
 from six import text_type
+from storages.backends.s3boto import S3BotoStorage
 
 from openedx.core.storage import get_storage
 
@@ -183,9 +185,8 @@ class InstructorTask(models.Model):
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. Rows are written to the backend as they are consumed, so reports
+    can be generated without holding the whole dataset in memory.
     """
     @classmethod
     def from_config(cls, config_name):
@@ -269,14 +270,67 @@ class DjangoStorageReportStore(ReportStore):
         """
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
+
+        `rows` can be any iterable, including a generator. Rows are written
+        out as they are consumed: S3 backends upload them in parts of the
+        storage's buffer size, and other backends are given a temporary file.
+        """
+        if isinstance(self.storage, S3BotoStorage):
+            output_file = self.storage.open(self.path_to(course_id, filename), 'wb')
+            try:
+                self._write_csv(output_file, rows)
+            except Exception:
+                # Abort the multipart upload rather than completing it with
+                # a truncated report.
+                multipart = output_file._multipart  # pylint: disable=protected-access
+                if multipart is not None:
+                    multipart.cancel_upload()
+                raise
+            output_file.close()
+        else:
+            with tempfile.TemporaryFile() as output_file:
+                self._write_csv(output_file, rows)
+                output_file.seek(0)
+                self.store(course_id, filename, File(output_file))
+
+    def _write_csv(self, output_file, rows):
+        """
+        Writes the given rows in csv format to the given file.
         """
-        output_buffer = ContentFile('')
         # Adding unicode signature (BOM) for MS Excel 2013 compatibility
-        output_buffer.write(codecs.BOM_UTF8)
-        csvwriter = csv.writer(output_buffer)
+        output_file.write(codecs.BOM_UTF8)
+        csvwriter = csv.writer(output_file)
         csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+
+    def read_rows(self, course_id, filename):
+        """
+        Given a course_id and the filename of a csv file written by
+        `store_rows`, generate its rows as lists of unicode strings.
+        """
+        with self.storage.open(self.path_to(course_id, filename)) as input_file:
+            for row in csv.reader(input_file):
+                # Decoding with utf-8-sig drops the unicode signature (BOM)
+                # written at the start of the file by store_rows.
+                yield [item.decode('utf-8-sig') for item in row]
+
+    def filenames_in(self, course_id, dirname):
+        """
+        Return the names of the files in the given directory of the given
+        course's report directory.  Unlike `links_for`, no urls are created.
+        """
+        try:
+            _, filenames = self.storage.listdir(self.path_to(course_id, dirname))
+        except OSError:
+            # Django's FileSystemStorage fails with an OSError if the
+            # dir does not exist; other storage types return an empty list.
+            return []
+        return filenames
+
+    def delete(self, course_id, filename):
+        """
+        Delete the given file from the given course's report directory.
+        """
+        self.storage.delete(self.path_to(course_id, filename))
 
     def links_for(self, course_id):
         """
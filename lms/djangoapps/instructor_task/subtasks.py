@@ -275,6 +275,7 @@ def queue_subtasks_for_query(
     item_fields,
     items_per_task,
     total_num_items,
+    final_subtask_id=None,
 ):
     """
     Generates and queues subtasks to each execute a chunk of "items" generated by a queryset.
@@ -290,6 +291,9 @@ def queue_subtasks_for_query(
             These are in addition to the 'pk' field.
         `items_per_task` : maximum size of chunks to break each query chunk into for use by a subtask.
         `total_num_items` : total amount of items that will be put into subtasks
+        `final_subtask_id` : optional id of a subtask that is not queued here, but by the other subtasks
+            once they have all completed (see `all_subtasks_completed`), e.g. to merge their results.
+            It is tracked with the other subtasks, so the InstructorTask only succeeds once it completes.
 
     Returns:  the task progress as stored in the InstructorTask object.
 
@@ -299,18 +303,19 @@ def queue_subtasks_for_query(
     # Calculate the number of tasks that will be created, and create a list of ids for each task.
     total_num_subtasks = _get_number_of_subtasks(total_num_items, items_per_task)
     subtask_id_list = [str(uuid4()) for _ in range(total_num_subtasks)]
+    tracked_subtask_id_list = subtask_id_list + ([final_subtask_id] if final_subtask_id is not None else [])
 
     # Update the InstructorTask  with information about the subtasks we've defined.
     TASK_LOG.info(
         "Task %s: updating InstructorTask %s with subtask info for %s subtasks to process %s items.",
         task_id,
         entry.id,
-        total_num_subtasks,
+        len(tracked_subtask_id_list),
         total_num_items,
     )
     # Make sure this is committed to database before handing off subtasks to celery.
     with outer_atomic():
-        progress = initialize_subtask_info(entry, action_name, total_num_items, subtask_id_list)
+        progress = initialize_subtask_info(entry, action_name, total_num_items, tracked_subtask_id_list)
 
     # Construct a generator that will return the recipients to use for each subtask.
     # Pass in the desired fields to fetch for each recipient.
@@ -344,6 +349,23 @@ def queue_subtasks_for_query(
     return progress
 
 
+def all_subtasks_completed(entry_id, excluded_subtask_id=None):
+    """
+    Returns whether all subtasks of the InstructorTask, other than the given
+    excluded subtask, have completed (successfully or not).
+
+    Subtasks that complete concurrently may each see the other as still running,
+    but at least the last of them to update its status sees all of them completed.
+    """
+    entry = InstructorTask.objects.get(pk=entry_id)
+    subtask_status_info = json.loads(entry.subtasks)['status']
+    return all(
+        subtask_status['state'] in READY_STATES
+        for subtask_id, subtask_status in subtask_status_info.iteritems()
+        if subtask_id != excluded_subtask_id
+    )
+
+
 def _acquire_subtask_lock(task_id):
     """
     Mark the specified task_id as being in progress.
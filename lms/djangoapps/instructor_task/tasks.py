@@ -27,6 +27,7 @@ from django.conf import settings
 from django.utils.translation import ugettext_noop
 
 from bulk_email.tasks import perform_delegate_email_batches
+from lms.djangoapps.instructor_task.subtasks import SubtaskStatus
 from lms.djangoapps.instructor_task.tasks_base import BaseInstructorTask
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
@@ -78,7 +79,7 @@ def rescore_problem(entry_id, xmodule_instance_args):
     action_name = ugettext_noop('rescored')
     update_fcn = partial(rescore_problem_module_state, xmodule_instance_args)
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    visit_fcn = partial(perform_module_state_update, update_fcn, None, prefetch_field_data=True)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
@@ -91,7 +92,7 @@ def override_problem_score(entry_id, xmodule_instance_args):
     action_name = ugettext_noop('overridden')
     update_fcn = partial(override_score_module_state, xmodule_instance_args)
 
-    visit_fcn = partial(perform_module_state_update, update_fcn, None)
+    visit_fcn = partial(perform_module_state_update, update_fcn, None, prefetch_field_data=True)
     return run_main_task(entry_id, visit_fcn, action_name)
 
 
@@ -188,6 +189,43 @@ def calculate_grades_csv(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
+def calculate_grades_csv_shard(entry_id, xmodule_instance_args, user_id_range, num_users, merge_subtask_id,
+                               subtask_status_dict):
+    """
+    Grade the enrolled users of a course whose ids are in `user_id_range`, as a
+    shard of the grade report of the `entry_id` InstructorTask.  Once all shards
+    have completed, successfully or not, queue the `merge_subtask_id` subtask
+    that merges them.
+
+    Unlike the tasks above, this is a subtask that updates its own status in the
+    InstructorTask, so it does not use BaseInstructorTask.
+    """
+    try:
+        subtask_status = CourseGradeReport.generate_shard(
+            entry_id, xmodule_instance_args, user_id_range, num_users, subtask_status_dict
+        )
+    finally:
+        # A failed shard is missing from the merged report, so the report
+        # is merged even if this shard was the last to complete and failed.
+        if CourseGradeReport.shards_completed(entry_id, merge_subtask_id):
+            merge_grades_csv_shards.apply_async(
+                (entry_id, xmodule_instance_args, SubtaskStatus.create(merge_subtask_id).to_dict()),
+                task_id=merge_subtask_id,
+                routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+            )
+    return subtask_status.to_dict()
+
+
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
+def merge_grades_csv_shards(entry_id, xmodule_instance_args, subtask_status_dict):
+    """
+    Merge the shards of the grade report of the `entry_id` InstructorTask and
+    push the results to an S3 bucket for download.
+    """
+    return CourseGradeReport.merge_shards(entry_id, xmodule_instance_args, subtask_status_dict).to_dict()
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)
 def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     """
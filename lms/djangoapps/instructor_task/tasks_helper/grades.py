@@ -1,13 +1,17 @@
 """
 Functionality for generating grade reports.
 """
+import json
 import logging
+import os.path
 import re
 from collections import defaultdict, OrderedDict
 from datetime import datetime
-from itertools import chain, izip, izip_longest
+from itertools import chain, izip_longest
 from time import time
+from uuid import uuid4
 
+from celery.states import FAILURE, SUCCESS
 from django.contrib.auth import get_user_model
 from django.conf import settings
 from lazy import lazy
@@ -19,11 +23,20 @@ from course_blocks.api import get_course_blocks
 from courseware.courses import get_course_by_id
 from courseware.user_state_client import DjangoXBlockUserStateClient
 from instructor_analytics.basic import list_problem_responses
-from instructor_analytics.csvs import format_dictlist
+from instructor_analytics.csvs import iter_format_dictlist
 from lms.djangoapps.certificates.models import CertificateWhitelist, GeneratedCertificate, certificate_info_for_user
 from lms.djangoapps.grades.context import grading_context, grading_context_for_course
 from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGrade
+from lms.djangoapps.grades.bulk_course_grade_factory import BulkCourseGrade, BulkCourseGradeFactory
 from lms.djangoapps.grades.course_grade_factory import CourseGradeFactory
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    all_subtasks_completed,
+    check_subtask_is_valid,
+    queue_subtasks_for_query,
+    update_subtask_status
+)
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.services import IDVerificationService
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
@@ -37,11 +50,16 @@ from xmodule.partitions.partitions_service import PartitionService
 from xmodule.split_test_module import get_split_user_partitions
 
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store
+from .utils import count_succeeded_rows, upload_csv_to_report_store
 
 WAFFLE_NAMESPACE = 'instructor_task'
 WAFFLE_SWITCHES = WaffleSwitchNamespace(name=WAFFLE_NAMESPACE)
 OPTIMIZE_GET_LEARNERS_FOR_COURSE = 'optimize_get_learners_for_course'
+BULK_COMPUTE_COURSE_GRADES = 'bulk_compute_course_grades'
+SHARD_GRADE_REPORTS = 'shard_grade_reports'
+
+# Directory of a course's reports in which the shards of grade reports are stored.
+GRADE_REPORT_SHARDS_DIR = 'grade_report_shards'
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -65,6 +83,14 @@ def _flatten(iterable):
     return list(chain.from_iterable(iterable))
 
 
+def _grade_report_shards_dir(entry_id):
+    """
+    Returns the directory in which the shards of the grade report of the
+    given InstructorTask are stored, relative to the course's reports.
+    """
+    return os.path.join(GRADE_REPORT_SHARDS_DIR, str(entry_id))
+
+
 class _CourseGradeReportContext(object):
     """
     Internal class that provides a common context to use for a single grade
@@ -87,6 +113,9 @@ class _CourseGradeReportContext(object):
         self.action_name = action_name
         self.course_id = course_id
         self.task_progress = TaskProgress(self.action_name, total=None, start_time=time())
+        # Inclusive (min_id, max_id) range of the users to report on when
+        # generating a shard of the report, or None for all enrolled users.
+        self.user_id_range = None
 
     @lazy
     def course(self):
@@ -96,6 +125,16 @@ class _CourseGradeReportContext(object):
     def course_structure(self):
         return get_course_in_cache(self.course_id)
 
+    @lazy
+    def bulk_grade_factory(self):
+        """
+        Returns a BulkCourseGradeFactory when grades for this report are to
+        be computed for whole batches of users at once, or None otherwise.
+        """
+        if WAFFLE_SWITCHES.is_enabled(BULK_COMPUTE_COURSE_GRADES) and BulkCourseGradeFactory.is_enabled(self.course_id):
+            return BulkCourseGradeFactory(self.course, self.course_structure)
+        return None
+
     @lazy
     def course_experiments(self):
         return get_split_user_partitions(self.course.user_partitions)
@@ -189,8 +228,10 @@ class _CourseGradeBulkContext(object):
         self.enrollments = _EnrollmentBulkContext(context, users)
         bulk_cache_cohorts(context.course_id, users)
         BulkRoleCache.prefetch(users)
-        PersistentCourseGrade.prefetch(context.course_id, users)
-        PersistentSubsectionGrade.prefetch(context.course_id, users)
+        if not context.bulk_grade_factory:
+            # The bulk grade factory reads the grades it needs by itself.
+            PersistentCourseGrade.prefetch(context.course_id, users)
+            PersistentSubsectionGrade.prefetch(context.course_id, users)
         BulkCourseTags.prefetch(context.course_id, users)
 
 
@@ -208,8 +249,177 @@ class CourseGradeReport(object):
         """
         with modulestore().bulk_operations(course_id):
             context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
+            if WAFFLE_SWITCHES.is_enabled(SHARD_GRADE_REPORTS):
+                enrolled_users = CourseEnrollment.objects.users_enrolled_in(course_id, include_inactive=True)
+                total_num_users = enrolled_users.count()
+                if total_num_users > settings.GRADE_REPORT_USERS_PER_SHARD:
+                    return cls._queue_shards(
+                        context, _xmodule_instance_args, _entry_id, enrolled_users, total_num_users
+                    )
             return CourseGradeReport()._generate(context)
 
+    @classmethod
+    def _queue_shards(cls, context, xmodule_instance_args, entry_id, enrolled_users, total_num_users):
+        """
+        Queues a subtask to generate the rows of each range of
+        GRADE_REPORT_USERS_PER_SHARD enrolled users, along with a final
+        subtask that merges them into the grade report once they have all
+        completed.  Returns the task progress of the InstructorTask.
+        """
+        # Imported here to avoid a circular import, since the tasks module imports this one.
+        from lms.djangoapps.instructor_task.tasks import calculate_grades_csv_shard
+
+        entry = InstructorTask.objects.get(pk=entry_id)
+
+        # As with bulk emails, the task may be run again when the connection to
+        # the broker is lost, in which case the shards are already queued.
+        if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+            TASK_LOG.warning(u'%s, Grade report shards have already been queued', context.task_info_string)
+            return json.loads(entry.task_output)
+
+        merge_subtask_id = str(uuid4())
+
+        def create_shard_subtask(users, initial_subtask_status):
+            """
+            Creates a subtask to generate the rows of the given users, which
+            are ordered by id.
+            """
+            return calculate_grades_csv_shard.subtask(
+                (
+                    entry_id,
+                    xmodule_instance_args,
+                    (users[0]['pk'], users[-1]['pk']),
+                    len(users),
+                    merge_subtask_id,
+                    initial_subtask_status.to_dict(),
+                ),
+                task_id=initial_subtask_status.task_id,
+                routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+            )
+
+        context.update_status(u'Queueing grade report shards')
+        return queue_subtasks_for_query(
+            entry,
+            context.action_name,
+            create_shard_subtask,
+            [enrolled_users.order_by('id')],
+            [],
+            settings.GRADE_REPORT_USERS_PER_SHARD,
+            total_num_users,
+            final_subtask_id=merge_subtask_id,
+        )
+
+    @classmethod
+    def generate_shard(cls, entry_id, xmodule_instance_args, user_id_range, num_users, subtask_status_dict):
+        """
+        Generates the rows of the enrolled users whose ids are in the given
+        inclusive user_id_range, and stores them as a shard of the grade
+        report of the given InstructorTask.  Returns the subtask's status.
+        """
+        subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+        current_task_id = subtask_status.task_id
+        check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+        try:
+            context = cls._context_for_subtask(entry_id, xmodule_instance_args)
+            context.user_id_range = user_id_range
+            with modulestore().bulk_operations(context.course_id):
+                report = CourseGradeReport()
+                success_rows, error_rows = report._compile(context, report._batched_rows(context))
+
+                report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+                shard_name = u'{:010d}'.format(user_id_range[0])
+                shards_dir = _grade_report_shards_dir(entry_id)
+                report_store.store_rows(context.course_id, os.path.join(shards_dir, shard_name + '.csv'), success_rows)
+                if error_rows:
+                    report_store.store_rows(
+                        context.course_id, os.path.join(shards_dir, shard_name + '_err.csv'), error_rows
+                    )
+        except Exception:
+            # Since we don't know which users were graded, they are all counted as failed.
+            TASK_LOG.exception(u'Grade report shard %s of instructor task %d failed', current_task_id, entry_id)
+            subtask_status.increment(failed=num_users, state=FAILURE)
+            update_subtask_status(entry_id, current_task_id, subtask_status)
+            raise
+
+        subtask_status.increment(
+            succeeded=context.task_progress.succeeded,
+            failed=context.task_progress.failed,
+            state=SUCCESS,
+        )
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        return subtask_status
+
+    @classmethod
+    def merge_shards(cls, entry_id, xmodule_instance_args, subtask_status_dict):
+        """
+        Merges the shards of the grade report of the given InstructorTask
+        into the grade report, in order of user id, and deletes them.
+        Returns the subtask's status.
+
+        Shards that failed to be generated are missing from the report; their
+        users are counted as failed in the task progress.
+        """
+        subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+        current_task_id = subtask_status.task_id
+        check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+        try:
+            context = cls._context_for_subtask(entry_id, xmodule_instance_args)
+            with modulestore().bulk_operations(context.course_id):
+                report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+                shards_dir = _grade_report_shards_dir(entry_id)
+                shard_filenames = sorted(report_store.filenames_in(context.course_id, shards_dir))
+
+                def shard_rows(filenames):
+                    """
+                    Generates the rows of the given shards, in order.
+                    """
+                    for filename in filenames:
+                        for row in report_store.read_rows(context.course_id, os.path.join(shards_dir, filename)):
+                            yield row
+
+                report = CourseGradeReport()
+                report._upload(
+                    context,
+                    report._success_headers(context),
+                    shard_rows(name for name in shard_filenames if not name.endswith('_err.csv')),
+                    report._error_headers(),
+                    list(shard_rows(name for name in shard_filenames if name.endswith('_err.csv'))),
+                )
+
+                for filename in shard_filenames:
+                    report_store.delete(context.course_id, os.path.join(shards_dir, filename))
+        except Exception:
+            TASK_LOG.exception(u'Merging the grade report shards of instructor task %d failed', entry_id)
+            subtask_status.increment(state=FAILURE)
+            update_subtask_status(entry_id, current_task_id, subtask_status)
+            raise
+
+        subtask_status.increment(state=SUCCESS)
+        update_subtask_status(entry_id, current_task_id, subtask_status)
+        return subtask_status
+
+    @classmethod
+    def shards_completed(cls, entry_id, merge_subtask_id):
+        """
+        Returns whether all shards of the grade report of the given
+        InstructorTask have completed, so that they can be merged.
+        """
+        return all_subtasks_completed(entry_id, excluded_subtask_id=merge_subtask_id)
+
+    @classmethod
+    def _context_for_subtask(cls, entry_id, xmodule_instance_args):
+        """
+        Returns the report context of the given InstructorTask, for use by
+        one of its subtasks.
+        """
+        entry = InstructorTask.objects.get(pk=entry_id)
+        action_name = json.loads(entry.task_output)['action_name']
+        return _CourseGradeReportContext(
+            xmodule_instance_args, entry_id, entry.course_id, json.loads(entry.task_input), action_name
+        )
+
     def _generate(self, context):
         """
         Internal method for generating a grade report for the given context.
@@ -258,27 +468,42 @@ class CourseGradeReport(object):
 
     def _compile(self, context, batched_rows):
         """
-        Compiles and returns the complete list of (success_rows, error_rows) for
-        the given batched_rows and context.
+        Compiles the given batched_rows for the given context into a
+        generator of success rows and a list of error rows.
+
+        The success rows are generated as they are uploaded, so only one
+        batch of them is held in memory at a time.  The error rows and the
+        metrics on task status are filled in as the success rows are
+        consumed.
         """
-        # partition and chain successes and errors
-        success_rows, error_rows = izip(*batched_rows)
-        success_rows = list(chain(*success_rows))
-        error_rows = list(chain(*error_rows))
+        error_rows = []
+
+        def success_rows():
+            """
+            Generates the success rows of each batch, collecting its error rows.
+            """
+            task_progress = context.task_progress
+            task_progress.succeeded = task_progress.failed = 0
+            for batch_success_rows, batch_error_rows in batched_rows:
+                error_rows.extend(batch_error_rows)
 
-        # update metrics on task status
-        context.task_progress.succeeded = len(success_rows)
-        context.task_progress.failed = len(error_rows)
-        context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
-        context.task_progress.total = context.task_progress.attempted
-        return success_rows, error_rows
+                # update metrics on task status
+                task_progress.succeeded += len(batch_success_rows)
+                task_progress.failed += len(batch_error_rows)
+                task_progress.attempted = task_progress.succeeded + task_progress.failed
+                task_progress.total = task_progress.attempted
+                for row in batch_success_rows:
+                    yield row
+
+        return success_rows(), error_rows
 
     def _upload(self, context, success_headers, success_rows, error_headers, error_rows):
         """
-        Creates and uploads a CSV for the given headers and rows.
+        Creates and uploads a CSV for the given headers and rows.  The
+        error rows are uploaded once all success rows have been consumed.
         """
         date = datetime.now(UTC)
-        upload_csv_to_report_store([success_headers] + success_rows, 'grade_report', context.course_id, date)
+        upload_csv_to_report_store(chain([success_headers], success_rows), 'grade_report', context.course_id, date)
         if len(error_rows) > 0:
             error_rows = [error_headers] + error_rows
             upload_csv_to_report_store(error_rows, 'grade_report_err', context.course_id, date)
@@ -312,6 +537,8 @@ class CourseGradeReport(object):
             `OPTIMIZE_GET_LEARNERS_FOR_COURSE` waffle flag is removed.
             """
             users = CourseEnrollment.objects.users_enrolled_in(course_id, include_inactive=True)
+            if context.user_id_range is not None:
+                users = users.filter(id__gte=context.user_id_range[0], id__lte=context.user_id_range[1])
             users = users.select_related('profile')
             return grouper(users)
 
@@ -327,6 +554,11 @@ class CourseGradeReport(object):
             }
 
             user_ids_list = get_user_model().objects.filter(**filter_kwargs).values_list('id', flat=True).order_by('id')
+            if context.user_id_range is not None:
+                user_ids_list = user_ids_list.filter(
+                    id__gte=context.user_id_range[0],
+                    id__lte=context.user_id_range[1],
+                )
             user_chunks = grouper(user_ids_list)
             for user_ids in user_chunks:
                 user_ids = [user_id for user_id in user_ids if user_id is not None]
@@ -362,7 +594,9 @@ class CourseGradeReport(object):
             )
             grade_results.extend(subsection_grades_results)
 
-            assignment_average = self._user_assignment_average(course_grade, subsection_grades, assignment_info)
+            assignment_average = self._user_assignment_average(
+                course_grade, subsection_grades, assignment_type, assignment_info,
+            )
             if assignment_average is not None:
                 grade_results.append([assignment_average])
 
@@ -385,17 +619,20 @@ class CourseGradeReport(object):
             subsection_grades.append(subsection_grade)
         return subsection_grades, grade_results
 
-    def _user_assignment_average(self, course_grade, subsection_grades, assignment_info):
+    def _user_assignment_average(self, course_grade, subsection_grades, assignment_type, assignment_info):
         if assignment_info['separate_subsection_avg_headers']:
             if assignment_info['grader']:
-                if course_grade.attempted:
+                if not course_grade.attempted:
+                    assignment_average = 0.0
+                elif isinstance(course_grade, BulkCourseGrade):
+                    # Averages were computed for the whole batch at once.
+                    assignment_average = course_grade.assignment_average(assignment_type)
+                else:
                     subsection_breakdown = [
                         {'percent': subsection_grade.percent_graded}
                         for subsection_grade in subsection_grades
                     ]
                     assignment_average, _ = assignment_info['grader'].total_with_drops(subsection_breakdown)
-                else:
-                    assignment_average = 0.0
                 return assignment_average
 
     def _user_cohort_group_names(self, user, context):
@@ -476,13 +713,18 @@ class CourseGradeReport(object):
         with modulestore().bulk_operations(context.course_id):
             bulk_context = _CourseGradeBulkContext(context, users)
 
+            if context.bulk_grade_factory:
+                grade_results = context.bulk_grade_factory.iter(users)
+            else:
+                grade_results = CourseGradeFactory().iter(
+                    users,
+                    course=context.course,
+                    collected_block_structure=context.course_structure,
+                    course_key=context.course_id,
+                )
+
             success_rows, error_rows = [], []
-            for user, course_grade, error in CourseGradeFactory().iter(
-                users,
-                course=context.course,
-                collected_block_structure=context.course_structure,
-                course_key=context.course_id,
-            ):
+            for user, course_grade, error in grade_results:
                 if not course_grade:
                     # An empty gradeset means we failed to grade a student.
                     error_rows.append([user.id, user.username, text_type(error)])
@@ -522,7 +764,7 @@ class ProblemGradeReport(object):
         graded_scorable_blocks = cls._graded_scorable_blocks_to_header(course)
 
         # Just generate the static fields for now.
-        rows = [list(header_row.values()) + ['Enrollment Status', 'Grade'] + _flatten(graded_scorable_blocks.values())]
+        header = list(header_row.values()) + ['Enrollment Status', 'Grade'] + _flatten(graded_scorable_blocks.values())
         error_rows = [list(header_row.values()) + ['error_msg']]
         current_step = {'step': 'Calculating Grades'}
 
@@ -530,42 +772,54 @@ class ProblemGradeReport(object):
         # whether each user is currently enrolled in the course.
         CourseEnrollment.bulk_fetch_enrollment_states(enrolled_students, course_id)
 
-        for student, course_grade, error in CourseGradeFactory().iter(enrolled_students, course):
-            student_fields = [getattr(student, field_name) for field_name in header_row]
-            task_progress.attempted += 1
-
-            if not course_grade:
-                err_msg = text_type(error)
-                # There was an error grading this student.
-                if not err_msg:
-                    err_msg = u'Unknown error'
-                error_rows.append(student_fields + [err_msg])
-                task_progress.failed += 1
-                continue
-
-            enrollment_status = _user_enrollment_status(student, course_id)
-
-            earned_possible_values = []
-            for block_location in graded_scorable_blocks:
-                try:
-                    problem_score = course_grade.problem_scores[block_location]
-                except KeyError:
-                    earned_possible_values.append([u'Not Available', u'Not Available'])
-                else:
-                    if problem_score.first_attempted:
-                        earned_possible_values.append([problem_score.earned, problem_score.possible])
-                    else:
-                        earned_possible_values.append([u'Not Attempted', problem_score.possible])
+        def success_rows():
+            """
+            Generates a row for each successfully graded student, collecting
+            the rows of the students that could not be graded.
+            """
+            for student, course_grade, error in CourseGradeFactory().iter(enrolled_students, course):
+                student_fields = [getattr(student, field_name) for field_name in header_row]
+                task_progress.attempted += 1
 
-            rows.append(student_fields + [enrollment_status, "{}%".format(course_grade.percent*100)] + _flatten(earned_possible_values))
+                if not course_grade:
+                    err_msg = text_type(error)
+                    # There was an error grading this student.
+                    if not err_msg:
+                        err_msg = u'Unknown error'
+                    error_rows.append(student_fields + [err_msg])
+                    task_progress.failed += 1
+                    continue
 
-            task_progress.succeeded += 1
-            if task_progress.attempted % status_interval == 0:
-                task_progress.update_task_state(extra_meta=current_step)
+                enrollment_status = _user_enrollment_status(student, course_id)
 
-        # Perform the upload if any students have been successfully graded
-        if len(rows) > 1:
-            upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
+                earned_possible_values = []
+                for block_location in graded_scorable_blocks:
+                    try:
+                        problem_score = course_grade.problem_scores[block_location]
+                    except KeyError:
+                        earned_possible_values.append([u'Not Available', u'Not Available'])
+                    else:
+                        if problem_score.first_attempted:
+                            earned_possible_values.append([problem_score.earned, problem_score.possible])
+                        else:
+                            earned_possible_values.append([u'Not Attempted', problem_score.possible])
+
+                task_progress.succeeded += 1
+                if task_progress.attempted % status_interval == 0:
+                    task_progress.update_task_state(extra_meta=current_step)
+
+                yield (
+                    student_fields +
+                    [enrollment_status, "{}%".format(course_grade.percent * 100)] +
+                    _flatten(earned_possible_values)
+                )
+
+        # Perform the upload if any students have been successfully graded,
+        # streaming the rows of the remaining students as they are graded.
+        rows = success_rows()
+        first_row = next(rows, None)
+        if first_row is not None:
+            upload_csv_to_report_store(chain([header, first_row], rows), 'problem_grade_report', course_id, start_date)
         # If there are any error rows, write them out as well
         if len(error_rows) > 1:
             upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
@@ -737,24 +991,18 @@ class ProblemResponses(object):
             usage_key_str=problem_location
         )
 
-        for data in student_data:
-            for key in student_data_keys:
-                data.setdefault(key, '')
-
-        header, rows = format_dictlist(student_data, student_data_keys)
-
-        task_progress.attempted = task_progress.succeeded = len(rows)
-        task_progress.skipped = task_progress.total - task_progress.attempted
-
-        rows.insert(0, header)
+        header, rows = iter_format_dictlist(student_data, student_data_keys, default='')
 
         current_step = {'step': 'Uploading CSV'}
         task_progress.update_task_state(extra_meta=current_step)
 
-        # Perform the upload
+        # Perform the upload, formatting the rows as they are uploaded
         problem_location = re.sub(r'[:/]', '_', problem_location)
         csv_name = 'student_state_from_{}'.format(problem_location)
-        report_name = upload_csv_to_report_store(rows, csv_name, course_id, start_date)
+        report_name = upload_csv_to_report_store(
+            chain([header], count_succeeded_rows(rows, task_progress)), csv_name, course_id, start_date
+        )
+        task_progress.skipped = task_progress.total - task_progress.attempted
         current_step = {'step': 'CSV uploaded', 'report_name': report_name}
 
         return task_progress.update_task_state(extra_meta=current_step)
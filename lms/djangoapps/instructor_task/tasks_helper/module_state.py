@@ -10,8 +10,8 @@ from opaque_keys.edx.keys import UsageKey
 
 from capa.responsetypes import LoncapaProblemError, ResponseError, StudentInputError
 from courseware.courses import get_course_by_id, get_problems_in_section
-from courseware.model_data import DjangoKeyValueStore, FieldDataCache
-from courseware.models import StudentModule
+from courseware.model_data import DjangoKeyValueStore, FieldDataCache, MultiUserFieldDataCache
+from courseware.models import StudentModule, chunks
 from courseware.module_render import get_module_for_descriptor_internal
 from lms.djangoapps.grades.events import GRADES_OVERRIDE_EVENT_TYPE, GRADES_RESCORE_EVENT_TYPE
 from student.models import get_user_by_username_or_email
@@ -19,6 +19,7 @@ from track.event_transaction_utils import create_new_event_transaction_id, set_e
 from track.views import task_track
 from util.db import outer_atomic
 
+from xblock.fields import Scope
 from xblock.runtime import KvsFieldData
 from xblock.scorable import Score
 from xmodule.modulestore.django import modulestore
@@ -29,7 +30,8 @@ from .utils import UNKNOWN_TASK_ID, UPDATE_STATUS_FAILED, UPDATE_STATUS_SKIPPED,
 TASK_LOG = logging.getLogger('edx.celery.task')
 
 
-def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name):
+def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, task_input, action_name,
+                                prefetch_field_data=False):
     """
     Performs generic update by visiting StudentModule instances with the update_fcn provided.
 
@@ -41,6 +43,10 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     on the particular student module failed.
     A raised exception indicates a fatal condition -- that no other student modules should be considered.
 
+    If `prefetch_field_data` is True, the field data of the students is loaded in bulk for chunks of
+    StudentModules, and the `update_fcn` is passed the resulting FieldDataCache as a `field_data_cache`
+    keyword argument.
+
     The return value is a dict containing the task's results, with the following keys:
 
           'attempted': number of attempts made
@@ -86,12 +92,22 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
     task_progress = TaskProgress(action_name, len(modules_to_update), start_time)
     task_progress.update_task_state()
 
-    for module_to_update in modules_to_update:
+    if prefetch_field_data:
+        modules_with_field_data = _iter_modules_with_field_data(course_id, problems.values(), modules_to_update)
+    else:
+        modules_with_field_data = ((module_to_update, None) for module_to_update in modules_to_update)
+
+    for module_to_update, field_data_cache in modules_with_field_data:
         task_progress.attempted += 1
         module_descriptor = problems[unicode(module_to_update.module_state_key)]
         # There is no try here:  if there's an error, we let it throw, and the task will
         # be marked as FAILED, with a stack trace.
-        update_status = update_fcn(module_descriptor, module_to_update, task_input)
+        if field_data_cache is None:
+            update_status = update_fcn(module_descriptor, module_to_update, task_input)
+        else:
+            update_status = update_fcn(
+                module_descriptor, module_to_update, task_input, field_data_cache=field_data_cache
+            )
         if update_status == UPDATE_STATUS_SUCCEEDED:
             # If the update_fcn returns true, then it performed some kind of work.
             # Logging of failures is left to the update_fcn itself.
@@ -107,11 +123,15 @@ def perform_module_state_update(update_fcn, filter_fcn, _entry_id, course_id, ta
 
 
 @outer_atomic
-def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, task_input):
+def rescore_problem_module_state(xmodule_instance_args, module_descriptor, student_module, task_input,
+                                 field_data_cache=None):
     '''
     Takes an XModule descriptor and a corresponding StudentModule object, and
     performs rescoring on the student's problem submission.
 
+    If `field_data_cache` is provided, it is used instead of loading the
+    student's field data for the problem.
+
     Throws exceptions if the rescoring is fatal and should be aborted if in a loop.
     In particular, raises UpdateProblemModuleStateError if module fails to instantiate,
     or if the module doesn't support rescoring.
@@ -135,7 +155,8 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
             module_descriptor,
             xmodule_instance_args,
             grade_bucket_type='rescore',
-            course=course
+            course=course,
+            field_data_cache=field_data_cache
         )
 
         if instance is None:
@@ -194,11 +215,15 @@ def rescore_problem_module_state(xmodule_instance_args, module_descriptor, stude
 
 
 @outer_atomic
-def override_score_module_state(xmodule_instance_args, module_descriptor, student_module, task_input):
+def override_score_module_state(xmodule_instance_args, module_descriptor, student_module, task_input,
+                                field_data_cache=None):
     '''
     Takes an XModule descriptor and a corresponding StudentModule object, and
     performs an override on the student's problem score.
 
+    If `field_data_cache` is provided, it is used instead of loading the
+    student's field data for the problem.
+
     Throws exceptions if the override is fatal and should be aborted if in a loop.
     In particular, raises UpdateProblemModuleStateError if module fails to instantiate,
     or if the module doesn't support overriding, or if the score used for override
@@ -220,7 +245,8 @@ def override_score_module_state(xmodule_instance_args, module_descriptor, studen
             student,
             module_descriptor,
             xmodule_instance_args,
-            course=course
+            course=course,
+            field_data_cache=field_data_cache
         )
 
         if instance is None:
@@ -316,16 +342,19 @@ def delete_problem_module_state(xmodule_instance_args, _module_descriptor, stude
 
 
 def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule_instance_args=None,
-                                  grade_bucket_type=None, course=None):
+                                  grade_bucket_type=None, course=None, field_data_cache=None):
     """
     Fetches a StudentModule instance for a given `course_id`, `student` object, and `module_descriptor`.
 
     `xmodule_instance_args` is used to provide information for creating a track function and an XQueue callback.
     These are passed, along with `grade_bucket_type`, to get_module_for_descriptor_internal, which sidesteps
     the need for a Request object when instantiating an xmodule instance.
+
+    `field_data_cache` is an optional prefetched FieldDataCache for `student`; if None, one is loaded here.
     """
     # reconstitute the problem's corresponding XModule:
-    field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
+    if field_data_cache is None:
+        field_data_cache = FieldDataCache.cache_for_descriptor_descendents(course_id, student, module_descriptor)
     student_data = KvsFieldData(DjangoKeyValueStore(field_data_cache))
 
     # get request-related tracking information from args passthrough, and supplement with task-specific
@@ -361,6 +390,31 @@ def _get_module_instance_for_task(course_id, student, module_descriptor, xmodule
     )
 
 
+def _iter_modules_with_field_data(course_id, problem_descriptors, modules_to_update):
+    """
+    Yields a (StudentModule, FieldDataCache) pair for each of `modules_to_update`.
+
+    The field data of the students is loaded with a MultiUserFieldDataCache, one
+    chunk of StudentModules at a time, so that most of the queries are made per
+    chunk rather than per student.
+
+    Students may change the state of their modules while the modules before theirs
+    are updated, so the state of each module is reloaded, with a single query, right
+    before it's yielded, and its update never writes back a state prefetched with
+    the chunk.
+    """
+    multi_user_cache = MultiUserFieldDataCache.cache_for_descriptor_descendents(course_id, problem_descriptors)
+    for module_chunk in chunks(modules_to_update, multi_user_cache.users_per_chunk):
+        students = {module_to_update.student_id: module_to_update.student for module_to_update in module_chunk}
+        field_data_caches = multi_user_cache.caches_for_users(students.values())
+        for module_to_update in module_chunk:
+            field_data_cache = field_data_caches[module_to_update.student_id]
+            field_data_cache.cache[Scope.user_state].reload_user_states([
+                module_to_update.module_state_key.map_into_course(module_to_update.course_id)
+            ])
+            yield module_to_update, field_data_cache
+
+
 def _get_track_function_for_task(student, xmodule_instance_args=None, source_page='x_module_task'):
     """
     Make a tracking function that logs what happened.
@@ -417,7 +471,7 @@ def _get_modules_to_update(course_id, usage_keys, student_identifier, filter_fcn
     if student:
         module_query_params['student_id'] = student.id
 
-    student_modules = StudentModule.get_state_by_params(**module_query_params)
+    student_modules = StudentModule.get_state_by_params(**module_query_params).select_related('student')
     if filter_fcn is not None:
         student_modules = filter_fcn(student_modules)
 
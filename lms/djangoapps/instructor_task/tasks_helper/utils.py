@@ -24,6 +24,8 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
                 [row1_colum1, row1_colum2, ...],
                 ...
             ]
+            Any iterable of rows may be given, including a generator, in
+            which case the rows are uploaded as they are generated.
         csv_name: Name of the resulting CSV
         course_id: ID of the course
 
@@ -42,6 +44,17 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
     return report_name
 
 
+def count_succeeded_rows(rows, task_progress):
+    """
+    Yields the given rows, counting each one as attempted and succeeded in
+    the given task_progress as it is consumed.
+    """
+    for row in rows:
+        task_progress.attempted += 1
+        task_progress.succeeded += 1
+        yield row
+
+
 def tracker_emit(report_name):
     """
     Emits a 'report.requested' event for the given report.
@@ -1,6 +1,7 @@
 """
 Tests for instructor_task/models.py.
 """
+import codecs
 import copy
 import time
 from cStringIO import StringIO
@@ -51,6 +52,20 @@ class ReportStoreTestMixin(object):
             ['new_file', 'middle_file', 'old_file']
         )
 
+    def test_store_rows_iterator(self):
+        """
+        Test that ReportStore.store_rows() writes rows from a generator.
+        """
+        report_store = self.create_report_store()
+        rows = ([u'row{}'.format(index), u'\u00e9'] for index in range(3))
+        report_store.store_rows(self.course_id, 'rows_file', rows)
+
+        with report_store.storage.open(report_store.path_to(self.course_id, 'rows_file')) as report_file:
+            self.assertEqual(
+                report_file.read(),
+                codecs.BOM_UTF8 + 'row0,\xc3\xa9\r\nrow1,\xc3\xa9\r\nrow2,\xc3\xa9\r\n'
+            )
+
 
 class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, SimpleTestCase):
     """
@@ -1,11 +1,19 @@
 """
 Unit tests for instructor_task subtasks.
 """
+import json
 from uuid import uuid4
 
+from celery.states import SUCCESS
 from mock import Mock, patch
 
-from lms.djangoapps.instructor_task.subtasks import queue_subtasks_for_query
+from lms.djangoapps.instructor_task.models import PROGRESS, InstructorTask
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    all_subtasks_completed,
+    queue_subtasks_for_query,
+    update_subtask_status
+)
 from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskCourseTestCase
 from student.models import CourseEnrollment
@@ -80,3 +88,40 @@ class TestSubtasks(InstructorTaskCourseTestCase):
         self.assertEqual(len(mock_create_subtask_fcn_args[0][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[1][0][0]), 3)
         self.assertEqual(len(mock_create_subtask_fcn_args[2][0][0]), 5)
+
+    def test_final_subtask(self):
+        """
+        Test that a final subtask is tracked with the queued subtasks, and
+        that all_subtasks_completed() only considers the other subtasks.
+        """
+        instructor_task = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='grade_course',
+        )
+        self._enroll_students_in_course(self.course.id, 4)
+        final_subtask_id = str(uuid4())
+        mock_create_subtask_fcn = Mock()
+        queue_subtasks_for_query(
+            entry=instructor_task,
+            action_name='action_name',
+            create_subtask_fcn=mock_create_subtask_fcn,
+            item_querysets=[CourseEnrollment.objects.filter(course_id=self.course.id)],
+            item_fields=[],
+            items_per_task=3,
+            total_num_items=4,
+            final_subtask_id=final_subtask_id,
+        )
+        self.assertEqual(mock_create_subtask_fcn.call_count, 2)
+        subtask_dict = json.loads(InstructorTask.objects.get(pk=instructor_task.id).subtasks)
+        self.assertEqual(subtask_dict['total'], 3)
+        self.assertIn(final_subtask_id, subtask_dict['status'])
+
+        subtask_ids = [call_args[0][1].task_id for call_args in mock_create_subtask_fcn.call_args_list]
+        for subtask_id in subtask_ids:
+            self.assertFalse(all_subtasks_completed(instructor_task.id, excluded_subtask_id=final_subtask_id))
+            update_subtask_status(instructor_task.id, subtask_id, SubtaskStatus(subtask_id, succeeded=1, state=SUCCESS))
+        self.assertTrue(all_subtasks_completed(instructor_task.id, excluded_subtask_id=final_subtask_id))
+        self.assertFalse(all_subtasks_completed(instructor_task.id))
+        self.assertEqual(InstructorTask.objects.get(pk=instructor_task.id).task_state, PROGRESS)
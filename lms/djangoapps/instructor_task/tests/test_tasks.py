@@ -16,6 +16,7 @@ from mock import MagicMock, Mock, patch
 from opaque_keys.edx.locations import i4xEncoder
 
 from course_modes.models import CourseMode
+from courseware.model_data import MultiUserFieldDataCache
 from courseware.models import StudentModule
 from courseware.tests.factories import StudentModuleFactory
 from lms.djangoapps.instructor_task.exceptions import UpdateProblemModuleStateError
@@ -489,6 +490,38 @@ class TestRescoreInstructorTask(TestInstructorTasks):
             action_name='rescored'
         )
 
+    def test_rescoring_prefetches_field_data(self):
+        """
+        Tests that rescoring loads the students' field data in bulk rather than once per student.
+        """
+        mock_instance = MagicMock()
+        getattr(mock_instance, 'rescore').return_value = None
+        mock_instance.has_submitted_answer.return_value = True
+
+        num_students = 10
+        self._create_students_with_state(num_students)
+        task_entry = self._create_input_entry()
+        module_state = 'lms.djangoapps.instructor_task.tasks_helper.module_state'
+        with patch(module_state + '.get_module_for_descriptor_internal', return_value=mock_instance):
+            with patch(module_state + '.FieldDataCache.cache_for_descriptor_descendents') as mock_single_user_cache:
+                with patch.object(
+                    MultiUserFieldDataCache, 'caches_for_users', autospec=True,
+                    side_effect=MultiUserFieldDataCache.caches_for_users,
+                ) as mock_caches_for_users:
+                    self._run_task_with_mock_celery(rescore_problem, task_entry.id, task_entry.task_id)
+
+        self.assertFalse(mock_single_user_cache.called)
+        self.assertEqual(mock_caches_for_users.call_count, 1)
+        self.assert_task_output(
+            output=self.get_task_output(task_entry.id),
+            total=num_students,
+            attempted=num_students,
+            succeeded=num_students,
+            skipped=0,
+            failed=0,
+            action_name='rescored'
+        )
+
 
 @attr(shard=3)
 class TestResetAttemptsInstructorTask(TestInstructorTasks):
@@ -8,16 +8,19 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 
 """
 
+import json
 import os
 import shutil
 import tempfile
 import urllib
 from contextlib import contextmanager
 from datetime import datetime, timedelta
+from uuid import uuid4
 
 import ddt
 import unicodecsv
 from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
+from celery.states import SUCCESS
 from course_modes.models import CourseMode
 from course_modes.tests.factories import CourseModeFactory
 from courseware.tests.factories import InstructorFactory
@@ -57,6 +60,7 @@ from lms.djangoapps.certificates.models import CertificateStatuses, GeneratedCer
 from lms.djangoapps.certificates.tests.factories import CertificateWhitelistFactory, GeneratedCertificateFactory
 from lms.djangoapps.grades.models import PersistentCourseGrade
 from lms.djangoapps.grades.transformer import GradesTransformer
+from lms.djangoapps.instructor_task.tasks import calculate_grades_csv_shard
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_enrollment_report,
@@ -65,8 +69,11 @@ from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_students_csv,
 )
 from lms.djangoapps.instructor_task.tasks_helper.grades import (
+    BULK_COMPUTE_COURSE_GRADES,
     ENROLLED_IN_COURSE,
     NOT_ENROLLED_IN_COURSE,
+    SHARD_GRADE_REPORTS,
+    WAFFLE_SWITCHES,
     CourseGradeReport,
     ProblemGradeReport,
     ProblemResponses,
@@ -76,6 +83,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_course_survey_report,
     upload_ora2_data,
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -155,6 +163,84 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
         self.assertTrue(any('grade_report_err' in item[0] for item in report_store.links_for(self.course.id)))
 
+    @override_settings(GRADE_REPORT_USERS_PER_SHARD=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_grade_report(self, _mock_current_task):
+        """
+        Test that a grade report is generated in shards of users, which are
+        merged into a single report.
+        """
+        students = [self.create_student(u'student{}'.format(index)) for index in range(5)]
+        entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_type='grade_course',
+            task_id=str(uuid4()),
+        )
+
+        with WAFFLE_SWITCHES.override(SHARD_GRADE_REPORTS, active=True):
+            with patch('lms.djangoapps.instructor_task.tasks.calculate_grades_csv_shard.subtask') as mock_subtask:
+                CourseGradeReport.generate(None, entry.id, self.course.id, None, 'graded')
+            # Run the shards in reverse order, to check that the report is merged in order.
+            for call_args in reversed(mock_subtask.call_args_list):
+                calculate_grades_csv_shard.apply(call_args[0][0], task_id=call_args[1]['task_id'])
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual(json.loads(entry.subtasks)['total'], 4)
+        self.assertDictContainsSubset(
+            {'action_name': 'graded', 'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5},
+            json.loads(entry.task_output),
+        )
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+        self.assertEqual(len(links), 1)
+        with report_store.storage.open(report_store.path_to(self.course.id, links[0][0])) as csv_file:
+            self.assertEqual(
+                [row['Username'] for row in unicodecsv.DictReader(csv_file)],
+                [student.username for student in students],
+            )
+        self.assertEqual(report_store.filenames_in(self.course.id, 'grade_report_shards/{}'.format(entry.id)), [])
+
+    @override_settings(GRADE_REPORT_USERS_PER_SHARD=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_grade_report_with_failed_last_shard(self, _mock_current_task):
+        """
+        Test that the shards of a grade report are merged even if the last
+        shard to complete failed, leaving its users out of the report.
+        """
+        students = [self.create_student(u'student{}'.format(index)) for index in range(5)]
+        entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_type='grade_course',
+            task_id=str(uuid4()),
+        )
+
+        with WAFFLE_SWITCHES.override(SHARD_GRADE_REPORTS, active=True):
+            with patch('lms.djangoapps.instructor_task.tasks.calculate_grades_csv_shard.subtask') as mock_subtask:
+                CourseGradeReport.generate(None, entry.id, self.course.id, None, 'graded')
+            # Run the shards in reverse order, failing the last one to run, of the first two users.
+            shard_call_args = list(reversed(mock_subtask.call_args_list))
+            for call_args in shard_call_args[:-1]:
+                calculate_grades_csv_shard.apply(call_args[0][0], task_id=call_args[1]['task_id'])
+            with patch.object(CourseGradeReport, '_batched_rows', side_effect=Exception('Grading failed')):
+                calculate_grades_csv_shard.apply(shard_call_args[-1][0][0], task_id=shard_call_args[-1][1]['task_id'])
+
+        entry.refresh_from_db()
+        self.assertDictContainsSubset(
+            {'action_name': 'graded', 'attempted': 5, 'succeeded': 3, 'failed': 2, 'total': 5},
+            json.loads(entry.task_output),
+        )
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+        self.assertEqual(len(links), 1)
+        with report_store.storage.open(report_store.path_to(self.course.id, links[0][0])) as csv_file:
+            self.assertEqual(
+                [row['Username'] for row in unicodecsv.DictReader(csv_file)],
+                [student.username for student in students[2:]],
+            )
+
     def test_cohort_data_in_grading(self):
         """
         Test that cohort data is included in grades csv if cohort configuration is enabled for course.
@@ -413,7 +499,7 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
 
         RequestCache.clear_all_namespaces()
 
-        expected_query_count = 50
+        expected_query_count = 52
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
             with check_mongo_calls(mongo_count):
                 with self.assertNumQueries(expected_query_count):
@@ -1948,11 +2034,13 @@ class TestGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
             display_name='Empty',
         )
 
-    def test_grade_report(self):
+    @ddt.data(True, False)
+    def test_grade_report(self, bulk_compute_course_grades):
         self.submit_student_answer(self.student.username, u'Problem1', ['Option 1'])
 
         with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
-            result = CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+            with WAFFLE_SWITCHES.override(BULK_COMPUTE_COURSE_GRADES, active=bulk_compute_course_grades):
+                result = CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
 
             self.assertDictContainsSubset(
                 {'action_name': 'graded', 'attempted': 1, 'succeeded': 1, 'failed': 0},
@@ -1986,6 +2074,32 @@ class TestGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
                     self.assertFalse(mock_get_score.called)
                     self.assertFalse(mock_course_blocks.called)
 
+    def test_bulk_computation_without_persisted_course_grade(self):
+        """
+        Test that learners without a persisted course grade are graded
+        without computing their user-specific course structure.
+        """
+        self.submit_student_answer(self.student.username, u'Problem1', ['Option 1'])
+        PersistentCourseGrade.objects.filter(user_id=self.student.id).delete()
+
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+            with WAFFLE_SWITCHES.override(BULK_COMPUTE_COURSE_GRADES, active=True):
+                with patch('lms.djangoapps.grades.course_data.get_course_blocks') as mock_course_blocks:
+                    CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+                    self.assertFalse(mock_course_blocks.called)
+
+        self.verify_rows_in_csv(
+            [
+                {
+                    u'Username': self.student.username,
+                    u'Grade': '0.13',
+                    u'Homework 1: Subsection': '0.5',
+                    u'Homework (Avg)': '0.125',
+                },
+            ],
+            ignore_other_columns=True,
+        )
+
 
 @ddt.ddt
 @patch('lms.djangoapps.instructor_task.tasks_helper.misc.DefaultStorage', new=MockDefaultStorage)
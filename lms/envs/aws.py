@@ -369,6 +369,9 @@ for name, value in ENV_TOKENS.get("CODE_JAIL", {}).items():
         CODE_JAIL[name] = value
 
 COURSES_WITH_UNSAFE_CODE = ENV_TOKENS.get("COURSES_WITH_UNSAFE_CODE", [])
+SAFE_EXEC_PROCESS_CACHE_MAX_BYTES = ENV_TOKENS.get(
+    'SAFE_EXEC_PROCESS_CACHE_MAX_BYTES', SAFE_EXEC_PROCESS_CACHE_MAX_BYTES
+)
 
 ASSET_IGNORE_REGEX = ENV_TOKENS.get('ASSET_IGNORE_REGEX', ASSET_IGNORE_REGEX)
 
@@ -562,6 +565,16 @@ XQUEUE_INTERFACE = AUTH_TOKENS['XQUEUE_INTERFACE']
 # Get the MODULESTORE from auth.json, but if it doesn't exist,
 # use the one from common.py
 MODULESTORE = convert_module_store_setting_if_needed(AUTH_TOKENS.get('MODULESTORE', MODULESTORE))
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES', COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES
+)
+CONTENTSERVER_CHUNK_CACHE_MAX_BYTES = ENV_TOKENS.get(
+    'CONTENTSERVER_CHUNK_CACHE_MAX_BYTES', CONTENTSERVER_CHUNK_CACHE_MAX_BYTES
+)
+CONTENTSERVER_CHUNK_CACHE_DIR = ENV_TOKENS.get('CONTENTSERVER_CHUNK_CACHE_DIR', CONTENTSERVER_CHUNK_CACHE_DIR)
+CONTENTSERVER_ASSET_INDEX_MAX_BYTES = ENV_TOKENS.get(
+    'CONTENTSERVER_ASSET_INDEX_MAX_BYTES', CONTENTSERVER_ASSET_INDEX_MAX_BYTES
+)
 CONTENTSTORE = AUTH_TOKENS.get('CONTENTSTORE', CONTENTSTORE)
 DOC_STORE_CONFIG = AUTH_TOKENS.get('DOC_STORE_CONFIG', DOC_STORE_CONFIG)
 MONGODB_LOG = AUTH_TOKENS.get('MONGODB_LOG', {})
@@ -643,6 +656,7 @@ DISABLE_ACCOUNT_ACTIVATION_REQUIREMENT_SWITCH = ENV_TOKENS.get(
 GRADES_DOWNLOAD_ROUTING_KEY = ENV_TOKENS.get('GRADES_DOWNLOAD_ROUTING_KEY', HIGH_MEM_QUEUE)
 
 GRADES_DOWNLOAD = ENV_TOKENS.get("GRADES_DOWNLOAD", GRADES_DOWNLOAD)
+GRADE_REPORT_USERS_PER_SHARD = ENV_TOKENS.get('GRADE_REPORT_USERS_PER_SHARD', GRADE_REPORT_USERS_PER_SHARD)
 
 # Rate limit for regrading tasks that a grading policy change can kick off
 POLICY_CHANGE_TASK_RATE_LIMIT = ENV_TOKENS.get('POLICY_CHANGE_TASK_RATE_LIMIT', POLICY_CHANGE_TASK_RATE_LIMIT)
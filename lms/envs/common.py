@@ -906,6 +906,25 @@ MODULESTORE = {
     }
 }
 
+# Maximum total size, in bytes, of the pickled data of the course structures
+# that each process keeps decoded in memory, in front of the
+# 'course_structure_cache'.  0 means don't keep any.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Maximum total size, in bytes, of the chunks of streamed course assets (those
+# too large for the 'course_assets' cache) that each process keeps, for both
+# full and ranged responses.  The chunks are kept in memory, unless
+# CONTENTSERVER_CHUNK_CACHE_DIR is the path of a local directory in which to
+# keep them, shared by the processes of the host, whose total size the processes
+# also keep within CONTENTSERVER_CHUNK_CACHE_MAX_BYTES.  0 means don't keep any.
+CONTENTSERVER_CHUNK_CACHE_MAX_BYTES = 64 * 1024 * 1024
+CONTENTSERVER_CHUNK_CACHE_DIR = None
+
+# Maximum total size, in bytes, of the indexes of course asset metadata that
+# each process mirrors from the 'course_assets' cache, so that the contentserver
+# can check assets without querying the contentstore.  0 disables the index.
+CONTENTSERVER_ASSET_INDEX_MAX_BYTES = 16 * 1024 * 1024
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -919,6 +938,14 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Pool of pre-started sandbox workers, see capa.safe_exec.pool.
+    'pool': {
+        # How many workers does each process keep running?  0 means don't pool.
+        'size': 0,
+        # How many executions does a worker run before it is replaced?
+        'max_executions': 100,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -931,6 +958,10 @@ CODE_JAIL = {
 #   ]
 COURSES_WITH_UNSAFE_CODE = []
 
+# Maximum total size, in bytes, of the sandboxed execution results that each
+# process keeps in memory, in front of the shared cache.
+SAFE_EXEC_PROCESS_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
 ############################### DJANGO BUILT-INS ###############################
 # Change DEBUG in your environment settings files, not here
 DEBUG = False
@@ -1954,6 +1985,10 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Backend storage options
     PRUNING_ACTIVE=False,
+
+    # Maximum total size, in bytes, of the serialized block structures
+    # held in each process when the process_local_cache switch is on.
+    PROCESS_CACHE_MAX_BYTES=100 * 1024 * 1024,
 )
 
 ################################ Bulk Email ###################################
@@ -2081,7 +2116,7 @@ INSTALLED_APPS = [
     'openedx.core.djangoapps.plugin_api',
 
     # For content serving
-    'openedx.core.djangoapps.contentserver',
+    'openedx.core.djangoapps.contentserver.apps.ContentServerConfig',
 
     # Site configuration for theming and behavioral modification
     'openedx.core.djangoapps.site_configuration',
@@ -2621,6 +2656,10 @@ GRADES_DOWNLOAD = {
     'ROOT_PATH': '/tmp/edx-s3/grades',
 }
 
+# Maximum number of users graded by each subtask of a grade report, when the
+# instructor_task.shard_grade_reports waffle switch is enabled.
+GRADE_REPORT_USERS_PER_SHARD = 5000
+
 FINANCIAL_REPORTS = {
     'STORAGE_TYPE': 'localfs',
     'BUCKET': 'edx-financial-reports',
@@ -218,6 +218,9 @@ CACHES = {
     },
 }
 
+# Tests count the structures loaded from the modulestore.
+COURSE_STRUCTURE_PROCESS_CACHE_MAX_BYTES = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
@@ -29,6 +29,23 @@ def update_course_in_cache(course_key):
     return get_block_structure_manager(course_key).update_collected_if_needed()
 
 
+def update_course_in_cache_incrementally(course_key, changed_usage_keys, from_version, to_version):
+    """
+    A higher order function implemented on top of the
+    block_structure.update_collected_incrementally function that updates
+    the block structure in the cache for the given course_key by
+    re-collecting only the blocks affected by the given changed blocks,
+    which changed between the given versions of the course.
+    """
+    return get_block_structure_manager(course_key).update_collected_incrementally(
+        # Map the keys into the course, since keys of old Mongo courses
+        # do not include the run when serialized.
+        [usage_key.map_into_course(course_key) for usage_key in changed_usage_keys],
+        from_version,
+        to_version,
+    )
+
+
 def clear_course_from_cache(course_key):
     """
     A higher order function implemented on top of the
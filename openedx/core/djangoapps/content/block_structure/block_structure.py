@@ -3,6 +3,7 @@ Module with family of classes for block structures.
     BlockStructure - responsible for block existence and relations.
     BlockStructureBlockData - responsible for block & transformer data.
     BlockStructureModulestoreData - responsible for xBlock data.
+    BlockStructureIncrementalData - responsible for partial re-collection.
 
 The following internal data structures are implemented:
     _BlockRelations - Data structure for a single block's relations.
@@ -750,6 +751,19 @@ class BlockStructureBlockData(BlockStructure):
             raise TransformerException('Version attributes are not set on transformer {0}.', transformer.name())
         self.set_transformer_data(transformer, TRANSFORMER_VERSION_KEY, transformer.WRITE_VERSION)
 
+    def _retain_transformers(self, transformers):
+        """
+        Removes the data collected by all transformers other than the
+        given ones from the block structure.
+        """
+        transformer_names = {transformer.name() for transformer in transformers}
+        for transformer_data in [self.transformer_data] + [
+            block_data.transformer_data for block_data in self._block_data_map.itervalues()
+        ]:
+            for transformer_name in transformer_data.keys():
+                if transformer_name not in transformer_names:
+                    del transformer_data[transformer_name]
+
     def _get_or_create_block(self, usage_key):
         """
         Returns the BlockData associated with the given usage_key.
@@ -796,6 +810,9 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         Contrast this with each transformer collecting the same xBlock
         data within its own transformer data storage.
 
+        Requested fields with content scope should also be declared in
+        the Transformer's DEFINITION_FIELDS.
+
         Arguments:
             field_names (list(string)) - A list of names of common
                 xBlock fields whose values should be collected.
@@ -858,3 +875,100 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         """
         if hasattr(xblock, field_name):
             setattr(block_data, field_name, getattr(xblock, field_name))
+
+
+class BlockStructureIncrementalData(BlockStructureModulestoreData):
+    """
+    Subclass of BlockStructureModulestoreData that is used to re-collect
+    data for only some of the blocks of a previously collected block
+    structure, whose relations have not changed.
+
+    The structure starts out with the relations, block data and
+    transformer data of the previously collected block structure.  Its
+    traversals and iterators only yield the blocks that are to be
+    re-collected, so Transformers' collect methods can remain agnostic
+    of whether they are collecting the entire structure or not.
+    """
+    def __init__(self, root_block_usage_key, collected_block_structure, modulestore):
+        super(BlockStructureIncrementalData, self).__init__(root_block_usage_key)
+        self._block_relations = collected_block_structure._block_relations  # pylint: disable=protected-access
+        self._block_data_map = collected_block_structure._block_data_map  # pylint: disable=protected-access
+        self.transformer_data = collected_block_structure.transformer_data
+
+        # The modulestore from which xBlocks are loaded on demand.
+        self._modulestore = modulestore
+
+        # Set of usage keys of the blocks that are to be re-collected.
+        # set(UsageKey)
+        self._blocks_to_collect = set()
+
+    def get_block_keys(self):
+        """
+        Returns the block keys of the blocks that are to be re-collected.
+        """
+        return (usage_key for usage_key in self._block_relations if usage_key in self._blocks_to_collect)
+
+    def topological_traversal(self, *args, **kwargs):
+        """
+        Performs a topological sort of the entire block structure and
+        yields the usage_key of each block that is to be re-collected.
+        """
+        return self._filter_blocks_to_collect(
+            super(BlockStructureIncrementalData, self).topological_traversal(*args, **kwargs)
+        )
+
+    def post_order_traversal(self, *args, **kwargs):
+        """
+        Performs a post-order sort of the entire block structure and
+        yields the usage_key of each block that is to be re-collected.
+        """
+        return self._filter_blocks_to_collect(
+            super(BlockStructureIncrementalData, self).post_order_traversal(*args, **kwargs)
+        )
+
+    def get_xblock(self, usage_key):
+        """
+        Returns the instantiated xBlock for the given usage key, loading
+        it from the modulestore if it wasn't loaded yet.
+
+        Since any xBlock that is loaded is up-to-date, the requested
+        xBlock fields of all loaded xBlocks are re-collected.
+        """
+        try:
+            return self._xblock_map[usage_key]
+        except KeyError:
+            xblock = self._modulestore.get_item(usage_key)
+            self._add_xblock(usage_key, xblock)
+            return xblock
+
+    #--- Internal methods ---#
+    # To be used within the block_structure framework or by tests.
+
+    def _load_subtree(self, usage_key):
+        """
+        Loads the xBlocks of the given block and of all its descendants
+        with a single modulestore query, unless the block was already
+        loaded.
+        """
+        if usage_key in self._xblock_map:
+            return
+        xblocks = [self._modulestore.get_item(usage_key, depth=None, lazy=False)]
+        while xblocks:
+            xblock = xblocks.pop()
+            if xblock.location not in self._xblock_map:
+                self._add_xblock(xblock.location, xblock)
+                xblocks.extend(xblock.get_children())
+
+    def _add_blocks_to_collect(self, usage_keys):
+        """
+        Adds the given usage keys to the set of blocks to be re-collected.
+        """
+        self._blocks_to_collect.update(usage_keys)
+
+    def _filter_blocks_to_collect(self, usage_keys):
+        """
+        Yields those of the given usage keys that are to be re-collected.
+        """
+        for usage_key in usage_keys:
+            if usage_key in self._blocks_to_collect:
+                yield usage_key
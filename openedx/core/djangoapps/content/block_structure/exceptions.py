@@ -32,6 +32,14 @@ class TransformerDataIncompatible(BlockStructureException):
     pass
 
 
+class IncrementalCollectNotPossible(BlockStructureException):
+    """
+    Exception for when a Block Structure cannot be re-collected
+    incrementally and needs to be collected in its entirety.
+    """
+    pass
+
+
 class BlockStructureNotFound(BlockStructureException):
     """
     Exception for when a Block Structure is not found.
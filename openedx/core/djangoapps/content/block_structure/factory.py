@@ -1,7 +1,8 @@
 """
 Module for factory class for BlockStructure objects.
 """
-from .block_structure import BlockStructureModulestoreData, BlockStructureBlockData
+from .block_structure import BlockStructureBlockData, BlockStructureIncrementalData, BlockStructureModulestoreData
+from .exceptions import IncrementalCollectNotPossible
 
 
 class BlockStructureFactory(object):
@@ -9,7 +10,7 @@ class BlockStructureFactory(object):
     Factory class for BlockStructure objects.
     """
     @classmethod
-    def create_from_modulestore(cls, root_block_usage_key, modulestore):
+    def create_from_modulestore(cls, root_block_usage_key, modulestore, definition_fields=None):
         """
         Creates and returns a block structure from the modulestore
         starting at the given root_block_usage_key.
@@ -22,6 +23,13 @@ class BlockStructureFactory(object):
                 contains the data for the xBlocks within the block
                 structure starting at root_block_usage_key.
 
+            definition_fields (dict(string, iterable(string))) - A map
+                of block types to the names of the only content fields
+                to load up front for the xBlocks of those types, if not
+                None.  Their other content fields, and those of xBlocks
+                of other types, are loaded on demand by modulestores
+                which support it.
+
         Returns:
             BlockStructureModulestoreData - The created block structure
                 with instantiated xBlocks from the given modulestore
@@ -53,10 +61,88 @@ class BlockStructureFactory(object):
                 block_structure._add_relation(xblock.location, child.location)  # pylint: disable=protected-access
                 build_block_structure(child)
 
-        root_xblock = modulestore.get_item(root_block_usage_key, depth=None, lazy=False)
+        load_kwargs = {}
+        if definition_fields is not None:
+            load_kwargs['definition_fields'] = definition_fields
+        root_xblock = modulestore.get_item(root_block_usage_key, depth=None, lazy=False, **load_kwargs)
         build_block_structure(root_xblock)
         return block_structure
 
+    @classmethod
+    def create_for_incremental_collect(
+            cls,
+            collected_block_structure,
+            changed_usage_keys,
+            modulestore,
+            include_descendants,
+    ):
+        """
+        Creates and returns a block structure for re-collecting the data
+        of only the changed blocks of a previously collected block
+        structure, along with the data of their ancestors and, if
+        requested, of their descendants.
+
+        Arguments:
+            collected_block_structure (BlockStructureBlockData) - The
+                previously collected block structure, which is updated
+                in place by the collect.
+
+            changed_usage_keys (iterable(UsageKey)) - Usage keys of the
+                blocks that changed in the modulestore since the
+                collected_block_structure was collected.  Keys of blocks
+                that are not in the structure are ignored.
+
+            modulestore (ModuleStoreRead) - The modulestore that
+                contains the up-to-date xBlocks.
+
+            include_descendants (bool) - Whether the descendants of the
+                changed blocks are to be re-collected too.
+
+        Returns:
+            BlockStructureIncrementalData - The block structure to collect.
+
+        Raises:
+            IncrementalCollectNotPossible - If the children of any of
+                the changed blocks changed, since the relations of the
+                structure cannot be incrementally updated.
+        """
+        root_block_usage_key = collected_block_structure.root_block_usage_key
+        block_structure = BlockStructureIncrementalData(
+            root_block_usage_key,
+            collected_block_structure,
+            modulestore,
+        )
+        changed_usage_keys = {
+            usage_key for usage_key in changed_usage_keys
+            if usage_key in collected_block_structure
+        }
+
+        if include_descendants:
+            # Load each changed subtree at once, starting from the
+            # topmost changed blocks.
+            for usage_key in collected_block_structure.topological_traversal():
+                if usage_key in changed_usage_keys:
+                    block_structure._load_subtree(usage_key)  # pylint: disable=protected-access
+
+        for usage_key in changed_usage_keys:
+            xblock = block_structure.get_xblock(usage_key)
+            if list(getattr(xblock, 'children', [])) != block_structure.get_children(usage_key):
+                raise IncrementalCollectNotPossible(
+                    'Children of {} changed since the structure was collected.'.format(usage_key)
+                )
+
+        blocks_to_collect = {root_block_usage_key}
+        blocks_to_collect.update(_reachable_blocks(changed_usage_keys, block_structure.get_parents))
+        if include_descendants:
+            blocks_to_collect.update(_reachable_blocks(changed_usage_keys, block_structure.get_children))
+        block_structure._add_blocks_to_collect(blocks_to_collect)  # pylint: disable=protected-access
+
+        # Load all xBlocks to re-collect, so their requested xBlock
+        # fields are re-collected even if no transformer accesses them.
+        for usage_key in blocks_to_collect:
+            block_structure.get_xblock(usage_key)
+        return block_structure
+
     @classmethod
     def create_from_store(cls, root_block_usage_key, block_structure_store):
         """
@@ -95,3 +181,18 @@ class BlockStructureFactory(object):
         block_structure.transformer_data = transformer_data
         block_structure._block_data_map = block_data_map  # pylint: disable=protected-access
         return block_structure
+
+
+def _reachable_blocks(start_keys, get_related):
+    """
+    Returns the set of the given start_keys and of all the blocks that
+    are reachable from them through the given get_related accessor.
+    """
+    reachable = set()
+    stack = list(start_keys)
+    while stack:
+        usage_key = stack.pop()
+        if usage_key not in reachable:
+            reachable.add(usage_key)
+            stack.extend(get_related(usage_key))
+    return reachable
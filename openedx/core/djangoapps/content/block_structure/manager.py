@@ -3,14 +3,24 @@ Top-level module for the Block Structure framework with a class for managing
 BlockStructures.
 """
 from contextlib import contextmanager
+from logging import getLogger
 
 from . import config
-from .exceptions import UsageKeyNotInBlockStructure, TransformerDataIncompatible, BlockStructureNotFound
+from .exceptions import (
+    BlockStructureNotFound,
+    IncrementalCollectNotPossible,
+    TransformerDataIncompatible,
+    UsageKeyNotInBlockStructure,
+)
 from .factory import BlockStructureFactory
 from .store import BlockStructureStore
+from .transformer import BlockStructureTransformer
 from .transformers import BlockStructureTransformers
 
 
+logger = getLogger(__name__)  # pylint: disable=invalid-name
+
+
 class BlockStructureManager(object):
     """
     Top-level class for managing Block Structures.
@@ -114,6 +124,80 @@ class BlockStructureManager(object):
             if not self.store.is_up_to_date(self.root_block_usage_key, self.modulestore):
                 self._update_collected()
 
+    def update_collected_incrementally(self, changed_usage_keys, from_version, to_version):
+        """
+        The store is updated with transformers data re-collected for only
+        the given changed blocks and the blocks whose data depends on
+        them, only if the data in the store is outdated.
+
+        The entire structure is re-collected instead if the stored data
+        cannot be incrementally updated, such as when the stored data was
+        not collected at from_version, the modulestore is no longer at
+        to_version, the relations of the structure changed or a
+        registered transformer does not support incremental collects.
+
+        Arguments:
+            changed_usage_keys (iterable(UsageKey)) - Usage keys of the
+                blocks that changed in the modulestore between
+                from_version and to_version.
+
+            from_version (unicode) - The version of the modulestore
+                data before the blocks changed.
+
+            to_version (unicode) - The version of the modulestore data
+                after the blocks changed.
+        """
+        with self._bulk_operations():
+            if self.store.is_up_to_date(self.root_block_usage_key, self.modulestore):
+                return
+
+            try:
+                block_structure = self._create_for_incremental_collect(changed_usage_keys, from_version, to_version)
+            except (BlockStructureNotFound, IncrementalCollectNotPossible, TransformerDataIncompatible) as error:
+                logger.info(
+                    "BlockStructure: Collecting entire structure for %s instead of incrementally; %s",
+                    self.root_block_usage_key,
+                    error,
+                )
+                self._update_collected()
+                return
+
+            BlockStructureTransformers.collect(block_structure)
+            self.store.add(block_structure)
+
+    def _create_for_incremental_collect(self, changed_usage_keys, from_version, to_version):
+        """
+        Returns the block structure to collect for incrementally
+        updating the stored block structure with the given changed blocks.
+        """
+        scope = BlockStructureTransformers.incremental_collect_scope()
+        if scope is None:
+            raise IncrementalCollectNotPossible('Not all registered transformers support incremental collects.')
+
+        # The changed blocks are only those between the two versions, so
+        # any other change since the stored data was collected, or since
+        # the blocks changed, would be missed.
+        stored_version = self.store.get_data_version(self.root_block_usage_key)
+        if stored_version is None or stored_version != unicode(from_version):
+            raise IncrementalCollectNotPossible(
+                'The stored data was collected at version {}, not {}.'.format(stored_version, from_version)
+            )
+        current_version = getattr(self.modulestore.get_item(self.root_block_usage_key), 'course_version', None)
+        if current_version is None or unicode(current_version) != unicode(to_version):
+            raise IncrementalCollectNotPossible(
+                'The modulestore data is at version {}, not {}.'.format(current_version, to_version)
+            )
+
+        collected_block_structure = self.store.get(self.root_block_usage_key)
+        BlockStructureTransformers.verify_write_versions(collected_block_structure)
+        BlockStructureTransformers.remove_unregistered(collected_block_structure)
+        return BlockStructureFactory.create_for_incremental_collect(
+            collected_block_structure,
+            changed_usage_keys,
+            self.modulestore,
+            include_descendants=(scope == BlockStructureTransformer.CHANGED_SUBTREES),
+        )
+
     def _update_collected(self):
         """
         The store is updated with newly collected transformers data from
@@ -123,6 +207,7 @@ class BlockStructureManager(object):
             block_structure = BlockStructureFactory.create_from_modulestore(
                 self.root_block_usage_key,
                 self.modulestore,
+                definition_fields=BlockStructureTransformers.definition_fields(),
             )
             BlockStructureTransformers.collect(block_structure)
             self.store.add(block_structure)
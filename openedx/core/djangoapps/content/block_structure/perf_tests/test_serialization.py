@@ -0,0 +1,136 @@
+"""
+Performance test comparing the zpickle and columnar serialization
+formats of collected block structures.
+"""
+from datetime import datetime, timedelta
+import gc
+import os
+import unittest
+
+import ddt
+import psutil
+import pytest
+from opaque_keys.edx.locator import CourseLocator
+from pytz import UTC
+
+from .. import config
+from ..block_structure import BlockStructureBlockData
+from ..store import BlockStructureStore
+from ..tests.helpers import MockCache
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Number of blocks in the generated block structures.
+NUM_BLOCKS = (500, 5000, 20000)
+
+# Number of times each serialized block structure is loaded.
+NUM_LOADS = 20
+
+# Fields read from every block after each load, mimicking a
+# typical course blocks request.
+FIELDS_READ = ('display_name', 'due')
+
+
+class _BenchmarkTransformer(object):
+    """
+    Stand-in transformer under which transformer block data is collected.
+    """
+    @classmethod
+    def name(cls):
+        return 'benchmark'
+
+
+def _make_block_structure(num_blocks):
+    """
+    Returns a block structure of the given number of blocks, shaped
+    like a course (10 children per block) and with collected data
+    resembling that of the registered transformers.
+    """
+    course_key = CourseLocator('org', 'course', 'run')
+    keys = [course_key.make_usage_key('vertical', 'block_{}'.format(index)) for index in range(num_blocks)]
+    block_structure = BlockStructureBlockData(keys[0])
+    for index, usage_key in enumerate(keys):
+        if index:
+            block_structure._add_relation(keys[(index - 1) // 10], usage_key)  # pylint: disable=protected-access
+        block_data = block_structure._get_or_create_block(usage_key)  # pylint: disable=protected-access
+        block_data.display_name = u'Block {}'.format(index)
+        block_data.due = datetime(2020, 1, 1, tzinfo=UTC) + timedelta(hours=index)
+        block_data.graded = bool(index % 2)
+        block_data.format = u'Homework'
+        block_data.group_access = {50: [1, 2]}
+        block_data.visible_to_staff_only = False
+        block_structure.set_transformer_block_field(usage_key, _BenchmarkTransformer, 'merged_start', [None, index])
+        block_structure.set_transformer_block_field(usage_key, _BenchmarkTransformer, 'student_view_data', {
+            u'only_on_web': False,
+            u'encoded_videos': {u'youtube': {u'url': u'https://example.com/{}'.format(index), u'file_size': 0}},
+        })
+    return block_structure
+
+
+def _rss():
+    """
+    Returns the resident set size of the current process.
+    """
+    return psutil.Process(os.getpid()).get_memory_info().rss
+
+
+def _load(store, serialized_data, root_key):
+    """
+    Deserializes the given block structure and reads the fields of a
+    typical request from each of its blocks.
+    """
+    structure = store._deserialize(serialized_data, root_key)  # pylint: disable=protected-access
+    for usage_key in structure:
+        for field_name in FIELDS_READ:
+            structure.get_xblock_field(usage_key, field_name)
+    return structure
+
+
+@ddt.ddt
+@unittest.skip
+class BlockStructureSerializationPerfTest(unittest.TestCase):
+    """
+    Generates timings and memory usage of loading block structures
+    serialized with each of the storage formats.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    @ddt.data(*NUM_BLOCKS)
+    def test_load_timings(self, num_blocks):
+        """
+        Generates the load times of each format, with its size and RSS growth
+        per load in the description of the timings.
+        """
+        if CodeBlockTimer is None:
+            pytest.skip("CodeBlockTimer undefined.")
+
+        block_structure = _make_block_structure(num_blocks)
+        root_key = block_structure.root_block_usage_key
+        for columnar in (False, True):
+            store = BlockStructureStore(MockCache())
+            with config.waffle().override(config.COLUMNAR_SERIALIZATION, active=columnar):
+                serialized_data = store._serialize(block_structure)  # pylint: disable=protected-access
+
+            gc.collect()
+            rss_before = _rss()
+            loaded = [_load(store, serialized_data, root_key) for _ in range(NUM_LOADS)]
+            rss_growth = _rss() - rss_before
+            del loaded
+
+            desc = "BlockStructureSerialization:{}:{}:{} bytes:{} KB RSS".format(
+                'columnar' if columnar else 'zpickle',
+                num_blocks,
+                len(serialized_data),
+                rss_growth // NUM_LOADS // 1024,
+            )
+            with CodeBlockTimer(desc):
+                for _ in range(NUM_LOADS):
+                    with CodeBlockTimer("load"):
+                        _load(store, serialized_data, root_key)
@@ -0,0 +1,513 @@
+"""
+Columnar serialization format for collected BlockStructures.
+
+The default storage format (see BlockStructureStore._serialize) is a
+zlib-compressed pickle of the structure's block relations, transformer
+data and block data map.  Loading it requires unpickling every BlockData
+and TransformerData object of the course, even when the request only
+needs a handful of fields.
+
+The columnar format implemented here instead stores:
+
+    * an interned table of the structure's usage keys,
+    * parent/child adjacency lists as integer indices into that table,
+    * one independently compressed column per xBlock field and per
+      transformer block field, holding the (block index, value) pairs
+      of the blocks that have the field.
+
+Columns are encoded as JSON, with tagged objects for the few non-JSON
+types that collected fields commonly hold (datetimes, opaque keys,
+tuples, sets and dicts with non-string keys).  A column holding a value
+that cannot be encoded this way falls back to a pickled column; only
+that column pays the unpickling cost, and only when it is accessed.
+
+On load, only the key table and the adjacency lists are decoded.  Each
+column is decoded lazily, the first time any block's value for that
+field is read.
+
+Serialized data starts with FORMAT_MAGIC, which lets the store tell this
+format apart from zpickled data, so both formats can be read regardless
+of which one is currently enabled for writing.
+"""
+# pylint: disable=protected-access
+from datetime import date, datetime, timedelta
+import json
+from logging import getLogger
+import struct
+import zlib
+
+import cPickle as pickle
+from opaque_keys.edx.keys import AssetKey, CourseKey, DefinitionKey, UsageKey
+from pytz import UTC
+
+from .block_structure import BlockData, TransformerData, TransformerDataMap, _BlockRelations
+from .factory import BlockStructureFactory
+
+
+logger = getLogger(__name__)  # pylint: disable=invalid-name
+
+
+# Prefix of all data serialized with the columnar format.  The trailing
+# digit is the version of the format; increment it (and keep reading the
+# older versions, if need be) whenever the layout below changes.
+FORMAT_MAGIC = b'BSCOL1'
+
+_HEADER_LENGTH = struct.Struct('>I')
+
+# Codecs of an encoded column.
+_JSON_CODEC = u'json'
+_PICKLE_CODEC = u'pickle'
+
+# Tag key of JSON objects that encode non-JSON types.
+_TAG = u'__t'
+
+_OPAQUE_KEY_CLASSES = {
+    key_class.KEY_TYPE: key_class
+    for key_class in (AssetKey, CourseKey, DefinitionKey, UsageKey)
+}
+
+
+def is_columnar(serialized_data):
+    """
+    Returns whether the given serialized data was serialized
+    with the columnar format.
+    """
+    return serialized_data[:len(FORMAT_MAGIC)] == FORMAT_MAGIC
+
+
+def serialize(block_structure):
+    """
+    Serializes the given block structure with the columnar format.
+
+    Arguments:
+        block_structure (BlockStructureBlockData) - The block structure
+            that is to be serialized.
+
+    Returns:
+        bytes - The serialized data.
+    """
+    keys, index_of = _intern_keys(block_structure)
+    root_course_key = block_structure.root_block_usage_key.course_key
+
+    header = {
+        u'keys': _encode_key_table(keys, root_course_key),
+        u'course_key': unicode(root_course_key),
+        u'relations': _encode_relations(block_structure._block_relations, index_of),
+        u'data_blocks': [index_of[usage_key] for usage_key in block_structure._block_data_map],
+        u'transformer_blocks': {},
+        u'columns': [],
+    }
+    blobs = []
+    offset = [0]
+
+    def add_blob(codec, blob):
+        """
+        Appends the given blob to the payload and returns its directory entry.
+        """
+        entry = [codec, offset[0], len(blob)]
+        blobs.append(blob)
+        offset[0] += len(blob)
+        return entry
+
+    header[u'transformer_data'] = add_blob(*_encode_values(
+        u'transformer_data',
+        {name: data.fields for name, data in block_structure.transformer_data.iteritems()},
+    ))
+
+    for (namespace, field_name), column in _build_columns(block_structure, index_of, header).iteritems():
+        entry = add_blob(*_encode_values(field_name, column))
+        header[u'columns'].append([namespace, field_name] + entry)
+
+    encoded_header = zlib.compress(json.dumps(header, separators=(',', ':')))
+    return b''.join([FORMAT_MAGIC, _HEADER_LENGTH.pack(len(encoded_header)), encoded_header] + blobs)
+
+
+def deserialize(serialized_data, root_block_usage_key):
+    """
+    Deserializes the given columnar data and returns the block structure.
+
+    Only the block keys and relations are decoded eagerly; collected
+    field values are decoded on first access.
+
+    Arguments:
+        serialized_data (bytes) - Data previously returned by serialize.
+
+        root_block_usage_key (UsageKey) - The usage key for the root of
+            the serialized block structure.
+
+    Returns:
+        BlockStructureBlockData - The deserialized block structure.
+    """
+    header_start = len(FORMAT_MAGIC) + _HEADER_LENGTH.size
+    header_length, = _HEADER_LENGTH.unpack_from(serialized_data, len(FORMAT_MAGIC))
+    header = json.loads(zlib.decompress(serialized_data[header_start:header_start + header_length]))
+    columns = _ColumnStore(serialized_data, header_start + header_length, header[u'columns'])
+
+    keys = _decode_key_table(header[u'keys'], CourseKey.from_string(header[u'course_key']))
+    block_relations = _decode_relations(header[u'relations'], keys)
+
+    block_data_list = [None] * len(keys)
+    block_data_map = {}
+    for index in header[u'data_blocks']:
+        block_data = BlockData(keys[index])
+        block_data.fields = _LazyFieldDict(columns, None)
+        block_data_list[index] = block_data
+        block_data_map[keys[index]] = block_data
+
+    for transformer_name, indices in header[u'transformer_blocks'].iteritems():
+        for index in indices:
+            transformer_block_data = TransformerData()
+            transformer_block_data.fields = _LazyFieldDict(columns, transformer_name)
+            block_data_list[index].transformer_data[transformer_name] = transformer_block_data
+
+    transformer_data = TransformerDataMap()
+    for transformer_name, fields in columns.decode(*header[u'transformer_data']).iteritems():
+        transformer_data[transformer_name] = TransformerData()
+        transformer_data[transformer_name].fields = fields
+
+    columns.block_data_list = block_data_list
+    return BlockStructureFactory.create_new(
+        root_block_usage_key,
+        block_relations,
+        transformer_data,
+        block_data_map,
+    )
+
+
+def _intern_keys(block_structure):
+    """
+    Returns the list of all usage keys in the given block structure,
+    along with a map of each usage key to its index in that list.
+    """
+    keys = []
+    index_of = {}
+    for usage_key in _iter_all_keys(block_structure):
+        if usage_key not in index_of:
+            index_of[usage_key] = len(keys)
+            keys.append(usage_key)
+    return keys, index_of
+
+
+def _iter_all_keys(block_structure):
+    """
+    Yields the usage keys of all blocks in the given block structure,
+    which may repeat.
+    """
+    for usage_key, relations in block_structure._block_relations.iteritems():
+        yield usage_key
+        for parent_key in relations.parents:
+            yield parent_key
+        for child_key in relations.children:
+            yield child_key
+    for usage_key in block_structure._block_data_map:
+        yield usage_key
+
+
+def _encode_key_table(keys, root_course_key):
+    """
+    Encodes the given list of usage keys.  Keys in the root's course are
+    encoded as their (block_type, block_id) pair, which is both smaller and
+    much cheaper to decode than the full serialized key.
+    """
+    encoded = []
+    for usage_key in keys:
+        if _is_in_course(usage_key, root_course_key):
+            encoded.append([usage_key.block_type, usage_key.block_id])
+        else:
+            encoded.append(unicode(usage_key))
+    return encoded
+
+
+def _is_in_course(usage_key, course_key):
+    """
+    Returns whether the given usage key can be rebuilt from the given
+    course key and its block type and block id.
+    """
+    try:
+        return usage_key == course_key.make_usage_key(usage_key.block_type, usage_key.block_id)
+    except AttributeError:
+        return False
+
+
+def _decode_key_table(encoded_keys, root_course_key):
+    """
+    Decodes the given key table, as encoded by _encode_key_table.
+    """
+    return [
+        UsageKey.from_string(encoded) if isinstance(encoded, basestring)
+        else root_course_key.make_usage_key(*encoded)
+        for encoded in encoded_keys
+    ]
+
+
+def _encode_relations(block_relations, index_of):
+    """
+    Encodes the given block relations as a list of
+    [block index, parent indices, child indices] entries.
+    """
+    return [
+        [
+            index_of[usage_key],
+            [index_of[parent_key] for parent_key in relations.parents],
+            [index_of[child_key] for child_key in relations.children],
+        ]
+        for usage_key, relations in block_relations.iteritems()
+    ]
+
+
+def _decode_relations(encoded_relations, keys):
+    """
+    Decodes the given block relations, as encoded by _encode_relations.
+    """
+    block_relations = {}
+    for index, parents, children in encoded_relations:
+        relations = _BlockRelations()
+        relations.parents = [keys[parent] for parent in parents]
+        relations.children = [keys[child] for child in children]
+        block_relations[keys[index]] = relations
+    return block_relations
+
+
+def _build_columns(block_structure, index_of, header):
+    """
+    Returns a map of (namespace, field name) to the column of
+    [block indices, values] of that field, where namespace is None for
+    xBlock fields and the transformer's name for transformer block fields.
+
+    Also records in the given header which blocks have data for
+    which transformers.
+    """
+    columns = {}
+
+    def add_to_column(namespace, index, fields):
+        """
+        Adds the given block's field values to their columns.
+        """
+        for field_name, value in fields.iteritems():
+            indices, values = columns.setdefault((namespace, field_name), ([], []))
+            indices.append(index)
+            values.append(value)
+
+    for usage_key, block_data in block_structure._block_data_map.iteritems():
+        index = index_of[usage_key]
+        add_to_column(None, index, block_data.fields)
+        for transformer_name, transformer_block_data in block_data.transformer_data.iteritems():
+            header[u'transformer_blocks'].setdefault(transformer_name, []).append(index)
+            add_to_column(transformer_name, index, transformer_block_data.fields)
+
+    return columns
+
+
+def _encode_values(name, values):
+    """
+    Encodes the given values, with JSON if possible and with
+    pickle otherwise.  Returns a (codec, blob) pair.
+    """
+    try:
+        encoded = json.dumps(_to_json(values), separators=(',', ':'), ensure_ascii=False)
+        return _JSON_CODEC, zlib.compress(encoded.encode('utf-8'))
+    except (TypeError, ValueError, UnicodeError):
+        logger.info("BlockStructure: Falling back to a pickled column for field %s.", name)
+        return _PICKLE_CODEC, zlib.compress(pickle.dumps(values, pickle.HIGHEST_PROTOCOL))
+
+
+def _to_json(value):
+    """
+    Returns the JSON-encodable form of the given value, tagging
+    values of types that JSON does not support.
+
+    Raises:
+        TypeError if the value (or one of its members) is not supported.
+    """
+    # bool and long are covered by int, and unicode by basestring.
+    if value is None or isinstance(value, (basestring, int, long, float)):
+        return value
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if isinstance(value, tuple):
+        return {_TAG: u't', u'v': [_to_json(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        tag = u'fs' if isinstance(value, frozenset) else u's'
+        return {_TAG: tag, u'v': [_to_json(item) for item in value]}
+    if isinstance(value, dict):
+        return {_TAG: u'd', u'v': [[_to_json(key), _to_json(item)] for key, item in value.iteritems()]}
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            return {_TAG: u'dtz', u'v': _datetime_parts(value.astimezone(UTC))}
+        return {_TAG: u'dt', u'v': _datetime_parts(value)}
+    if isinstance(value, date):
+        return {_TAG: u'date', u'v': [value.year, value.month, value.day]}
+    if isinstance(value, timedelta):
+        return {_TAG: u'td', u'v': [value.days, value.seconds, value.microseconds]}
+    if getattr(value, 'KEY_TYPE', None) in _OPAQUE_KEY_CLASSES:
+        return {_TAG: u'k', u't': value.KEY_TYPE, u'v': unicode(value)}
+    raise TypeError("Unsupported type for columnar serialization: {}".format(type(value)))
+
+
+def _datetime_parts(value):
+    """
+    Returns the list of the given datetime's components.
+    """
+    return [value.year, value.month, value.day, value.hour, value.minute, value.second, value.microsecond]
+
+
+def _from_json_object(obj):
+    """
+    object_hook for json.loads that decodes the tagged objects
+    created by _to_json.
+    """
+    tag = obj[_TAG]
+    value = obj[u'v']
+    if tag == u'd':
+        return {key: item for key, item in value}
+    if tag == u't':
+        return tuple(value)
+    if tag == u's':
+        return set(value)
+    if tag == u'fs':
+        return frozenset(value)
+    if tag == u'dtz':
+        return datetime(*value, tzinfo=UTC)
+    if tag == u'dt':
+        return datetime(*value)
+    if tag == u'date':
+        return date(*value)
+    if tag == u'td':
+        return timedelta(*value)
+    if tag == u'k':
+        return _OPAQUE_KEY_CLASSES[obj[u't']].from_string(value)
+    raise ValueError("Unknown tag in columnar data: {}".format(tag))
+
+
+class _ColumnStore(object):
+    """
+    Lazily decodes the columns of serialized columnar data into the
+    fields of the deserialized blocks.
+    """
+    def __init__(self, serialized_data, payload_start, directory):
+        self._data = serialized_data
+        self._payload_start = payload_start
+
+        # Map of (namespace, field name) to the (codec, offset, length)
+        # of the encoded column.
+        self._directory = {
+            (namespace, field_name): (codec, offset, length)
+            for namespace, field_name, codec, offset, length in directory
+        }
+
+        # Set of (namespace, field name) of columns that are decoded.
+        self._loaded = set()
+
+        # List of the deserialized BlockData objects, indexed as the key table.
+        self.block_data_list = []
+
+    def decode(self, codec, offset, length):
+        """
+        Decodes and returns the values of the given blob.
+        """
+        start = self._payload_start + offset
+        blob = zlib.decompress(self._data[start:start + length])
+        if codec == _PICKLE_CODEC:
+            return pickle.loads(blob)
+        return json.loads(blob.decode('utf-8'), object_hook=_from_json_object)
+
+    def load(self, namespace, field_name):
+        """
+        Decodes the column of the given field, if not already decoded,
+        into the fields of the blocks that have the field.
+        """
+        column_id = (namespace, field_name)
+        if column_id in self._loaded:
+            return
+        self._loaded.add(column_id)
+
+        entry = self._directory.get(column_id)
+        if entry is None:
+            return
+
+        indices, values = self.decode(*entry)
+        for index, value in zip(indices, values):
+            block_data = self.block_data_list[index]
+            if namespace is not None:
+                block_data = block_data.transformer_data[namespace]
+            dict.__setitem__(block_data.fields, field_name, value)
+
+    def load_all(self, namespace):
+        """
+        Decodes all columns of the given namespace.
+        """
+        for column_namespace, field_name in self._directory:
+            if column_namespace == namespace:
+                self.load(namespace, field_name)
+
+
+class _LazyFieldDict(dict):
+    """
+    The fields dict of a deserialized BlockData or TransformerData, whose
+    values are decoded from their columns on first access.
+
+    Single-field lookups and updates decode only that field's column, while
+    operations over all fields decode all columns of the dict's namespace
+    first.  Copying or pickling the dict yields a plain dict.
+    """
+    def __init__(self, columns, namespace):
+        super(_LazyFieldDict, self).__init__()
+        self._columns = columns
+        self._namespace = namespace
+
+    def __missing__(self, field_name):
+        self._columns.load(self._namespace, field_name)
+        if dict.__contains__(self, field_name):
+            return dict.__getitem__(self, field_name)
+        raise KeyError(field_name)
+
+    def __contains__(self, field_name):
+        self._columns.load(self._namespace, field_name)
+        return dict.__contains__(self, field_name)
+
+    def __setitem__(self, field_name, value):
+        self._columns.load(self._namespace, field_name)
+        dict.__setitem__(self, field_name, value)
+
+    def __delitem__(self, field_name):
+        self._columns.load(self._namespace, field_name)
+        dict.__delitem__(self, field_name)
+
+    def get(self, field_name, default=None):
+        self._columns.load(self._namespace, field_name)
+        return dict.get(self, field_name, default)
+
+    def has_key(self, field_name):
+        return field_name in self
+
+    def __reduce_ex__(self, protocol):
+        self._columns.load_all(self._namespace)
+        return dict, (dict(self),)
+
+    def __reduce__(self):
+        return self.__reduce_ex__(2)
+
+
+def _make_loading_method(method_name):
+    """
+    Returns a _LazyFieldDict method that decodes all columns of the
+    dict's namespace before delegating to the dict method of the given name.
+    """
+    dict_method = getattr(dict, method_name)
+
+    def loading_method(self, *args, **kwargs):
+        """
+        Decodes all columns, then delegates to the dict method.
+        """
+        self._columns.load_all(self._namespace)  # pylint: disable=protected-access
+        return dict_method(self, *args, **kwargs)
+
+    loading_method.__name__ = method_name
+    return loading_method
+
+
+for _method_name in (
+        '__eq__', '__ne__', '__iter__', '__len__', '__repr__', 'copy', 'items', 'iteritems', 'iterkeys',
+        'itervalues', 'keys', 'pop', 'popitem', 'setdefault', 'update', 'values',
+):
+    setattr(_LazyFieldDict, _method_name, _make_loading_method(_method_name))
@@ -14,11 +14,17 @@ from .tasks import update_course_in_cache_v2
 
 
 @receiver(SignalHandler.course_published)
-def update_block_structure_on_course_publish(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+def update_block_structure_on_course_publish(
+        sender, course_key, structure_diff=None, **kwargs  # pylint: disable=unused-argument
+):
     """
     Catches the signal that a course has been published in the module
     store and creates/updates the corresponding cache entry.
     Ignores publish signals from content libraries.
+
+    When the publish only changed existing blocks, the update is told
+    which blocks changed between which versions of the course, so it
+    can re-collect only what they affect.
     """
     if isinstance(course_key, LibraryLocator):
         return
@@ -26,8 +32,18 @@ def update_block_structure_on_course_publish(sender, course_key, **kwargs):  # p
     if config.waffle().is_enabled(config.INVALIDATE_CACHE_ON_PUBLISH):
         clear_course_from_cache(course_key)
 
+    task_kwargs = dict(course_id=unicode(course_key))
+    # Adding or removing blocks changes the relations of the structure,
+    # which are never updated incrementally.
+    if structure_diff is not None and not structure_diff.added and not structure_diff.removed:
+        task_kwargs.update(
+            changed_usage_keys=[unicode(usage_key) for usage_key in structure_diff.changed],
+            from_version=unicode(structure_diff.old_version),
+            to_version=unicode(structure_diff.new_version),
+        )
+
     update_course_in_cache_v2.apply_async(
-        kwargs=dict(course_id=unicode(course_key)),
+        kwargs=task_kwargs,
         countdown=settings.BLOCK_STRUCTURES_SETTINGS['COURSE_PUBLISH_TASK_DELAY'],
     )
 
@@ -4,9 +4,12 @@ Module for the Storage of BlockStructure objects.
 # pylint: disable=protected-access
 from logging import getLogger
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
+from django.conf import settings
+from edx_django_utils.monitoring import set_custom_metric
 
-from . import config
+from openedx.core.lib.cache_utils import ProcessLRUCache, zpickle, zunpickle
+
+from . import config, serialization
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
@@ -16,6 +19,12 @@ from .transformer_registry import TransformerRegistry
 
 logger = getLogger(__name__)  # pylint: disable=C0103
 
+# Default maximum total size, in bytes, of the serialized block
+# structures held in the process-local cache.
+DEFAULT_PROCESS_CACHE_MAX_BYTES = 100 * 1024 * 1024
+
+_process_cache = None  # pylint: disable=invalid-name
+
 
 class StubModel(object):
     """
@@ -65,6 +74,7 @@ class BlockStructureStore(object):
 
         bs_model = self._update_or_create_model(block_structure, serialized_data)
         self._add_to_cache(serialized_data, bs_model)
+        self._add_to_process_cache(serialized_data, bs_model)
 
     def get(self, root_block_usage_key):
         """
@@ -88,12 +98,15 @@ class BlockStructureStore(object):
             found.
         """
         bs_model = self._get_model(root_block_usage_key)
+        serialized_data = self._get_from_process_cache(bs_model)
 
-        try:
-            serialized_data = self._get_from_cache(bs_model)
-        except BlockStructureNotFound:
-            serialized_data = self._get_from_store(bs_model)
-            self._add_to_cache(serialized_data, bs_model)
+        if serialized_data is None:
+            try:
+                serialized_data = self._get_from_cache(bs_model)
+            except BlockStructureNotFound:
+                serialized_data = self._get_from_store(bs_model)
+                self._add_to_cache(serialized_data, bs_model)
+            self._add_to_process_cache(serialized_data, bs_model)
 
         return self._deserialize(serialized_data, root_block_usage_key)
 
@@ -108,6 +121,7 @@ class BlockStructureStore(object):
         """
         bs_model = self._get_model(root_block_usage_key)
         self._cache.delete(self._encode_root_cache_key(bs_model))
+        process_cache().delete(unicode(bs_model.data_usage_key))
         bs_model.delete()
         logger.info("BlockStructure: Deleted from cache and store; %s.", bs_model)
 
@@ -126,6 +140,19 @@ class BlockStructureStore(object):
 
         return False
 
+    def get_data_version(self, root_block_usage_key):
+        """
+        Returns the version of the modulestore data from which the data
+        in storage for the given key was collected, or None if unknown.
+        """
+        if _is_storage_backing_enabled():
+            try:
+                return self._get_model(root_block_usage_key).data_version
+            except BlockStructureNotFound:
+                pass
+
+        return None
+
     def _get_model(self, root_block_usage_key):
         """
         Returns the model associated with the given key.
@@ -175,6 +202,43 @@ class BlockStructureStore(object):
             raise BlockStructureNotFound(bs_model.data_usage_key)
         return serialized_data
 
+    def _add_to_process_cache(self, serialized_data, bs_model):
+        """
+        Adds the given serialized_data for the given BlockStructureModel
+        to the process-local cache, along with the model's version data.
+        """
+        if _is_process_cache_enabled():
+            process_cache().set(
+                unicode(bs_model.data_usage_key),
+                (self._version_data_of_model(bs_model), serialized_data),
+                size=len(serialized_data),
+            )
+
+    def _get_from_process_cache(self, bs_model):
+        """
+        Returns the serialized data for the given BlockStructureModel
+        from the process-local cache, or None if not found.
+
+        Since the data is only returned if it was cached for the same
+        version data as the given model's, the cache needs no explicit
+        invalidation across processes: once a new version is stored, the
+        entries of all processes are outdated.
+        """
+        if not _is_process_cache_enabled():
+            return None
+
+        cache_key = unicode(bs_model.data_usage_key)
+        cached_value = process_cache().get(cache_key)
+        if cached_value is not None:
+            version_data, serialized_data = cached_value
+            if version_data == self._version_data_of_model(bs_model):
+                set_custom_metric('block_structure_process_cache', 'hit')
+                return serialized_data
+            process_cache().delete(cache_key)
+
+        set_custom_metric('block_structure_process_cache', 'miss')
+        return None
+
     def _get_from_store(self, bs_model):
         """
         Returns the serialized data for the given BlockStructureModel
@@ -191,6 +255,9 @@ class BlockStructureStore(object):
         """
         Serializes the data for the given block_structure.
         """
+        if _is_columnar_serialization_enabled():
+            return serialization.serialize(block_structure)
+
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
@@ -201,7 +268,13 @@ class BlockStructureStore(object):
     def _deserialize(self, serialized_data, root_block_usage_key):
         """
         Deserializes the given data and returns the parsed block_structure.
+
+        Data in either the columnar or the zpickle format is accepted,
+        regardless of which format is currently enabled for writing.
         """
+        if serialization.is_columnar(serialized_data):
+            return serialization.deserialize(serialized_data, root_block_usage_key)
+
         block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
         return BlockStructureFactory.create_new(
             root_block_usage_key,
@@ -254,3 +327,37 @@ def _is_storage_backing_enabled():
     Returns whether storage backing for Block Structures is enabled.
     """
     return config.waffle().is_enabled(config.STORAGE_BACKING_FOR_CACHE)
+
+
+def process_cache():
+    """
+    Returns the process-local cache of serialized block structures,
+    whose hit, miss and eviction counters are available for monitoring
+    through its stats method.
+    """
+    global _process_cache  # pylint: disable=global-statement, invalid-name
+    if _process_cache is None:
+        _process_cache = ProcessLRUCache(
+            max_size=settings.BLOCK_STRUCTURES_SETTINGS.get(
+                'PROCESS_CACHE_MAX_BYTES',
+                DEFAULT_PROCESS_CACHE_MAX_BYTES,
+            ),
+        )
+    return _process_cache
+
+
+def _is_process_cache_enabled():
+    """
+    Returns whether the process-local cache for Block Structures is
+    enabled.  Since cached data is validated against the version data
+    of the stored model, the cache requires storage backing.
+    """
+    return _is_storage_backing_enabled() and config.waffle().is_enabled(config.PROCESS_LOCAL_CACHE)
+
+
+def _is_columnar_serialization_enabled():
+    """
+    Returns whether Block Structures are to be serialized with the
+    columnar format instead of zpickle.
+    """
+    return config.waffle().is_enabled(config.COLUMNAR_SERIALIZATION)
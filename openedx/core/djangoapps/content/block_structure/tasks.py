@@ -2,6 +2,7 @@
 Asynchronous tasks related to the Course Blocks sub-application.
 """
 import logging
+from functools import partial
 
 from capa.responsetypes import LoncapaProblemError
 from celery.task import task
@@ -9,11 +10,15 @@ from django.conf import settings
 from lxml.etree import XMLSyntaxError
 
 from edxval.api import ValInternalError
-from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.keys import CourseKey, UsageKey
 
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from openedx.core.djangoapps.content.block_structure import api
-from openedx.core.djangoapps.content.block_structure.config import STORAGE_BACKING_FOR_CACHE, waffle
+from openedx.core.djangoapps.content.block_structure.config import (
+    INCREMENTAL_COLLECT,
+    STORAGE_BACKING_FOR_CACHE,
+    waffle,
+)
 
 log = logging.getLogger('edx.celery.task')
 
@@ -42,6 +47,16 @@ def update_course_in_cache_v2(self, **kwargs):
         course_id (string) - The string serialized value of the course key.
         with_storage (boolean) - Whether or not storage backing should be
             enabled for the generated block structure(s).
+        changed_usage_keys (list of strings) - The string serialized
+            values of the usage keys of the blocks that changed from
+            from_version to to_version of the course, if known.  When
+            given and incremental collects are enabled, only the
+            affected blocks are collected if the cached data is of
+            from_version.
+        from_version (string) - The version of the course before the
+            blocks changed.
+        to_version (string) - The version of the course after the
+            blocks changed.
     """
     _update_course_in_cache(self, **kwargs)
 
@@ -60,7 +75,18 @@ def _update_course_in_cache(self, **kwargs):
     """
     if kwargs.get('with_storage'):
         waffle().override_for_request(STORAGE_BACKING_FOR_CACHE)
-    _call_and_retry_if_needed(self, api.update_course_in_cache, **kwargs)
+
+    changed_usage_keys = kwargs.get('changed_usage_keys')
+    if changed_usage_keys is not None and 'from_version' in kwargs and waffle().is_enabled(INCREMENTAL_COLLECT):
+        api_method = partial(
+            api.update_course_in_cache_incrementally,
+            changed_usage_keys=[UsageKey.from_string(usage_key) for usage_key in changed_usage_keys],
+            from_version=kwargs['from_version'],
+            to_version=kwargs['to_version'],
+        )
+    else:
+        api_method = api.update_course_in_cache
+    _call_and_retry_if_needed(self, api_method, **kwargs)
 
 
 @block_structure_task()
@@ -1,17 +1,20 @@
 """
 Tests for block_structure_factory.py
 """
+import ddt
 from django.test import TestCase
+from mock import call, patch
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
 from ..store import BlockStructureStore
-from ..exceptions import BlockStructureNotFound
+from ..exceptions import BlockStructureNotFound, IncrementalCollectNotPossible
 from ..factory import BlockStructureFactory
 from .helpers import (
     MockCache, MockModulestoreFactory, ChildrenMapTestMixin
 )
 
 
+@ddt.ddt
 class TestBlockStructureFactory(TestCase, ChildrenMapTestMixin):
     """
     Tests for BlockStructureFactory
@@ -65,3 +68,53 @@ class TestBlockStructureFactory(TestCase, ChildrenMapTestMixin):
             block_structure._block_data_map,  # pylint: disable=protected-access
         )
         self.assert_block_structure(new_structure, self.children_map)
+
+    @ddt.data(
+        ([3], False, {0, 1, 3}),
+        ([1], False, {0, 1}),
+        ([1], True, {0, 1, 3, 4}),
+        ([2, 4], True, {0, 1, 2, 4}),
+        ([], True, {0}),
+        ([100], True, {0}),
+    )
+    @ddt.unpack
+    def test_for_incremental_collect(self, changed_keys, include_descendants, expected_blocks):
+        collected_block_structure = self.create_block_structure(self.children_map)
+        block_structure = BlockStructureFactory.create_for_incremental_collect(
+            collected_block_structure,
+            changed_keys,
+            self.modulestore,
+            include_descendants=include_descendants,
+        )
+        self.assert_block_structure(block_structure, self.children_map)
+        self.assertEqual(set(block_structure.topological_traversal()), expected_blocks)
+        self.assertEqual(set(block_structure.post_order_traversal()), expected_blocks)
+        self.assertEqual(set(block_structure), expected_blocks)
+
+        # xBlocks of blocks that are not re-collected are loaded on demand.
+        self.assertEqual(block_structure.get_xblock(2).location, 2)
+
+    def test_for_incremental_collect_loads_changed_subtrees(self):
+        collected_block_structure = self.create_block_structure(self.children_map)
+        with patch.object(self.modulestore, 'get_item', wraps=self.modulestore.get_item) as mock_get_item:
+            BlockStructureFactory.create_for_incremental_collect(
+                collected_block_structure,
+                [4, 1],
+                self.modulestore,
+                include_descendants=True,
+            )
+        # The subtree of block 1 is loaded at once, including block 4.
+        subtree_loads = [
+            load for load in mock_get_item.call_args_list if load[1].get('depth', 0) is None
+        ]
+        self.assertEqual(subtree_loads, [call(1, depth=None, lazy=False)])
+
+    def test_for_incremental_collect_with_changed_children(self):
+        collected_block_structure = self.create_block_structure([[1, 2], [3], [], [], []])
+        with self.assertRaises(IncrementalCollectNotPossible):
+            BlockStructureFactory.create_for_incremental_collect(
+                collected_block_structure,
+                [1],
+                self.modulestore,
+                include_descendants=True,
+            )
@@ -5,6 +5,7 @@ import ddt
 from django.test import TestCase
 
 from ..block_structure import BlockStructureBlockData
+from ..transformer import BlockStructureTransformer
 from ..config import RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
 from ..exceptions import UsageKeyNotInBlockStructure, BlockStructureNotFound
 from ..manager import BlockStructureManager
@@ -88,6 +89,43 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + unicode(block_key)
 
 
+class TestIncrementalTransformer(TestTransformer1):
+    """
+    Test Transformer class that supports incremental collects and
+    records which blocks it collected.
+    """
+    INCREMENTAL_COLLECT_SCOPE = BlockStructureTransformer.CHANGED_SUBTREES
+    collected_blocks = None
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects block data for the block structure.
+        """
+        super(TestIncrementalTransformer, cls).collect(block_structure)
+        cls.collected_blocks = set(block_structure.topological_traversal())
+
+    @classmethod
+    def name(cls):
+        return TestTransformer1.name()
+
+
+class TestRemovedTransformer(MockTransformer):
+    """
+    Test Transformer class that supports incremental collects and is
+    unregistered after a collect.
+    """
+    INCREMENTAL_COLLECT_SCOPE = BlockStructureTransformer.CHANGED_BLOCKS
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects block data for the block structure.
+        """
+        for block_key in block_structure.topological_traversal():
+            block_structure.set_transformer_block_field(block_key, cls, 'collected', True)
+
+
 @ddt.ddt
 class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
     """
@@ -219,3 +257,119 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
         self.bs_manager.clear()
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         self.assertEquals(TestTransformer1.collect_call_count, 2)
+
+    def enable_storage_backing(self):
+        """
+        Enables storage backing for the cache for the rest of the test.
+        """
+        override = waffle().override(STORAGE_BACKING_FOR_CACHE, active=True)
+        override.__enter__()  # pylint: disable=no-member
+        self.addCleanup(override.__exit__, None, None, None)  # pylint: disable=no-member
+
+    def set_course_version(self, version):
+        """
+        Sets the version of the data in the modulestore.
+        """
+        self.modulestore.get_item(self.block_key_factory(0)).field_map['course_version'] = version
+
+    def update_collected_incrementally(
+            self, changed_block_ids, change_modulestore=None, from_version='v1', with_storage_backing=True
+    ):
+        """
+        Collects the block structure at version v1, optionally calls the
+        given function to change the modulestore, and then calls the
+        manager's update_collected_incrementally method for the given
+        blocks changed from from_version to version v2.
+        """
+        if with_storage_backing:
+            self.enable_storage_backing()
+        self.registered_transformers = [TestIncrementalTransformer()]
+        with mock_registered_transformers(self.registered_transformers):
+            self.set_course_version('v1')
+            self.bs_manager.update_collected_if_needed()
+            if change_modulestore:
+                change_modulestore()
+            self.set_course_version('v2')
+            self.bs_manager.update_collected_incrementally(
+                [self.block_key_factory(block_id) for block_id in changed_block_ids], from_version, 'v2',
+            )
+        self.assertEquals(TestTransformer1.collect_call_count, 2)
+
+    def test_update_collected_incrementally(self):
+        self.update_collected_incrementally([1])
+        self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
+        self.assertEquals(
+            TestIncrementalTransformer.collected_blocks,
+            {self.block_key_factory(block_id) for block_id in (0, 1, 3, 4)},
+        )
+
+    def test_update_collected_incrementally_from_other_version(self):
+        self.update_collected_incrementally([1], from_version='v0')
+        self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
+        self.assertEquals(len(TestIncrementalTransformer.collected_blocks), len(self.children_map))
+
+    def test_update_collected_incrementally_to_other_version(self):
+        self.update_collected_incrementally([1])
+        with mock_registered_transformers(self.registered_transformers):
+            self.set_course_version('v4')
+            self.bs_manager.update_collected_incrementally([self.block_key_factory(1)], 'v2', 'v3')
+        self.assertEquals(TestTransformer1.collect_call_count, 3)
+        self.assertEquals(len(TestIncrementalTransformer.collected_blocks), len(self.children_map))
+
+    def test_update_collected_incrementally_without_storage_backing(self):
+        self.update_collected_incrementally([1], with_storage_backing=False)
+        self.assertEquals(len(TestIncrementalTransformer.collected_blocks), len(self.children_map))
+
+    def test_update_collected_incrementally_with_removed_transformer(self):
+        self.enable_storage_backing()
+        self.set_course_version('v1')
+        with mock_registered_transformers([TestIncrementalTransformer(), TestRemovedTransformer()]):
+            self.bs_manager.update_collected_if_needed()
+        self.set_course_version('v2')
+        with mock_registered_transformers([TestIncrementalTransformer()]):
+            self.bs_manager.update_collected_incrementally([self.block_key_factory(1)], 'v1', 'v2')
+            block_structure = self.bs_manager.get_collected()
+        self.assertEquals(
+            TestIncrementalTransformer.collected_blocks,
+            {self.block_key_factory(block_id) for block_id in (0, 1, 3, 4)},
+        )
+        self.assertEquals(
+            block_structure._get_transformer_data_version(TestRemovedTransformer),  # pylint: disable=protected-access
+            0,
+        )
+        for block_key in block_structure:
+            self.assertIsNone(
+                block_structure.get_transformer_block_field(block_key, TestRemovedTransformer, 'collected')
+            )
+
+    def test_update_collected_incrementally_not_supported(self):
+        self.update_collected_incrementally([1])
+        self.registered_transformers = [TestTransformer1()]
+        with mock_registered_transformers(self.registered_transformers):
+            self.set_course_version('v3')
+            self.bs_manager.update_collected_incrementally([self.block_key_factory(1)], 'v2', 'v3')
+            self.assertEquals(TestTransformer1.collect_call_count, 3)
+            self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
+
+    def test_update_collected_incrementally_with_changed_children(self):
+        def add_child():
+            """
+            Adds a child to a block in the modulestore.
+            """
+            self.modulestore.get_item(self.block_key_factory(4)).children = [self.block_key_factory(2)]
+
+        self.update_collected_incrementally([2, 4], change_modulestore=add_child)
+        self.children_map = [[1, 2], [3, 4], [], [], [2]]
+        self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
+        self.assertEquals(
+            TestIncrementalTransformer.collected_blocks,
+            {self.block_key_factory(block_id) for block_id in range(len(self.children_map))},
+        )
+
+    def test_update_collected_incrementally_when_not_collected(self):
+        self.enable_storage_backing()
+        self.set_course_version('v2')
+        with mock_registered_transformers([TestIncrementalTransformer()]):
+            self.bs_manager.update_collected_incrementally([self.block_key_factory(1)], 'v1', 'v2')
+        self.assertEquals(TestTransformer1.collect_call_count, 1)
+        self.assertEquals(len(TestIncrementalTransformer.collected_blocks), len(self.children_map))
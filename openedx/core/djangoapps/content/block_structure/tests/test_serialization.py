@@ -0,0 +1,129 @@
+"""
+Tests for block_structure/serialization.py
+"""
+from datetime import datetime, timedelta
+import pickle
+from unittest import TestCase
+
+import ddt
+from pytz import UTC
+
+from .. import serialization
+from .helpers import ChildrenMapTestMixin, MockTransformer, UsageKeyFactoryMixin
+
+
+class _UnencodableValue(object):
+    """
+    A picklable value that the JSON codec does not support.
+    """
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+@ddt.ddt
+class TestColumnarSerialization(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the columnar serialization format.
+    """
+    def setUp(self):
+        super(TestColumnarSerialization, self).setUp()
+        self.block_structure = self.create_block_structure(self.DAG_CHILDREN_MAP)
+        for block_index in range(len(self.DAG_CHILDREN_MAP)):
+            block_data = self.block_structure._get_or_create_block(self.block_key_factory(block_index))
+            block_data.display_name = u'Block {}'.format(block_index)
+            block_data.due = datetime(2020, 1, block_index + 1, tzinfo=UTC)
+        self.block_structure._add_transformer(MockTransformer)
+
+    def round_trip(self, block_structure=None):
+        """
+        Serializes and deserializes the given block structure.
+        """
+        block_structure = block_structure or self.block_structure
+        serialized_data = serialization.serialize(block_structure)
+        self.assertTrue(serialization.is_columnar(serialized_data))
+        return serialization.deserialize(serialized_data, block_structure.root_block_usage_key)
+
+    def test_relations(self):
+        self.assert_block_structure(self.round_trip(), self.DAG_CHILDREN_MAP)
+
+    def test_xblock_fields(self):
+        deserialized = self.round_trip()
+        for block_index in range(len(self.DAG_CHILDREN_MAP)):
+            block_key = self.block_key_factory(block_index)
+            for field_name in ('display_name', 'due'):
+                self.assertEqual(
+                    deserialized.get_xblock_field(block_key, field_name),
+                    self.block_structure.get_xblock_field(block_key, field_name),
+                )
+            self.assertIsNone(deserialized.get_xblock_field(block_key, 'nonexistent'))
+
+    @ddt.data(
+        None,
+        True,
+        42,
+        1.5,
+        u'unicode \u2603',
+        [1, [2, 3]],
+        (1, u'two'),
+        {1, 2},
+        frozenset([3]),
+        {1: [2, 3], (4, 5): {u'nested': None}},
+        datetime(2019, 2, 3, 4, 5, 6, 7),
+        datetime(2019, 2, 3, 4, 5, 6, 7, tzinfo=UTC),
+        timedelta(days=1, seconds=2),
+        _UnencodableValue([1]),
+    )
+    def test_transformer_block_field(self, value):
+        block_key = self.block_key_factory(3)
+        self.block_structure.set_transformer_block_field(block_key, MockTransformer, 'test', value)
+        deserialized = self.round_trip()
+        self.assertEqual(deserialized.get_transformer_block_field(block_key, MockTransformer, 'test'), value)
+
+    def test_opaque_key_values(self):
+        block_key = self.block_key_factory(1)
+        self.block_structure.set_transformer_block_field(block_key, MockTransformer, 'key', block_key)
+        self.block_structure.set_transformer_data(MockTransformer, 'course', self.course_key)
+        deserialized = self.round_trip()
+        self.assertEqual(deserialized.get_transformer_block_field(block_key, MockTransformer, 'key'), block_key)
+        self.assertEqual(deserialized.get_transformer_data(MockTransformer, 'course'), self.course_key)
+        self.assertEqual(
+            deserialized.get_transformer_data(MockTransformer, 'course'),
+            self.block_structure.get_transformer_data(MockTransformer, 'course'),
+        )
+
+    def test_lazy_decoding(self):
+        deserialized = self.round_trip()
+        block_data = deserialized[self.block_key_factory(2)]
+        self.assertEqual(dict.__len__(block_data.fields), 0)
+
+        self.assertEqual(block_data.display_name, u'Block 2')
+        self.assertEqual(dict.keys(block_data.fields), ['display_name'])
+
+        self.assertEqual(set(block_data.fields), {'display_name', 'due'})
+
+    def test_override_before_access(self):
+        block_key = self.block_key_factory(4)
+        deserialized = self.round_trip()
+        deserialized.override_xblock_field(block_key, 'display_name', u'Overridden')
+        self.assertEqual(deserialized.get_xblock_field(block_key, 'display_name'), u'Overridden')
+        self.assertEqual(deserialized.get_xblock_field(self.block_key_factory(0), 'display_name'), u'Block 0')
+
+    def test_remove_field_before_access(self):
+        block_key = self.block_key_factory(4)
+        self.block_structure.set_transformer_block_field(block_key, MockTransformer, 'test', 1)
+        deserialized = self.round_trip()
+        deserialized.remove_transformer_block_field(block_key, MockTransformer, 'test')
+        self.assertIsNone(deserialized.get_transformer_block_field(block_key, MockTransformer, 'test'))
+
+    def test_copy_and_pickle(self):
+        deserialized = self.round_trip()
+        for block_structure in (deserialized.copy(), pickle.loads(pickle.dumps(deserialized))):
+            block_data = block_structure[self.block_key_factory(5)]
+            self.assertIs(type(block_data.fields), dict)
+            self.assertEqual(block_data.display_name, u'Block 5')
+
+    def test_reserialize(self):
+        self.assert_block_structure(self.round_trip(self.round_trip()), self.DAG_CHILDREN_MAP)
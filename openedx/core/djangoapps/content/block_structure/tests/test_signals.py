@@ -6,6 +6,7 @@ from mock import patch
 
 from opaque_keys.edx.locator import LibraryLocator, CourseLocator
 from xmodule.modulestore.exceptions import ItemNotFoundError
+from xmodule.modulestore.split_mongo import StructureDiff
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
@@ -80,3 +81,27 @@ class CourseBlocksSignalTest(ModuleStoreTestCase):
     def test_update_only_for_courses(self, key, expect_update_called, mock_update):
         update_block_structure_on_course_publish(sender=None, course_key=key)
         self.assertEqual(mock_update.called, expect_update_called)
+
+    @ddt.data(
+        ((set(), {'chapter'}, set()), True),
+        (({'sequential'}, {'chapter'}, set()), False),
+        ((set(), {'chapter'}, {'sequential'}), False),
+        (None, False),
+    )
+    @ddt.unpack
+    @patch('openedx.core.djangoapps.content.block_structure.tasks.update_course_in_cache_v2.apply_async')
+    def test_update_with_structure_diff(self, structure_diff, expect_changed_usage_keys, mock_update):
+        course_key = CourseLocator(org='org', course='course', run='run')
+        changed_usage_key = course_key.make_usage_key('chapter', 'chapter')
+        if structure_diff is not None:
+            structure_diff = StructureDiff(*[
+                {course_key.make_usage_key(block_type, block_type) for block_type in block_types}
+                for block_types in structure_diff
+            ] + ['old_version', 'new_version'])
+        update_block_structure_on_course_publish(sender=None, course_key=course_key, structure_diff=structure_diff)
+        task_kwargs = mock_update.call_args[1]['kwargs']
+        if expect_changed_usage_keys:
+            self.assertEqual(task_kwargs['changed_usage_keys'], [unicode(changed_usage_key)])
+            self.assertEqual((task_kwargs['from_version'], task_kwargs['to_version']), ('old_version', 'new_version'))
+        else:
+            self.assertNotIn('changed_usage_keys', task_kwargs)
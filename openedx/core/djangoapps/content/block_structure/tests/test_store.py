@@ -1,14 +1,17 @@
 """
 Tests for block_structure/cache.py
 """
+import itertools
+
 import ddt
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 
-from ..config import STORAGE_BACKING_FOR_CACHE, waffle
+from ..config import COLUMNAR_SERIALIZATION, PROCESS_LOCAL_CACHE, STORAGE_BACKING_FOR_CACHE, waffle
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
-from ..store import BlockStructureStore
+from ..models import BlockStructureModel
+from ..store import BlockStructureStore, process_cache
 from .helpers import ChildrenMapTestMixin, UsageKeyFactoryMixin, MockCache, MockTransformer
 
 
@@ -29,6 +32,7 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
 
         self.mock_cache = MockCache()
         self.store = BlockStructureStore(self.mock_cache)
+        process_cache().clear()
 
     def add_transformers(self):
         """
@@ -58,6 +62,19 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
             self.assertIsNotNone(stored_value)
             self.assert_block_structure(stored_value, self.children_map)
 
+    @ddt.data(*itertools.product((True, False), repeat=2))
+    @ddt.unpack
+    def test_add_and_get_across_formats(self, columnar_on_add, columnar_on_get):
+        with waffle().override(COLUMNAR_SERIALIZATION, active=columnar_on_add):
+            self.store.add(self.block_structure)
+        with waffle().override(COLUMNAR_SERIALIZATION, active=columnar_on_get):
+            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+        self.assert_block_structure(stored_value, self.children_map)
+        self.assertEqual(
+            stored_value.get_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test'),
+            '{} val'.format(MockTransformer.name()),
+        )
+
     @ddt.data(True, False)
     def test_delete(self, with_storage_backing):
         with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
@@ -89,3 +106,39 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
         self.assertEquals(self.mock_cache.timeout_from_last_call, 0)
         self.store.add(self.block_structure)
         self.assertEquals(self.mock_cache.timeout_from_last_call, timeout)
+
+    def test_process_cache_hit(self):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with waffle().override(PROCESS_LOCAL_CACHE, active=True):
+                self.store.add(self.block_structure)
+                self.mock_cache.map.clear()
+                stored_value = self.store.get(self.block_structure.root_block_usage_key)
+        self.assert_block_structure(stored_value, self.children_map)
+        self.assertEqual(process_cache().hits, 1)
+        self.assertEqual(self.mock_cache.map, {})
+
+    def test_process_cache_invalidated_by_new_version(self):
+        root_key = self.block_structure.root_block_usage_key
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with waffle().override(PROCESS_LOCAL_CACHE, active=True):
+                self.store.add(self.block_structure)
+                # Mimic another process storing a newer version.
+                BlockStructureModel.objects.filter(data_usage_key=root_key).update(data_version='newer')
+                self.store.get(root_key)
+                self.store.get(root_key)
+        self.assertEqual(process_cache().stats()['hits'], 1)
+        self.assertEqual(process_cache().stats()['entries'], 1)
+
+    def test_process_cache_cleared_on_delete(self):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with waffle().override(PROCESS_LOCAL_CACHE, active=True):
+                self.store.add(self.block_structure)
+                self.store.delete(self.block_structure.root_block_usage_key)
+                self.assertEqual(len(process_cache()), 0)
+                with self.assertRaises(BlockStructureNotFound):
+                    self.store.get(self.block_structure.root_block_usage_key)
+
+    def test_process_cache_requires_storage_backing(self):
+        with waffle().override(PROCESS_LOCAL_CACHE, active=True):
+            self.store.add(self.block_structure)
+        self.assertEqual(len(process_cache()), 0)
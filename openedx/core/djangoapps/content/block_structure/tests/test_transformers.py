@@ -4,6 +4,11 @@ Tests for transformers.py
 from mock import MagicMock, patch
 from unittest import TestCase
 
+from xmodule.modulestore import ModuleStoreEnum
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+from ..api import get_block_structure_manager
 from ..block_structure import BlockStructureModulestoreData
 from ..exceptions import TransformerException, TransformerDataIncompatible
 from ..transformers import BlockStructureTransformers
@@ -82,3 +87,54 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
                 self.transformers.verify_versions(block_structure)
             self.transformers.collect(block_structure)
             self.assertTrue(self.transformers.verify_versions(block_structure))
+
+    def test_definition_fields(self):
+        class DataTransformer(MockTransformer):
+            """
+            Mock transformer that uses the data field.
+            """
+            DEFINITION_FIELDS = {'problem': ('data',), 'html': ('data',)}
+
+        class SettingsTransformer(MockFilteringTransformer):
+            """
+            Mock transformer that uses the data and another field of problems.
+            """
+            DEFINITION_FIELDS = {'problem': ('data', 'markdown')}
+
+        with mock_registered_transformers([DataTransformer(), SettingsTransformer()]):
+            self.assertEqual(
+                BlockStructureTransformers.definition_fields(),
+                {'problem': {'data', 'markdown'}, 'html': {'data'}},
+            )
+
+        with mock_registered_transformers([DataTransformer(), MockTransformer()]):
+            self.assertIsNone(BlockStructureTransformers.definition_fields())
+
+
+class TestRegisteredTransformersCollect(ModuleStoreTestCase):
+    """
+    Test collecting block structures with the registered Transformers.
+    """
+    shard = 2
+
+    def test_collect_loads_definition_fields(self):
+        # All of the registered Transformers declare their DEFINITION_FIELDS.
+        definition_fields = BlockStructureTransformers.definition_fields()
+        self.assertIsNotNone(definition_fields)
+
+        course = CourseFactory.create(default_store=ModuleStoreEnum.Type.split)
+        chapter = ItemFactory.create(parent=course, category='chapter')
+        problem_data = '<problem><stringresponse answer="A"><textline/></stringresponse></problem>'
+        problem = ItemFactory.create(parent=chapter, category='problem', data=problem_data)
+
+        manager = get_block_structure_manager(course.id)
+        manager.clear()
+        with patch.object(manager.modulestore, 'get_item', wraps=manager.modulestore.get_item) as mock_get_item:
+            block_structure = manager.get_collected()
+
+        _, kwargs = mock_get_item.call_args_list[0]
+        self.assertEqual(kwargs['definition_fields'], definition_fields)
+        # The data of blocks is only loaded for the block types whose data is used.
+        self.assertNotIn('chapter', definition_fields)
+        self.assertEqual(definition_fields['problem'], {'data'})
+        self.assertEqual(block_structure.get_xblock(problem.location).data, problem_data)
@@ -55,6 +55,56 @@ class BlockStructureTransformer(object):
     WRITE_VERSION = 0
     READ_VERSION = 0
 
+    # Possible values of INCREMENTAL_COLLECT_SCOPE.
+    #
+    # CHANGED_BLOCKS: The transformer's collected data for a block only
+    # depends on the block itself or on its descendants.  Re-collecting
+    # the changed blocks and their ancestors is sufficient.
+    #
+    # CHANGED_SUBTREES: The transformer percolates data down the
+    # hierarchy, or requests xBlock fields whose values are inherited
+    # from ancestors (see InheritanceMixin), so the data of a block also
+    # depends on its ancestors.  The descendants of the changed blocks
+    # need to be re-collected too.
+    CHANGED_BLOCKS = u'changed_blocks'
+    CHANGED_SUBTREES = u'changed_subtrees'
+
+    # The INCREMENTAL_COLLECT_SCOPE of a Transformer declares which
+    # blocks need to be re-collected when only some blocks of an
+    # already collected structure have changed, without any change in
+    # the relations of the structure.
+    #
+    # During an incremental collect, the collect method is called with
+    # a block structure whose traversals only yield the blocks to be
+    # re-collected, whose get_xblock method loads xBlocks from the
+    # modulestore on demand, and whose block data for all other blocks
+    # is the previously collected data.  The root block is always
+    # re-collected.
+    #
+    # The default value of None declares that the transformer does not
+    # support incremental collects, in which case the entire structure
+    # is always re-collected.
+    #
+    INCREMENTAL_COLLECT_SCOPE = None
+
+    # The DEFINITION_FIELDS of a Transformer declare, as a dict mapping
+    # block types to field names, the xBlock fields with content scope
+    # (stored in the blocks' definitions in the modulestore, like
+    # "data") whose values its collect method uses for blocks of each
+    # type, including the values used by xBlock methods it calls.  When
+    # all registered Transformers declare their DEFINITION_FIELDS, only
+    # those fields of blocks of those types are loaded up front from
+    # the modulestore for the collect, and the others are loaded for
+    # each block if and when they are accessed.  Since a field that is
+    # loaded on access costs a query for each block, the fields used
+    # for all blocks of a type should be declared.
+    #
+    # The default value of None declares that the transformer may use
+    # any content field, in which case the entire definitions are
+    # loaded.
+    #
+    DEFINITION_FIELDS = None
+
     @classmethod
     def name(cls):
         """
@@ -207,3 +257,15 @@ class FilteringTransformerMixin(BlockStructureTransformer):
                 transformer, that is to be transformed in place.
         """
         raise NotImplementedError
+
+
+def merge_definition_fields(*definition_fields_list):
+    """
+    Returns the union of the given DEFINITION_FIELDS declarations, as
+    a dict mapping block types to sets of field names.
+    """
+    merged_definition_fields = {}
+    for definition_fields in definition_fields_list:
+        for block_type, field_names in definition_fields.iteritems():
+            merged_definition_fields.setdefault(block_type, set()).update(field_names)
+    return merged_definition_fields
@@ -5,7 +5,7 @@ import functools
 from logging import getLogger
 
 from .exceptions import TransformerException, TransformerDataIncompatible
-from .transformer import FilteringTransformerMixin
+from .transformer import BlockStructureTransformer, FilteringTransformerMixin, merge_definition_fields
 from .transformer_registry import TransformerRegistry
 
 
@@ -105,6 +105,71 @@ class BlockStructureTransformers(object):
             )
         return True
 
+    @classmethod
+    def verify_write_versions(cls, block_structure):
+        """
+        Verifies that the collected data in the block structure was
+        collected by the current version of each registered Transformer,
+        so it can be updated in place by an incremental collect.
+
+        Raises:
+            TransformerDataIncompatible with information about all
+            Transformers whose data was collected by another version.
+        """
+        mismatched_transformers = [
+            transformer for transformer in TransformerRegistry.get_registered_transformers()
+            if (
+                block_structure._get_transformer_data_version(transformer) !=  # pylint: disable=protected-access
+                transformer.WRITE_VERSION
+            )
+        ]
+        if mismatched_transformers:
+            raise TransformerDataIncompatible(
+                "Collected Block Structure data for the following transformers was collected by another version: '%s'.",
+                [(transformer.name(), transformer.WRITE_VERSION) for transformer in mismatched_transformers],
+            )
+        return True
+
+    @classmethod
+    def remove_unregistered(cls, block_structure):
+        """
+        Removes the collected data of Transformers that are no longer
+        registered from the block structure.
+        """
+        block_structure._retain_transformers(  # pylint: disable=protected-access
+            TransformerRegistry.get_registered_transformers()
+        )
+
+    @classmethod
+    def incremental_collect_scope(cls):
+        """
+        Returns the INCREMENTAL_COLLECT_SCOPE that satisfies all
+        registered Transformers, or None if any of them does not support
+        incremental collects.
+        """
+        scopes = {
+            transformer.INCREMENTAL_COLLECT_SCOPE
+            for transformer in TransformerRegistry.get_registered_transformers()
+        }
+        if None in scopes:
+            return None
+        if BlockStructureTransformer.CHANGED_SUBTREES in scopes:
+            return BlockStructureTransformer.CHANGED_SUBTREES
+        return BlockStructureTransformer.CHANGED_BLOCKS
+
+    @classmethod
+    def definition_fields(cls):
+        """
+        Returns a dict mapping block types to the names of the content
+        fields that all registered Transformers use for blocks of those
+        types during a collect, or None if any of them does not declare
+        its DEFINITION_FIELDS.
+        """
+        transformers = TransformerRegistry.get_registered_transformers()
+        if any(transformer.DEFINITION_FIELDS is None for transformer in transformers):
+            return None
+        return merge_definition_fields(*(transformer.DEFINITION_FIELDS for transformer in transformers))
+
     def transform(self, block_structure):
         """
         The given block structure is transformed by each transformer in the
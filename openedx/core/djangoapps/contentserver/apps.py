@@ -0,0 +1,18 @@
+"""
+Configuration for the contentserver djangoapp.
+"""
+
+from django.apps import AppConfig
+
+
+class ContentServerConfig(AppConfig):
+    """
+    contentserver django app.
+    """
+    name = u'openedx.core.djangoapps.contentserver'
+
+    def ready(self):
+        """
+        Connect signal handlers.
+        """
+        from . import signals  # pylint: disable=unused-variable
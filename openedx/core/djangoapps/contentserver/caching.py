@@ -1,11 +1,35 @@
 """
 Helper functions for caching course assets.
+
+Small assets are cached whole in the Django cache.  Larger assets are cached
+in chunks, in a byte-bounded cache local to the process or host (see
+:class:`AssetChunkCache`), which serves both full and ranged responses.
+
+The metadata of the assets of each course is kept in an index (see
+:class:`AssetIndex`), so that requests can be checked without loading the
+asset they are for.
 """
+import cPickle as pickle
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import time
+from collections import namedtuple
+from uuid import uuid4
+
+from django.conf import settings
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from opaque_keys import InvalidKeyError
 
-from xmodule.contentstore.content import STATIC_CONTENT_VERSION
+from openedx.core.lib.cache_utils import ProcessLRUCache
+from xmodule.contentstore.content import STATIC_CONTENT_VERSION, StaticContentStream
+from xmodule.contentstore.django import contentstore
+from xmodule.exceptions import NotFoundError
+
+log = logging.getLogger(__name__)
 
 # See if there's a "course_assets" cache configured, and if not, fallback to the default cache.
 CONTENT_CACHE = caches['default']
@@ -48,3 +72,396 @@ def del_cached_content(location):
         pass
 
     CONTENT_CACHE.delete_many(locations, version=STATIC_CONTENT_VERSION)
+
+
+# The size of the chunks of the assets in the chunk cache.  This is the default
+# size of GridFS chunks, so that each missing chunk is read from a single one.
+CHUNK_SIZE = 255 * 1024
+
+# The minimum number of seconds between two sweeps of the directory of a
+# DiskChunkStore by the same process.
+DISK_CHUNK_STORE_SWEEP_INTERVAL = 5 * 60
+
+# The prefix of the files chunks are written to before they are complete.
+PARTIAL_CHUNK_FILE_PREFIX = '.partial-'
+
+_chunk_cache = None  # pylint: disable=invalid-name
+
+
+class MemoryChunkStore(object):
+    """
+    Keeps asset chunks in a process-local LRU cache.
+    """
+    def __init__(self, max_size):
+        self._cache = ProcessLRUCache(max_size=max_size)
+
+    def get(self, key):
+        """
+        Returns the chunk stored for the given key, or None.
+        """
+        return self._cache.get(key)
+
+    def set(self, key, data):
+        """
+        Stores the given chunk for the given key.
+        """
+        self._cache.set(key, data)
+
+    def stats(self):
+        """
+        Returns the counters and usage of the store.
+        """
+        return self._cache.stats()
+
+
+class DiskChunkStore(object):
+    """
+    Keeps asset chunks in files in a local directory, which are memory-mapped
+    when read: only the pages of a chunk that are served are read, and all of
+    the processes on the host share the chunks through the OS page cache.
+
+    The files this process wrote or read are deleted, least recently used
+    first, when their total size would exceed max_size.  Since the directory
+    is shared by the processes of the host, and outlives them, the files of all
+    of them are also swept (see sweep) when the store is created, and then at
+    most every sweep_interval seconds as chunks are stored.
+    """
+    def __init__(self, max_size, directory, sweep_interval=DISK_CHUNK_STORE_SWEEP_INTERVAL):
+        self.directory = directory
+        self.sweep_interval = sweep_interval
+        self._index = ProcessLRUCache(max_size=max_size, on_evict=self._remove_file)
+        self._last_sweep = None
+        self.sweep()
+
+    def get(self, key):
+        """
+        Returns the chunk stored for the given key, as a read-only memory map,
+        or None.
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as chunk_file:
+                data = mmap.mmap(chunk_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError):
+            return None
+        self._index.set(key, path, size=len(data))
+        return data
+
+    def set(self, key, data):
+        """
+        Stores the given chunk for the given key.
+        """
+        if len(data) > self._index.max_size:
+            return
+        path = self._path(key)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+        except OSError:
+            # Another process may have just created it.
+            pass
+        try:
+            # Write to a temporary file first, so that readers never see a partial chunk.
+            with tempfile.NamedTemporaryFile(
+                dir=os.path.dirname(path), prefix=PARTIAL_CHUNK_FILE_PREFIX, delete=False
+            ) as chunk_file:
+                chunk_file.write(data)
+            os.rename(chunk_file.name, path)
+        except (IOError, OSError):
+            log.warning(u"Couldn't store asset chunk in %s", path, exc_info=True)
+            return
+        self._index.set(key, path, size=len(data))
+        if time.time() - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+
+    def sweep(self):
+        """
+        Deletes the chunk files in the directory, whichever process wrote them,
+        least recently used first, until their total size is at most max_size.
+        Files are ordered by their last access or modification, whichever is
+        later, so on filesystems which don't record accesses, by their age.
+
+        Partial files left by writers which didn't finish are deleted once they
+        are older than sweep_interval.
+        """
+        self._last_sweep = time.time()
+        chunk_files = []
+        total_size = 0
+        for dirpath, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    # Another process deleted it.
+                    continue
+                last_used = max(stat.st_atime, stat.st_mtime)
+                if filename.startswith(PARTIAL_CHUNK_FILE_PREFIX):
+                    if last_used < self._last_sweep - self.sweep_interval:
+                        self._remove_file(None, path)
+                    continue
+                chunk_files.append((last_used, stat.st_size, path))
+                total_size += stat.st_size
+
+        chunk_files.sort()
+        for _, size, path in chunk_files:
+            if total_size <= self._index.max_size:
+                break
+            self._remove_file(None, path)
+            total_size -= size
+
+    def stats(self):
+        """
+        Returns the counters and usage of the store.
+        """
+        return self._index.stats()
+
+    def _path(self, key):
+        """
+        Returns the path of the file for the given key.
+        """
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    @staticmethod
+    def _remove_file(key, path):  # pylint: disable=unused-argument
+        """
+        Deletes the file of an evicted chunk.
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class AssetChunkCache(object):
+    """
+    A cache of the chunks of streamed assets, keyed by the location and content
+    digest of each asset, so that the chunks of an asset which changes are
+    never served again.
+    """
+    def __init__(self, store, chunk_size=CHUNK_SIZE):
+        """
+        Arguments:
+            store - A MemoryChunkStore or DiskChunkStore.
+            chunk_size (int) - The size of the cached chunks.
+        """
+        self.store = store
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def is_cacheable(content):
+        """
+        Can the chunks of the given content be cached?
+        """
+        return isinstance(content, StaticContentStream) and bool(content.content_digest)
+
+    def stream_data(self, content, first_byte=0, last_byte=None):
+        """
+        Yields the data of the given StaticContentStream between first_byte and
+        last_byte (included, defaults to the last byte), from the cached chunks.
+        Chunks which aren't cached are read from the content's stream, and cached.
+        """
+        if last_byte is None:
+            last_byte = content.length - 1
+        position = first_byte
+        while position <= last_byte:
+            index = position // self.chunk_size
+            chunk_start = index * self.chunk_size
+            chunk = self._get_chunk(content, index)
+            end = min(len(chunk), last_byte - chunk_start + 1)
+            if position - chunk_start >= end:
+                # The asset is shorter than its length says.
+                break
+            yield chunk[position - chunk_start:end]
+            position = chunk_start + end
+
+    def _get_chunk(self, content, index):
+        """
+        Returns the chunk with the given index of the content.
+        """
+        key = u'{}@{}@{}@{}'.format(content.location, content.content_digest, self.chunk_size, index)
+        chunk = self.store.get(key)
+        if chunk is None:
+            first_byte = index * self.chunk_size
+            last_byte = min(first_byte + self.chunk_size, content.length) - 1
+            chunk = b''.join(content.stream_data_in_range(first_byte, last_byte))
+            self.store.set(key, chunk)
+        return chunk
+
+
+def get_chunk_cache():
+    """
+    Returns this process's AssetChunkCache, or None if chunk caching is disabled
+    (CONTENTSERVER_CHUNK_CACHE_MAX_BYTES is 0).  The chunks are kept in memory,
+    unless CONTENTSERVER_CHUNK_CACHE_DIR names a local directory to keep them in.
+    """
+    global _chunk_cache  # pylint: disable=global-statement, invalid-name
+    if _chunk_cache is None:
+        max_size = getattr(settings, 'CONTENTSERVER_CHUNK_CACHE_MAX_BYTES', 0)
+        directory = getattr(settings, 'CONTENTSERVER_CHUNK_CACHE_DIR', None)
+        if not max_size:
+            return None
+        if directory:
+            store = DiskChunkStore(max_size, directory)
+        else:
+            store = MemoryChunkStore(max_size)
+        _chunk_cache = AssetChunkCache(store)
+    return _chunk_cache
+
+
+def stream_content_data(content, first_byte=None, last_byte=None):
+    """
+    Returns an iterator over the data of the given content, or over the bytes
+    between first_byte and last_byte (included), through the chunk cache if
+    it's enabled and can cache the content.
+    """
+    chunk_cache = get_chunk_cache()
+    if chunk_cache is not None and chunk_cache.is_cacheable(content):
+        return chunk_cache.stream_data(content, first_byte or 0, last_byte)
+    if first_byte is None:
+        return content.stream_data()
+    return content.stream_data_in_range(first_byte, last_byte)
+
+
+# The attributes of an asset needed to answer a request for it, other than its data.
+AssetIndexEntry = namedtuple('AssetIndexEntry', 'locked content_digest last_modified_at length content_type')
+
+_asset_index = None  # pylint: disable=invalid-name
+
+
+class AssetIndex(object):
+    """
+    An index of the AssetIndexEntry of each asset and thumbnail of each course,
+    so that the existence, lock, digest and modification date of an asset can be
+    checked without querying the contentstore.
+
+    The index of a course is built with a single query, then kept in the shared
+    CONTENT_CACHE and mirrored in a process-local cache, both keyed by a version
+    of the index held in CONTENT_CACHE.  That version is replaced whenever an
+    asset of the course changes (see invalidate), so every process sees the
+    change on its next request.
+    """
+    def __init__(self, max_size, shared_cache=None):
+        """
+        Arguments:
+            max_size (int) - The maximum total size, in bytes, of the pickled
+                indexes mirrored in this process.
+            shared_cache - The Django cache to keep the indexes in, by default
+                CONTENT_CACHE.
+        """
+        self.shared_cache = shared_cache if shared_cache is not None else CONTENT_CACHE
+        self._mirror = ProcessLRUCache(max_size=max_size)
+
+    def get(self, location):
+        """
+        Returns the AssetIndexEntry of the asset at the given location.
+
+        Raises NotFoundError if the course has no such asset.
+        """
+        index = self.get_course_index(location.course_key)
+        entry = index.get(_asset_index_entry_id(location.block_type, location.block_id))
+        if entry is None:
+            raise NotFoundError(location)
+        return entry
+
+    def get_course_index(self, course_key):
+        """
+        Returns the index of the given course: a dict of AssetIndexEntry by asset.
+        """
+        key = _asset_index_cache_key(
+            u'contentserver.asset_index.{}.{}'.format(_asset_index_course_id(course_key), self._get_version(course_key))
+        )
+        index = self._mirror.get(key)
+        if index is None:
+            index = self.shared_cache.get(key)
+            if index is None:
+                index = self._build(course_key)
+                self.shared_cache.set(key, index)
+            self._mirror.set(key, index, size=len(pickle.dumps(index, pickle.HIGHEST_PROTOCOL)))
+        return index
+
+    def invalidate(self, course_key):
+        """
+        Replaces the version of the index of the given course, so that it's rebuilt
+        by the next request for one of its assets.
+        """
+        self.shared_cache.set(self._version_key(course_key), uuid4().hex)
+
+    def _get_version(self, course_key):
+        """
+        Returns the current version of the index of the given course.
+        """
+        version_key = self._version_key(course_key)
+        version = self.shared_cache.get(version_key)
+        if version is None:
+            # Another process may be doing the same, and only one version may win.
+            self.shared_cache.add(version_key, uuid4().hex)
+            version = self.shared_cache.get(version_key) or uuid4().hex
+        return version
+
+    @staticmethod
+    def _version_key(course_key):
+        """
+        Returns the shared cache key of the version of the index of the given course.
+        """
+        return _asset_index_cache_key(
+            u'contentserver.asset_index_version.{}'.format(_asset_index_course_id(course_key))
+        )
+
+    @staticmethod
+    def _build(course_key):
+        """
+        Returns the index of the given course, read from the contentstore.
+        """
+        all_attrs = contentstore().get_all_content_attrs_for_course(
+            course_key, fields=['locked', 'md5', 'uploadDate', 'length', 'contentType'],
+        )
+        return {
+            _asset_index_entry_id(attrs['asset_key'].block_type, attrs['asset_key'].block_id): AssetIndexEntry(
+                locked=attrs.get('locked', False),
+                content_digest=attrs.get('md5'),
+                last_modified_at=attrs['uploadDate'],
+                length=attrs['length'],
+                content_type=attrs.get('contentType'),
+            )
+            for attrs in all_attrs
+        }
+
+
+def _asset_index_course_id(course_key):
+    """
+    Returns the id of the index of the given course.  Deprecated course keys
+    share the assets of all of their runs, so their run is left out.
+    """
+    if getattr(course_key, 'deprecated', False):
+        return u'{}/{}'.format(course_key.org, course_key.course)
+    return u'{}+{}+{}'.format(course_key.org, course_key.course, course_key.run)
+
+
+def _asset_index_cache_key(key):
+    """
+    Returns a cache key, short and safe for any cache backend, for the given key.
+    """
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _asset_index_entry_id(block_type, block_id):
+    """
+    Returns the id of the entry of an asset in the index of its course.
+    """
+    return u'{}@{}'.format(block_type, block_id)
+
+
+def get_asset_index():
+    """
+    Returns this process's AssetIndex, or None if the index is disabled
+    (CONTENTSERVER_ASSET_INDEX_MAX_BYTES is 0).
+    """
+    global _asset_index  # pylint: disable=global-statement, invalid-name
+    if _asset_index is None:
+        max_size = getattr(settings, 'CONTENTSERVER_ASSET_INDEX_MAX_BYTES', 0)
+        if not max_size:
+            return None
+        _asset_index = AssetIndex(max_size)
+    return _asset_index
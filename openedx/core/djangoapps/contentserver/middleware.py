@@ -16,12 +16,12 @@ from six import text_type
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import StaticContent, StaticContentStream, XASSET_LOCATION_TAG
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 from openedx.core.djangoapps.header_control import force_header_for_response
-from .caching import get_cached_content, set_cached_content
+from .caching import get_asset_index, get_cached_content, set_cached_content, stream_content_data
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -68,14 +68,12 @@ class StaticContentServer(object):
             except (InvalidLocationError, InvalidKeyError):
                 return HttpResponseBadRequest()
 
-            # Attempt to load the asset to make sure it exists, and grab the asset digest
-            # if we're able to load it.
-            actual_digest = None
+            # Look up the asset's metadata to make sure it exists, and grab the asset digest.
             try:
-                content = self.load_asset_from_location(loc)
-                actual_digest = getattr(content, "content_digest", None)
+                metadata = self.load_asset_metadata_from_location(loc)
             except (ItemNotFoundError, NotFoundError):
                 return HttpResponseNotFound()
+            actual_digest = getattr(metadata, "content_digest", None)
 
             # If this was a versioned asset, and the digest doesn't match, redirect
             # them to the actual version.
@@ -100,21 +98,30 @@ class StaticContentServer(object):
                 newrelic.agent.add_custom_parameter('contentserver.from_cdn', is_from_cdn)
 
                 # Check if this content is locked or not.
-                locked = self.is_content_locked(content)
+                locked = self.is_content_locked(metadata)
                 newrelic.agent.add_custom_parameter('contentserver.locked', locked)
 
             # Check that user has access to the content.
-            if not self.is_user_authorized(request, content, loc):
+            if not self.is_user_authorized(request, metadata, loc):
                 return HttpResponseForbidden('Unauthorized')
 
             # Figure out if the client sent us a conditional request, and let them know
             # if this asset has changed since then.
-            last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
+            last_modified_at_str = metadata.last_modified_at.strftime(HTTP_DATE_FORMAT)
             if 'HTTP_IF_MODIFIED_SINCE' in request.META:
                 if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
                 if if_modified_since == last_modified_at_str:
                     return HttpResponseNotModified()
 
+            # Now that we know we have to send it, load the asset itself.
+            if isinstance(metadata, StaticContent):
+                content = metadata
+            else:
+                try:
+                    content = self.load_asset_from_location(loc)
+                except (ItemNotFoundError, NotFoundError):
+                    return HttpResponseNotFound()
+
             # *** File streaming within a byte range ***
             # If a Range is provided, parse Range attribute of the request
             # Add Content-Range in the response if Range is structurally correct
@@ -124,7 +131,7 @@ class StaticContentServer(object):
             response = None
             if request.META.get('HTTP_RANGE'):
                 # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
+                if not isinstance(content, StaticContentStream):
                     content = AssetManager.find(loc, as_stream=True)
 
                 header_value = request.META['HTTP_RANGE']
@@ -151,7 +158,7 @@ class StaticContentServer(object):
 
                         if 0 <= first <= last < content.length:
                             # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                            response = HttpResponse(stream_content_data(content, first, last))
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
@@ -169,7 +176,7 @@ class StaticContentServer(object):
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                response = HttpResponse(stream_content_data(content))
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -268,6 +275,17 @@ class StaticContentServer(object):
 
         return True
 
+    def load_asset_metadata_from_location(self, location):
+        """
+        Returns the metadata of the asset at the given location, from the asset index
+        if it's enabled, or else the asset itself: either way, an object with the
+        locked, content_digest, last_modified_at, length and content_type attributes.
+        """
+        asset_index = get_asset_index()
+        if asset_index is None:
+            return self.load_asset_from_location(location)
+        return asset_index.get(location)
+
     def load_asset_from_location(self, location):
         """
         Loads an asset based on its location, either retrieving it from a cache
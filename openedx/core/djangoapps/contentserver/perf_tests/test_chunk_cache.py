@@ -0,0 +1,89 @@
+"""
+Performance test comparing the throughput of ranged reads of a large asset,
+with and without the contentserver's chunk cache.
+"""
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import ddt
+import pytest
+from django.test.client import Client
+from django.test.utils import override_settings
+from mock import patch
+
+from xmodule.contentstore.content import StaticContent
+from xmodule.contentstore.django import contentstore
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+
+# The dependency below needs to be installed manually from the development.txt file, which doesn't
+# get installed during unit tests!
+try:
+    from code_block_timer import CodeBlockTimer
+except ImportError:
+    CodeBlockTimer = None
+
+# Size of the asset read, in bytes.
+ASSET_SIZE = 100 * 1024 * 1024
+
+# Size of each ranged read, in bytes, like those of video players seeking.
+RANGE_SIZE = 1024 * 1024
+
+# Number of ranged reads timed for each configuration.
+NUM_REQUESTS = 200
+
+
+@ddt.ddt
+@unittest.skip
+class AssetChunkCachePerfTest(ModuleStoreTestCase):
+    """
+    Generates the times taken by ranged reads of a 100 MB asset.
+    """
+
+    # Use this attribute to skip this test on regular unittest CI runs.
+    perf_test = True
+
+    def setUp(self):
+        super(AssetChunkCachePerfTest, self).setUp()
+        self.location = self.store.make_course_key('org', 'perf', 'run').make_asset_key('asset', 'lecture.mp4')
+        contentstore().save(
+            StaticContent(self.location, 'lecture.mp4', 'video/mp4', os.urandom(ASSET_SIZE))
+        )
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    @ddt.data(
+        ('no_cache', 0, False),
+        ('memory', ASSET_SIZE, False),
+        ('disk', ASSET_SIZE, True),
+    )
+    @ddt.unpack
+    def test_ranged_read_throughput(self, name, max_size, on_disk):
+        """
+        Generates the times taken by random ranged reads, reading each range
+        once before timing so that the caches are warm.
+        """
+        if CodeBlockTimer is None:
+            pytest.skip("CodeBlockTimer undefined.")
+
+        client = Client()
+        url = unicode(self.location)
+        ranges = [
+            (first, first + RANGE_SIZE - 1)
+            for first in (random.randrange(0, ASSET_SIZE - RANGE_SIZE) for _ in range(NUM_REQUESTS))
+        ]
+        with override_settings(
+            CONTENTSERVER_CHUNK_CACHE_MAX_BYTES=max_size,
+            CONTENTSERVER_CHUNK_CACHE_DIR=self.directory if on_disk else None,
+        ):
+            with patch('openedx.core.djangoapps.contentserver.caching._chunk_cache', None):
+                for first, last in ranges:
+                    client.get(url, HTTP_RANGE='bytes={}-{}'.format(first, last))
+
+                with CodeBlockTimer("AssetChunkCache:{}".format(name)):
+                    for first, last in ranges:
+                        with CodeBlockTimer("request"):
+                            response = client.get(url, HTTP_RANGE='bytes={}-{}'.format(first, last))
+                        self.assertEqual(response.status_code, 206)
@@ -0,0 +1,18 @@
+"""
+Signal handlers for the contentserver.
+"""
+from django.dispatch import receiver
+
+from xmodule.contentstore.django import ASSET_CHANGED
+
+from .caching import get_asset_index
+
+
+@receiver(ASSET_CHANGED)
+def _invalidate_asset_index(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Makes the contentserver rebuild the asset index of a course whose assets changed.
+    """
+    asset_index = get_asset_index()
+    if asset_index is not None:
+        asset_index.invalidate(course_key)
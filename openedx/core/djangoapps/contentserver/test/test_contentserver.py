@@ -6,27 +6,35 @@ import copy
 import datetime
 import ddt
 import logging
+import os
+import shutil
+import tempfile
 import unittest
+from StringIO import StringIO
 from uuid import uuid4
 
 from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
 from django.test import RequestFactory
 from django.test.client import Client
 from django.test.utils import override_settings
-from mock import patch
+from mock import Mock, patch
 
 from xmodule.contentstore.django import contentstore
-from xmodule.contentstore.content import StaticContent, VERSIONED_ASSETS_PREFIX
+from xmodule.contentstore.content import StaticContent, StaticContentStream, VERSIONED_ASSETS_PREFIX
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.xml_importer import import_course_from_xml
 from xmodule.assetstore.assetmgr import AssetManager
+from xmodule.exceptions import NotFoundError
 from opaque_keys import InvalidKeyError
+from opaque_keys.edx.locator import AssetLocator, CourseLocator
 from xmodule.modulestore.exceptions import ItemNotFoundError
 
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory, AdminFactory
 
+from ..caching import AssetChunkCache, AssetIndex, DiskChunkStore, MemoryChunkStore
 from ..middleware import parse_range_header, HTTP_DATE_FORMAT, StaticContentServer
 
 log = logging.getLogger(__name__)
@@ -285,6 +293,39 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
             first=(self.length_unlocked), last=(self.length_unlocked)))
         self.assertEqual(resp.status_code, 416)
 
+    def test_not_modified_without_loading_asset(self):
+        """
+        Test that conditional requests for unchanged assets are answered from the
+        asset index, without loading the asset.
+        """
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        with patch.object(StaticContentServer, 'load_asset_from_location') as mock_load_asset:
+            resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=resp['Last-Modified'])
+        self.assertEqual(resp.status_code, 304)
+        self.assertFalse(mock_load_asset.called)
+
+    def test_asset_index_invalidation(self):
+        """
+        Test that the asset index follows changes to the assets of the course.
+        """
+        asset_index = AssetIndex(max_size=1024 * 1024, shared_cache=LocMemCache('asset_index', {}))
+        with patch('openedx.core.djangoapps.contentserver.caching._asset_index', asset_index):
+            self.assertFalse(asset_index.get(self.unlocked_asset).locked)
+            self.assertTrue(asset_index.get(self.locked_asset).locked)
+            unknown_asset = self.course_key.make_asset_key('asset', 'no_such_file.gif')
+            with self.assertRaises(NotFoundError):
+                asset_index.get(unknown_asset)
+
+            # The index is read from the caches until an asset changes.
+            with patch.object(self.contentstore, 'get_all_content_attrs_for_course') as mock_get_attrs:
+                asset_index.get(self.unlocked_asset)
+            self.assertFalse(mock_get_attrs.called)
+
+            self.contentstore.set_attr(self.unlocked_asset, 'locked', True)
+            self.addCleanup(self.contentstore.set_attr, self.unlocked_asset, 'locked', False)
+            self.assertTrue(asset_index.get(self.unlocked_asset).locked)
+
     def test_vary_header_sent(self):
         """
         Tests that we're properly setting the Vary header to ensure browser requests don't get
@@ -447,3 +488,113 @@ class ParseRangeHeaderTestCase(unittest.TestCase):
         self.assertRaisesRegexp(
             exception_class, exception_message_regex, parse_range_header, header_value, self.content_length
         )
+
+
+@ddt.ddt
+class AssetChunkCacheTestCase(unittest.TestCase):
+    """
+    Tests for the AssetChunkCache.
+    """
+    DATA = ''.join(chr(index % 256) for index in range(1000))
+
+    def setUp(self):
+        super(AssetChunkCacheTestCase, self).setUp()
+        self.location = AssetLocator(CourseLocator('org', 'course', 'run'), 'asset', 'video.mp4')
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def make_content(self, data=DATA, digest=FAKE_MD5_HASH):
+        """
+        Returns a StaticContentStream of the given data, whose stream counts its reads.
+        """
+        stream = StringIO(data)
+        stream.read = Mock(wraps=stream.read)
+        return StaticContentStream(
+            self.location, 'video.mp4', 'video/mp4', stream, length=len(data), content_digest=digest
+        )
+
+    def make_chunk_cache(self, store_type, max_size=1000):
+        """
+        Returns an AssetChunkCache of 100 byte chunks, with the given type of store.
+        """
+        if store_type == 'disk':
+            store = DiskChunkStore(max_size, self.directory)
+        else:
+            store = MemoryChunkStore(max_size)
+        return AssetChunkCache(store, chunk_size=100)
+
+    @ddt.data('memory', 'disk')
+    def test_stream_data(self, store_type):
+        chunk_cache = self.make_chunk_cache(store_type)
+        self.assertEqual(''.join(chunk_cache.stream_data(self.make_content())), self.DATA)
+
+        # All of the chunks are cached now.
+        content = self.make_content()
+        self.assertEqual(''.join(chunk_cache.stream_data(content)), self.DATA)
+        self.assertEqual(''.join(chunk_cache.stream_data(content, 150, 420)), self.DATA[150:421])
+        self.assertEqual(''.join(chunk_cache.stream_data(content, 999, 999)), self.DATA[999])
+        self.assertFalse(content._stream.read.called)  # pylint: disable=protected-access
+
+    @ddt.data('memory', 'disk')
+    def test_ranges_only_read_their_chunks(self, store_type):
+        chunk_cache = self.make_chunk_cache(store_type)
+        self.assertEqual(''.join(chunk_cache.stream_data(self.make_content(), 150, 250)), self.DATA[150:251])
+        self.assertEqual(chunk_cache.store.stats()['entries'], 2)
+
+    @ddt.data('memory', 'disk')
+    def test_eviction(self, store_type):
+        chunk_cache = self.make_chunk_cache(store_type, max_size=300)
+        self.assertEqual(''.join(chunk_cache.stream_data(self.make_content())), self.DATA)
+        self.assertEqual(chunk_cache.store.stats()['size'], 300)
+        if store_type == 'disk':
+            self.assertEqual(sum(len(files) for _, _, files in os.walk(self.directory)), 3)
+
+    def chunk_files(self):
+        """
+        Returns the names of the chunk files in the directory of the disk stores.
+        """
+        return set(filename for _, _, filenames in os.walk(self.directory) for filename in filenames)
+
+    def test_disk_sweep_on_creation(self):
+        store = DiskChunkStore(1000, self.directory)
+        paths = [store._path(u'chunk{}'.format(index)) for index in range(5)]  # pylint: disable=protected-access
+        for index, path in enumerate(paths):
+            store.set(u'chunk{}'.format(index), 'x' * 100)
+            # Make the chunks used in the order they were stored.
+            os.utime(path, (index, index))
+
+        # Another process's store, with a lower bound, deletes the least recently used chunks.
+        DiskChunkStore(300, self.directory)
+        self.assertEqual(self.chunk_files(), set(os.path.basename(path) for path in paths[2:]))
+
+    def test_disk_sweep_bounds_all_processes(self):
+        stores = [DiskChunkStore(300, self.directory, sweep_interval=0) for _ in range(2)]
+        for index in range(6):
+            stores[index % 2].set(u'chunk{}'.format(index), 'x' * 100)
+        self.assertLessEqual(len(self.chunk_files()), 3)
+
+    def test_disk_sweep_partial_files(self):
+        subdirectory = os.path.join(self.directory, '00')
+        os.makedirs(subdirectory)
+        old_partial_file = os.path.join(subdirectory, '.partial-old')
+        new_partial_file = os.path.join(subdirectory, '.partial-new')
+        for path in (old_partial_file, new_partial_file):
+            with open(path, 'wb') as partial_file:
+                partial_file.write('x' * 100)
+        os.utime(old_partial_file, (0, 0))
+
+        DiskChunkStore(1000, self.directory)
+        self.assertEqual(self.chunk_files(), {'.partial-new'})
+
+    def test_new_digest(self):
+        chunk_cache = self.make_chunk_cache('memory')
+        list(chunk_cache.stream_data(self.make_content()))
+        new_data = self.DATA[::-1]
+        content = self.make_content(new_data, digest='0' * 32)
+        self.assertEqual(''.join(chunk_cache.stream_data(content)), new_data)
+
+    def test_is_cacheable(self):
+        self.assertTrue(AssetChunkCache.is_cacheable(self.make_content()))
+        self.assertFalse(AssetChunkCache.is_cacheable(self.make_content(digest=None)))
+        in_memory_content = StaticContent(self.location, 'video.mp4', 'video/mp4', self.DATA)
+        self.assertFalse(AssetChunkCache.is_cacheable(in_memory_content))
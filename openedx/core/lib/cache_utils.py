@@ -5,6 +5,7 @@ import collections
 import cPickle as pickle
 import functools
 import itertools
+import threading
 import zlib
 
 from django.utils.encoding import force_text
@@ -151,6 +152,120 @@ class process_cached(object):  # pylint: disable=invalid-name
         return functools.partial(self.__call__, obj)
 
 
+class ProcessLRUCache(object):
+    """
+    A process-local, least-recently-used cache whose capacity is bounded
+    by the total size of its values rather than by their number.
+
+    Entries are evicted, least recently used first, whenever adding a value
+    would exceed max_size.  Values larger than max_size are not cached.
+    Hit, miss and eviction counters are kept for monitoring.
+
+    WARNING: Values are shared by all callers in the process and are
+    returned without being copied, so only cache immutable values (such
+    as serialized data) or values that callers never mutate.
+    """
+    def __init__(self, max_size, sizeof=len, on_evict=None):
+        """
+        Arguments:
+            max_size (int) - The maximum total size of the cached values.
+            sizeof (function: value->int) - Function that returns the
+                size of a value, when not given to set.  Defaults to len.
+            on_evict (function: (key, value)->None) - Function called,
+                with the cache's lock held, for each entry evicted to
+                make room for another one.
+        """
+        self.max_size = max_size
+        self._sizeof = sizeof
+        self._on_evict = on_evict
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """
+        Returns the value cached for the given key, marking it as
+        the most recently used; returns default if not found.
+        """
+        with self._lock:
+            try:
+                entry = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, size=None):
+        """
+        Caches the given value for the given key, evicting least
+        recently used entries as needed to stay within max_size.
+        """
+        if size is None:
+            size = self._sizeof(value)
+
+        with self._lock:
+            self._remove(key)
+            if size > self.max_size:
+                return
+            while self._size + size > self.max_size:
+                evicted_key = next(iter(self._entries))
+                evicted_value = self._entries[evicted_key][0]
+                self._remove(evicted_key)
+                self.evictions += 1
+                if self._on_evict is not None:
+                    self._on_evict(evicted_key, evicted_value)
+            self._entries[key] = (value, size)
+            self._size += size
+
+    def delete(self, key):
+        """
+        Removes the given key from the cache, if present.
+        """
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        """
+        Removes all entries from the cache and resets its counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Returns a dict of the cache's counters and current usage.
+        """
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(self._entries),
+            size=self._size,
+            max_size=self.max_size,
+        )
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        """
+        Removes the given key, if present.  Must be called with the lock held.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+
+
 def zpickle(data):
     """Given any data structure, returns a zlib compressed pickled serialization."""
     return zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
@@ -8,7 +8,7 @@ import ddt
 from mock import Mock
 
 from edx_django_utils.cache import RequestCache
-from openedx.core.lib.cache_utils import request_cached
+from openedx.core.lib.cache_utils import ProcessLRUCache, request_cached
 
 
 @ddt.ddt
@@ -295,3 +295,60 @@ class TestRequestCachedDecorator(TestCase):
         result = wrapped(3)
         self.assertEqual(result, 2)
         self.assertEqual(to_be_wrapped.call_count, 2)
+
+
+class TestProcessLRUCache(TestCase):
+    """
+    Test the ProcessLRUCache class.
+    """
+    def setUp(self):
+        super(TestProcessLRUCache, self).setUp()
+        self.cache = ProcessLRUCache(max_size=10)
+
+    def test_get_and_set(self):
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.set('a', 'xyz')
+        self.assertEqual(self.cache.get('a'), 'xyz')
+        self.assertEqual(self.cache.stats()['size'], 3)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set('a', 'aaaa')
+        self.cache.set('b', 'bbbb')
+        self.cache.get('a')
+        self.cache.set('c', 'cccc')
+        self.assertIn('a', self.cache)
+        self.assertNotIn('b', self.cache)
+        self.assertIn('c', self.cache)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(self.cache.stats()['size'], 8)
+
+    def test_replace_and_delete(self):
+        self.cache.set('a', 'aaaa')
+        self.cache.set('a', 'aaaaaaaa')
+        self.assertEqual(self.cache.stats()['size'], 8)
+        self.cache.delete('a')
+        self.cache.delete('a')
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.stats()['size'], 0)
+
+    def test_value_too_large(self):
+        self.cache.set('a', 'a')
+        self.cache.set('big', 'x' * 11)
+        self.assertNotIn('big', self.cache)
+        self.assertIn('a', self.cache)
+
+    def test_explicit_size(self):
+        self.cache.set('a', object(), size=6)
+        self.cache.set('b', object(), size=6)
+        self.assertEqual(len(self.cache), 1)
+        self.assertIn('b', self.cache)
+
+    def test_on_evict(self):
+        evicted = []
+        cache = ProcessLRUCache(max_size=10, on_evict=lambda key, value: evicted.append((key, value)))
+        cache.set('a', 'aaaa')
+        cache.set('b', 'bbbb')
+        cache.delete('b')
+        cache.set('c', 'cccccccc')
+        self.assertEqual(evicted, [('a', 'aaaa')])
@@ -269,6 +269,16 @@ def replace_static_urls(data_dir, block, view, frag, context, course_id=None, st
     ))
 
 
+def rewrite_urls(url_rewriter, block, view, frag, context):  # pylint: disable=unused-argument
+    """
+    Updates the supplied module with a new get_html function that wraps
+    the old get_html function and rewrites its /static/, /course/ and
+    /jump_to_id/ urls in a single pass, with the given
+    :class:`~static_replace.CourseUrlRewriter`.
+    """
+    return wrap_fragment(frag, url_rewriter.rewrite(frag.content))
+
+
 def grade_histogram(module_id):
     '''
     Print out a histogram of grades on a given problem in staff member debug info.
@@ -247,7 +247,8 @@ class CourseXBlockApi(APIView):
 
             # get the block, which verifies whether the user has access to the block.
             block, _ = get_module_by_usage_id(
-                request, text_type(course_key), text_type(usage_key), disable_staff_debug_info=True, course=course
+                request, text_type(course_key), text_type(usage_key), disable_staff_debug_info=True, course=course,
+                prefetch_definitions=True,
             )
 
             student_view_context = request.GET.dict()